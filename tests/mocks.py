@@ -8,9 +8,9 @@
 from __future__ import annotations
 
 import time
-from mlflow.entities import LifecycleStage, RunStatus
+from mlflow.entities import LifecycleStage, Metric, Param, RunStatus, RunTag
 from mlflow.entities.run import Run, RunData, RunInfo
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 import pytest
 
 from unittest import mock
@@ -98,6 +98,7 @@ class TrackingServer:
         self.__current_run_id:int = 0
         self.__current_run:ActiveRun = None
         self.__runs:Dict[str, ActiveRun] = dict()
+        self.__artifacts:Dict[str, Dict[str, str]] = dict()
         self.set_experiment(experiment_name=Experiment.DEFAULT_EXPERIMENT_NAME)
 
     def start_run(self, run_name:str=None, run_id:int=None, nested:bool=True) -> ActiveRun:
@@ -124,7 +125,7 @@ class TrackingServer:
                 run_data = RunData()
             )
 
-            self.__runs[self.__current_experiment_id] = run    
+            self.__runs[run.info.run_id] = run
 
         self.__current_run = ActiveRun(run)
         return self.__current_run
@@ -162,20 +163,27 @@ class TrackingServer:
             current_run.data.status = status
             self.__current_run = None
 
-    def set_tag(self, key: str, value: Any) -> None:
-        run_data:RunData = self.active_run().data
-        if run_data:
-            run_data.tags[key] = value
+    def log_batch(self, run_id: str, metrics: List[Metric] = (), params: List[Param] = (), tags: List[RunTag] = ()) -> None:
+        run_data:RunData = self.__runs[run_id].data
+        run_data.metrics.update({m.key: m.value for m in metrics})
+        run_data.params.update({p.key: p.value for p in params})
+        run_data.tags.update({t.key: t.value for t in tags})
 
-    def set_tags(self, tags: Dict[str, Any]) -> None:
-        run_data:RunData = self.active_run().data
-        if run_data:
-            run_data.tags.update(tags)
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        self.__artifacts.setdefault(run_id, dict())[artifact_file] = text
 
-    def log_param(self, key: str, value: Any) -> None:
-        run_data:RunData = self.active_run().data
-        if run_data:
-            run_data.params[key] = value
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        with open(local_path, "rb") as f:
+            self.__artifacts.setdefault(run_id, dict())[local_path] = f.read()
+
+    def set_terminated(self, run_id: str, status: Optional[str] = None) -> None:
+        self.__runs[run_id].info._status = status
+
+    def search_runs(self, *args, **kwargs) -> List[Run]:
+        return []
+
+    def artifacts(self, run_id: str) -> Dict[str, str]:
+        return self.__artifacts.get(run_id, dict())
 
     def active_run(self) -> ActiveRun:
         return self.__current_run
@@ -222,14 +230,43 @@ def mock_active_run():
         
 
 @pytest.fixture(autouse=True)
-def mock_set_tags():
-    with mock.patch("mlflow.set_tags") as mocked_function:
-        mocked_function.side_effect = mocked_server.set_tags
-        yield mocked_function
+def mock_client():
+    # the client addressing runs explicitly, on the tracking server mlflow is set to
+    client:mock.Mock = mock.Mock()
+    for method in ("log_batch", "log_text", "log_artifact", "set_terminated"):
+        getattr(client, method).side_effect = getattr(mocked_server, method)
+    with mock.patch("veil.sinks._fluent_client") as mocked_function:
+        mocked_function.return_value = client
+        yield client
+
+
+@pytest.fixture
+def mock_log_batch(mock_client):
+    yield mock_client.log_batch
+
+
+@pytest.fixture
+def mock_log_text(mock_client):
+    yield mock_client.log_text
+
+
+@pytest.fixture
+def mock_log_artifact(mock_client):
+    yield mock_client.log_artifact
+
+
+def logged(mock_log_batch:mock.Mock, kind:str) -> List[Dict[str, str]]:
+    """Returns the params, tags or metrics logged by each call of a mocked log_batch,
+    skipping the calls logging none.
+    """
+    return [
+        {entry.key: entry.value for entry in call.kwargs[kind]}
+        for call in mock_log_batch.call_args_list if call.kwargs.get(kind)
+    ]
 
 
 @pytest.fixture(autouse=True)
-def mock_log_param():
-    with mock.patch("mlflow.log_param") as mocked_function:
-        mocked_function.side_effect = mocked_server.log_param
-        yield mocked_function
\ No newline at end of file
+def mock_search_runs():
+    with mock.patch("mlflow.search_runs") as mocked_function:
+        mocked_function.side_effect = mocked_server.search_runs
+        yield mocked_function
@@ -0,0 +1,230 @@
+from array import array
+from typing import Any, Dict, List
+import json
+import os
+import tempfile
+import pytest
+
+from mlflow.tracking import MlflowClient
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+import veil.artifacts
+from veil.artifacts import as_buffer, current_run, mapped, spool_file, write_buffer
+from veil.decorators import Autologger, Run
+from veil.sinks import BatchingSink, JsonlSink, MlflowSink, NoopSink
+
+
+
+class LinkingSink(NoopSink):
+
+    def __init__(self):
+        self.artifacts:List[tuple] = []
+
+    def log_artifact(self, run_id:str, local_path:str, artifact_path = None) -> None:
+        self.artifacts.append((os.path.basename(local_path), os.stat(local_path).st_ino, artifact_path))
+
+
+
+class TestBuffers:
+    """
+    Test suite designed for veil.artifacts.as_buffer, veil.artifacts.write_buffer,
+    veil.artifacts.mapped and veil.artifacts.spool_file.
+    """
+
+    def test_as_buffer_correctness(self) -> None:
+        """
+        Checks whether as_buffer views the bytes of buffers of any item type
+        without copying them.
+        """
+        data:array = array("d", [1.0, 2.0, 3.0])
+        view:memoryview = as_buffer(data)
+        data[0] = 4.0
+
+        assert((view.format, len(view)) == ("B", 24))
+        assert(bytes(view) == data.tobytes())
+
+
+
+    @pytest.mark.parametrize("illegal_value,error", [(memoryview(b"abcdef")[::2], ValueError), (1, TypeError)])
+    def test_as_buffer_error_on_illegal_value(self, illegal_value:Any, error:type) -> None:
+        """
+        Checks whether as_buffer raises on non-contiguous buffers and objects
+        not supporting the buffer protocol.
+        """
+        with pytest.raises(error):
+            as_buffer(illegal_value)
+
+
+
+    def test_write_buffer_correctness(self, tmp_path, monkeypatch) -> None:
+        """
+        Checks whether write_buffer writes every slice of the buffer.
+        """
+        monkeypatch.setattr(veil.artifacts, "CHUNK_BYTES", 7)
+        data:bytes = os.urandom(100)
+
+        assert(write_buffer(data, str(tmp_path / "data.bin")) == 100)
+        assert((tmp_path / "data.bin").read_bytes() == data)
+
+
+
+    @pytest.mark.parametrize("content", [b"", b"content"])
+    def test_mapped_correctness(self, tmp_path, content:bytes) -> None:
+        """
+        Checks whether mapped views the bytes of a file, empty ones included.
+        """
+        (tmp_path / "data.bin").write_bytes(content)
+
+        with mapped(str(tmp_path / "data.bin")) as view:
+            assert(bytes(view) == content)
+
+
+
+    @pytest.mark.parametrize("linkable", [True, False])
+    def test_spool_file_correctness(self, tmp_path, monkeypatch, linkable:bool) -> None:
+        """
+        Checks whether spool_file hard-links the file under its new name,
+        copying it when it cannot be linked (e.g. across file systems).
+        """
+        (tmp_path / "local.bin").write_bytes(b"content")
+        if not linkable:
+            def link(source, destination): raise OSError("cross-device link")
+            monkeypatch.setattr(os, "link", link)
+
+        path:str = spool_file(str(tmp_path / "local.bin"), "renamed.bin")
+
+        assert(os.path.basename(path) == "renamed.bin")
+        with open(path, "rb") as f:
+            assert(f.read() == b"content")
+        assert(os.path.samefile(path, tmp_path / "local.bin") == linkable)
+
+
+
+class TestLogArtifact:
+    """
+    Test suite designed for the veil.decorators.Autologger.log_artifact method.
+    """
+
+    def test_log_artifact_correctness(self, tmp_path) -> None:
+        """
+        Checks whether log_artifact stores buffers and files on the run of
+        the innermost decorated call, and on the session outside of them.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink)
+        (tmp_path / "local.bin").write_bytes(b"file")
+
+        @Run(autologger = autologger)
+        def annotated_function():
+            autologger.log_artifact(bytearray(b"buffer"), "data/buffer.bin")
+            autologger.log_artifact(str(tmp_path / "local.bin"))
+            autologger.log_artifact(tmp_path / "local.bin", "data/renamed.bin")
+
+        assert(current_run() is None)
+        with autologger.start_session():
+            annotated_function()
+            autologger.log_artifact(memoryview(b"session"), "session.bin")
+        sink.close()
+
+        with open(sink.path) as f:
+            events:List[Dict[str, Any]] = [json.loads(line) for line in f]
+        artifacts:Dict[str, Dict[str, Any]] = {e["artifact_file"]: e for e in events if e["event"] == "log_artifact"}
+        child_id:str = next(e["run_id"] for e in events if e["event"] == "start_run")
+
+        assert(sorted(artifacts) == ["data/buffer.bin", "data/renamed.bin", "local.bin", "session.bin"])
+        assert(all(artifacts[f]["run_id"] == child_id for f in ["data/buffer.bin", "data/renamed.bin", "local.bin"]))
+        assert(artifacts["session.bin"]["run_id"] == events[0]["run_id"])
+        assert(sink.load_artifact(child_id, "data/renamed.bin") is not None)
+        with open(sink.load_artifact(child_id, "data/buffer.bin"), "rb") as f:
+            assert(f.read() == b"buffer")
+        assert(current_run() is None)
+
+
+
+    def test_log_artifact_correctness_without_session(self, tmp_path) -> None:
+        """
+        Checks whether log_artifact stores nothing outside of sessions.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        Autologger(sink = sink).log_artifact(b"buffer", "buffer.bin")
+        sink.close()
+
+        assert(not os.path.exists(sink.artifacts_dir))
+
+
+
+    def test_log_artifact_correctness_on_mlflow_sink(self, tmp_path) -> None:
+        """
+        Checks whether buffers reach the artifacts of the child run on a
+        tracking server.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(sink = MlflowSink(tracking_uri), experiment_name = "experiment")
+
+        @Run(autologger = autologger)
+        def annotated_function():
+            autologger.log_artifact(array("i", range(1000)), "data/values.bin")
+
+        with autologger.start_session():
+            annotated_function()
+
+        client:MlflowClient = MlflowClient(tracking_uri)
+        runs = client.search_runs([client.get_experiment_by_name("experiment").experiment_id])
+        child = next(r for r in runs if MLFLOW_PARENT_RUN_ID in r.data.tags)
+        with open(client.download_artifacts(child.info.run_id, "data/values.bin", str(tmp_path)), "rb") as f:
+            assert(f.read() == array("i", range(1000)).tobytes())
+
+
+
+    def test_log_artifact_correctness_on_batching_sink(self, tmp_path, monkeypatch) -> None:
+        """
+        Checks whether BatchingSink delivers the buffers as they were when
+        logged, removing their spooled copies.
+        """
+        (tmp_path / "spool").mkdir()
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "spool"))
+        target:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        sink:BatchingSink = BatchingSink(target)
+        session_id:str = sink.start_session("experiment", "session")
+        data:bytearray = bytearray(b"before")
+        sink.log_bytes(session_id, data, "data.bin")
+        data[:] = b"after!"
+        assert(len(os.listdir(tmp_path / "spool")) == 1)
+        sink.end_session(session_id, "FINISHED")
+        target.close()
+
+        with open(target.path) as f:
+            event:Dict[str, Any] = next(e for e in map(json.loads, f) if e["event"] == "log_artifact")
+        with open(event["path"], "rb") as f:
+            assert(f.read() == b"before")
+        assert(os.listdir(tmp_path / "spool") == [])
+
+
+
+    def test_log_artifact_correctness_on_renamed_file(self, tmp_path, monkeypatch) -> None:
+        """
+        Checks whether renamed files are handed over to the sink hard-linked
+        under their artifact name, the link being removed afterwards.
+        """
+        (tmp_path / "spool").mkdir()
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "spool"))
+        (tmp_path / "local.bin").write_bytes(b"file")
+        sink:LinkingSink = LinkingSink()
+        autologger:Autologger = Autologger(sink = sink)
+
+        with autologger.start_session():
+            autologger.log_artifact(tmp_path / "local.bin", "data/renamed.bin")
+
+        assert(sink.artifacts == [("renamed.bin", os.stat(tmp_path / "local.bin").st_ino, "data")])
+        assert(os.listdir(tmp_path / "spool") == [])
+        assert((tmp_path / "local.bin").read_bytes() == b"file")
+
+
+
+    def test_log_artifact_value_error_on_missing_artifact_file(self) -> None:
+        """
+        Checks whether log_artifact raises a ValueError when a buffer comes
+        without an artifact_file.
+        """
+        with pytest.raises(ValueError):
+            Autologger().log_artifact(b"buffer")
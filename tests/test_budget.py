@@ -0,0 +1,172 @@
+from typing import List
+import time
+import pytest
+
+from veil.budget import BackgroundDelivery, BudgetCounters, LoggingBudget, POLICY_DEFER, POLICY_DROP
+
+
+
+class TestLoggingBudget:
+    """
+    Test suite designed for methods belonging to the
+    veil.budget.LoggingBudget class.
+    """
+
+    #
+    # section: LoggingBudget.dispatch
+    #
+    @pytest.mark.parametrize("policy", [POLICY_DEFER, POLICY_DROP])
+    def test_dispatch_correctness_on_no_budget(self, policy) -> None:
+        """
+        Checks whether LoggingBudget.dispatch always performs operations
+        inline when no budget has been configured.
+        """
+        calls:List[str] = []
+        budget:LoggingBudget = LoggingBudget(None, policy, BudgetCounters(), BackgroundDelivery())
+
+        assert(budget.dispatch("tags", inline=lambda: calls.append("inline")))
+        assert(calls == ["inline"])
+
+
+
+    def test_dispatch_correctness_on_exceeded_budget_with_defer_policy(self) -> None:
+        """
+        Checks whether LoggingBudget.dispatch defers over-budget operations
+        to the background delivery and counts them.
+        """
+        calls:List[str] = []
+        counters:BudgetCounters = BudgetCounters()
+        delivery:BackgroundDelivery = BackgroundDelivery()
+        budget:LoggingBudget = LoggingBudget(0.0, POLICY_DEFER, counters, delivery)
+        time.sleep(0.001)
+
+        performed:bool = budget.dispatch(
+            "tags",
+            inline=lambda: calls.append("inline"),
+            deferred=lambda: calls.append("deferred"),
+            amount=3
+        )
+        delivery.flush()
+
+        assert(not performed)
+        assert(calls == ["deferred"])
+        assert(counters.snapshot()["deferred"]["tags"] == 3)
+        assert(counters.snapshot()["dropped"]["tags"] == 0)
+
+
+
+    def test_dispatch_correctness_on_exceeded_budget_with_drop_policy(self) -> None:
+        """
+        Checks whether LoggingBudget.dispatch drops over-budget operations
+        and counts them.
+        """
+        calls:List[str] = []
+        counters:BudgetCounters = BudgetCounters()
+        budget:LoggingBudget = LoggingBudget(0.0, POLICY_DROP, counters, BackgroundDelivery())
+        time.sleep(0.001)
+
+        budget.dispatch(
+            "params",
+            inline=lambda: calls.append("inline"),
+            deferred=lambda: calls.append("deferred"),
+            amount=2
+        )
+
+        assert(calls == [])
+        assert(counters.snapshot()["dropped"]["params"] == 2)
+
+
+
+    def test_dispatch_correctness_on_undeferrable_operation(self) -> None:
+        """
+        Checks whether LoggingBudget.dispatch drops over-budget operations
+        that cannot be deferred even if the policy is "defer".
+        """
+        counters:BudgetCounters = BudgetCounters()
+        budget:LoggingBudget = LoggingBudget(0.0, POLICY_DEFER, counters, BackgroundDelivery())
+        time.sleep(0.001)
+
+        budget.dispatch("tags", inline=lambda: None)
+
+        assert(counters.snapshot()["dropped"]["tags"] == 1)
+
+
+
+    def test_dispatch_correctness_on_priority_order(self) -> None:
+        """
+        Checks whether LoggingBudget.dispatch sacrifices the operations of
+        lower priority once one of higher priority has been sacrificed, even
+        if they would fit the budget.
+        """
+        calls:List[str] = []
+        counters:BudgetCounters = BudgetCounters()
+        counters.observe("params", 500.0)
+        budget:LoggingBudget = LoggingBudget(50.0, POLICY_DROP, counters, BackgroundDelivery())
+
+        assert(not budget.dispatch("params", inline=lambda: calls.append("params")))
+        assert(not budget.dispatch("tags", inline=lambda: calls.append("tags"), amount=2))
+        assert(budget.dispatch("status", inline=lambda: calls.append("status")))
+
+        assert(calls == ["status"])
+        assert(counters.snapshot()["dropped"]["tags"] == 2)
+
+
+
+    def test_dispatch_correctness_on_expected_operations(self) -> None:
+        """
+        Checks whether LoggingBudget.dispatch reserves the budget of the
+        expected operations of higher priority, and only theirs.
+        """
+        calls:List[str] = []
+        counters:BudgetCounters = BudgetCounters()
+        counters.observe("status", 500.0)
+        counters.observe("artifacts", 500.0)
+        budget:LoggingBudget = LoggingBudget(50.0, POLICY_DROP, counters, BackgroundDelivery())
+        budget.expect("status", "params", "artifacts")
+
+        assert(not budget.dispatch("tags", inline=lambda: calls.append("tags")))
+        budget.perform("status", lambda: calls.append("status"))
+        assert(budget.dispatch("params", inline=lambda: calls.append("params")))
+
+        assert(calls == ["status", "params"])
+
+
+
+    #
+    # section: LoggingBudget.suspended
+    #
+    def test_suspended_correctness(self) -> None:
+        """
+        Checks whether the time spent within LoggingBudget.suspended is
+        not accounted to the budget.
+        """
+        calls:List[str] = []
+        budget:LoggingBudget = LoggingBudget(50.0, POLICY_DROP, BudgetCounters(), BackgroundDelivery())
+
+        with budget.suspended():
+            time.sleep(0.1)
+
+        assert(budget.spent_ms < 50.0)
+        assert(budget.dispatch("tags", inline=lambda: calls.append("inline")))
+        assert(calls == ["inline"])
+
+
+
+class TestBudgetCounters:
+    """
+    Test suite designed for methods belonging to the
+    veil.budget.BudgetCounters class.
+    """
+
+    def test_reset_correctness(self) -> None:
+        """
+        Checks whether BudgetCounters.reset zeroes every counter.
+        """
+        counters:BudgetCounters = BudgetCounters()
+        counters.count_deferred("tags", 2)
+        counters.count_dropped("status")
+        counters.reset()
+
+        snapshot = counters.snapshot()
+        assert(sum(snapshot["deferred"].values()) == 0)
+        assert(sum(snapshot["dropped"].values()) == 0)
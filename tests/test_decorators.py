@@ -3,10 +3,11 @@ from unittest.mock import Mock
 import mlflow
 from mlflow.tracking.fluent import ActiveRun
 from mlflow.entities import Experiment, RunData, RunInfo
+from mlflow.utils.mlflow_tags import MLFLOW_GIT_COMMIT
 import pytest
 from typeguard import TypeCheckError
 
-from veil.decorators import Run, AutologSession, Autologger, MlflowIsolated, _get_repo_info
+from veil.decorators import Run, AutologSession, Autologger, MlflowIsolated, _get_repo_info, _read_repo_info_with_gitpython
 from veil.types import StringDict, StringList
 
 from tests.mocks import (
@@ -17,9 +18,10 @@ from tests.mocks import (
     mock_active_run, 
     mock_start_run, 
     mock_set_experiment, 
-    mock_log_param, 
+    mock_client, 
     mock_end_run, 
-    mock_set_tags,
+    mock_log_batch,
+    logged,
 )
 
 
@@ -71,6 +73,32 @@ class TestAutologger:
 
 
 
+    @pytest.mark.parametrize("illegal_value", ["wrong", [1.0]])
+    def test_init_type_check_error_on_illegal_logging_budget_ms(self, illegal_value) -> None:
+        """
+        Checks whether Autologger.__init__ raises a TypeCheckError when
+        logging_budget_ms is of illegal type.
+        """
+        with pytest.raises(TypeCheckError):
+            Autologger(
+                logging_budget_ms = illegal_value
+            )
+
+
+
+    @pytest.mark.parametrize("illegal_value", [None, 1, "wrong"])
+    def test_init_type_check_error_on_illegal_budget_policy(self, illegal_value) -> None:
+        """
+        Checks whether Autologger.__init__ raises a TypeCheckError when
+        budget_policy is of illegal value.
+        """
+        with pytest.raises(TypeCheckError):
+            Autologger(
+                budget_policy = illegal_value
+            )
+
+
+
     def test_init_correctness_on_default_arguments(self) -> None:
         """
         Checks whether Autologger.__init__ returns an Autologger instance
@@ -892,8 +920,7 @@ class TestRun:
         mock_start_run:Mock,
         mock_end_run:Mock,
         mock_active_run:Mock,
-        mock_log_param:Mock,
-        mock_set_tags:Mock,
+        mock_log_batch:Mock,
         mock_set_experiment:Mock) -> None:
 
         autologger:Autologger = Autologger(is_autolog_enabled = False)
@@ -904,8 +931,7 @@ class TestRun:
             mock_end_run.assert_not_called()
             mock_set_experiment.assert_not_called()
             mock_active_run.assert_not_called()
-            mock_log_param.assert_not_called()
-            mock_set_tags.assert_not_called()
+            mock_log_batch.assert_not_called()
 
         with autologger.start_session():
             annotated_function()
@@ -916,8 +942,7 @@ class TestRun:
         mock_start_run:Mock,
         mock_end_run:Mock,
         mock_active_run:Mock,
-        mock_log_param:Mock,
-        mock_set_tags:Mock,
+        mock_log_batch:Mock,
         mock_set_experiment:Mock) -> None:
 
         autologger:Autologger = Autologger(is_autolog_enabled = False)
@@ -928,8 +953,7 @@ class TestRun:
             mock_end_run.assert_not_called()
             mock_set_experiment.assert_not_called()
             mock_active_run.assert_not_called()
-            mock_log_param.assert_not_called()
-            mock_set_tags.assert_not_called()
+            mock_log_batch.assert_not_called()
 
         annotated_function()
             
@@ -943,7 +967,7 @@ class TestRun:
     ])
     def test_call_correctness_on_log_params(
         self,
-        mock_log_param:Mock,
+        mock_log_batch:Mock,
         log_params,
         args:List[str],
         kwargs:Dict[str, int]
@@ -958,11 +982,12 @@ class TestRun:
 
         @Run(autologger = autologger, log_params=log_params)
         def annotated_function(a, b, c, d, e):
+            logged_params:int = sum(len(params) for params in logged(mock_log_batch, "params"))
             if len(log_params) == 0:
-                assert(mock_log_param.call_count == len(kwargs))
+                assert(logged_params == len(kwargs))
             else:
                 common_args:Set[str] = set(kwargs.keys()).intersection(log_params)
-                assert(mock_log_param.call_count == len(common_args))
+                assert(logged_params == len(common_args))
 
         with autologger.start_session():
             annotated_function(*args, **kwargs)
@@ -1001,13 +1026,82 @@ class TestRun:
             annotated_function()
 
 
+    @pytest.mark.parametrize("session_tags", [{}, {"a":"1"}])
+    @pytest.mark.parametrize("run_tags", [{}, {"b":"1"}, {"a":"2"}, {"a":"1", "b":"1"}])
+    def test_call_correctness_on_tags_on_parent(
+        self,
+        mock_git_correct_repo:Mock,
+        mock_log_batch:Mock,
+        session_tags:StringDict,
+        run_tags:StringDict
+    ) -> None:
+        """
+        Checks that, within a session setting tags on the parent run, the
+        session and git tags are set once on the parent while child runs
+        get only the tags differing from the session ones.
+        """
+        autologger:Autologger = Autologger(is_autolog_enabled = True)
+
+        @Run(autologger = autologger, log_tags=run_tags)
+        def annotated_function():
+            pass
+
+        with autologger.start_session(log_tags=session_tags, tags_on_parent=True):
+            parent_tags:StringDict = logged(mock_log_batch, "tags")[0]
+            for _ in range(3):
+                annotated_function()
+
+        delta_tags:StringDict = {k: v for k, v in run_tags.items() if session_tags.get(k) != v}
+        assert(parent_tags == {**session_tags, **parent_tags})
+        assert(MLFLOW_GIT_COMMIT in parent_tags)
+        child_tags:List[StringDict] = logged(mock_log_batch, "tags")[1:]
+        assert(len(child_tags) == (3 if delta_tags else 0))
+        for tags in child_tags:
+            assert(tags == delta_tags)
+
+
+
+    @pytest.mark.parametrize("budget_policy, counter", [("defer", "deferred"), ("drop", "dropped")])
+    def test_call_correctness_on_exceeded_logging_budget(
+        self,
+        mock_log_batch:Mock,
+        budget_policy:str,
+        counter:str
+    ) -> None:
+        """
+        Checks that calling the Run decorator with an exhausted logging budget
+        does not log params and tags inline, while still invoking the function
+        and counting the deferred/dropped operations.
+        """
+        autologger:Autologger = Autologger(
+            is_autolog_enabled = True,
+            logging_budget_ms = 0.0,
+            budget_policy = budget_policy
+        )
+        autologger._delivery.submit = Mock()
+
+        @Run(autologger = autologger)
+        def annotated_function(a):
+            return a
+
+        with autologger.start_session():
+            assert(annotated_function(a = 1) == 1)
+
+        assert(logged(mock_log_batch, "params") == [] and logged(mock_log_batch, "tags") == [])
+
+        counters:Dict[str, int] = autologger.budget_counters.snapshot()[counter]
+        assert(counters["params"] == 1)
+        assert(counters["tags"] == 3)
+        assert(autologger._delivery.submit.call_count == (2 if budget_policy == "defer" else 0))
+
+
 class TestGitRepo:
 
     def test_git_repo_info_on_correct_repo(
         self, 
         mock_git_correct_repo: Mock,
     ):
-        repo_uri, sha_commit, branch_name = _get_repo_info()
+        repo_uri, sha_commit, branch_name = _read_repo_info_with_gitpython()
 
         assert (repo_uri is not None)
         assert (sha_commit is not None)
@@ -1017,7 +1111,7 @@ class TestGitRepo:
         self, 
         mock_git_wrong_repo: Mock,
     ):
-        repo_uri, sha_commit, branch_name = _get_repo_info()
+        repo_uri, sha_commit, branch_name = _read_repo_info_with_gitpython()
 
         assert (repo_uri is None)
         assert (sha_commit is None)
@@ -1027,7 +1121,7 @@ class TestGitRepo:
         self, 
         mock_git_detached_head: Mock,
     ):
-        repo_uri, sha_commit, branch_name = _get_repo_info()
+        repo_uri, sha_commit, branch_name = _read_repo_info_with_gitpython()
 
         assert (repo_uri is not None)
         assert (sha_commit is not None)
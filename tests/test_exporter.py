@@ -0,0 +1,123 @@
+from typing import Dict, List
+from urllib.error import HTTPError
+from urllib.request import urlopen
+import pytest
+
+import veil
+from veil.decorators import Autologger, Run
+from veil.exporter import CONTENT_TYPE, MetricsExporter, render_metrics
+from veil.overhead import LATENCY_BUCKETS_S, CallTimer, StatsRegistry
+from veil.sinks import JsonlSink
+
+
+def samples(text:str) -> Dict[str, float]:
+    return {
+        line.rpartition(" ")[0]: float(line.rpartition(" ")[2])
+        for line in text.splitlines() if not line.startswith("#")
+    }
+
+
+
+class TestRenderMetrics:
+    """
+    Test suite designed for veil.exporter.render_metrics.
+    """
+
+    def test_render_metrics_correctness(self) -> None:
+        """
+        Checks whether render_metrics exposes the counters of each function
+        and a cumulative duration histogram.
+        """
+        registry:StatsRegistry = StatsRegistry()
+        timer:CallTimer = CallTimer()
+        timer.user_s = 0.002
+        registry.record_call("f", 0.003, timer, False)
+        registry.record_call("f", 0.3, timer, True)
+        registry.record_call("f", 1000.0, timer, False)
+
+        metrics:Dict[str, float] = samples(render_metrics(registry.snapshot()))
+        assert(metrics['veil_function_calls_total{function="f"}'] == 3)
+        assert(metrics['veil_function_errors_total{function="f"}'] == 1)
+        assert(metrics['veil_function_user_seconds_total{function="f"}'] == pytest.approx(0.006))
+        assert(metrics['veil_function_duration_seconds_bucket{function="f",le="0.001"}'] == 0)
+        assert(metrics['veil_function_duration_seconds_bucket{function="f",le="0.005"}'] == 1)
+        assert(metrics['veil_function_duration_seconds_bucket{function="f",le="0.5"}'] == 2)
+        assert(metrics['veil_function_duration_seconds_bucket{function="f",le="300.0"}'] == 2)
+        assert(metrics['veil_function_duration_seconds_bucket{function="f",le="+Inf"}'] == 3)
+        assert(metrics['veil_function_duration_seconds_sum{function="f"}'] == pytest.approx(1000.303))
+        assert(metrics['veil_function_duration_seconds_count{function="f"}'] == 3)
+        assert(metrics['veil_sessions_total{phase="enter"}'] == 0)
+        assert(metrics["veil_git_lookups_total"] == 0)
+
+
+
+    def test_render_metrics_correctness_on_escaped_labels(self) -> None:
+        """
+        Checks whether render_metrics escapes quotes, backslashes and newlines
+        in function names.
+        """
+        registry:StatsRegistry = StatsRegistry()
+        registry.record_call('a"b\\c\nd', 0.1, CallTimer(), False)
+
+        text:str = render_metrics(registry.snapshot())
+        assert('veil_function_calls_total{function="a\\"b\\\\c\\nd"} 1' in text.splitlines())
+
+
+
+class TestMetricsExporter:
+    """
+    Test suite designed for the veil.exporter.MetricsExporter class.
+    """
+
+    def test_start_correctness(self) -> None:
+        """
+        Checks whether MetricsExporter serves the statistics at /metrics, as
+        they were at the time of each scrape.
+        """
+        registry:StatsRegistry = StatsRegistry()
+        with MetricsExporter(port = 0, stats_registry = registry) as exporter:
+            assert(exporter.is_running and exporter.address[1] != 0)
+            with urlopen(exporter.url) as response:
+                assert(response.headers["Content-Type"] == CONTENT_TYPE)
+                assert("veil_function_calls_total" not in samples(response.read().decode()))
+
+            registry.record_call("f", 0.1, CallTimer(), False)
+            with urlopen(exporter.url) as response:
+                assert(samples(response.read().decode())['veil_function_calls_total{function="f"}'] == 1)
+
+            with pytest.raises(HTTPError) as error:
+                urlopen(exporter.url.replace("/metrics", "/other"))
+            assert(error.value.code == 404)
+        assert(not exporter.is_running)
+
+
+
+    def test_start_correctness_on_decorated_function(self, tmp_path) -> None:
+        """
+        Checks whether veil.start_exporter exposes the calls of decorated
+        functions, and veil.stop_exporter releases the address.
+        """
+        veil.reset_stats()
+        autologger:Autologger = Autologger(sink = JsonlSink(str(tmp_path / "events.jsonl")))
+
+        @Run(autologger = autologger, name = "other")
+        def annotated_function():
+            pass
+
+        exporter:MetricsExporter = veil.start_exporter(port = 0)
+        try:
+            assert(veil.start_exporter() is exporter)
+            with autologger.start_session():
+                for _ in range(5):
+                    annotated_function()
+
+            with urlopen(exporter.url) as response:
+                metrics:Dict[str, float] = samples(response.read().decode())
+            name:str = f"{__name__}.{annotated_function.__qualname__}"
+            assert(metrics[f'veil_function_calls_total{{function="{name}"}}'] == 5)
+            assert(metrics[f'veil_function_duration_seconds_bucket{{function="{name}",le="+Inf"}}'] == 5)
+            assert(metrics['veil_sessions_total{phase="exit"}'] == 1)
+        finally:
+            veil.stop_exporter()
+            veil.reset_stats()
+        assert(not exporter.is_running)
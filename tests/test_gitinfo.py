@@ -0,0 +1,204 @@
+from typing import Dict
+import os
+import pytest
+
+import veil
+from veil.decorators import _get_repo_info
+from veil.gitinfo import find_git_dir, read_ci_repo_info, read_repo_info
+
+
+SHA_MAIN:str = "a" * 40
+SHA_TAG:str = "b" * 40
+SHA_DETACHED:str = "c" * 40
+
+CONFIG:str = """[core]
+\trepositoryformatversion = 0
+[remote "origin"]
+\turl = https://example.org/veil.git
+\tfetch = +refs/heads/*:refs/remotes/origin/*
+[remote "mirror"]
+\turl = https://mirror.example.org/veil.git
+"""
+
+
+def write(path, content:str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git_dir = tmp_path / "repo" / ".git"
+    write(git_dir / "HEAD", "ref: refs/heads/main\n")
+    write(git_dir / "config", CONFIG)
+    write(git_dir / "refs" / "heads" / "main", SHA_MAIN + "\n")
+    write(git_dir / "packed-refs", f"# pack-refs with: peeled\n{SHA_TAG} refs/heads/packed\n^{SHA_MAIN}\n")
+    os.makedirs(tmp_path / "repo" / "src" / "module")
+    return tmp_path / "repo"
+
+
+@pytest.fixture
+def clean_environ(monkeypatch):
+    for variable in list(os.environ):
+        if variable.startswith(("GITHUB_", "CI_", "BITBUCKET_", "BUILD_", "GIT_", "CIRCLE_")):
+            monkeypatch.delenv(variable)
+
+
+
+
+class TestReadRepoInfo:
+    """
+    Test suite designed for veil.gitinfo.read_repo_info.
+    """
+
+    def test_read_repo_info_correctness_on_loose_ref(self, repo) -> None:
+        """
+        Checks whether read_repo_info resolves the first remote, the HEAD
+        commit and the branch, also from subdirectories.
+        """
+        expected = ("https://example.org/veil.git", SHA_MAIN, "main")
+        assert(read_repo_info(str(repo)) == expected)
+        assert(read_repo_info(str(repo / "src" / "module")) == expected)
+
+
+
+    def test_read_repo_info_correctness_on_packed_ref(self, repo) -> None:
+        """
+        Checks whether read_repo_info resolves branches from packed-refs.
+        """
+        write(repo / ".git" / "HEAD", "ref: refs/heads/packed\n")
+        assert(read_repo_info(str(repo)) == ("https://example.org/veil.git", SHA_TAG, "packed"))
+
+
+
+    def test_read_repo_info_correctness_on_detached_head(self, repo) -> None:
+        """
+        Checks whether read_repo_info returns no branch on detached HEAD.
+        """
+        write(repo / ".git" / "HEAD", SHA_DETACHED + "\n")
+        assert(read_repo_info(str(repo)) == ("https://example.org/veil.git", SHA_DETACHED, None))
+
+
+
+    def test_read_repo_info_correctness_on_unborn_branch(self, repo) -> None:
+        """
+        Checks whether read_repo_info returns no commit on branches
+        without commits.
+        """
+        write(repo / ".git" / "HEAD", "ref: refs/heads/unborn\n")
+        assert(read_repo_info(str(repo)) == ("https://example.org/veil.git", None, "unborn"))
+
+
+
+    def test_read_repo_info_correctness_on_worktree(self, repo, tmp_path) -> None:
+        """
+        Checks whether read_repo_info resolves linked worktrees, whose refs
+        and config live in the common git directory.
+        """
+        worktree_git_dir = repo / ".git" / "worktrees" / "feature"
+        write(worktree_git_dir / "HEAD", "ref: refs/heads/feature\n")
+        write(worktree_git_dir / "commondir", "../..\n")
+        write(repo / ".git" / "refs" / "heads" / "feature", SHA_DETACHED + "\n")
+        write(tmp_path / "feature" / ".git", f"gitdir: {worktree_git_dir}\n")
+
+        assert(find_git_dir(str(tmp_path / "feature")) == (str(worktree_git_dir), str(repo / ".git")))
+        assert(read_repo_info(str(tmp_path / "feature")) == ("https://example.org/veil.git", SHA_DETACHED, "feature"))
+
+
+
+    def test_read_repo_info_correctness_on_no_repo(self, tmp_path) -> None:
+        """
+        Checks whether read_repo_info returns None outside repositories.
+        """
+        assert(read_repo_info(str(tmp_path)) is None)
+
+
+
+class TestReadCiRepoInfo:
+    """
+    Test suite designed for veil.gitinfo.read_ci_repo_info.
+    """
+
+    @pytest.mark.parametrize("environ, expected", [
+        ({}, (None, None, None)),
+        (
+            {"GITHUB_SHA":SHA_MAIN, "GITHUB_REF_NAME":"main", "GITHUB_SERVER_URL":"https://github.com", "GITHUB_REPOSITORY":"veil-org/veil"},
+            ("https://github.com/veil-org/veil", SHA_MAIN, "main")
+        ),
+        (
+            {"CI_COMMIT_SHA":SHA_MAIN, "CI_COMMIT_REF_NAME":"main", "CI_REPOSITORY_URL":"https://gitlab.com/veil.git"},
+            ("https://gitlab.com/veil.git", SHA_MAIN, "main")
+        ),
+        ({"GIT_COMMIT":SHA_MAIN}, (None, SHA_MAIN, None)),
+    ])
+    def test_read_ci_repo_info_correctness(self, environ:Dict[str, str], expected) -> None:
+        """
+        Checks whether read_ci_repo_info reads the variables of CI services.
+        """
+        assert(read_ci_repo_info(environ) == expected)
+
+
+
+class TestGetRepoInfo:
+    """
+    Test suite designed for veil.decorators._get_repo_info.
+    """
+
+    def test_get_repo_info_correctness_on_repo(self, repo, monkeypatch, clean_environ) -> None:
+        """
+        Checks whether _get_repo_info reads the repository of the current
+        working directory.
+        """
+        monkeypatch.chdir(repo)
+        assert(_get_repo_info() == ("https://example.org/veil.git", SHA_MAIN, "main"))
+
+
+
+    def test_get_repo_info_correctness_on_ci_fallback(self, tmp_path, monkeypatch, clean_environ) -> None:
+        """
+        Checks whether _get_repo_info falls back to CI environment variables
+        outside repositories.
+        """
+        monkeypatch.chdir(tmp_path)
+        assert(_get_repo_info() == (None, None, None))
+
+        monkeypatch.setenv("GIT_COMMIT", SHA_MAIN)
+        monkeypatch.setenv("GIT_BRANCH", "main")
+        assert(_get_repo_info() == (None, SHA_MAIN, "main"))
+
+
+
+    def test_get_repo_info_correctness_on_cache(self, repo, monkeypatch, clean_environ) -> None:
+        """
+        Checks whether _get_repo_info reads the git state once as long as
+        it does not change.
+        """
+        monkeypatch.chdir(repo)
+        veil.reset_stats()
+        assert(_get_repo_info() == _get_repo_info())
+        assert(veil.stats()["git"]["calls"] == 1)
+
+
+
+    def test_get_repo_info_correctness_on_changed_state(self, repo, tmp_path, monkeypatch, clean_environ) -> None:
+        """
+        Checks whether _get_repo_info reads the git state again after
+        commits, checkouts and changes of the working directory.
+        """
+        def replace(path, content:str) -> None:
+            # git writes a new file and renames it over the former one
+            write(f"{path}.lock", content)
+            os.replace(f"{path}.lock", path)
+
+        monkeypatch.chdir(repo)
+        assert(_get_repo_info() == ("https://example.org/veil.git", SHA_MAIN, "main"))
+
+        replace(repo / ".git" / "refs" / "heads" / "main", SHA_DETACHED + "\n")
+        assert(_get_repo_info() == ("https://example.org/veil.git", SHA_DETACHED, "main"))
+
+        replace(repo / ".git" / "HEAD", "ref: refs/heads/packed\n")
+        assert(_get_repo_info() == ("https://example.org/veil.git", SHA_TAG, "packed"))
+
+        monkeypatch.chdir(tmp_path)
+        assert(_get_repo_info() == (None, None, None))
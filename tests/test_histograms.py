@@ -0,0 +1,170 @@
+from typing import Any, Dict, List
+import json
+import random
+import pytest
+
+from mlflow import MlflowClient
+from mlflow.entities import RunStatus
+
+from veil.decorators import Autologger, Run
+from veil.histograms import (
+    BUCKETS_PER_OCTAVE, LATENCY_PREFIX, OCTAVES, LatencyHistogram, latency_metrics, metric_name
+)
+from veil.sinks import JsonlSink
+
+
+
+class TestLatencyHistogram:
+    """
+    Test suite designed for the veil.histograms.LatencyHistogram class.
+    """
+
+    def test_percentiles_correctness(self) -> None:
+        """
+        Checks whether LatencyHistogram.percentiles stays within the relative
+        error of the buckets, with memory independent of the recorded count.
+        """
+        rng:random.Random = random.Random(0)
+        latencies:List[float] = sorted(rng.lognormvariate(-4, 1.5) for _ in range(100000))
+        histogram:LatencyHistogram = LatencyHistogram()
+        for latency in latencies:
+            histogram.record(latency)
+
+        for q, estimate in zip([0.5, 0.9, 0.99, 1.0], histogram.percentiles([0.5, 0.9, 0.99, 1.0])):
+            exact:float = latencies[int(q * len(latencies)) - 1]
+            assert(abs(estimate - exact) / exact <= 2 ** (1 / BUCKETS_PER_OCTAVE) - 1)
+        assert(histogram.count == len(latencies))
+        assert(histogram.max_s == latencies[-1])
+        assert(len(histogram.buckets()) == BUCKETS_PER_OCTAVE * OCTAVES)
+
+
+
+    def test_percentiles_correctness_on_empty_histogram(self) -> None:
+        """
+        Checks whether LatencyHistogram.percentiles returns zeros when no
+        latency has been recorded.
+        """
+        assert(LatencyHistogram().percentiles([0.5, 0.99]) == [0.0, 0.0])
+
+
+
+    @pytest.mark.parametrize("latency", [0.0, 1e-9, 1e9])
+    def test_record_correctness_on_out_of_range_latency(self, latency:float) -> None:
+        """
+        Checks whether LatencyHistogram.record clamps latencies out of the
+        range of the buckets into the first or the last one.
+        """
+        histogram:LatencyHistogram = LatencyHistogram()
+        histogram.record(latency)
+
+        assert(sum(histogram.buckets()) == 1)
+        assert(histogram.percentiles([1.0]) == [latency])
+
+
+
+    def test_merge_correctness(self) -> None:
+        """
+        Checks whether LatencyHistogram.merge adds the latencies of another
+        histogram.
+        """
+        a:LatencyHistogram = LatencyHistogram()
+        b:LatencyHistogram = LatencyHistogram()
+        a.record(0.001)
+        b.record(0.1)
+        b.record(0.2)
+        a.merge(b)
+
+        assert((a.count, a.max_s) == (3, 0.2))
+        assert(a.sum_s == pytest.approx(0.301))
+        assert(sum(a.buckets()) == 3 and a.buckets()[a.bucket(0.001)] == 1)
+
+
+
+class TestLatencyMetrics:
+    """
+    Test suite designed for veil.histograms.latency_metrics.
+    """
+
+    def test_latency_metrics_correctness(self) -> None:
+        """
+        Checks whether latency_metrics summarizes each histogram under a
+        metric-safe name.
+        """
+        histogram:LatencyHistogram = LatencyHistogram()
+        histogram.record(0.5)
+        metrics:Dict[str, float] = latency_metrics({"load <data>": histogram})
+
+        prefix:str = f"{LATENCY_PREFIX}.load _data_"
+        assert(sorted(metrics) == sorted(f"{prefix}.{s}" for s in ["p50_s", "p90_s", "p99_s", "max_s", "count"]))
+        assert(metrics[f"{prefix}.p99_s"] == metrics[f"{prefix}.max_s"] == 0.5)
+        assert(metrics[f"{prefix}.count"] == 1)
+        assert(metric_name("a.b/c-d e_f") == "a.b/c-d e_f")
+
+
+
+class TestSessionLatencies:
+    """
+    Test suite designed for the log_latencies option of the
+    veil.decorators.AutologSession class.
+    """
+
+    @pytest.mark.parametrize("log_latencies", [False, True])
+    def test_exit_correctness(self, tmp_path, log_latencies:bool) -> None:
+        """
+        Checks whether sessions with log_latencies log the latency metrics
+        of each decorated function on the parent run, failed calls included.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink)
+
+        @Run(autologger = autologger)
+        def annotated_function(fail):
+            if fail:
+                raise ValueError()
+
+        @Run(autologger = autologger, name = "other")
+        def other_function():
+            pass
+
+        with autologger.start_session(log_latencies = log_latencies):
+            for i in range(10):
+                try:
+                    annotated_function(fail = i == 0)
+                except ValueError:
+                    pass
+            other_function()
+        sink.close()
+
+        with open(sink.path) as f:
+            events:List[Dict[str, Any]] = [json.loads(line) for line in f]
+        metrics:List[Dict[str, Any]] = [e for e in events if e["event"] == "log_metrics"]
+
+        if not log_latencies:
+            assert(metrics == [])
+            return
+        assert(len(metrics) == 1 and metrics[0]["run_id"] == events[0]["run_id"])
+        assert(metrics[0]["metrics"][f"{LATENCY_PREFIX}.annotated_function.count"] == 10)
+        assert(metrics[0]["metrics"][f"{LATENCY_PREFIX}.other.count"] == 1)
+        assert(events[-1]["event"] == "end_session")
+
+    def test_exit_correctness_on_mlflow_sink(self, tmp_path) -> None:
+        """
+        Checks whether sessions with log_latencies log the latency metrics on
+        the parent run and terminate it, with the default isolated sink.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(tracking_uri = tracking_uri, experiment_name = "latencies")
+
+        @Run(autologger = autologger)
+        def annotated_function():
+            pass
+
+        with autologger.start_session(log_latencies = True):
+            annotated_function()
+
+        client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+        runs = client.search_runs([client.get_experiment_by_name("latencies").experiment_id])
+        assert(len(runs) == 2)
+        assert(all(run.info.status == RunStatus.to_string(RunStatus.FINISHED) for run in runs))
+        parent = next(run for run in runs if run.info.run_name != "annotated_function")
+        assert(parent.data.metrics[f"{LATENCY_PREFIX}.annotated_function.count"] == 1)
@@ -8,7 +8,7 @@ from typeguard import TypeCheckError
 import veil
 from veil.decorators import Run, AutologSession
 from veil.types import StringDict, StringList
-from tests.mocks import mocked_server, mock_active_run, mock_start_run, mock_set_experiment, mock_log_param, mock_end_run, mock_set_tags
+from tests.mocks import mocked_server, mock_active_run, mock_start_run, mock_set_experiment, mock_client, mock_end_run
 
 
 
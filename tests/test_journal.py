@@ -0,0 +1,141 @@
+from typing import List
+import os
+import pytest
+
+from veil.decorators import Autologger, Run
+from veil.journal import MAGIC, JournalEvent, JournalReader, JournalWriter
+from veil.sinks import JournalSink
+
+
+
+class TestJournal:
+    """
+    Test suite designed for the veil.journal.JournalWriter and
+    veil.journal.JournalReader classes.
+    """
+
+    def write(self, path:str, codec:str = "zlib", block_size:int = 512, events:int = 100) -> None:
+        writer:JournalWriter = JournalWriter(path, codec = codec, block_size = block_size)
+        for i in range(events):
+            writer.append("log_params", f"run{i % 4}", f"session{i % 2}", float(i), {"params": {"i": i}})
+        writer.close()
+
+
+
+    @pytest.mark.parametrize("codec", ["none", "zlib", "lzma"])
+    def test_events_correctness(self, tmp_path, codec:str) -> None:
+        """
+        Checks whether JournalReader.events iterates the appended events in
+        order, across several blocks.
+        """
+        path:str = str(tmp_path / "veil.journal")
+        self.write(path, codec = codec)
+
+        with JournalReader(path) as reader:
+            events:List[JournalEvent] = list(reader)
+            assert(len(reader.blocks) > 1)
+            assert(len(reader) == 100)
+
+        assert([e.data["params"]["i"] for e in events] == list(range(100)))
+        assert(events[5] == JournalEvent("log_params", "run1", "session1", 5.0, {"params": {"i": 5}}))
+
+
+
+    def test_events_correctness_on_filters(self, tmp_path) -> None:
+        """
+        Checks whether JournalReader.events filters by run, session and time,
+        and seeks past the given number of events.
+        """
+        path:str = str(tmp_path / "veil.journal")
+        writer:JournalWriter = JournalWriter(path, block_size = 256)
+        for i in range(60):
+            # the second half of the journal holds a novel session only
+            writer.append("set_tags", f"run{i}", "late" if i >= 30 else "early", float(i), {"tags": {}})
+        writer.close()
+
+        with JournalReader(path) as reader:
+            assert([e.run_id for e in reader.events(run_id = "run7")] == ["run7"])
+            assert(len(list(reader.events(session_id = "late"))) == 30)
+            assert([e.timestamp for e in reader.events(since = 55.0)] == [55.0, 56.0, 57.0, 58.0, 59.0])
+            assert([e.run_id for e in reader.events(start = 58)] == ["run58", "run59"])
+            assert(any("late" not in b.session_ids for b in reader.blocks))
+
+
+
+    def test_append_correctness_on_truncated_journal(self, tmp_path) -> None:
+        """
+        Checks whether a block truncated by a crash is ignored by readers and
+        overwritten by writers.
+        """
+        path:str = str(tmp_path / "veil.journal")
+        self.write(path, events = 10, block_size = 1 << 20)
+        with open(path, "ab") as f:
+            f.write(b"VJBK\x01\x00partial")
+
+        with JournalReader(path) as reader:
+            assert(len(reader) == 10)
+
+        self.write(path, events = 10, block_size = 1 << 20)
+        with JournalReader(path) as reader:
+            assert(len(reader) == 20)
+            assert(reader.end_offset == os.path.getsize(path))
+
+
+
+    def test_init_value_error_on_illegal_file(self, tmp_path) -> None:
+        """
+        Checks whether JournalReader.__init__ raises a ValueError when the
+        file is not a journal.
+        """
+        path = tmp_path / "veil.journal"
+        path.write_bytes(b"not a journal")
+
+        with pytest.raises(ValueError):
+            JournalReader(str(path))
+
+
+
+    def test_read_block_value_error_on_corrupted_block(self, tmp_path) -> None:
+        """
+        Checks whether JournalReader.read_block raises a ValueError when the
+        block payload is corrupted.
+        """
+        path:str = str(tmp_path / "veil.journal")
+        self.write(path, events = 10, block_size = 1 << 20)
+        data = bytearray(open(path, "rb").read())
+        data[-1] ^= 0xFF
+        open(path, "wb").write(bytes(data))
+
+        with JournalReader(path) as reader:
+            with pytest.raises(ValueError):
+                list(reader)
+
+
+
+class TestJournalSink:
+    """
+    Test suite designed for the veil.sinks.JournalSink class.
+    """
+
+    def test_call_correctness(self, tmp_path) -> None:
+        """
+        Checks whether decorated calls are journaled within their session.
+        """
+        sink:JournalSink = JournalSink(str(tmp_path / "veil.journal"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+        step = Run(autologger = autologger)(lambda a: a)
+
+        with autologger.start_session(log_tags = {"k": "v"}):
+            session_id:str = autologger._current_session.run_id
+            step(a = 1)
+            step(a = 2)
+        with autologger.start_session():
+            step(a = 3)
+        sink.close()
+
+        with open(sink.path, "rb") as f:
+            assert(f.read(len(MAGIC)) == MAGIC)
+        with JournalReader(sink.path) as reader:
+            events:List[JournalEvent] = list(reader.events(session_id = session_id))
+        assert([e.event for e in events] == ["start_session"] + ["start_run", "log_params", "set_tags", "end_run"] * 2 + ["end_session"])
+        assert([e.data["params"]["a"] for e in events if e.event == "log_params"] == [1, 2])
@@ -0,0 +1,274 @@
+from typing import List
+import array
+from unittest.mock import Mock
+import inspect
+import pytest
+from typeguard import TypeCheckError
+
+from veil.decorators import Autologger, Run
+from veil.memo import MEMO_HIT_TAG, MEMO_KEY_TAG, MemoIndex, bind_arguments, memo_key, register_key_encoder
+from veil.sinks import JsonlSink, SqliteSink
+
+from tests.mocks import (
+    mocked_server,
+    mock_active_run,
+    mock_start_run,
+    mock_set_experiment,
+    mock_client,
+    mock_end_run,
+    mock_log_batch,
+    mock_log_text,
+    mock_log_artifact,
+    mock_search_runs,
+    logged,
+)
+
+
+def expensive_function(a, b = 2):
+    return {"sum": a + b}
+
+
+class Config:
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return "Config"
+
+
+class Encoded(Config):
+    pass
+
+
+
+class TestMemoKey:
+    """
+    Test suite designed for veil.memo.memo_key and veil.memo.bind_arguments.
+    """
+
+    def test_memo_key_correctness(self) -> None:
+        """
+        Checks whether memo_key does not depend on how arguments are passed,
+        while depending on their values, on the function and on its code.
+        """
+        signature = inspect.signature(expensive_function)
+        key:str = memo_key("m.f", "digest", bind_arguments(signature, (1,), {}))
+
+        assert(key == memo_key("m.f", "digest", bind_arguments(signature, (), {"b": 2, "a": 1})))
+        assert(key != memo_key("m.f", "digest", bind_arguments(signature, (1, 3), {})))
+        assert(key != memo_key("m.f", "other_digest", bind_arguments(signature, (1,), {})))
+        assert(key != memo_key("m.g", "digest", bind_arguments(signature, (1,), {})))
+
+
+
+    def test_memo_key_correctness_on_same_repr(self) -> None:
+        """
+        Checks whether memo_key keys arguments by their type and content
+        rather than by their repr.
+        """
+        def key(value) -> str:
+            return memo_key("m.f", "digest", {"a": value})
+
+        zeros:array.array = array.array("d", [0] * 2000)
+        ones:array.array = array.array("d", [0] * 1999 + [1])
+
+        assert(key(Config(1)) != key(Config(2)))
+        assert(key(Config(1)) == key(Config(1)))
+        assert(key((1, 2)) != key([1, 2]))
+        assert(len({key(1), key(True), key(1.0), key("1"), key(None)}) == 5)
+        assert(key(zeros) != key(ones))
+        assert(key(zeros) == key(array.array("d", zeros)))
+        assert(key(zeros) != key(array.array("f", [0] * 2000)))
+        assert(key({"x": 1, "y": {2, 3}}) == key({"y": {3, 2}, "x": 1}))
+
+
+
+    def test_memo_key_type_error_on_unpicklable_argument(self) -> None:
+        """
+        Checks whether memo_key raises a TypeError when an argument can be
+        keyed neither by value nor by its pickled bytes.
+        """
+        with pytest.raises(TypeError):
+            memo_key("m.f", "digest", {"a": [lambda: None]})
+
+
+
+    def test_register_key_encoder_correctness(self) -> None:
+        """
+        Checks whether the arguments of a registered type are keyed by their
+        encoding.
+        """
+        register_key_encoder(Encoded, lambda config: str(config.value % 2).encode())
+
+        assert(memo_key("m.f", None, {"a": Encoded(1)}) == memo_key("m.f", None, {"a": Encoded(3)}))
+        assert(memo_key("m.f", None, {"a": Encoded(1)}) != memo_key("m.f", None, {"a": Encoded(2)}))
+        assert(memo_key("m.f", None, {"a": Encoded(1)}) != memo_key("m.f", None, {"a": Config(1)}))
+
+
+
+    def test_bind_arguments_correctness_on_unbindable_call(self) -> None:
+        """
+        Checks whether bind_arguments falls back to the raw arguments when
+        they do not match the signature.
+        """
+        signature = inspect.signature(expensive_function)
+
+        assert(bind_arguments(signature, (1, 2, 3), {}) == {"args": [1, 2, 3], "kwargs": {}})
+        assert(bind_arguments(None, (1,), {"b": 2}) == {"args": [1], "kwargs": {"b": 2}})
+
+
+
+class TestMemoIndex:
+    """
+    Test suite designed for methods belonging to the
+    veil.memo.MemoIndex class.
+    """
+
+    def test_store_correctness(self, tmp_path) -> None:
+        """
+        Checks whether MemoIndex.store makes results available to
+        MemoIndex.lookup, per experiment.
+        """
+        index:MemoIndex = MemoIndex(str(tmp_path))
+        path:str = index.store("experiment", "key", "run", [1, 2])
+
+        assert(index.lookup("experiment", "key") == ("run", path))
+        assert(index.load(path) == [1, 2])
+        assert(index.lookup("other_experiment", "key") is None)
+        assert(index.lookup("experiment", "other_key") is None)
+
+
+
+    def test_store_correctness_on_unpicklable_result(self, tmp_path) -> None:
+        """
+        Checks whether MemoIndex.store skips results which cannot be pickled.
+        """
+        index:MemoIndex = MemoIndex(str(tmp_path))
+
+        assert(index.store("experiment", "key", "run", lambda: None) is None)
+        assert(index.lookup("experiment", "key") is None)
+
+
+
+    def test_adopt_correctness(self, tmp_path) -> None:
+        """
+        Checks whether MemoIndex.adopt copies results retrieved elsewhere.
+        """
+        source:MemoIndex = MemoIndex(str(tmp_path / "source"))
+        index:MemoIndex = MemoIndex(str(tmp_path / "index"))
+
+        run_id, path = index.adopt("experiment", "key", "run", source.store("experiment", "key", "run", 42))
+
+        assert(run_id == "run")
+        assert(path.startswith(str(tmp_path / "index")))
+        assert(index.load(path) == 42)
+
+
+
+class TestRunMemoize:
+    """
+    Test suite designed for the memoize argument of the
+    veil.decorators.Run class.
+    """
+
+    @pytest.mark.parametrize("illegal_value", [1, "wrong", None])
+    def test_init_type_check_error_on_illegal_memoize(self, illegal_value) -> None:
+        """
+        Checks whether Run.__init__ raises a TypeCheckError when
+        memoize is of illegal type.
+        """
+        with pytest.raises(TypeCheckError):
+            Run(autologger = Autologger(), memoize = illegal_value)
+
+
+
+    def test_call_correctness_on_mlflow_sink(self, tmp_path, mock_log_artifact:Mock, mock_log_batch:Mock) -> None:
+        """
+        Checks whether memoized results are reused by calls with the same
+        arguments, which still get tracked as child runs.
+        """
+        calls:List[int] = []
+        autologger:Autologger = Autologger(experiment_name = "memoize_experiment", cache_dir = str(tmp_path))
+
+        @Run(autologger = autologger, memoize = True)
+        def counted_function(a, b = 2):
+            calls.append(a)
+            return a + b
+
+        with autologger.start_session():
+            assert(counted_function(1) == 3)
+            assert(counted_function(a = 1, b = 2) == 3)
+            assert(counted_function(2) == 4)
+
+        assert(calls == [1, 2])
+        assert(mock_log_artifact.call_count == 2)
+        tags:List[dict] = logged(mock_log_batch, "tags")
+        assert(tags[0][MEMO_KEY_TAG] == tags[1][MEMO_KEY_TAG] != tags[2][MEMO_KEY_TAG])
+        assert(MEMO_HIT_TAG not in tags[0] and MEMO_HIT_TAG in tags[1])
+
+
+
+    def test_call_correctness_on_failed_call(self, tmp_path) -> None:
+        """
+        Checks whether failed calls are not memoized.
+        """
+        calls:List[int] = []
+        autologger:Autologger = Autologger(experiment_name = "memoize_experiment", cache_dir = str(tmp_path))
+
+        @Run(autologger = autologger, memoize = True)
+        def faulty_function(a):
+            calls.append(a)
+            raise ValueError()
+
+        with autologger.start_session():
+            for _ in range(2):
+                with pytest.raises(ValueError):
+                    faulty_function(1)
+
+        assert(calls == [1, 1])
+
+
+
+    def test_call_correctness_on_unkeyable_arguments(self, tmp_path) -> None:
+        """
+        Checks whether calls whose arguments cannot be keyed are performed
+        without memoization.
+        """
+        calls:List[int] = []
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment", cache_dir = str(tmp_path))
+
+        @Run(autologger = autologger, memoize = True)
+        def callback_function(a, callback):
+            calls.append(a)
+            return callback(a)
+
+        with autologger.start_session():
+            for _ in range(2):
+                assert(callback_function(1, lambda a: a + 1) == 2)
+        sink.close()
+
+        assert(calls == [1, 1])
+        assert(not (tmp_path / "memo").exists())
+
+
+
+    @pytest.mark.parametrize("sink_class", [SqliteSink, JsonlSink])
+    def test_call_correctness_on_tracking_store_lookup(self, tmp_path, sink_class) -> None:
+        """
+        Checks whether results memoized by another machine are retrieved
+        from the tracking store, when supported by the sink.
+        """
+        sink = sink_class(str(tmp_path / "veil.store"), artifacts_dir = str(tmp_path / "artifacts"))
+        decorated = {}
+        for cache in ["first", "second"]:
+            # each iteration simulates a novel machine, with an empty local cache
+            autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment", cache_dir = str(tmp_path / cache))
+            decorated[cache] = Run(autologger = autologger, memoize = True)(Mock(side_effect = expensive_function, __name__ = "f", __qualname__ = "f", __module__ = "m"))
+            with autologger.start_session():
+                assert(decorated[cache](1) == {"sum": 3})
+        sink.close()
+
+        assert(decorated["first"].__wrapped__.call_count == 1)
+        assert(decorated["second"].__wrapped__.call_count == (1 if sink_class is JsonlSink else 0))
@@ -0,0 +1,116 @@
+from typing import Dict
+from unittest.mock import Mock
+import time
+import pytest
+
+import veil
+from veil.decorators import Autologger, Run
+from veil.overhead import LATENCY_BUCKETS_S, CallTimer, StatsRegistry
+
+from tests.mocks import (
+    mock_git_correct_repo,
+    mocked_server,
+    mock_active_run,
+    mock_start_run,
+    mock_set_experiment,
+    mock_client,
+    mock_end_run,
+    mock_log_batch,
+)
+
+
+
+class TestStatsRegistry:
+    """
+    Test suite designed for methods belonging to the
+    veil.overhead.StatsRegistry class.
+    """
+
+    def test_record_call_correctness(self) -> None:
+        """
+        Checks whether StatsRegistry.record_call accounts to tracking I/O
+        the time not spent in user code or git lookups.
+        """
+        registry:StatsRegistry = StatsRegistry()
+        timer:CallTimer = CallTimer()
+        timer.user_s = 0.5
+        timer.git_s = 0.25
+
+        registry.record_call("f", 1.0, timer, False)
+        registry.record_call("f", 1.0, timer, True)
+
+        stats:Dict = registry.snapshot()["functions"]["f"]
+        assert(stats["calls"] == 2)
+        assert(stats["errors"] == 1)
+        assert(stats["user_s"] == pytest.approx(1.0))
+        assert(stats["git_s"] == pytest.approx(0.5))
+        assert(stats["tracking_s"] == pytest.approx(0.5))
+        assert(stats["total_s"] == pytest.approx(2.0))
+        assert(stats["latency_buckets"][LATENCY_BUCKETS_S.index(1.0)] == 2)
+        assert(sum(stats["latency_buckets"]) == 2)
+
+
+
+    def test_reset_correctness(self) -> None:
+        """
+        Checks whether StatsRegistry.reset discards every statistic.
+        """
+        registry:StatsRegistry = StatsRegistry()
+        registry.record_call("f", 1.0, CallTimer(), False)
+        registry.record_session("enter", 1.0, False)
+        registry.record_git(1.0, False)
+        registry.reset()
+
+        stats:Dict = registry.snapshot()
+        assert(stats["functions"] == {})
+        assert(stats["sessions"]["enter"] == 0)
+        assert(stats["git"]["calls"] == 0)
+
+
+
+class TestStats:
+    """
+    Test suite designed for veil.stats and veil.reset_stats.
+    """
+
+    @pytest.mark.parametrize("is_autolog_enabled", [True, False])
+    def test_stats_correctness_on_decorated_function(
+        self,
+        mock_git_correct_repo:Mock,
+        is_autolog_enabled:bool,
+        tmp_path,
+        monkeypatch
+    ) -> None:
+        """
+        Checks whether calling a function decorated with Run accounts
+        calls, errors and timings to the function statistics.
+        """
+        # a repository whose git state has not been read yet
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "HEAD").write_text("c" * 40 + "\n")
+        monkeypatch.chdir(tmp_path)
+        veil.reset_stats()
+        autologger:Autologger = Autologger(is_autolog_enabled = is_autolog_enabled)
+
+        @Run(autologger = autologger)
+        def annotated_function(fail:bool):
+            time.sleep(0.01)
+            if fail:
+                raise ValueError()
+
+        with autologger.start_session():
+            annotated_function(fail = False)
+            with pytest.raises(ValueError):
+                annotated_function(fail = True)
+
+        stats:Dict = veil.stats()
+        function_stats:Dict = stats["functions"][f"{__name__}.{annotated_function.__qualname__}"]
+        assert(function_stats["calls"] == 2)
+        assert(function_stats["errors"] == 1)
+        assert(function_stats["user_s"] >= 0.02)
+        assert(stats["sessions"]["enter"] == 1)
+        assert(stats["sessions"]["exit"] == 1)
+        assert(stats["git"]["calls"] == (1 if is_autolog_enabled else 0))
+
+        veil.reset_stats()
+        assert(veil.stats()["functions"] == {})
@@ -0,0 +1,322 @@
+from typing import Any, Dict, List
+import os
+import pstats
+import pytest
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+from mlflow.tracking import MlflowClient
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+from veil.decorators import Autologger, Run
+from veil.profiling import (
+    HOTSPOT_PREFIX, OVERFLOW_STACK, PROFILE_ARTIFACT_PATH, CallProfiler, StackSampler, render_flamegraph
+)
+from veil.sinks import BatchingSink, JsonlSink, MlflowSink
+
+from tests.utils import read_events
+
+
+def fibonacci(n):
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+
+
+def busy_leaf(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+
+def busy_root(seconds):
+    busy_leaf(seconds)
+
+
+
+class TestCallProfiler:
+    """
+    Test suite designed for the veil.profiling.CallProfiler class.
+    """
+
+    def test_hotspots_correctness(self, tmp_path) -> None:
+        """
+        Checks whether CallProfiler.hotspots ranks the profiled functions by
+        cumulative time and whether CallProfiler.dump writes a pstats file.
+        """
+        profiler:CallProfiler = CallProfiler()
+        with profiler:
+            fibonacci(15)
+
+        hotspots = profiler.hotspots(top = 3)
+        assert(profiler.profiled)
+        assert(len(hotspots) <= 3)
+        assert(hotspots[0].function.startswith("fibonacci (test_profiling.py:"))
+        assert(hotspots[0].calls == 1973)
+        assert(all(a.cumulative_s >= b.cumulative_s for a, b in zip(hotspots, hotspots[1:])))
+
+        path:str = profiler.dump(str(tmp_path / "profiles" / "fibonacci.pstats"))
+        assert(pstats.Stats(path).total_calls >= 1973)
+
+
+
+    def test_enter_correctness_on_nested_profilers(self) -> None:
+        """
+        Checks whether a CallProfiler entered within another one of the
+        same thread stays idle, leaving the outer one active.
+        """
+        outer:CallProfiler = CallProfiler()
+        inner:CallProfiler = CallProfiler()
+        with outer:
+            with inner:
+                fibonacci(5)
+            fibonacci(5)
+
+        assert(outer.profiled and not inner.profiled)
+        assert(inner.hotspots() == [])
+        assert(outer.hotspots()[0].calls == 30)
+
+    def test_enter_correctness_on_concurrent_profilers(self) -> None:
+        """
+        Checks whether CallProfilers entered concurrently by several threads
+        never fail the profiled code, a profiler that cannot be enabled (e.g.
+        since Python 3.12, while another thread is profiled) leaving the next
+        calls of its thread profilable.
+        """
+        barrier:threading.Barrier = threading.Barrier(2)
+        outcomes:List[Any] = []
+
+        def profile_twice():
+            try:
+                first:CallProfiler = CallProfiler()
+                with first:
+                    barrier.wait(timeout = 10)
+                    fibonacci(10)
+                    barrier.wait(timeout = 10)
+                barrier.wait(timeout = 10)
+                if threading.current_thread() is not threads[0]:
+                    barrier.wait(timeout = 10)
+                second:CallProfiler = CallProfiler()
+                with second:
+                    fibonacci(10)
+                if threading.current_thread() is threads[0]:
+                    barrier.wait(timeout = 10)
+                outcomes.append((first.profiled, second.profiled))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads:List[threading.Thread] = [threading.Thread(target = profile_twice) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert(all(isinstance(outcome, tuple) for outcome in outcomes))
+        assert(any(first for first, _ in outcomes))
+        assert(all(second for _, second in outcomes))
+
+
+
+class TestStackSampler:
+    """
+    Test suite designed for the veil.profiling.StackSampler class.
+    """
+
+    def test_call_correctness(self, tmp_path) -> None:
+        """
+        Checks whether StackSampler aggregates folded stacks rooted at the
+        sampled code and stores them together with their flamegraph.
+        """
+        sampler:StackSampler = StackSampler(interval_s = 0.002)
+        with sampler:
+            busy_root(0.2)
+
+        stacks:Dict[str, int] = sampler.stacks
+        leaf_stack:str = "tests.test_profiling:busy_root;tests.test_profiling:busy_leaf"
+        assert(sampler.profiled and sampler.samples > 10)
+        assert(sum(stacks.values()) == sampler.samples)
+        assert(all(stack.startswith("tests.test_profiling:busy_root") for stack in stacks))
+        assert(stacks.get(leaf_stack, 0) >= sampler.samples // 2)
+
+        hotspots = sampler.hotspots()
+        assert([h.function for h in hotspots[:2]] == ["tests.test_profiling:busy_root", "tests.test_profiling:busy_leaf"])
+        assert(hotspots[0].calls == sampler.samples and hotspots[0].total_s == 0.0)
+
+        folded_path, svg_path = sampler.store(str(tmp_path), "busy")
+        with open(folded_path) as f:
+            assert(f"{leaf_stack} {stacks[leaf_stack]}" in f.read().splitlines())
+        assert(ET.parse(svg_path).getroot().tag.endswith("svg"))
+
+
+
+    def test_call_correctness_on_max_stacks(self) -> None:
+        """
+        Checks whether StackSampler merges the samples of the stacks
+        exceeding max_stacks.
+        """
+        sampler:StackSampler = StackSampler(interval_s = 0.002, max_stacks = 1)
+        with sampler:
+            busy_leaf(0.05)
+            busy_root(0.05)
+
+        assert(len(set(sampler.stacks) - {OVERFLOW_STACK}) == 1)
+        assert(sum(sampler.stacks.values()) == sampler.samples)
+
+
+
+    def test_render_flamegraph_correctness(self) -> None:
+        """
+        Checks whether render_flamegraph draws a frame per node of the
+        merged stacks, escaping their labels.
+        """
+        svg:str = render_flamegraph({"a;b": 3, "a;<c>": 1}, title = "graph")
+        titles = [e.text for e in ET.fromstring(svg).iter("{http://www.w3.org/2000/svg}title")]
+
+        assert(titles == [
+            "all (4 samples, 100.00%)", "a (4 samples, 100.00%)", "b (3 samples, 75.00%)", "<c> (1 samples, 25.00%)"])
+
+
+
+class TestRunProfile:
+    """
+    Test suite designed for the profile option of the
+    veil.decorators.Run class.
+    """
+
+    @pytest.mark.parametrize("fail", [False, True])
+    def test_call_correctness(self, tmp_path, fail:bool) -> None:
+        """
+        Checks whether profiled calls, even failed ones, attach the pstats
+        dump, tag the hotspots and log their metrics on the child run.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, cache_dir = str(tmp_path / "cache"))
+
+        @Run(autologger = autologger, profile = True)
+        def annotated_function(n):
+            result = fibonacci(n)
+            if fail:
+                raise ValueError()
+            return result
+
+        with autologger.start_session():
+            try:
+                assert(annotated_function(n = 10) == 55)
+            except ValueError:
+                pass
+
+        events:List[Dict[str, Any]] = read_events(sink)
+        run_id:str = events[1]["run_id"]
+        tags:Dict[str, str] = {k: v for e in events if e["event"] == "set_tags" for k, v in e["tags"].items()}
+        metrics:Dict[str, float] = [e for e in events if e["event"] == "log_metrics"][0]["metrics"]
+        artifact:Dict[str, Any] = [e for e in events if e["event"] == "log_artifact"][0]
+
+        assert(tags[f"{HOTSPOT_PREFIX}.1"].startswith("annotated_function"))
+        assert(any(v.startswith("fibonacci") for k, v in tags.items() if k.startswith(HOTSPOT_PREFIX)))
+        assert(metrics[f"{HOTSPOT_PREFIX}.1.calls"] == 1)
+        assert(metrics[f"{HOTSPOT_PREFIX}.1.cumulative_s"] >= metrics[f"{HOTSPOT_PREFIX}.2.cumulative_s"])
+        assert(artifact["run_id"] == run_id)
+        assert(artifact["artifact_file"] == f"{PROFILE_ARTIFACT_PATH}/annotated_function.pstats")
+        assert(pstats.Stats(artifact["path"]).total_calls > 0)
+        assert([e["status"] for e in events if e["event"] == "end_run"] == ["FAILED" if fail else "FINISHED"])
+
+
+
+    def test_call_correctness_on_sampling(self, tmp_path) -> None:
+        """
+        Checks whether calls profiled by sampling attach their folded stacks
+        and flamegraph, and tag the hotspots on the child run.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, cache_dir = str(tmp_path / "cache"))
+
+        @Run(autologger = autologger, profile = "sampling")
+        def annotated_function(seconds):
+            busy_root(seconds)
+
+        with autologger.start_session():
+            annotated_function(seconds = 0.1)
+
+        events:List[Dict[str, Any]] = read_events(sink)
+        tags:Dict[str, str] = {k: v for e in events if e["event"] == "set_tags" for k, v in e["tags"].items()}
+
+        assert(tags[f"{HOTSPOT_PREFIX}.1"] == "tests.test_profiling:annotated_function")
+        assert(sorted(e["artifact_file"] for e in events if e["event"] == "log_artifact") == [
+            f"{PROFILE_ARTIFACT_PATH}/annotated_function.folded", f"{PROFILE_ARTIFACT_PATH}/annotated_function.svg"])
+
+
+
+    @pytest.mark.parametrize("batched", [False, True])
+    @pytest.mark.parametrize("dropped", [False, True])
+    def test_call_correctness_on_stored_profile(self, tmp_path, monkeypatch, batched:bool, dropped:bool) -> None:
+        """
+        Checks whether the files of a profile are removed once uploaded,
+        even by sinks delivering them later, or once dropped.
+        """
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+        os.makedirs(tmp_path / "tmp")
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(
+            sink = BatchingSink(sink) if batched else sink, cache_dir = str(tmp_path / "cache"),
+            logging_budget_ms = 0.0 if dropped else None, budget_policy = "drop")
+
+        @Run(autologger = autologger, profile = "sampling")
+        def annotated_function(seconds):
+            busy_root(seconds)
+
+        with autologger.start_session():
+            annotated_function(seconds = 0.05)
+        autologger.sink.flush()
+
+        artifacts:List[str] = [e["path"] for e in read_events(sink) if e["event"] == "log_artifact"]
+        assert(len(artifacts) == (0 if dropped else 2))
+        assert(all(os.path.isfile(path) for path in artifacts))
+        assert(os.listdir(tmp_path / "tmp") == [])
+        assert(not os.path.exists(tmp_path / "cache" / "profiles"))
+
+
+
+    def test_call_correctness_on_unprofiled_run(self, tmp_path) -> None:
+        """
+        Checks whether calls are not profiled by default.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, cache_dir = str(tmp_path / "cache"))
+
+        @Run(autologger = autologger)
+        def annotated_function(n):
+            return fibonacci(n)
+
+        with autologger.start_session():
+            annotated_function(n = 5)
+
+        assert(not os.path.exists(tmp_path / "cache"))
+        assert(all(e["event"] not in ("log_metrics", "log_artifact") for e in read_events(sink)))
+
+
+
+    def test_call_correctness_on_mlflow_sink(self, tmp_path) -> None:
+        """
+        Checks whether the profile of a call reaches the child run of a
+        tracking server.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(
+            sink = MlflowSink(tracking_uri), experiment_name = "experiment", cache_dir = str(tmp_path / "cache"))
+
+        @Run(autologger = autologger, profile = True)
+        def annotated_function(n):
+            return fibonacci(n)
+
+        with autologger.start_session():
+            annotated_function(n = 5)
+
+        client:MlflowClient = MlflowClient(tracking_uri)
+        runs = client.search_runs([client.get_experiment_by_name("experiment").experiment_id])
+        child = next(r for r in runs if MLFLOW_PARENT_RUN_ID in r.data.tags)
+        assert(child.data.metrics[f"{HOTSPOT_PREFIX}.1.calls"] == 1)
+        assert(child.data.tags[f"{HOTSPOT_PREFIX}.1"].startswith("annotated_function"))
+        assert([a.path for a in client.list_artifacts(child.info.run_id, PROFILE_ARTIFACT_PATH)] == [
+            f"{PROFILE_ARTIFACT_PATH}/annotated_function.pstats"])
@@ -0,0 +1,291 @@
+from typing import Dict, List
+from unittest import mock
+import sqlite3
+import pytest
+
+from veil.__main__ import main
+from veil.decorators import Autologger, Run
+from veil.replay import ReplayReport, read_events, replay
+from veil.sinks import JournalSink, JsonlSink, MlflowSink, SqliteSink
+
+
+def record(sink, sessions:int = 2, calls:int = 3) -> None:
+    autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+    step = Run(autologger = autologger, log_tags = {"k": "v"})(lambda a: a)
+    for s in range(sessions):
+        with autologger.start_session(name = f"session{s}"):
+            for i in range(calls):
+                step(a = i)
+    sink.close()
+
+
+
+class FailingSink(SqliteSink):
+    """ Fails the first writes of params and tags.
+    """
+
+    def __init__(self, path:str, failures:int):
+        super().__init__(path)
+        self.failures:int = failures
+
+    def log_batch(self, run_id, params, tags) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("unreachable")
+        super().log_batch(run_id, params, tags)
+
+
+
+class FlakySink(SqliteSink):
+    """ Fails the first call of a method, either start_run or end_session.
+    """
+
+    def __init__(self, path:str, method:str):
+        super().__init__(path)
+        self.method:str = method
+        self.failed:bool = False
+
+    def __fail(self, method:str) -> None:
+        if method == self.method and not self.failed:
+            self.failed = True
+            raise ConnectionError("unreachable")
+
+    def start_run(self, experiment_name, parent_run_id, name) -> str:
+        self.__fail("start_run")
+        return super().start_run(experiment_name, parent_run_id, name)
+
+    def end_session(self, run_id, status) -> None:
+        self.__fail("end_session")
+        super().end_session(run_id, status)
+
+
+
+class CountingSink(SqliteSink):
+    """ Counts the requests logging metrics.
+    """
+
+    def __init__(self, path:str):
+        super().__init__(path)
+        self.requests:List[str] = []
+
+    def log_metrics(self, run_id, metrics, step = None) -> None:
+        self.requests.append("log_metrics")
+        super().log_metrics(run_id, metrics, step)
+
+    def log_metric_batch(self, run_id, metrics) -> None:
+        self.requests.append("log_metric_batch")
+        super().log_metric_batch(run_id, metrics)
+
+
+
+class TestReplay:
+    """
+    Test suite designed for veil.replay.replay.
+    """
+
+    @pytest.mark.parametrize("sink_class", [JournalSink, JsonlSink])
+    def test_replay_correctness(self, tmp_path, sink_class) -> None:
+        """
+        Checks whether replay recreates the recorded runs, parented and
+        terminated, together with their params and tags.
+        """
+        path:str = str(tmp_path / "recording")
+        record(sink_class(path))
+        target:SqliteSink = SqliteSink(str(tmp_path / "target.db"))
+
+        report:ReplayReport = replay(path, target, workers = 4)
+        target.close()
+
+        assert((report.runs, report.skipped, report.failed) == (8, 0, 0))
+        assert(report.events == len(list(read_events(path))))
+        connection = sqlite3.connect(target.path)
+        sessions:Dict[str, str] = dict(connection.execute(
+            "SELECT run_id, name FROM runs WHERE parent_run_id IS NULL AND status = 'FINISHED'").fetchall())
+        assert(sorted(sessions.values()) == ["session0", "session1"])
+        children = connection.execute("SELECT parent_run_id, status FROM runs WHERE parent_run_id IS NOT NULL").fetchall()
+        assert(sorted(sessions[c[0]] for c in children) == ["session0"] * 3 + ["session1"] * 3)
+        assert(all(c[1] == "FINISHED" for c in children))
+        assert(connection.execute("SELECT COUNT(*) FROM params WHERE key = 'a'").fetchone()[0] == 6)
+        assert(connection.execute("SELECT COUNT(*) FROM tags WHERE key = 'k'").fetchone()[0] == 6)
+
+
+
+    def test_replay_correctness_on_restart(self, tmp_path) -> None:
+        """
+        Checks whether replaying again completes the runs that failed, without
+        duplicating the others.
+        """
+        path:str = str(tmp_path / "recording")
+        record(JournalSink(path))
+        target:FailingSink = FailingSink(str(tmp_path / "target.db"), failures = 3)
+
+        reports:List[ReplayReport] = [replay(path, target, workers = 2) for _ in range(3)]
+        target.close()
+
+        assert(reports[0].failed == 3)
+        assert((reports[1].failed, reports[1].runs + reports[1].skipped) == (0, 8))
+        assert((reports[2].runs, reports[2].skipped) == (0, 8))
+        connection = sqlite3.connect(target.path)
+        assert(connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 8)
+        assert(connection.execute("SELECT COUNT(*) FROM runs WHERE status = 'FINISHED'").fetchone()[0] == 8)
+
+
+
+    def test_replay_correctness_on_failed_child(self, tmp_path) -> None:
+        """
+        Checks whether sessions are terminated only once all their child runs
+        have been replayed.
+        """
+        path:str = str(tmp_path / "recording")
+        record(JournalSink(path), sessions = 1, calls = 3)
+        target:FlakySink = FlakySink(str(tmp_path / "target.db"), "start_run")
+
+        report:ReplayReport = replay(path, target, workers = 1)
+        connection = sqlite3.connect(target.path)
+        assert(report.failed == 1)
+        assert(connection.execute("SELECT status FROM runs WHERE parent_run_id IS NULL").fetchall() == [("RUNNING",)])
+
+        report = replay(path, target, workers = 1)
+        target.close()
+        assert((report.runs, report.skipped, report.failed) == (2, 2, 0))
+        session_id, status = connection.execute("SELECT run_id, status FROM runs WHERE parent_run_id IS NULL").fetchone()
+        assert(status == "FINISHED")
+        children = connection.execute("SELECT parent_run_id, status FROM runs WHERE parent_run_id IS NOT NULL").fetchall()
+        assert(children == [(session_id, "FINISHED")] * 3)
+
+
+
+    def test_replay_correctness_on_failed_session_termination(self, tmp_path) -> None:
+        """
+        Checks whether replaying again terminates the sessions that failed to,
+        without writing their data twice.
+        """
+        path:str = str(tmp_path / "recording")
+        sink:JournalSink = JournalSink(path)
+        session_id:str = sink.start_session("experiment", "session")
+        sink.log_metrics(session_id, {"latency": 0.5})
+        sink.end_run(sink.start_run("experiment", session_id, "child"), "FINISHED")
+        sink.end_session(session_id, "FINISHED")
+        sink.close()
+        target:FlakySink = FlakySink(str(tmp_path / "target.db"), "end_session")
+
+        reports:List[ReplayReport] = [replay(path, target) for _ in range(2)]
+        target.close()
+
+        assert(reports[0].failed == 1 and reports[1].failed == 0)
+        connection = sqlite3.connect(target.path)
+        assert(connection.execute("SELECT status FROM runs WHERE parent_run_id IS NULL").fetchall() == [("FINISHED",)])
+        assert(connection.execute("SELECT COUNT(*) FROM metrics WHERE key = 'latency'").fetchone()[0] == 1)
+
+
+
+    @pytest.mark.parametrize("sink_class", [JournalSink, JsonlSink])
+    def test_replay_correctness_on_metric_timestamps(self, tmp_path, sink_class) -> None:
+        """
+        Checks whether replay keeps the recorded timestamps of the metrics,
+        those of metric series included.
+        """
+        path:str = str(tmp_path / "recording")
+        sink = sink_class(path)
+        session_id:str = sink.start_session("experiment", "session")
+        sink.log_metric_series(session_id, {"cpu": [0.5, 0.75]}, [1000.0, 1001.5])
+        sink.end_session(session_id, "FINISHED")
+        sink.close()
+        target:SqliteSink = SqliteSink(str(tmp_path / "target.db"))
+
+        replay(path, target)
+        target.close()
+
+        connection = sqlite3.connect(target.path)
+        rows = connection.execute("SELECT step, value, timestamp FROM metrics ORDER BY step").fetchall()
+        assert(rows == [(0, 0.5, 1000.0), (1, 0.75, 1001.5)])
+
+
+
+    def test_replay_correctness_on_metrics(self, tmp_path) -> None:
+        """
+        Checks whether replay writes the recorded metrics of each run in a
+        single batch, keeping their steps.
+        """
+        path:str = str(tmp_path / "recording")
+        sink:JournalSink = JournalSink(path)
+        session_id:str = sink.start_session("experiment", "session")
+        for step in range(50):
+            sink.log_metrics(session_id, {"loss": 1 / (step + 1), "accuracy": step / 50}, step = step)
+        sink.end_session(session_id, "FINISHED")
+        sink.close()
+        target:CountingSink = CountingSink(str(tmp_path / "target.db"))
+
+        report:ReplayReport = replay(path, target)
+        target.close()
+
+        assert((report.runs, report.failed) == (1, 0))
+        assert(target.requests == ["log_metric_batch"])
+        connection = sqlite3.connect(target.path)
+        steps = connection.execute("SELECT step FROM metrics WHERE key = 'loss' ORDER BY step").fetchall()
+        assert([s[0] for s in steps] == list(range(50)))
+        assert(connection.execute("SELECT COUNT(*) FROM metrics").fetchone()[0] == 100)
+
+
+
+    def test_replay_correctness_on_mlflow_sink(self, tmp_path) -> None:
+        """
+        Checks whether replay writes the recorded metrics to a MlflowSink in
+        requests of up to 1000 values, with their recorded timestamps.
+        """
+        path:str = str(tmp_path / "recording")
+        sink:JournalSink = JournalSink(path)
+        session_id:str = sink.start_session("experiment", "session")
+        sink.log_metric_batch(session_id, [
+            ({"loss": 1 / (step + 1), "accuracy": step / 600}, step, 1000.0 + step) for step in range(600)])
+        sink.end_session(session_id, "FINISHED")
+        sink.close()
+        target:MlflowSink = MlflowSink(tracking_uri = (tmp_path / "mlruns").as_uri())
+
+        with mock.patch.object(target.client, "log_batch", wraps = target.client.log_batch) as log_batch:
+            report:ReplayReport = replay(path, target)
+
+        assert((report.runs, report.failed) == (1, 0))
+        metric_requests = [c for c in log_batch.call_args_list if c.kwargs.get("metrics")]
+        assert([len(c.kwargs["metrics"]) for c in metric_requests] == [1000, 200])
+        run_id:str = metric_requests[0].args[0]
+        history = target.client.get_metric_history(run_id, "loss")
+        assert(sorted((m.step, m.timestamp) for m in history) == [(step, (1000 + step) * 1000) for step in range(600)])
+
+
+
+    def test_replay_value_error_on_isolated_sink(self, tmp_path) -> None:
+        """
+        Checks whether replay raises a ValueError when the target sink is
+        bound to the mlflow fluent state.
+        """
+        path:str = str(tmp_path / "recording")
+        record(JournalSink(path), sessions = 1, calls = 1)
+
+        with pytest.raises(ValueError):
+            replay(path, MlflowSink())
+
+
+
+class TestMain:
+    """
+    Test suite designed for the veil command line.
+    """
+
+    def test_main_correctness_on_sync(self, tmp_path, capsys) -> None:
+        """
+        Checks whether `veil sync` replays a recording into a tracking server
+        and reports the throughput.
+        """
+        from mlflow import MlflowClient
+        path:str = str(tmp_path / "recording")
+        record(JournalSink(path), sessions = 1, calls = 2)
+        tracking_uri:str = f"file:{tmp_path / 'mlruns'}"
+
+        assert(main(["sync", path, "--tracking-uri", tracking_uri, "--workers", "2"]) == 0)
+
+        assert("3 runs replayed" in capsys.readouterr().out)
+        client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+        runs = client.search_runs([client.get_experiment_by_name("experiment").experiment_id])
+        assert(sorted(r.data.params.get("a", "-") for r in runs) == ["-", "0", "1"])
+        assert(all(r.info.status == "FINISHED" for r in runs))
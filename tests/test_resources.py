@@ -0,0 +1,188 @@
+from typing import Any, Dict, List
+import json
+import sqlite3
+import time
+import pytest
+
+from mlflow.tracking import MlflowClient
+from typeguard import TypeCheckError
+
+from veil.decorators import Autologger, Run
+from veil.resources import RESOURCE_PREFIX, SERIES, ResourceSampler, read_usage
+from veil.sinks import JsonlSink, MlflowSink, SqliteSink
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+
+class TestResourceSampler:
+    """
+    Test suite designed for veil.resources.read_usage and the
+    veil.resources.ResourceSampler class.
+    """
+
+    def test_read_usage_correctness(self) -> None:
+        """
+        Checks whether read_usage reports the cpu time and threads of the
+        process.
+        """
+        usage = read_usage()
+        busy(0.05)
+
+        assert(read_usage().cpu_s > usage.cpu_s)
+        assert(usage.threads >= 1)
+
+
+
+    def test_call_correctness(self, tmp_path) -> None:
+        """
+        Checks whether ResourceSampler samples every series while within the
+        context, I/O bytes being counted since entering it.
+        """
+        sampler:ResourceSampler = ResourceSampler(interval_s = 0.01)
+        with sampler:
+            busy(0.1)
+            (tmp_path / "data.bin").write_bytes(b"0" * 100000)
+
+        series, timestamps = sampler.series()
+        assert(len(sampler) == len(timestamps) >= 5)
+        assert(sorted(series) == sorted(f"{RESOURCE_PREFIX}.{name}" for name in SERIES))
+        assert(all(len(values) == len(timestamps) for values in series.values()))
+        assert(timestamps == sorted(timestamps))
+        assert(max(series[f"{RESOURCE_PREFIX}.cpu_percent"]) > 0)
+        assert(series[f"{RESOURCE_PREFIX}.io_write_bytes"][-1] >= 100000)
+
+
+
+    def test_call_correctness_on_full_buffers(self) -> None:
+        """
+        Checks whether ResourceSampler halves the resolution of full buffers
+        instead of growing them.
+        """
+        sampler:ResourceSampler = ResourceSampler(interval_s = 0.005, capacity = 4)
+        with sampler:
+            busy(0.15)
+
+        series, timestamps = sampler.series()
+        assert(len(timestamps) <= 4)
+        assert(sampler.interval_s >= 0.02)
+        assert(timestamps == sorted(timestamps))
+
+
+
+    @pytest.mark.parametrize("illegal_value", [0, -1.0])
+    def test_init_value_error_on_illegal_interval(self, illegal_value) -> None:
+        """
+        Checks whether ResourceSampler.__init__ raises a ValueError when the
+        interval is not positive.
+        """
+        with pytest.raises(ValueError):
+            ResourceSampler(interval_s = illegal_value)
+
+
+
+class TestLogResources:
+    """
+    Test suite designed for the log_resources option of the
+    veil.decorators.Run and veil.decorators.AutologSession classes.
+    """
+
+    def test_call_correctness(self, tmp_path) -> None:
+        """
+        Checks whether calls with log_resources log the resource series on
+        the child run, one step per sample.
+        """
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        autologger:Autologger = Autologger(sink = sink)
+
+        @Run(autologger = autologger, log_resources = 0.01)
+        def annotated_function(seconds):
+            busy(seconds)
+
+        with autologger.start_session():
+            annotated_function(seconds = 0.1)
+        sink.close()
+
+        connection = sqlite3.connect(sink.path)
+        child_id:str = connection.execute("SELECT run_id FROM runs WHERE parent_run_id IS NOT NULL").fetchone()[0]
+        steps = connection.execute(
+            "SELECT run_id, step FROM metrics WHERE key = ? ORDER BY step", (f"{RESOURCE_PREFIX}.rss_bytes",)).fetchall()
+        assert(len(steps) >= 5)
+        assert(steps == [(child_id, i) for i in range(len(steps))])
+
+
+
+    def test_call_correctness_on_session(self, tmp_path) -> None:
+        """
+        Checks whether sessions with log_resources log the resource series on
+        the parent run before terminating it.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink)
+
+        with autologger.start_session(log_resources = 0.01):
+            busy(0.05)
+        sink.close()
+
+        with open(sink.path) as f:
+            events:List[Dict[str, Any]] = [json.loads(line) for line in f]
+        metrics:List[Dict[str, Any]] = [e for e in events if e["event"] == "log_metrics"]
+
+        assert(len(metrics) >= 3)
+        assert(all(e["run_id"] == events[0]["run_id"] for e in metrics))
+        assert([e["step"] for e in metrics] == list(range(len(metrics))))
+        assert(events[-1]["event"] == "end_session")
+
+
+
+    def test_call_correctness_on_disabled_resources(self, tmp_path) -> None:
+        """
+        Checks whether no resources are sampled by default.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink)
+
+        @Run(autologger = autologger)
+        def annotated_function(seconds):
+            busy(seconds)
+
+        with autologger.start_session():
+            annotated_function(seconds = 0.01)
+        sink.close()
+
+        with open(sink.path) as f:
+            assert(all(json.loads(line)["event"] != "log_metrics" for line in f))
+
+
+
+    def test_call_correctness_on_mlflow_sink(self, tmp_path) -> None:
+        """
+        Checks whether the resource series reach the parent run of a tracking
+        server as metric histories.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(sink = MlflowSink(tracking_uri), experiment_name = "experiment")
+
+        with autologger.start_session(log_resources = 0.01):
+            busy(0.05)
+
+        client:MlflowClient = MlflowClient(tracking_uri)
+        run = client.search_runs([client.get_experiment_by_name("experiment").experiment_id])[0]
+        history = client.get_metric_history(run.info.run_id, f"{RESOURCE_PREFIX}.threads")
+        assert(len(history) >= 3)
+        assert([m.step for m in history] == list(range(len(history))))
+
+
+
+    @pytest.mark.parametrize("illegal_value", ["1", None])
+    def test_init_type_check_error_on_illegal_log_resources(self, illegal_value) -> None:
+        """
+        Checks whether Run.__init__ raises a TypeCheckError when log_resources
+        is of illegal type.
+        """
+        with pytest.raises(TypeCheckError):
+            Run(autologger = Autologger(), log_resources = illegal_value)
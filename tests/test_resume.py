@@ -0,0 +1,199 @@
+from typing import List
+import contextlib
+import os
+import sqlite3
+import pytest
+from typeguard import TypeCheckError
+
+from veil.decorators import Autologger, AutologSession, Run
+from veil.resume import SessionState
+from veil.sinks import SqliteSink
+
+
+class Config:
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return "Config"
+
+
+class TestSessionState:
+    """
+    Test suite designed for methods belonging to the
+    veil.resume.SessionState class.
+    """
+
+    def test_complete_correctness(self, tmp_path) -> None:
+        """
+        Checks whether SessionState persists the parent run id and the
+        finished calls until cleared.
+        """
+        state:SessionState = SessionState(str(tmp_path), "experiment", "session")
+        state.save_run_id("parent")
+        assert(state.complete("key", "child", {"a": 1}))
+
+        # a novel process sees the same state
+        state = SessionState(str(tmp_path), "experiment", "session")
+        assert(state.load_run_id() == "parent")
+        assert(state.lookup("key") == ("child", {"a": 1}))
+        assert(state.lookup("other_key") is None)
+        assert(SessionState(str(tmp_path), "experiment", "other_session").load_run_id() is None)
+
+        state.clear()
+        assert(state.load_run_id() is None)
+        assert(not os.path.exists(state.directory))
+
+
+
+    def test_init_value_error_on_unnamed_session(self, tmp_path) -> None:
+        """
+        Checks whether SessionState.__init__ raises a ValueError without a
+        session name, as unnamed sessions would share the same state.
+        """
+        with pytest.raises(ValueError):
+            SessionState(str(tmp_path), "experiment", None)
+
+
+
+    def test_complete_correctness_on_unpicklable_result(self, tmp_path) -> None:
+        """
+        Checks whether SessionState.complete does not record calls whose
+        result cannot be pickled.
+        """
+        state:SessionState = SessionState(str(tmp_path), "experiment", "session")
+
+        assert(not state.complete("key", "child", lambda: None))
+        assert(state.lookup("key") is None)
+
+
+
+class TestAutologSessionResume:
+    """
+    Test suite designed for the resume argument of the
+    veil.decorators.AutologSession class.
+    """
+
+    @pytest.mark.parametrize("illegal_value", [1, "wrong", None])
+    def test_init_type_check_error_on_illegal_resume(self, illegal_value) -> None:
+        """
+        Checks whether AutologSession.__init__ raises a TypeCheckError when
+        resume is of illegal type.
+        """
+        with pytest.raises(TypeCheckError):
+            AutologSession(autologger = Autologger(), resume = illegal_value)
+
+
+
+    def test_enter_correctness_on_failed_session(self, tmp_path) -> None:
+        """
+        Checks whether a resumed session reattaches to the parent run of the
+        failed attempt, skipping the calls that already finished.
+        """
+        calls:List[str] = []
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment", cache_dir = str(tmp_path / "cache"))
+
+        @Run(autologger = autologger)
+        def step(name, fail = False):
+            calls.append(name)
+            if fail:
+                raise ValueError()
+            return name.upper()
+
+        run_ids:List[str] = []
+        for fail in [True, False]:
+            # each iteration simulates a novel attempt
+            with pytest.raises(ValueError) if fail else contextlib.nullcontext():
+                with autologger.start_session(name = "pipeline", resume = True):
+                    run_ids.append(autologger._current_session.run_id)
+                    assert(step("first") == "FIRST")
+                    step("second", fail = fail)
+        sink.close()
+
+        connection = sqlite3.connect(sink.path)
+        assert(calls == ["first", "second", "second"])
+        assert(run_ids[0] == run_ids[1])
+        assert(connection.execute("SELECT status FROM runs WHERE run_id = ?", (run_ids[0],)).fetchone()[0] == "FINISHED")
+        assert(connection.execute("SELECT COUNT(*) FROM runs WHERE parent_run_id = ?", (run_ids[0],)).fetchone()[0] == 3)
+        assert(not os.path.exists(str(tmp_path / "cache" / "sessions")) or os.listdir(str(tmp_path / "cache" / "sessions")) == [])
+
+
+
+    def test_enter_correctness_on_same_repr(self, tmp_path) -> None:
+        """
+        Checks whether a resumed session skips only the calls that finished
+        with the same arguments, not with arguments of the same repr.
+        """
+        calls:List[int] = []
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment", cache_dir = str(tmp_path / "cache"))
+
+        @Run(autologger = autologger)
+        def step(config, fail = False):
+            calls.append(config.value)
+            if fail:
+                raise ValueError()
+            return config.value
+
+        for fail in [True, False]:
+            with pytest.raises(ValueError) if fail else contextlib.nullcontext():
+                with autologger.start_session(name = "pipeline", resume = True):
+                    assert(step(Config(1)) == 1)
+                    assert(step(Config(2), fail = fail) == 2)
+        sink.close()
+
+        assert(calls == [1, 2, 2])
+
+
+
+    def test_init_value_error_on_unnamed_session(self, tmp_path) -> None:
+        """
+        Checks whether starting a resumable session without a name raises
+        a ValueError.
+        """
+        autologger:Autologger = Autologger(experiment_name = "experiment", cache_dir = str(tmp_path))
+
+        with pytest.raises(ValueError):
+            autologger.start_session(resume = True)
+
+
+
+    def test_enter_correctness_on_finished_session(self, tmp_path) -> None:
+        """
+        Checks whether a resumable session following a successful one starts
+        from scratch.
+        """
+        calls:List[int] = []
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment", cache_dir = str(tmp_path))
+        step = Run(autologger = autologger)(lambda a: calls.append(a))
+
+        run_ids:List[str] = []
+        for _ in range(2):
+            with autologger.start_session(name = "session", resume = True):
+                run_ids.append(autologger._current_session.run_id)
+                step(1)
+
+        assert(calls == [1, 1])
+        assert(run_ids[0] != run_ids[1])
+
+
+
+    def test_enter_correctness_on_unknown_parent_run(self, tmp_path) -> None:
+        """
+        Checks whether a resumable session whose parent run cannot be
+        reattached starts from scratch.
+        """
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment", cache_dir = str(tmp_path))
+        state:SessionState = SessionState(str(tmp_path), "experiment", "session")
+        state.save_run_id("unknown")
+        state.complete("key", "child", 1)
+
+        with autologger.start_session(name = "session", resume = True):
+            run_id:str = autologger._current_session.run_id
+
+        assert(run_id != "unknown")
+        assert(state.lookup("key") is None)
@@ -0,0 +1,207 @@
+from typing import Any, Dict, List
+import functools
+import multiprocessing
+import os
+import pytest
+
+import veil.sinks
+from veil.decorators import Autologger, Run
+from veil.ring import RING_ENV_VAR, EventRing, LoggingProcess, RingConsumer, RingSink
+from veil.sinks import JsonlSink, RunIdAllocator
+
+from tests.utils import read_events
+
+
+def produce(name:str, producer:int, records:int) -> None:
+    ring:EventRing = EventRing(name, create = False)
+    for i in range(records):
+        ring.put(f"{producer}:{i}".encode(), timeout_s = 30)
+    ring.close()
+
+
+def work(calls:int) -> None:
+    # joins the session exported by the parent process
+    autologger:Autologger = Autologger(sink = RingSink())
+
+    @Run(autologger = autologger)
+    def annotated_function(a):
+        return a
+
+    for i in range(calls):
+        annotated_function(a = i)
+    autologger.sink.flush()
+
+
+class TestEventRing:
+    """
+    Test suite designed for the veil.ring.EventRing class.
+    """
+
+    def test_put_correctness(self) -> None:
+        """
+        Checks whether EventRing.get reads the records in the order they have
+        been put, across many wrap-arounds of the ring.
+        """
+        ring:EventRing = EventRing(capacity = 256)
+        try:
+            written:List[bytes] = [os.urandom(i % 50) for i in range(1000)]
+            read:List[bytes] = []
+            for record in written:
+                ring.put(record, timeout_s = 0)
+                if ring.head - ring.tail > 128:
+                    read.extend(ring.get())
+            read.extend(ring.get())
+
+            assert(read == written)
+            assert(ring.head == ring.tail > 10 * ring.capacity)
+        finally:
+            ring.close()
+
+
+
+    def test_put_correctness_on_concurrent_processes(self) -> None:
+        """
+        Checks whether records put by several processes at once are all read,
+        in order for each process.
+        """
+        ring:EventRing = EventRing(capacity = 4096)
+        try:
+            processes = [
+                multiprocessing.Process(target = produce, args = (ring.name, p, 500)) for p in range(4)]
+            for process in processes:
+                process.start()
+            read:List[bytes] = []
+            while any(process.is_alive() for process in processes) or ring.head > ring.tail:
+                read.extend(ring.get())
+            for process in processes:
+                process.join()
+
+            for p in range(4):
+                assert([r for r in read if r.startswith(f"{p}:".encode())] == [f"{p}:{i}".encode() for i in range(500)])
+        finally:
+            ring.close()
+
+
+
+    def test_put_error_on_illegal_ring(self) -> None:
+        """
+        Checks whether EventRing.put raises on records larger than half the
+        ring, on full rings once timed out, and on closed rings.
+        """
+        ring:EventRing = EventRing(capacity = 256)
+        try:
+            with pytest.raises(ValueError):
+                ring.put(bytes(200))
+            for _ in range(8):
+                ring.put(bytes(28))
+            with pytest.raises(TimeoutError):
+                ring.put(bytes(28), timeout_s = 0.01)
+            ring.closed = True
+            with pytest.raises(ValueError):
+                ring.put(b"")
+        finally:
+            ring.close()
+
+
+
+class TestRingSink:
+    """
+    Test suite designed for the veil.ring.RingSink and veil.ring.RingConsumer
+    classes.
+    """
+
+    def test_call_correctness(self, tmp_path) -> None:
+        """
+        Checks whether the operations sent through the ring reach the target
+        sink, with the run ids it allocated.
+        """
+        ring:EventRing = EventRing()
+        try:
+            target:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+            consumer:RingConsumer = RingConsumer(ring, target)
+            autologger:Autologger = Autologger(sink = RingSink(ring.name))
+
+            @Run(autologger = autologger)
+            def annotated_function(a):
+                autologger.log_artifact(b"content", "data/content.bin")
+                return a
+
+            with autologger.start_session(name = "session"):
+                annotated_function(a = 1)
+            assert(consumer.drain() == 7 and consumer.failures == 0)
+            target.close()
+        finally:
+            ring.close()
+
+        events:List[Dict[str, Any]] = read_events(target.path)
+        session_id:str = events[0]["run_id"]
+        child:Dict[str, Any] = next(e for e in events if e["event"] == "start_run")
+        artifact:Dict[str, Any] = next(e for e in events if e["event"] == "log_artifact")
+        assert([e["event"] for e in events] == [
+            "start_session", "start_run", "log_params", "set_tags", "log_artifact", "end_run", "end_session"])
+        assert(child["parent_run_id"] == session_id)
+        assert(artifact["run_id"] == child["run_id"] and artifact["artifact_file"] == "data/content.bin")
+        with open(artifact["path"], "rb") as f:
+            assert(f.read() == b"content")
+
+
+
+    def test_start_run_correctness(self, monkeypatch) -> None:
+        """
+        Checks whether RingSink allocates the ids of sessions and runs through
+        the run id allocator shared by sinks.
+        """
+        monkeypatch.setattr(veil.sinks, "_allocator", RunIdAllocator())
+        ring:EventRing = EventRing()
+        try:
+            sink:RingSink = RingSink(ring.name)
+            session_id:str = sink.start_session("experiment", "session")
+            run_id:str = sink.start_run("experiment", session_id, "run")
+        finally:
+            ring.close()
+
+        assert(session_id[:24] == run_id[:24])
+        assert((session_id[24:], run_id[24:]) == ("00000000", "00000001"))
+
+
+
+    def test_init_value_error_on_missing_ring(self, monkeypatch) -> None:
+        """
+        Checks whether RingSink.__init__ raises a ValueError when no ring is
+        given nor found in the environment.
+        """
+        monkeypatch.delenv(RING_ENV_VAR, raising = False)
+        with pytest.raises(ValueError):
+            RingSink()
+
+
+
+class TestLoggingProcess:
+    """
+    Test suite designed for the veil.ring.LoggingProcess class.
+    """
+
+    def test_start_correctness(self, tmp_path) -> None:
+        """
+        Checks whether the runs of several worker processes joining a session
+        are delivered by the logging process within that session.
+        """
+        path:str = str(tmp_path / "events.jsonl")
+        with LoggingProcess(functools.partial(JsonlSink, path)) as logging_process:
+            assert(os.environ[RING_ENV_VAR] == logging_process.ring.name)
+            autologger:Autologger = Autologger(sink = RingSink())
+            with autologger.start_session(name = "session", export_token = True):
+                workers = [multiprocessing.Process(target = work, args = (50,)) for _ in range(4)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+        assert(RING_ENV_VAR not in os.environ and not logging_process.is_running)
+
+        events:List[Dict[str, Any]] = read_events(path)
+        runs:List[Dict[str, Any]] = [e for e in events if e["event"] == "start_run"]
+        end_runs:List[Dict[str, Any]] = [e for e in events if e["event"] == "end_run"]
+        assert(len(runs) == 200 and len(end_runs) == 200)
+        assert({e["run_id"] for e in end_runs} == {e["run_id"] for e in runs})
+        assert({e["parent_run_id"] for e in runs} == {events[0]["run_id"]})
+        assert(events[-1]["event"] == "end_session")
@@ -0,0 +1,522 @@
+from typing import Any, Dict, List
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import pytest
+
+from mlflow.entities import RunStatus
+from mlflow.tracking import MlflowClient
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+from typeguard import TypeCheckError
+
+import veil.sinks
+from veil.decorators import Autologger, Run
+from veil.sinks import (
+    BatchingSink, FanoutSink, JsonlSink, MlflowSink, NoopSink, RunCreation, RunIdAllocator, Sink, SqliteSink
+)
+
+
+
+def run_session(autologger:Autologger, fail:bool = False) -> None:
+    @Run(autologger = autologger, log_tags = {"b":"2"})
+    def annotated_function(a):
+        if fail:
+            raise ValueError()
+        return a
+
+    with autologger.start_session(name = "session", log_tags = {"a":"1"}):
+        try:
+            annotated_function(a = 1)
+        except ValueError:
+            pass
+
+
+
+class RecordingSink(NoopSink):
+
+    def __init__(self):
+        self.bulk_creations:List[List[RunCreation]] = []
+        self.calls:List[tuple] = []
+
+    def create_runs(self, runs:List[RunCreation]) -> List[str]:
+        self.bulk_creations.append(runs)
+        return [f"server-{len(self.bulk_creations)}-{i}" for i, _ in enumerate(runs)]
+
+    def log_batch(self, run_id:str, params:Dict[str, Any], tags:Dict[str, Any]) -> None:
+        self.calls.append(("log_batch", run_id, params, tags))
+
+    def log_metrics(self, run_id:str, metrics:Dict[str, float], step = None) -> None:
+        self.calls.append(("log_metrics", run_id, metrics, step))
+
+    def end_run(self, run_id:str, status:str) -> None:
+        self.calls.append(("end_run", run_id, status))
+
+    def end_session(self, run_id:str, status:str) -> None:
+        self.calls.append(("end_session", run_id, status))
+
+
+
+class TestAutologgerSink:
+    """
+    Test suite designed for the sink of the
+    veil.decorators.Autologger class.
+    """
+
+    @pytest.mark.parametrize("illegal_value", [1, "wrong"])
+    def test_init_type_check_error_on_illegal_sink(self, illegal_value) -> None:
+        """
+        Checks whether Autologger.__init__ raises a TypeCheckError when
+        sink is of illegal type.
+        """
+        with pytest.raises(TypeCheckError):
+            Autologger(
+                sink = illegal_value
+            )
+
+
+
+    def test_init_correctness_on_default_sink(self) -> None:
+        """
+        Checks whether Autologger.__init__ defaults to an isolated MlflowSink.
+        """
+        autologger:Autologger = Autologger()
+        assert(isinstance(autologger.sink, MlflowSink))
+        assert(autologger.sink.isolated)
+
+
+
+class TestNoopSink:
+    """
+    Test suite designed for the veil.sinks.NoopSink class.
+    """
+
+    def test_call_correctness(self) -> None:
+        """
+        Checks whether a Run decorated function is invoked when
+        dispatching to a NoopSink.
+        """
+        autologger:Autologger = Autologger(sink = NoopSink())
+
+        @Run(autologger = autologger)
+        def annotated_function(a):
+            return a
+
+        with autologger.start_session():
+            assert(annotated_function(a = 1) == 1)
+
+
+
+class TestJsonlSink:
+    """
+    Test suite designed for the veil.sinks.JsonlSink class.
+    """
+
+    @pytest.mark.parametrize("fail, status", [(False, "FINISHED"), (True, "FAILED")])
+    def test_call_correctness(self, tmp_path, fail:bool, status:str) -> None:
+        """
+        Checks whether a session with a Run decorated function writes
+        consistent events into the JSONL file.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        run_session(Autologger(sink = sink, experiment_name = "experiment"), fail = fail)
+        sink.close()
+
+        with open(sink.path) as f:
+            events:List[Dict[str, Any]] = [json.loads(line) for line in f]
+
+        assert([e["event"] for e in events] == [
+            "start_session", "start_run", "log_params", "set_tags", "end_run", "end_session"])
+        assert(events[0]["experiment"] == "experiment")
+        assert(events[1]["parent_run_id"] == events[0]["run_id"])
+        assert(events[2]["params"] == {"a":1})
+        assert(events[3]["tags"]["a"] == "1" and events[3]["tags"]["b"] == "2")
+        assert(events[4]["status"] == status)
+        assert(events[5]["status"] == "FINISHED")
+
+
+
+class TestSqliteSink:
+    """
+    Test suite designed for the veil.sinks.SqliteSink class.
+    """
+
+    def test_call_correctness(self, tmp_path) -> None:
+        """
+        Checks whether a session with a Run decorated function stores
+        consistent runs, params and tags into the database.
+        """
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        run_session(Autologger(sink = sink))
+        sink.close()
+
+        connection = sqlite3.connect(sink.path)
+        runs = connection.execute("SELECT run_id, parent_run_id, status FROM runs ORDER BY parent_run_id IS NOT NULL").fetchall()
+        assert(len(runs) == 2)
+        assert(runs[1][1] == runs[0][0])
+        assert(all(status == "FINISHED" for _, _, status in runs))
+        assert(connection.execute("SELECT key, value FROM params").fetchall() == [("a", "1")])
+        assert(("b", "2") in connection.execute("SELECT key, value FROM tags").fetchall())
+
+
+
+    def test_log_metrics_correctness(self, tmp_path) -> None:
+        """
+        Checks whether SqliteSink.log_metrics keeps the history of every
+        metric, step by step.
+        """
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        run_id:str = sink.start_session("experiment", "session")
+        sink.log_metrics(run_id, {"loss": 0.5}, step = 1)
+        sink.log_metrics(run_id, {"loss": 0.25, "accuracy": 1}, step = 2)
+        sink.close()
+
+        rows = sqlite3.connect(sink.path).execute("SELECT key, value, step FROM metrics ORDER BY step, key").fetchall()
+        assert(rows == [("loss", 0.5, 1), ("accuracy", 1.0, 2), ("loss", 0.25, 2)])
+
+
+
+class TestMlflowSink:
+    """
+    Test suite designed for the veil.sinks.MlflowSink class.
+    """
+
+    def test_call_correctness_on_isolated_sink(self, tmp_path) -> None:
+        """
+        Checks whether the sink following the mlflow fluent state logs to the
+        run it is given, rather than to the run active within mlflow.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(tracking_uri = tracking_uri, experiment_name = "experiment")
+        assert(autologger.sink.isolated)
+
+        @Run(autologger = autologger)
+        def annotated_function():
+            session_id:str = autologger._current_session.run_id
+            autologger.sink.log_params(session_id, {"p": 1})
+            autologger.sink.log_metrics(session_id, {"m": 0.5})
+            autologger.sink.log_text(session_id, "text", "notes.txt")
+
+        with autologger.start_session(name = "session"):
+            annotated_function()
+
+        client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+        runs = client.search_runs([client.get_experiment_by_name("experiment").experiment_id])
+        child = next(r for r in runs if MLFLOW_PARENT_RUN_ID in r.data.tags)
+        parent = next(r for r in runs if MLFLOW_PARENT_RUN_ID not in r.data.tags)
+
+        assert(len(runs) == 2)
+        assert((parent.data.params, parent.data.metrics) == ({"p": "1"}, {"m": 0.5}))
+        assert([a.path for a in client.list_artifacts(parent.info.run_id)] == ["notes.txt"])
+        assert((child.data.params, child.data.metrics) == ({}, {}))
+        assert(all(r.info.status == RunStatus.to_string(RunStatus.FINISHED) for r in runs))
+
+    def test_call_correctness_on_explicit_tracking_uri(self, tmp_path) -> None:
+        """
+        Checks whether a session with a Run decorated function creates
+        a parent and a nested child run on the given tracking server.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        sink:MlflowSink = MlflowSink(tracking_uri = tracking_uri)
+        assert(not sink.isolated)
+
+        run_session(Autologger(sink = sink, experiment_name = "experiment"))
+
+        client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+        experiment = client.get_experiment_by_name("experiment")
+        runs = client.search_runs([experiment.experiment_id])
+        child = next(r for r in runs if MLFLOW_PARENT_RUN_ID in r.data.tags)
+        parent = next(r for r in runs if MLFLOW_PARENT_RUN_ID not in r.data.tags)
+
+        assert(child.data.tags[MLFLOW_PARENT_RUN_ID] == parent.info.run_id)
+        assert(child.data.params == {"a":"1"})
+        assert(child.data.tags["b"] == "2")
+        assert(child.info.status == RunStatus.to_string(RunStatus.FINISHED))
+        assert(parent.info.status == RunStatus.to_string(RunStatus.FINISHED))
+
+
+
+class TestRunIdAllocator:
+    """
+    Test suite designed for the veil.sinks.RunIdAllocator class.
+    """
+
+    def test_allocate_correctness(self) -> None:
+        """
+        Checks whether RunIdAllocator.allocate returns unique ids, sharing
+        a prefix within the same block.
+        """
+        allocator:RunIdAllocator = RunIdAllocator(block_size = 4)
+        run_ids:List[str] = [allocator.allocate() for _ in range(8)]
+
+        assert(len(set(run_ids)) == 8)
+        assert(all(len(run_id) == 32 for run_id in run_ids))
+        assert(len({run_id[:24] for run_id in run_ids[:4]}) == 1)
+        assert(run_ids[0][:24] != run_ids[4][:24])
+
+    def test_reset_correctness(self) -> None:
+        """
+        Checks whether RunIdAllocator.reset makes the next id start a new block.
+        """
+        allocator:RunIdAllocator = RunIdAllocator()
+        run_id:str = allocator.allocate()
+        allocator.reset()
+
+        assert(allocator.allocate()[:24] != run_id[:24])
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason = "forking is not supported")
+    def test_reset_correctness_on_forked_processes(self) -> None:
+        """
+        Checks whether forked processes allocate other ids than their parent.
+        """
+        run_id:str = veil.sinks._new_run_id()
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        process = context.Process(target = lambda: queue.put(veil.sinks._new_run_id()))
+        process.start()
+        child_run_id:str = queue.get(timeout = 30)
+        process.join()
+
+        assert(child_run_id[:24] != run_id[:24])
+        assert(veil.sinks._new_run_id()[:24] == run_id[:24])
+
+
+
+class TestBatchingSink:
+    """
+    Test suite designed for the veil.sinks.BatchingSink class.
+    """
+
+    def test_init_value_error_on_isolated_target(self) -> None:
+        """
+        Checks whether BatchingSink.__init__ raises a ValueError when the
+        target sink is bound to the mlflow fluent state.
+        """
+        with pytest.raises(ValueError):
+            BatchingSink(MlflowSink())
+
+
+
+    def test_call_correctness(self) -> None:
+        """
+        Checks whether a session with many Run decorated calls creates
+        every run with a single bulk creation per kind on session exit.
+        """
+        target:RecordingSink = RecordingSink()
+        autologger:Autologger = Autologger(sink = BatchingSink(target, batch_size = 10000))
+
+        @Run(autologger = autologger)
+        def annotated_function(a):
+            return a
+
+        with autologger.start_session(name = "session"):
+            for i in range(100):
+                annotated_function(a = i)
+            assert(target.bulk_creations == [])
+
+        assert([len(runs) for runs in target.bulk_creations] == [1, 100])
+        session_id:str = [c for c in target.calls if c[0] == "end_session"][0][1]
+        assert(all(r.parent_run_id == session_id for r in target.bulk_creations[1]))
+        assert(len([c for c in target.calls if c[0] == "end_run"]) == 100)
+        assert(sorted(c[2]["a"] for c in target.calls if c[0] == "log_batch" and c[2]) == list(range(100)))
+
+
+
+    def test_flush_correctness_on_batch_size(self) -> None:
+        """
+        Checks whether BatchingSink flushes pending operations once
+        batch_size of them have been buffered.
+        """
+        target:RecordingSink = RecordingSink()
+        sink:BatchingSink = BatchingSink(target, batch_size = 3)
+
+        session_id:str = sink.start_session("experiment", "session")
+        run_id:str = sink.start_run("experiment", session_id, "run")
+        assert(target.bulk_creations == [])
+        sink.log_params(run_id, {"a":1})
+
+        assert([len(runs) for runs in target.bulk_creations] == [1, 1])
+        assert(target.calls == [("log_batch", "server-2-0", {"a":1}, {})])
+
+
+
+    def test_flush_correctness_on_metrics(self) -> None:
+        """
+        Checks whether BatchingSink delivers buffered metrics after the
+        params and tags of their run, in logging order.
+        """
+        target:RecordingSink = RecordingSink()
+        sink:BatchingSink = BatchingSink(target)
+
+        session_id:str = sink.start_session("experiment", "session")
+        sink.log_metrics(session_id, {"loss": 0.5}, step = 1)
+        sink.set_tags(session_id, {"a":"1"})
+        sink.log_metrics(session_id, {"loss": 0.25}, step = 2)
+        sink.flush()
+
+        assert(target.calls == [
+            ("log_batch", "server-1-0", {}, {"a":"1"}),
+            ("log_metrics", "server-1-0", {"loss": 0.5}, 1),
+            ("log_metrics", "server-1-0", {"loss": 0.25}, 2),
+        ])
+
+
+
+class SlowSink(RecordingSink):
+
+    def log_batch(self, run_id:str, params:Dict[str, Any], tags:Dict[str, Any]) -> None:
+        time.sleep(0.2)
+        super().log_batch(run_id, params, tags)
+
+
+
+class FailingSink(NoopSink):
+
+    def start_session(self, experiment_name:str, name, tags = None) -> str:
+        raise ConnectionError("unreachable")
+
+    def create_runs(self, runs:List[RunCreation]) -> List[str]:
+        raise ConnectionError("unreachable")
+
+    def log_batch(self, run_id:str, params:Dict[str, Any], tags:Dict[str, Any]) -> None:
+        raise ConnectionError("unreachable")
+
+
+
+class TestFanoutSink:
+    """
+    Test suite designed for the veil.sinks.FanoutSink class.
+    """
+
+    @pytest.mark.parametrize("targets", [[], [MlflowSink()]])
+    def test_init_value_error_on_illegal_targets(self, targets:List[Sink]) -> None:
+        """
+        Checks whether FanoutSink.__init__ raises a ValueError without
+        destinations or with a destination bound to the mlflow fluent state.
+        """
+        with pytest.raises(ValueError):
+            FanoutSink(targets)
+
+
+
+    def test_call_correctness(self, tmp_path) -> None:
+        """
+        Checks whether a session with a Run decorated function creates
+        the same runs on every tracking server.
+        """
+        tracking_uris:List[str] = [(tmp_path / name).as_uri() for name in ["central", "mirror"]]
+        sink:FanoutSink = FanoutSink([MlflowSink(tracking_uri = uri) for uri in tracking_uris])
+
+        run_session(Autologger(sink = sink, experiment_name = "experiment"))
+
+        for tracking_uri in tracking_uris:
+            client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+            runs = client.search_runs([client.get_experiment_by_name("experiment").experiment_id])
+            child = next(r for r in runs if MLFLOW_PARENT_RUN_ID in r.data.tags)
+            parent = next(r for r in runs if MLFLOW_PARENT_RUN_ID not in r.data.tags)
+
+            assert(child.data.tags[MLFLOW_PARENT_RUN_ID] == parent.info.run_id)
+            assert(child.data.params == {"a":"1"})
+            assert(child.info.status == parent.info.status == RunStatus.to_string(RunStatus.FINISHED))
+        assert(sink.failures == [0, 0])
+
+
+
+    def test_call_correctness_on_concurrent_destinations(self) -> None:
+        """
+        Checks whether FanoutSink addresses its destinations concurrently,
+        each one with its own run ids.
+        """
+        targets:List[SlowSink] = [SlowSink() for _ in range(3)]
+        sink:FanoutSink = FanoutSink(targets)
+
+        session_id:str = sink.start_session("experiment", "session")
+        run_id:str = sink.start_run("experiment", session_id, "run")
+        start:float = time.perf_counter()
+        sink.log_batch(run_id, {"a":1}, {})
+
+        assert(time.perf_counter() - start < 0.4)
+        assert(all(t.calls == [("log_batch", "server-1-0", {"a":1}, {})] for t in targets))
+        parent_run_ids:List[str] = [t.bulk_creations[0][0].parent_run_id for t in targets]
+        assert(session_id == ".".join(["fanout", *parent_run_ids]) and len(set(parent_run_ids)) == 3)
+
+
+
+    def test_call_correctness_on_failing_destination(self) -> None:
+        """
+        Checks whether a destination failing does not prevent the others
+        from receiving the operations, while it is skipped by the ones on
+        runs it failed to create.
+        """
+        target:RecordingSink = RecordingSink()
+        sink:FanoutSink = FanoutSink([FailingSink(), target])
+
+        session_id:str = sink.start_session("experiment", "session")
+        run_id:str = sink.start_run("experiment", session_id, "run")
+        sink.log_batch(run_id, {"a":1}, {})
+        sink.end_run(run_id, "FINISHED")
+
+        assert(run_id == "server-1-0")
+        assert(target.calls == [("log_batch", "server-1-0", {"a":1}, {}), ("end_run", "server-1-0", "FINISHED")])
+        assert(session_id != run_id and sink.failures == [1, 0])
+
+
+
+    def test_call_correctness_on_other_process(self) -> None:
+        """
+        Checks whether a session resumed by another FanoutSink, e.g. after
+        a restart or from a session token, is still dispatched to every
+        destination that created it, with its own session ids.
+        """
+        targets:List[RecordingSink] = [RecordingSink(), RecordingSink(), RecordingSink()]
+        session_id:str = FanoutSink([FailingSink(), *targets[1:]]).start_session("experiment", "session")
+
+        sink:FanoutSink = FanoutSink(targets)
+        assert(sink.resume_session(session_id))
+        sink.start_run("experiment", session_id, "run")
+        sink.end_session(session_id, "FINISHED")
+
+        parent_run_ids:List[str] = [run_id for run_id in session_id.split(".")[1:] if run_id]
+        assert(targets[0].bulk_creations == [] and targets[0].calls == [])
+        assert([t.bulk_creations[0][0].parent_run_id for t in targets[1:]] == parent_run_ids)
+        assert([t.calls for t in targets[1:]] == [[("end_session", r, "FINISHED")] for r in parent_run_ids])
+
+
+
+    def test_log_spooled_correctness(self, tmp_path, monkeypatch) -> None:
+        """
+        Checks whether every destination takes a spooled file of its own
+        over, each one removed once delivered.
+        """
+        monkeypatch.setattr(veil.sinks.tempfile, "tempdir", str(tmp_path / "tmp"))
+        os.makedirs(tmp_path / "tmp")
+        targets:List[JsonlSink] = [JsonlSink(str(tmp_path / f"{name}.jsonl")) for name in ["central", "mirror"]]
+        batching:BatchingSink = BatchingSink(targets[1])
+        sink:FanoutSink = FanoutSink([targets[0], batching])
+        session_id:str = sink.start_session("experiment", "session")
+
+        sink.log_bytes(session_id, b"profile", "profiles/run.folded")
+        assert(len(os.listdir(tmp_path / "tmp")) == 1)
+        batching.flush()
+
+        assert(os.listdir(tmp_path / "tmp") == [])
+        for target in targets:
+            target.flush()
+            with open(target.path) as f:
+                artifact = [json.loads(line) for line in f if "log_artifact" in line][0]
+            assert(artifact["artifact_file"] == "profiles/run.folded")
+            with open(artifact["path"], "rb") as f:
+                assert(f.read() == b"profile")
+
+
+
+    def test_call_error_on_failing_destinations(self) -> None:
+        """
+        Checks whether an operation raises when every destination fails it.
+        """
+        sink:FanoutSink = FanoutSink([FailingSink(), FailingSink()])
+
+        with pytest.raises(ConnectionError):
+            sink.start_session("experiment", "session")
+        assert(sink.failures == [1, 1])
@@ -0,0 +1,137 @@
+from typing import List
+from unittest.mock import ANY, Mock
+import sqlite3
+import pytest
+from typeguard import TypeCheckError
+
+from veil.decorators import Autologger, Run
+from veil.sinks import SqliteSink
+from veil.source import SCOPE_FUNCTION, SCOPE_MODULE, SourceSnapshot, UploadRegistry, take_snapshots
+
+from tests.mocks import (
+    mocked_server,
+    mock_active_run,
+    mock_start_run,
+    mock_set_experiment,
+    mock_client,
+    mock_end_run,
+    mock_log_batch,
+    mock_log_text,
+    mock_search_runs,
+    logged,
+)
+
+
+def snapshotted_function(a):
+    return a
+
+
+
+class TestTakeSnapshots:
+    """
+    Test suite designed for veil.source.take_snapshots.
+    """
+
+    @pytest.mark.parametrize("include_module, scopes", [
+        (False, [SCOPE_FUNCTION]),
+        (True, [SCOPE_FUNCTION, SCOPE_MODULE])
+    ])
+    def test_take_snapshots_correctness(self, include_module:bool, scopes:List[str]) -> None:
+        """
+        Checks whether take_snapshots hashes the source of the function
+        and, optionally, of its module.
+        """
+        snapshots:List[SourceSnapshot] = take_snapshots(snapshotted_function, include_module = include_module)
+
+        assert([s.scope for s in snapshots] == scopes)
+        assert(snapshots[0].text.startswith("def snapshotted_function(a):"))
+        assert(len(snapshots[0].digest) == 64)
+        assert(snapshots[0].artifact_file == f"source/function/{snapshots[0].digest}.py")
+        assert(take_snapshots(snapshotted_function, include_module = include_module) == snapshots)
+
+
+
+    def test_take_snapshots_correctness_on_unavailable_source(self) -> None:
+        """
+        Checks whether take_snapshots skips functions without source.
+        """
+        assert(take_snapshots(len) == [])
+
+
+
+class TestUploadRegistry:
+    """
+    Test suite designed for the veil.source.UploadRegistry class.
+    """
+
+    def test_claim_correctness(self) -> None:
+        """
+        Checks whether UploadRegistry.claim succeeds once per experiment
+        and digest, unless released.
+        """
+        registry:UploadRegistry = UploadRegistry()
+
+        assert(registry.claim("experiment", "digest"))
+        assert(not registry.claim("experiment", "digest"))
+        assert(registry.claim("other_experiment", "digest"))
+        registry.release("experiment", "digest")
+        assert(registry.claim("experiment", "digest"))
+
+
+
+class TestRunLogSource:
+    """
+    Test suite designed for the log_source argument of the
+    veil.decorators.Run class.
+    """
+
+    @pytest.mark.parametrize("illegal_value", [1, "wrong"])
+    def test_init_type_check_error_on_illegal_log_source(self, illegal_value) -> None:
+        """
+        Checks whether Run.__init__ raises a TypeCheckError when
+        log_source is of illegal value.
+        """
+        with pytest.raises(TypeCheckError):
+            Run(autologger = Autologger(), log_source = illegal_value)
+
+
+
+    def test_call_correctness_on_mlflow_sink(self, mock_log_text:Mock, mock_log_batch:Mock) -> None:
+        """
+        Checks whether the source of the decorated function is tagged on
+        every child run while being uploaded once.
+        """
+        autologger:Autologger = Autologger(experiment_name = "log_source_experiment")
+        snapshot:SourceSnapshot = take_snapshots(snapshotted_function)[0]
+
+        with autologger.start_session():
+            decorated = Run(autologger = autologger, log_source = "function")(snapshotted_function)
+            for i in range(3):
+                decorated(a = i)
+
+        mock_log_text.assert_called_once_with(ANY, snapshot.text, snapshot.artifact_file)
+        assert(all(tags[snapshot.tag] == snapshot.digest for tags in logged(mock_log_batch, "tags")))
+
+
+
+    def test_call_correctness_on_previously_uploaded_source(self, tmp_path, monkeypatch) -> None:
+        """
+        Checks whether the source already uploaded within the experiment
+        by a previous process is not uploaded again.
+        """
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+        decorated = Run(autologger = autologger, log_source = "module")(snapshotted_function)
+
+        for _ in range(2):
+            # each iteration simulates a novel process
+            monkeypatch.setattr("veil.decorators.source_uploads", UploadRegistry())
+            with autologger.start_session():
+                decorated(a = 1)
+                decorated(a = 2)
+        sink.close()
+
+        connection = sqlite3.connect(sink.path)
+        artifacts = connection.execute("SELECT artifact_file FROM artifacts").fetchall()
+        assert(sorted(a[0].split("/")[1] for a in artifacts) == [SCOPE_FUNCTION, SCOPE_MODULE])
+        assert(connection.execute("SELECT COUNT(*) FROM tags WHERE key = 'veil.source.module.hash'").fetchone()[0] == 4)
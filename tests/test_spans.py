@@ -0,0 +1,195 @@
+from typing import Any, Dict, List
+import json
+import threading
+import pytest
+
+from veil.decorators import Autologger, Run
+from veil.sinks import JsonlSink
+from veil.spans import SPAN_ARTIFACT_FILE, SPAN_PREFIX, SpanTree, current_tree, recording
+
+from tests.utils import read_events
+
+
+class TestSpanTree:
+    """
+    Test suite designed for the veil.spans.SpanTree class.
+    """
+
+    def test_span_tree_correctness(self) -> None:
+        """
+        Checks whether nested spans are recorded under the innermost open one
+        and summarized as metrics.
+        """
+        tree:SpanTree = SpanTree("outer", {"a":1})
+        inner = tree.open("inner", {})
+        innermost = tree.open("innermost", {"b":2})
+        tree.close(innermost, "FAILED")
+        tree.close(inner, "FINISHED")
+        sibling = tree.open("inner", {})
+        tree.close(sibling, "FINISHED")
+        tree.close(tree.root, "FINISHED")
+
+        assert(tree.size == 3)
+        assert([span.name for span in tree.root.children] == ["inner", "inner"])
+        assert(tree.root.children[0].children[0].params == {"b":2})
+
+        metrics:Dict[str, float] = tree.metrics("FAILED")
+        assert(metrics[f"{SPAN_PREFIX}.count"] == 3)
+        assert(metrics[f"{SPAN_PREFIX}.depth"] == 2)
+        assert(metrics[f"{SPAN_PREFIX}.errors"] == 1)
+        assert(metrics[f"{SPAN_PREFIX}.inner.calls"] == 2)
+        assert(metrics[f"{SPAN_PREFIX}.innermost.calls"] == 1)
+        assert(metrics[f"{SPAN_PREFIX}.inner.max_s"] <= metrics[f"{SPAN_PREFIX}.inner.total_s"])
+
+        root:Dict[str, Any] = json.loads(tree.to_json())
+        assert(root["params"] == {"a":1} and root["status"] == "FINISHED")
+        assert("params" not in root["children"][1] and "children" not in root["children"][1])
+        assert(root["children"][0]["children"][0]["status"] == "FAILED")
+
+    def test_span_tree_correctness_on_max_spans(self) -> None:
+        """
+        Checks whether spans beyond max_spans are counted as dropped.
+        """
+        tree:SpanTree = SpanTree("outer", {}, max_spans = 2)
+        for _ in range(5):
+            tree.close(tree.open("inner", {}), "FINISHED")
+
+        assert(tree.size == 2)
+        assert(tree.dropped == 3)
+        assert(tree.metrics("FAILED")[f"{SPAN_PREFIX}.dropped"] == 3)
+
+    def test_recording_correctness(self) -> None:
+        """
+        Checks whether recording makes a tree the current one of the calling
+        thread only, restoring the previous one on exit.
+        """
+        outer:SpanTree = SpanTree("outer", {})
+        inner:SpanTree = SpanTree("inner", {})
+        seen:List[Any] = []
+
+        with recording(outer):
+            with recording(inner):
+                assert(current_tree() is inner)
+                thread = threading.Thread(target = lambda: seen.append(current_tree()))
+                thread.start()
+                thread.join()
+            assert(current_tree() is outer)
+        assert(current_tree() is None)
+        assert(seen == [None])
+
+
+
+class TestSpanMode:
+    """
+    Test suite designed for sessions recording nested decorated calls as spans.
+    """
+
+    def test_span_mode_correctness(self, tmp_path) -> None:
+        """
+        Checks whether nested decorated calls are recorded as spans of the
+        outermost child run rather than as runs of their own.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+
+        @Run(autologger = autologger)
+        def innermost(b):
+            raise ValueError()
+
+        @Run(autologger = autologger, name = "middle")
+        def inner(a):
+            with pytest.raises(ValueError):
+                innermost(b = a)
+            return a
+
+        @Run(autologger = autologger)
+        def outer(a):
+            return inner(a = a) + inner(a = a + 1)
+
+        with autologger.start_session(log_spans = True):
+            assert(outer(a = 1) == 3)
+
+        events:List[Dict[str, Any]] = read_events(sink)
+        runs:List[Dict[str, Any]] = [e for e in events if e["event"] == "start_run"]
+        assert([run["name"] for run in runs] == ["outer"])
+        run_id:str = runs[0]["run_id"]
+
+        metrics:Dict[str, float] = next(e["metrics"] for e in events if e["event"] == "log_metrics")
+        assert(metrics[f"{SPAN_PREFIX}.count"] == 4)
+        assert(metrics[f"{SPAN_PREFIX}.depth"] == 2)
+        assert(metrics[f"{SPAN_PREFIX}.errors"] == 2)
+        assert(metrics[f"{SPAN_PREFIX}.middle.calls"] == 2)
+
+        with open(sink.load_artifact(run_id, SPAN_ARTIFACT_FILE)) as f:
+            root:Dict[str, Any] = json.load(f)
+        assert(root["name"] == "outer" and root["params"] == {"a":1} and root["status"] == "FINISHED")
+        assert([child["params"] for child in root["children"]] == [{"a":1}, {"a":2}])
+        assert(root["children"][0]["children"][0]["name"] == "innermost")
+        assert(root["children"][0]["children"][0]["status"] == "FAILED")
+
+        end_runs:List[Dict[str, Any]] = [e for e in events if e["event"] == "end_run"]
+        assert(len(end_runs) == 1 and end_runs[0]["status"] == "FINISHED")
+
+    def test_span_mode_correctness_on_flat_calls(self, tmp_path) -> None:
+        """
+        Checks whether calls without nested decorated calls log no spans.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+
+        @Run(autologger = autologger)
+        def flat(a):
+            return a
+
+        with autologger.start_session(log_spans = True):
+            flat(a = 1)
+
+        events:List[Dict[str, Any]] = read_events(sink)
+        assert(not any(e["event"] in ("log_metrics", "log_artifact") for e in events))
+
+    def test_span_mode_correctness_on_worker_threads(self, tmp_path) -> None:
+        """
+        Checks whether decorated calls performed by other threads are not
+        nested into the spans of the calling one.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+
+        @Run(autologger = autologger)
+        def inner():
+            pass
+
+        @Run(autologger = autologger)
+        def outer():
+            thread = threading.Thread(target = inner)
+            thread.start()
+            thread.join()
+
+        with autologger.start_session(log_spans = True):
+            outer()
+
+        events:List[Dict[str, Any]] = read_events(sink)
+        assert(sorted(e["name"] for e in events if e["event"] == "start_run") == ["inner", "outer"])
+        assert(not any(e["event"] == "log_metrics" for e in events))
+
+    def test_span_mode_correctness_on_disabled_spans(self, tmp_path) -> None:
+        """
+        Checks whether nested decorated calls keep getting runs of their own
+        outside of span mode.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+
+        @Run(autologger = autologger)
+        def inner():
+            return current_tree()
+
+        @Run(autologger = autologger)
+        def outer():
+            return inner()
+
+        with autologger.start_session():
+            assert(outer() is None)
+
+        events:List[Dict[str, Any]] = read_events(sink)
+        assert([e["name"] for e in events if e["event"] == "start_run"] == ["outer", "inner"])
@@ -0,0 +1,182 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import json
+import os
+import sqlite3
+import threading
+import time
+import pytest
+
+from veil.decorators import Autologger, Run
+from veil.sinks import SqliteSink
+from veil.sweeps import SweepPoint, expand_grid
+
+
+def power(base, exponent = 2):
+    if base < 0:
+        raise ValueError("negative base")
+    return base ** exponent
+
+
+
+class TestExpandGrid:
+    """
+    Test suite designed for veil.sweeps.expand_grid.
+    """
+
+    def test_expand_grid_correctness(self) -> None:
+        """
+        Checks whether expand_grid computes the cartesian product of the
+        param values, or keeps the explicit points.
+        """
+        assert(expand_grid({"a": [1, 2], "b": ["x", "y"]}) == [
+            {"a": 1, "b": "x"}, {"a": 1, "b": "y"}, {"a": 2, "b": "x"}, {"a": 2, "b": "y"}
+        ])
+        assert(expand_grid([{"a": 1}, {"a": 2, "b": 3}]) == [{"a": 1}, {"a": 2, "b": 3}])
+
+
+
+    def test_expand_grid_correctness_on_random_space(self) -> None:
+        """
+        Checks whether expand_grid draws the requested number of points,
+        reproducibly given a seed.
+        """
+        space = {"lr": lambda rng: rng.uniform(0.0, 1.0), "depth": [2, 4, 8]}
+        points:List[Dict] = expand_grid(space, n_samples = 5, seed = 42)
+
+        assert(len(points) == 5)
+        assert(all(0.0 <= p["lr"] <= 1.0 and p["depth"] in [2, 4, 8] for p in points))
+        assert(points == expand_grid(space, n_samples = 5, seed = 42))
+        assert(len(expand_grid([{"a": i} for i in range(10)], n_samples = 3)) == 3)
+
+
+
+    def test_expand_grid_value_error_on_unsampled_random_space(self) -> None:
+        """
+        Checks whether expand_grid raises a ValueError when a random space is
+        not sampled.
+        """
+        with pytest.raises(ValueError):
+            expand_grid({"lr": lambda rng: rng.random()})
+
+
+
+class TestSweep:
+    """
+    Test suite designed for veil.sweeps.sweep.
+    """
+
+    @pytest.fixture
+    def sink(self, tmp_path):
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        yield sink
+        sink.close()
+
+
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_sweep_correctness(self, sink:SqliteSink, executor) -> None:
+        """
+        Checks whether every point is tracked as a child run of the session,
+        failed points being isolated and summarized on the parent run.
+        """
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+
+        with autologger.start_session(name = "grid"):
+            parent_run_id:str = autologger._current_session.run_id
+            outcomes:List[SweepPoint] = autologger.sweep(
+                power, {"base": [-1, 1, 2, 3], "exponent": [2, 3]}, executor = executor, max_workers = 2)
+        sink.flush()
+
+        assert([o.result for o in outcomes] == [None, None, 1, 1, 4, 8, 9, 27])
+        assert([o.failed for o in outcomes] == [True, True] + [False] * 6)
+        assert(isinstance(outcomes[0].error, ValueError))
+
+        connection = sqlite3.connect(sink.path)
+        statuses = connection.execute(
+            "SELECT status, COUNT(*) FROM runs WHERE parent_run_id = ? GROUP BY status", (parent_run_id,)).fetchall()
+        assert(sorted(statuses) == [("FAILED", 2), ("FINISHED", 6)])
+        tags = dict(connection.execute("SELECT key, value FROM tags WHERE run_id = ?", (parent_run_id,)).fetchall())
+        assert((tags["veil.sweep.power.points"], tags["veil.sweep.power.failed"]) == ("8", "2"))
+        path:str = connection.execute("SELECT path FROM artifacts WHERE run_id = ?", (parent_run_id,)).fetchone()[0]
+        with open(path) as f:
+            assert(len(json.load(f)) == 8)
+
+
+
+    def test_sweep_correctness_on_bounded_concurrency(self, sink:SqliteSink) -> None:
+        """
+        Checks whether at most max_workers points are in progress at once,
+        with the given executor.
+        """
+        lock:threading.Lock = threading.Lock()
+        in_progress:List[int] = [0, 0]
+
+        def sleepy(a):
+            with lock:
+                in_progress[0] += 1
+                in_progress[1] = max(in_progress[1], in_progress[0])
+            time.sleep(0.02)
+            with lock:
+                in_progress[0] -= 1
+            return a
+
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+        with ThreadPoolExecutor(max_workers = 8) as executor:
+            outcomes = autologger.sweep(sleepy, [{"a": i} for i in range(12)], executor = executor, max_workers = 3)
+
+        assert([o.result for o in outcomes] == list(range(12)))
+        assert(1 < in_progress[1] <= 3)
+
+
+
+    def test_sweep_correctness_on_decorated_function(self, sink:SqliteSink) -> None:
+        """
+        Checks whether the options of a decorated function are preserved, and
+        whether a session is started when none is active.
+        """
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+        decorated = Run(autologger = autologger, name = "custom", log_tags = {"k": "v"})(power)
+
+        autologger.sweep(decorated, {"base": [1, 2]}, name = "my_sweep")
+        sink.flush()
+
+        connection = sqlite3.connect(sink.path)
+        runs = connection.execute("SELECT name, parent_run_id FROM runs ORDER BY parent_run_id IS NOT NULL").fetchall()
+        assert([r[0] for r in runs] == ["my_sweep", "custom", "custom"])
+        assert(connection.execute("SELECT COUNT(*) FROM tags WHERE key = 'k'").fetchone()[0] == 2)
+
+
+
+    def test_sweep_correctness_on_disabled_autolog(self, sink:SqliteSink) -> None:
+        """
+        Checks whether points are still computed when auto-logging is disabled.
+        """
+        autologger:Autologger = Autologger(is_autolog_enabled = False, sink = sink)
+
+        outcomes = autologger.sweep(power, {"base": [1, 2, 3]})
+
+        assert([o.result for o in outcomes] == [1, 4, 9])
+        assert(not os.path.exists(sink.path) or sqlite3.connect(sink.path).execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 0)
+
+
+
+    def test_sweep_correctness_on_mlflow_sink(self, tmp_path) -> None:
+        """
+        Checks whether points are correctly parented when tracked from worker
+        threads with the default mlflow sink, bound to the thread-unsafe fluent apis.
+        """
+        from mlflow import MlflowClient
+        tracking_uri:str = f"file:{tmp_path / 'mlruns'}"
+        autologger:Autologger = Autologger(tracking_uri = tracking_uri, experiment_name = "experiment")
+
+        with autologger.start_session(name = "grid"):
+            parent_run_id:str = autologger._current_session.run_id
+            autologger.sweep(power, {"base": list(range(6))}, max_workers = 3)
+
+        client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+        experiment_id:str = client.get_experiment_by_name("experiment").experiment_id
+        children = client.search_runs([experiment_id], filter_string = f"tags.mlflow.parentRunId = '{parent_run_id}'")
+        assert(sorted(int(r.data.params["base"]) for r in children) == list(range(6)))
+        assert(all(r.info.status == "FINISHED" for r in children))
+        assert(client.get_run(parent_run_id).data.tags["veil.sweep.power.finished"] == "6")
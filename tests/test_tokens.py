@@ -0,0 +1,183 @@
+from typing import List
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+from typeguard import TypeCheckError
+
+from veil.decorators import Autologger, AutologSession, Run
+from veil.sinks import SqliteSink
+from veil.tokens import SESSION_ENV_VAR, SessionToken, token_from_environ
+
+
+REPOSITORY_DIR:str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER_SCRIPT:str = """
+import veil
+
+@veil.run(name = "worker")
+def work(worker, i):
+    return i
+
+for i in range(3):
+    work(worker = {worker}, i = i)
+"""
+
+
+
+class TestSessionToken:
+    """
+    Test suite designed for methods belonging to the
+    veil.tokens.SessionToken class.
+    """
+
+    def test_decode_correctness(self) -> None:
+        """
+        Checks whether SessionToken.decode inverts SessionToken.encode.
+        """
+        token:SessionToken = SessionToken("http://localhost:5000", "my experiment", "0123abcd")
+        encoded:str = token.encode()
+
+        assert(SessionToken.decode(encoded) == token)
+        assert(all(c.isalnum() or c in "._-" for c in encoded))
+
+
+
+    @pytest.mark.parametrize("illegal_value", ["", "v2.abc", "v1.!!!", "v1.e30", "v1.WzEsMiwzXQ"])
+    def test_decode_value_error_on_malformed_token(self, illegal_value:str) -> None:
+        """
+        Checks whether SessionToken.decode raises a ValueError when the
+        token is malformed.
+        """
+        with pytest.raises(ValueError):
+            SessionToken.decode(illegal_value)
+
+
+
+    def test_token_from_environ_correctness(self) -> None:
+        """
+        Checks whether token_from_environ reads the session token variable.
+        """
+        assert(token_from_environ({SESSION_ENV_VAR: "v1.abc"}) == "v1.abc")
+        assert(token_from_environ({SESSION_ENV_VAR: ""}) is None)
+        assert(token_from_environ({}) is None)
+
+
+
+class TestAutologSessionJoin:
+    """
+    Test suite designed for the join and export_token arguments of the
+    veil.decorators.AutologSession class.
+    """
+
+    @pytest.fixture
+    def sink(self, tmp_path):
+        sink:SqliteSink = SqliteSink(str(tmp_path / "veil.db"))
+        yield sink
+        sink.close()
+
+
+
+    @pytest.mark.parametrize("argument, illegal_value", [("join", 1), ("export_token", None)])
+    def test_init_type_check_error_on_illegal_argument(self, argument:str, illegal_value) -> None:
+        """
+        Checks whether AutologSession.__init__ raises a TypeCheckError when
+        join or export_token are of illegal type.
+        """
+        with pytest.raises(TypeCheckError):
+            AutologSession(autologger = Autologger(), **{argument: illegal_value})
+
+
+
+    def test_enter_correctness_on_joined_session(self, sink:SqliteSink) -> None:
+        """
+        Checks whether a joined session logs its child runs within the parent
+        run of the origin session, neither creating nor terminating parent runs.
+        """
+        origin:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+        worker:Autologger = Autologger(sink = sink, experiment_name = "other_experiment")
+        step = Run(autologger = worker)(lambda a: a)
+
+        with origin.start_session(name = "origin"):
+            token:str = origin._current_session.token
+            with worker.start_session(join = token):
+                assert(worker._current_session.joined)
+                assert(worker.experiment_name == "experiment")
+                step(1)
+                step(2)
+            assert(worker.experiment_name == "other_experiment")
+            running:str = sink.connection.execute(
+                "SELECT status FROM runs WHERE parent_run_id IS NULL").fetchone()[0]
+
+        connection = sink.connection
+        assert(running == "RUNNING")
+        assert(connection.execute("SELECT COUNT(*) FROM runs WHERE parent_run_id IS NULL").fetchone()[0] == 1)
+        assert(connection.execute(
+            "SELECT COUNT(*) FROM runs WHERE parent_run_id = ? AND experiment = 'experiment'",
+            (SessionToken.decode(token).run_id,)
+        ).fetchone()[0] == 2)
+
+
+
+    def test_enter_value_error_on_malformed_token(self) -> None:
+        """
+        Checks whether joining a malformed token raises a ValueError, leaving
+        no session active.
+        """
+        autologger:Autologger = Autologger()
+
+        with pytest.raises(ValueError):
+            with autologger.start_session(join = "malformed"):
+                pass
+        assert(autologger._current_session is None)
+
+
+
+    def test_enter_correctness_on_exported_token(self, sink:SqliteSink, monkeypatch) -> None:
+        """
+        Checks whether the token is exported while the session is active, and
+        whether decorated calls without sessions join it.
+        """
+        monkeypatch.delenv(SESSION_ENV_VAR, raising = False)
+        origin:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+        worker:Autologger = Autologger(sink = sink)
+        step = Run(autologger = worker)(lambda a: a)
+
+        with origin.start_session(export_token = True):
+            assert(os.environ[SESSION_ENV_VAR] == origin._current_session.token)
+            parent_run_id:str = origin._current_session.run_id
+            step(1)
+        assert(SESSION_ENV_VAR not in os.environ)
+
+        assert(worker._current_session.joined)
+        assert(sink.connection.execute(
+            "SELECT COUNT(*) FROM runs WHERE parent_run_id = ?", (parent_run_id,)).fetchone()[0] == 1)
+
+
+
+    def test_enter_correctness_on_worker_processes(self, tmp_path) -> None:
+        """
+        Checks whether worker processes launched within a session exporting its
+        token log their child runs in parallel within the parent run.
+        """
+        from mlflow import MlflowClient
+        tracking_uri:str = f"file:{tmp_path / 'mlruns'}"
+        autologger:Autologger = Autologger(tracking_uri = tracking_uri, experiment_name = "experiment")
+        environ = {**os.environ, "PYTHONPATH": REPOSITORY_DIR}
+
+        with autologger.start_session(name = "origin", export_token = True):
+            parent_run_id:str = autologger._current_session.run_id
+            workers:List[subprocess.Popen] = [
+                subprocess.Popen([sys.executable, "-c", WORKER_SCRIPT.format(worker = w)], cwd = str(tmp_path), env = {**environ, SESSION_ENV_VAR: os.environ[SESSION_ENV_VAR]})
+                for w in range(2)
+            ]
+            assert([w.wait(timeout = 120) for w in workers] == [0, 0])
+
+        client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+        runs = client.search_runs([client.get_experiment_by_name("experiment").experiment_id])
+        children = [r for r in runs if r.data.tags.get("mlflow.parentRunId") == parent_run_id]
+        assert(len(runs) == 7)
+        assert(sorted((r.data.params["worker"], r.data.params["i"]) for r in children) == [
+            (str(w), str(i)) for w in range(2) for i in range(3)])
+        assert(client.get_run(parent_run_id).info.status == "FINISHED")
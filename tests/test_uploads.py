@@ -0,0 +1,209 @@
+from typing import Any, Dict, List, Set
+import json
+import os
+import threading
+import time
+import pytest
+
+from mlflow import MlflowClient
+from mlflow.entities import RunStatus
+
+from veil.decorators import Autologger, Run
+from veil.sinks import JsonlSink
+from veil.uploads import UPLOAD_PREFIX, ChunkedUploader, LocalArtifactStore, UploadReport
+
+
+class FlakyStore(LocalArtifactStore):
+
+    def __init__(self, root:str, failing:Set[int], delay_s:float = 0.0):
+        super().__init__(root)
+        self.failing:Set[int] = failing
+        self.delay_s:float = delay_s
+        self.uploaded:List[int] = []
+        self.lock:threading.Lock = threading.Lock()
+
+    def put_chunk(self, run_id:str, artifact_file:str, index:int, data:memoryview) -> None:
+        time.sleep(self.delay_s)
+        if index in self.failing:
+            raise ConnectionError(f"chunk {index}")
+        super().put_chunk(run_id, artifact_file, index, data)
+        with self.lock:
+            self.uploaded.append(index)
+
+
+
+class TestChunkedUploader:
+    """
+    Test suite designed for the veil.uploads.ChunkedUploader class, with the
+    veil.uploads.LocalArtifactStore class.
+    """
+
+    @pytest.mark.parametrize("size", [0, 1000, 65536 * 16, 65536 * 16 + 1])
+    def test_upload_correctness(self, tmp_path, size:int) -> None:
+        """
+        Checks whether ChunkedUploader.upload assembles the chunks into a copy
+        of the file, removing the staged chunks.
+        """
+        data:bytes = os.urandom(size)
+        (tmp_path / "model.bin").write_bytes(data)
+        store:LocalArtifactStore = LocalArtifactStore(str(tmp_path / "artifacts"))
+
+        report:UploadReport = ChunkedUploader(store, chunk_bytes = 65536, max_workers = 4).upload(
+            "run", str(tmp_path / "model.bin"), "models")
+
+        assert(report.artifact_file == "models/model.bin")
+        assert(report.location == store.path("run", "models/model.bin"))
+        assert((report.size_bytes, report.uploaded_bytes, report.resumed_chunks) == (size, size, 0))
+        assert(report.chunks == max((size + 65535) // 65536, 1))
+        with open(report.location, "rb") as f:
+            assert(f.read() == data)
+        assert(os.listdir(tmp_path / "artifacts" / ".uploads") == [])
+
+
+
+    def test_upload_correctness_on_concurrent_chunks(self, tmp_path) -> None:
+        """
+        Checks whether ChunkedUploader.upload uploads max_workers chunks at once.
+        """
+        (tmp_path / "model.bin").write_bytes(os.urandom(8 * 1024))
+        store:FlakyStore = FlakyStore(str(tmp_path / "artifacts"), set(), delay_s = 0.1)
+
+        report:UploadReport = ChunkedUploader(store, chunk_bytes = 1024, max_workers = 8).upload(
+            "run", str(tmp_path / "model.bin"))
+
+        assert(report.chunks == 8 and sorted(store.uploaded) == list(range(8)))
+        assert(report.elapsed_s < 0.5)
+        assert(report.throughput_bytes_s > 0)
+
+
+
+    def test_upload_correctness_on_resumed_upload(self, tmp_path) -> None:
+        """
+        Checks whether ChunkedUploader.upload resumes a failed upload, only
+        uploading the missing chunks, unless the file changed in the meanwhile.
+        """
+        data:bytes = os.urandom(16 * 1024)
+        (tmp_path / "model.bin").write_bytes(data)
+        store:FlakyStore = FlakyStore(str(tmp_path / "artifacts"), {3})
+        uploader:ChunkedUploader = ChunkedUploader(store, chunk_bytes = 1024, max_workers = 1)
+
+        with pytest.raises(ConnectionError):
+            uploader.upload("run", str(tmp_path / "model.bin"))
+        # the chunks not started yet when a chunk fails are not uploaded
+        resumed:int = len(store.uploaded)
+        assert(store.uploaded[:3] == [0, 1, 2] and resumed < 16)
+        assert(not os.path.exists(store.path("run", "model.bin")))
+
+        # retries log to another run
+        store.failing = set()
+        report:UploadReport = uploader.upload("retry", str(tmp_path / "model.bin"))
+        assert((report.resumed_chunks, report.uploaded_bytes) == (resumed, (16 - resumed) * 1024))
+        assert(report.location == store.path("retry", "model.bin"))
+        with open(report.location, "rb") as f:
+            assert(f.read() == data)
+
+        store.failing = {3}
+        with pytest.raises(ConnectionError):
+            uploader.upload("run", str(tmp_path / "model.bin"))
+        (tmp_path / "model.bin").write_bytes(data[::-1])
+        os.utime(tmp_path / "model.bin", ns = (0, 0))
+        store.failing = set()
+        report = uploader.upload("run", str(tmp_path / "model.bin"))
+        assert(report.resumed_chunks == 0)
+        with open(report.location, "rb") as f:
+            assert(f.read() == data[::-1])
+
+
+
+    def test_upload_correctness_on_stale_staging(self, tmp_path) -> None:
+        """
+        Checks whether ChunkedUploader.upload prunes the chunks staged by
+        uploads left unfinished for longer than the staging ttl, only.
+        """
+        (tmp_path / "model.bin").write_bytes(os.urandom(4 * 1024))
+        store:FlakyStore = FlakyStore(str(tmp_path / "artifacts"), {1})
+        uploader:ChunkedUploader = ChunkedUploader(store, chunk_bytes = 1024, max_workers = 1)
+        with pytest.raises(ConnectionError):
+            uploader.upload("run", str(tmp_path / "model.bin"))
+        stale = tmp_path / "artifacts" / ".uploads" / "run"
+        os.makedirs(stale / "other.bin")
+        os.utime(stale, (0, 0))
+
+        store.failing = set()
+        report:UploadReport = uploader.upload("run", str(tmp_path / "model.bin"), "models")
+
+        assert(report.resumed_chunks == 0)
+        assert(not stale.exists())
+        assert(len(os.listdir(tmp_path / "artifacts" / ".uploads")) == 1)
+
+
+
+    @pytest.mark.parametrize("chunk_bytes,max_workers", [(0, 1), (1, 0)])
+    def test_init_value_error_on_illegal_arguments(self, tmp_path, chunk_bytes:int, max_workers:int) -> None:
+        """
+        Checks whether ChunkedUploader.__init__ raises a ValueError when the
+        chunk size or the workers are not positive.
+        """
+        with pytest.raises(ValueError):
+            ChunkedUploader(LocalArtifactStore(str(tmp_path)), chunk_bytes = chunk_bytes, max_workers = max_workers)
+
+
+
+class TestUploadArtifact:
+    """
+    Test suite designed for the veil.decorators.Autologger.upload_artifact method.
+    """
+
+    @pytest.mark.parametrize("chunked", [False, True])
+    def test_upload_artifact_correctness(self, tmp_path, chunked:bool) -> None:
+        """
+        Checks whether upload_artifact stores the file on the run of the
+        decorated call, logging the upload throughput when chunked.
+        """
+        sink:JsonlSink = JsonlSink(str(tmp_path / "events.jsonl"))
+        autologger:Autologger = Autologger(
+            sink = sink, artifact_store = LocalArtifactStore(sink.artifacts_dir) if chunked else None)
+        (tmp_path / "model.bin").write_bytes(os.urandom(100000))
+        reports:List[UploadReport] = []
+
+        @Run(autologger = autologger)
+        def annotated_function():
+            reports.append(autologger.upload_artifact(str(tmp_path / "model.bin"), "models"))
+
+        with autologger.start_session():
+            annotated_function()
+        sink.close()
+
+        with open(sink.path) as f:
+            events:List[Dict[str, Any]] = [json.loads(line) for line in f]
+        child_id:str = next(e["run_id"] for e in events if e["event"] == "start_run")
+        metrics:List[Dict[str, Any]] = [e for e in events if e["event"] == "log_metrics"]
+
+        with open(sink.load_artifact(child_id, "models/model.bin"), "rb") as f:
+            assert(f.read() == (tmp_path / "model.bin").read_bytes())
+        if not chunked:
+            assert(reports == [None] and metrics == [])
+            return
+        assert(reports[0].size_bytes == 100000)
+        assert(len(metrics) == 1 and metrics[0]["run_id"] == child_id)
+        assert(metrics[0]["metrics"][f"{UPLOAD_PREFIX}.models/model.bin.throughput_bytes_s"] > 0)
+
+    def test_upload_artifact_correctness_on_mlflow_sink(self, tmp_path) -> None:
+        """
+        Checks whether upload_artifact outside of decorated calls logs the upload
+        metrics on the parent run, with the default isolated sink.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(
+            tracking_uri = tracking_uri, experiment_name = "uploads",
+            artifact_store = LocalArtifactStore(str(tmp_path / "store")))
+        (tmp_path / "model.bin").write_bytes(os.urandom(1000))
+
+        with autologger.start_session():
+            report:UploadReport = autologger.upload_artifact(str(tmp_path / "model.bin"))
+
+        client:MlflowClient = MlflowClient(tracking_uri = tracking_uri)
+        runs = client.search_runs([client.get_experiment_by_name("uploads").experiment_id])
+        assert(len(runs) == 1)
+        assert(runs[0].info.status == RunStatus.to_string(RunStatus.FINISHED))
+        assert(runs[0].data.metrics[f"{UPLOAD_PREFIX}.model.bin.size_bytes"] == report.size_bytes == 1000)
@@ -0,0 +1,144 @@
+from typing import Any, Callable, List, Literal, Optional, Union
+import pytest
+from typeguard import TypeCheckError
+
+import veil
+import veil.validation
+from veil.decorators import Autologger, AutologSession, MlflowIsolated, Run
+from veil.sinks import NoopSink, Sink
+from veil.types import StringDict, StringList
+from veil.validation import trusted, validate
+
+
+
+class TestStrictMode:
+    """
+    Test suite designed for veil.set_strict_mode and veil.is_strict_mode.
+    """
+
+    @pytest.mark.parametrize("illegal_value", [None, 1])
+    def test_set_strict_mode_correctness_on_illegal_value(self, illegal_value) -> None:
+        """
+        Checks whether veil.set_strict_mode raises a TypeCheckError when
+        calling it with a value of illegal type.
+        """
+        with pytest.raises(TypeCheckError):
+            veil.set_strict_mode(illegal_value)
+
+
+
+    def test_set_strict_mode_correctness_on_disabled(self) -> None:
+        """
+        Checks whether values of illegal type are accepted once the strict
+        mode gets disabled, and refused again once re-enabled.
+        """
+        veil.set_strict_mode(False)
+        try:
+            assert(not veil.is_strict_mode())
+            run:Run = Run(autologger = Autologger(), name = 1)
+            assert(run.name == 1)
+        finally:
+            veil.set_strict_mode(True)
+
+        assert(veil.is_strict_mode())
+        with pytest.raises(TypeCheckError):
+            Run(autologger = Autologger(), name = 1)
+
+
+
+class TestValidate:
+    """
+    Test suite designed for veil.validation.validate.
+    """
+
+    @pytest.mark.parametrize("value, expected_type, legal", [
+        (True, bool, True),
+        (1, bool, False),
+        (None, Optional[str], True),
+        ("a", Optional[str], True),
+        (1, Optional[str], False),
+        (1, Optional[float], True),
+        ("drop", Literal["defer", "drop"], True),
+        ("other", Literal["defer", "drop"], False),
+        (0.5, Union[bool, float], True),
+        ("a", Union[bool, float], False),
+        ({"a":"b"}, StringDict, True),
+        ({"a":1}, StringDict, False),
+        (["a"], Optional[StringList], True),
+        ([1], Optional[StringList], False),
+        (NoopSink(), Sink, True),
+        (print, Callable, True),
+        (1, Callable, False),
+    ])
+    def test_validate_correctness(self, value:Any, expected_type:Any, legal:bool) -> None:
+        """
+        Checks whether validate accepts the values typeguard accepts and
+        raises a TypeCheckError for the others.
+        """
+        if legal:
+            assert(validate(value, expected_type) is value)
+        else:
+            with pytest.raises(TypeCheckError):
+                validate(value, expected_type)
+
+
+
+    def test_validate_correctness_on_common_values(self, monkeypatch) -> None:
+        """
+        Checks whether building veil objects with common values never falls
+        back to typeguard.
+        """
+        calls:List[Any] = []
+        monkeypatch.setattr(veil.validation, "check_type", lambda *args: calls.append(args))
+
+        autologger:Autologger = Autologger(experiment_name = "experiment", logging_budget_ms = 5.0)
+        AutologSession(autologger = autologger, name = "session", log_tags = {"a":"b"})
+        Run(autologger = autologger, name = "run", log_params = ["a"], log_tags = {"a":"b"}, memoize = True)
+
+        assert(calls == [])
+
+
+
+    def test_trusted_correctness(self) -> None:
+        """
+        Checks whether values are not type-checked within trusted contexts,
+        nor by the internal copies of veil objects.
+        """
+        with trusted():
+            run:Run = Run(autologger = Autologger(), name = 1)
+        assert(run.name == 1)
+        with pytest.raises(TypeCheckError):
+            Run(autologger = Autologger(), name = 1)
+
+        veil.set_strict_mode(False)
+        try:
+            autologger:Autologger = Autologger(tracking_uri = 1)
+        finally:
+            veil.set_strict_mode(True)
+        assert(autologger._fork(NoopSink()).tracking_uri == 1)
+        assert(run._rebind(autologger).name == 1)
+
+
+
+class TestSlots:
+    """
+    Test suite checking the compact representation of veil objects.
+    """
+
+    def test_slots_correctness(self) -> None:
+        """
+        Checks whether veil objects have no instance dictionary, hence
+        refusing undeclared attributes.
+        """
+        autologger:Autologger = Autologger()
+        objects = [
+            autologger,
+            AutologSession(autologger = autologger),
+            Run(autologger = autologger),
+            MlflowIsolated(autologger = autologger)
+        ]
+
+        for o in objects:
+            assert(not hasattr(o, "__dict__"))
+            with pytest.raises(AttributeError):
+                o.undeclared = None
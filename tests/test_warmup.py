@@ -0,0 +1,178 @@
+from typing import List
+from unittest.mock import Mock
+import threading
+import pytest
+
+from mlflow import MlflowClient
+
+import veil
+from veil.decorators import Autologger, Run
+from veil.sinks import FanoutSink, MlflowSink, NoopSink
+from veil.warmup import WarmupReport, WarmupStep, perform
+
+from tests.mocks import mock_git_correct_repo
+
+
+class WarmingSink(NoopSink):
+
+    def __init__(self):
+        self.warmed:List[str] = []
+
+    def warmup(self, experiment_name:str) -> None:
+        self.warmed.append(experiment_name)
+
+
+
+class TestPerform:
+    """
+    Test suite designed for veil.warmup.perform.
+    """
+
+    def test_perform_correctness(self) -> None:
+        """
+        Checks whether perform reports every step in order, a failing step
+        not preventing the next ones.
+        """
+        performed:List[str] = []
+        def fail(): raise ConnectionError("unreachable")
+
+        report:WarmupReport = perform([
+            ("first", lambda: performed.append("first")),
+            ("failing", fail),
+            ("last", lambda: performed.append("last")),
+        ])
+
+        assert(report.done)
+        assert(performed == ["first", "last"])
+        assert([step.name for step in report.steps] == ["first", "failing", "last"])
+        assert(report.steps[1] == WarmupStep("failing", report.steps[1].elapsed_s, "ConnectionError: unreachable"))
+        assert(not report.ok)
+        assert(report.elapsed_s == sum(step.elapsed_s for step in report.steps))
+
+    def test_perform_correctness_on_background(self) -> None:
+        """
+        Checks whether perform returns immediately in background mode,
+        filling the report from another thread.
+        """
+        release:threading.Event = threading.Event()
+        threads:List[str] = []
+        def step():
+            release.wait()
+            threads.append(threading.current_thread().name)
+
+        report:WarmupReport = perform([("blocking", step)], background = True)
+        assert(not report.done)
+        assert(report.steps == ())
+
+        release.set()
+        assert(report.wait(timeout = 10))
+        assert(report.ok)
+        assert(threads == ["veil-warmup"])
+
+
+
+class TestAutologgerWarmup:
+    """
+    Test suite designed for the warmup method belonging to the
+    veil.decorators.Autologger class.
+    """
+
+    def test_warmup_correctness(self, mock_git_correct_repo:Mock) -> None:
+        """
+        Checks whether warmup reads the git state and warms the sink up for
+        the experiment of the autologger, the first call reading no git state.
+        """
+        veil.reset_stats()
+        sink:WarmingSink = WarmingSink()
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+
+        report:WarmupReport = autologger.warmup()
+
+        assert(report.ok)
+        assert([step.name for step in report.steps] == ["git_state", "sink"])
+        assert(sink.warmed == ["experiment"])
+        git_calls:int = veil.stats()["git"]["calls"]
+
+        @Run(autologger = autologger)
+        def annotated_function():
+            pass
+
+        with autologger.start_session():
+            annotated_function()
+        assert(veil.stats()["git"]["calls"] == git_calls)
+
+    def test_warmup_correctness_on_disabled_autolog(self) -> None:
+        """
+        Checks whether warmup performs nothing when autologging is disabled.
+        """
+        sink:WarmingSink = WarmingSink()
+        autologger:Autologger = Autologger(is_autolog_enabled = False, sink = sink)
+
+        report:WarmupReport = autologger.warmup()
+
+        assert(report.done and report.steps == ())
+        assert(sink.warmed == [])
+
+    def test_warmup_correctness_on_mlflow_sink(self, mock_git_correct_repo:Mock, tmp_path) -> None:
+        """
+        Checks whether warmup resolves, hence creates, the experiment on the
+        tracking server of a MlflowSink.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(sink = MlflowSink(tracking_uri = tracking_uri), experiment_name = "warm")
+
+        assert(autologger.warmup().ok)
+        assert(MlflowClient(tracking_uri = tracking_uri).get_experiment_by_name("warm") is not None)
+
+    def test_warmup_correctness_on_isolated_mlflow_sink(self, mock_git_correct_repo:Mock, tmp_path) -> None:
+        """
+        Checks whether warmup warms the mlflow fluent apis up and addresses the
+        tracking server of the autologger when the sink follows the mlflow
+        fluent state.
+        """
+        tracking_uri:str = (tmp_path / "mlruns").as_uri()
+        autologger:Autologger = Autologger(
+            sink = MlflowSink(), tracking_uri = tracking_uri, experiment_name = "warm")
+
+        report:WarmupReport = autologger.warmup()
+        assert(report.ok)
+        assert([step.name for step in report.steps] == ["git_state", "mlflow_fluent", "sink"])
+        assert(MlflowClient(tracking_uri = tracking_uri).get_experiment_by_name("warm") is not None)
+
+    def test_warmup_correctness_on_fanout_sink(self, mock_git_correct_repo:Mock) -> None:
+        """
+        Checks whether warmup warms every destination of a FanoutSink up.
+        """
+        targets:List[WarmingSink] = [WarmingSink(), WarmingSink()]
+        sink:FanoutSink = FanoutSink(targets)
+        autologger:Autologger = Autologger(sink = sink, experiment_name = "experiment")
+
+        assert(autologger.warmup().ok)
+        assert([target.warmed for target in targets] == [["experiment"], ["experiment"]])
+        sink.close()
+
+
+
+class TestGlobalWarmup:
+    """
+    Test suite designed for veil.warmup.
+    """
+
+    def test_warmup_correctness_on_background(self, mock_git_correct_repo:Mock) -> None:
+        """
+        Checks whether veil.warmup warms the global autologger up from a
+        background thread.
+        """
+        sink:WarmingSink = WarmingSink()
+        past_sink, past_enabled = veil.get_sink(), veil.is_autolog_enabled()
+        veil.set_sink(sink)
+        veil.set_autolog_enabled(True)
+        try:
+            report:WarmupReport = veil.warmup(background = True)
+            assert(report.wait(timeout = 30))
+        finally:
+            veil.set_sink(past_sink)
+            veil.set_autolog_enabled(past_enabled)
+
+        assert(report.ok)
+        assert(sink.warmed == [veil.get_experiment_name()])
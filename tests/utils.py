@@ -1,13 +1,25 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from typeguard import check_type
+import json
 
 import veil
+from veil.sinks import JsonlSink
 from veil.types import StringDict, StringList
 
 
 
+def read_events(source:Union[JsonlSink, str]) -> List[Dict[str, Any]]:
+    # sinks are flushed first, so that every event logged so far is read
+    if isinstance(source, JsonlSink):
+        source.flush()
+        source = source.path
+    with open(source) as f:
+        return [json.loads(line) for line in f]
+
+
+
 class Autologgable(ABC):
 
     def __init__(self, 
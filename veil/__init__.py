@@ -1,8 +1,16 @@
 from __future__ import annotations
 
 import mlflow
-from typing import Optional
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
 from veil.decorators import Autologger
+from veil.exporter import EXPORTER_HOST, EXPORTER_PORT, MetricsExporter
+from veil.overhead import stats, reset_stats
+from veil.sinks import FanoutSink, MlflowSink, Sink
+from veil.sweeps import SweepPoint
+from veil.uploads import ArtifactStore, UploadReport
+from veil.validation import set_strict_mode, is_strict_mode
+from veil.warmup import WarmupReport
 
 from veil.types import StringDict, StringList
 
@@ -14,6 +22,7 @@ __version__ = "0.0.22"
 #####################
 
 __global_autologger:Autologger = Autologger()
+__global_exporter:Optional[MetricsExporter] = None
 
 def set_autolog_enabled(enabled:bool) -> None:
     global __global_autologger
@@ -53,12 +62,26 @@ def get_tracking_uri() -> str:
 
 def start_session(
     name:Optional[str] = None,
-    log_tags:StringDict = dict()
+    log_tags:StringDict = dict(),
+    tags_on_parent:bool = False,
+    resume:bool = False,
+    join:Optional[str] = None,
+    export_token:bool = False,
+    log_resources:Union[bool, float] = False,
+    log_latencies:bool = False,
+    log_spans:bool = False
 ):
     global __global_autologger
     return __global_autologger.start_session(
         name=name, 
-        log_tags=log_tags
+        log_tags=log_tags,
+        tags_on_parent=tags_on_parent,
+        resume=resume,
+        join=join,
+        export_token=export_token,
+        log_resources=log_resources,
+        log_latencies=log_latencies,
+        log_spans=log_spans
     )
 
 
@@ -66,11 +89,136 @@ def start_session(
 def run(
     name: Optional[str] = None,
     log_params: Optional[StringList] = None,
-    log_tags: StringDict = dict()
+    log_tags: StringDict = dict(),
+    log_source: Optional[str] = None,
+    memoize: bool = False,
+    profile: Union[bool, str] = False,
+    log_resources: Union[bool, float] = False
 ):
     global __global_autologger
     return __global_autologger.run(
         name = name,
         log_params = log_params,
-        log_tags = log_tags
-    )
\ No newline at end of file
+        log_tags = log_tags,
+        log_source = log_source,
+        memoize = memoize,
+        profile = profile,
+        log_resources = log_resources
+    )
+
+
+
+def sweep(
+    func:Callable,
+    grid:Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
+    executor:Union[str, Executor] = "thread",
+    max_workers:Optional[int] = None,
+    n_samples:Optional[int] = None,
+    seed:Optional[int] = None,
+    name:Optional[str] = None
+) -> List[SweepPoint]:
+    global __global_autologger
+    return __global_autologger.sweep(
+        func = func,
+        grid = grid,
+        executor = executor,
+        max_workers = max_workers,
+        n_samples = n_samples,
+        seed = seed,
+        name = name
+    )
+
+
+
+def set_logging_budget(budget_ms:Optional[float], policy:str = "defer") -> None:
+    global __global_autologger
+    __global_autologger.logging_budget_ms = budget_ms
+    __global_autologger.budget_policy = policy
+
+
+
+def get_logging_budget() -> Optional[float]:
+    global __global_autologger
+    return __global_autologger.logging_budget_ms
+
+
+
+def get_budget_counters() -> Dict[str, Dict[str, int]]:
+    global __global_autologger
+    return __global_autologger.budget_counters.snapshot()
+
+
+
+def set_sink(sink:Sink) -> None:
+    global __global_autologger
+    __global_autologger.sink = sink
+
+
+
+def get_sink() -> Sink:
+    global __global_autologger
+    return __global_autologger.sink
+
+
+
+def log_artifact(data:Any, artifact_file:Optional[str] = None) -> None:
+    global __global_autologger
+    __global_autologger.log_artifact(data, artifact_file)
+
+
+
+def upload_artifact(local_path:str, artifact_path:Optional[str] = None) -> Optional[UploadReport]:
+    global __global_autologger
+    return __global_autologger.upload_artifact(local_path, artifact_path)
+
+
+
+def set_artifact_store(artifact_store:Optional[ArtifactStore]) -> None:
+    global __global_autologger
+    __global_autologger.artifact_store = artifact_store
+
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    global __global_autologger
+    return __global_autologger.artifact_store
+
+
+
+def set_tracking_uris(tracking_uris:Sequence[str]) -> None:
+    global __global_autologger
+    __global_autologger.sink = FanoutSink([MlflowSink(tracking_uri=uri) for uri in tracking_uris])
+
+
+
+def warmup(background:bool = False) -> WarmupReport:
+    global __global_autologger
+    return __global_autologger.warmup(background)
+
+
+
+def set_cache_dir(cache_dir:str) -> None:
+    global __global_autologger
+    __global_autologger.cache_dir = cache_dir
+
+
+
+def get_cache_dir() -> str:
+    global __global_autologger
+    return __global_autologger.cache_dir
+
+
+
+def start_exporter(host:str = EXPORTER_HOST, port:int = EXPORTER_PORT) -> MetricsExporter:
+    global __global_exporter
+    if __global_exporter is None:
+        __global_exporter = MetricsExporter(host=host, port=port).start()
+    return __global_exporter
+
+
+
+def stop_exporter() -> None:
+    global __global_exporter
+    if __global_exporter is not None:
+        __global_exporter.stop()
+        __global_exporter = None
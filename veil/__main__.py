@@ -0,0 +1,49 @@
+from __future__ import annotations
+from typing import List, Optional
+import argparse
+import sys
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the veil command line.
+
+    Parameters
+    ----------
+    argv : Optional[List[str]], optional
+        the command line arguments, by default sys.argv[1:]
+
+    Returns
+    -------
+    int
+        the exit code.
+    """
+    parser = argparse.ArgumentParser(prog="veil")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync = commands.add_parser("sync", help="replays the events recorded by a JournalSink or a JsonlSink")
+    sync.add_argument("path", help="the path of the recording")
+    sync.add_argument("--tracking-uri", default=None, help="the tracking server uri, by default the mlflow one")
+    sync.add_argument("--workers", type=int, default=8, help="the number of concurrent workers")
+    sync.add_argument("--checkpoint", default=None, help="the checkpoint path, by default PATH.checkpoint")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "sync":
+        import mlflow
+        from veil.replay import ReplayReport, replay
+        from veil.sinks import MlflowSink
+
+        report: ReplayReport = replay(
+            path=args.path,
+            target=MlflowSink(tracking_uri=args.tracking_uri or mlflow.get_tracking_uri()),
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+        )
+        print(report)
+        return 1 if report.failed else 0
+
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
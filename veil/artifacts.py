@@ -0,0 +1,139 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple, TYPE_CHECKING
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+
+if TYPE_CHECKING:
+    from veil.sinks import Sink
+
+
+"""Size of the slices a buffer is written by, in bytes."""
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# the runs of the decorated calls being executed by each thread, innermost last
+_active: threading.local = threading.local()
+
+
+def _runs() -> List[Tuple[Sink, str]]:
+    runs: Optional[List[Tuple[Sink, str]]] = getattr(_active, "runs", None)
+    if runs is None:
+        runs = _active.runs = []
+    return runs
+
+
+def as_buffer(data: Any) -> memoryview:
+    """Returns a flat view of the bytes of an object supporting the buffer
+    protocol (bytes, bytearray, memoryview, mmap, array, numpy arrays...),
+    without copying them.
+
+    Raises
+    ------
+    TypeError
+        if the object does not support the buffer protocol.
+    ValueError
+        if the bytes of the object are not contiguous in memory.
+    """
+    view: memoryview = memoryview(data)
+    if not view.c_contiguous:
+        raise ValueError("Artifact buffers must be contiguous in memory")
+    return view.cast("B") if view.ndim != 1 or view.format != "B" else view
+
+
+def write_buffer(data: Any, path: str) -> int:
+    """Writes a buffer to a file by slices of CHUNK_BYTES, straight from the
+    memory of the buffer, i.e. without user-space copies.
+
+    Parameters
+    ----------
+    data : Any
+        an object supporting the buffer protocol
+    path : str
+        the path of the file, created or truncated
+
+    Returns
+    -------
+    int
+        the number of bytes written.
+    """
+    with as_buffer(data) as view:
+        # unbuffered, so that slices reach the kernel without going through a write buffer
+        with open(path, "wb", buffering=0) as f:
+            written: int = 0
+            while written < len(view):
+                with view[written:written + CHUNK_BYTES] as chunk:
+                    written += f.write(chunk)
+        return written
+
+
+def spool_file(local_path: str, name: str) -> str:
+    """Spools a local file under another name, within a temporary directory of
+    its own, by hard-linking it rather than copying it whenever possible (i.e.
+    unless on another file system).
+
+    Returns
+    -------
+    str
+        the path of the spooled file.
+    """
+    path: str = os.path.join(tempfile.mkdtemp(prefix="veil-"), name)
+    try:
+        os.link(local_path, path)
+    except OSError:
+        shutil.copyfile(local_path, path)
+    return path
+
+
+def discard_spooled(path: str) -> None:
+    """Removes a spooled file (see Sink.log_spooled), together with its
+    temporary directory once empty.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    try:
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+@contextmanager
+def mapped(path: str) -> Iterator[memoryview]:
+    """Maps a file into memory, read-only, yielding a view of its bytes: pages
+    are read lazily by the kernel as the view gets consumed.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # empty files cannot be mapped
+            yield memoryview(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            view: memoryview = memoryview(m)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def current_run() -> Optional[Tuple[Sink, str]]:
+    """Returns the sink and the id of the run of the innermost decorated call
+    being executed by the calling thread, if any.
+    """
+    runs: List[Tuple[Sink, str]] = _runs()
+    return runs[-1] if runs else None
+
+
+@contextmanager
+def active_run(sink: Sink, run_id: str) -> Iterator[None]:
+    """Makes a run the current one of the calling thread while within the context.
+    """
+    runs: List[Tuple[Sink, str]] = _runs()
+    runs.append((sink, run_id))
+    try:
+        yield
+    finally:
+        runs.pop()
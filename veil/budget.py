@@ -0,0 +1,250 @@
+from __future__ import annotations
+from typing import Callable, Dict, Optional, Set
+import atexit
+import contextlib
+import queue
+import threading
+import time
+
+
+"""Tracking operations priorities, from the first to be sacrificed to the last one."""
+PRIORITIES = ("artifacts", "metrics", "tags", "params", "status")
+
+"""Policy deferring over-budget tracking operations to a background thread."""
+POLICY_DEFER = "defer"
+
+"""Policy dropping over-budget tracking operations."""
+POLICY_DROP = "drop"
+
+
+class BudgetCounters:
+    """ Thread-safe counters of the tracking operations deferred or dropped
+    because of the logging latency budget, together with a moving estimate
+    of the cost of each kind of operation.
+    """
+
+    # weight of the last observation in the moving cost estimate
+    _SMOOTHING: float = 0.2
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__deferred: Dict[str, int] = dict.fromkeys(PRIORITIES, 0)
+        self.__dropped: Dict[str, int] = dict.fromkeys(PRIORITIES, 0)
+        self.__cost_ms: Dict[str, float] = dict.fromkeys(PRIORITIES, 0.0)
+
+    def estimate(self, kind: str) -> float:
+        return self.__cost_ms[kind]
+
+    def observe(self, kind: str, elapsed_ms: float) -> None:
+        with self.__lock:
+            self.__cost_ms[kind] += self._SMOOTHING * (elapsed_ms - self.__cost_ms[kind])
+
+    def count_deferred(self, kind: str, amount: int = 1) -> None:
+        with self.__lock:
+            self.__deferred[kind] += amount
+
+    def count_dropped(self, kind: str, amount: int = 1) -> None:
+        with self.__lock:
+            self.__dropped[kind] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Returns a copy of the deferred/dropped counters.
+
+        Returns
+        -------
+        Dict[str, Dict[str, int]]
+            the counters, keyed by "deferred" and "dropped" first and by kind later.
+        """
+        with self.__lock:
+            return {
+                "deferred": dict(self.__deferred),
+                "dropped": dict(self.__dropped),
+            }
+
+    def reset(self) -> None:
+        with self.__lock:
+            for kind in PRIORITIES:
+                self.__deferred[kind] = 0
+                self.__dropped[kind] = 0
+
+
+class BackgroundDelivery:
+    """ Delivers deferred tracking operations from a daemon thread, in
+    submission order. The thread is lazily started on first submission
+    and pending operations are flushed at interpreter exit.
+    """
+
+    def __init__(self):
+        self.__queue: queue.Queue = queue.Queue()
+        self.__thread: Optional[threading.Thread] = None
+        self.__lock: threading.Lock = threading.Lock()
+
+    def submit(self, operation: Callable[[], None]) -> None:
+        self.__ensure_started()
+        self.__queue.put(operation)
+
+    def flush(self) -> None:
+        """Blocks until every submitted operation has been delivered.
+        """
+        if self.__thread is not None:
+            self.__queue.join()
+
+    def __ensure_started(self) -> None:
+        if self.__thread is None:
+            with self.__lock:
+                if self.__thread is None:
+                    self.__thread = threading.Thread(
+                        target=self.__deliver, name="veil-delivery", daemon=True)
+                    self.__thread.start()
+                    atexit.register(self.flush)
+
+    def __deliver(self) -> None:
+        while True:
+            operation: Callable[[], None] = self.__queue.get()
+            try:
+                operation()
+            except Exception as e:
+                print(f"Deferred tracking operation failed: {e}")
+            finally:
+                self.__queue.task_done()
+
+
+class LoggingBudget:
+    """ Enforces the maximum logging overhead of a single decorated call.
+
+    Time spent in the user function is excluded from the budget by running
+    it within `suspended()`. Before each tracking operation the budget
+    predicts whether it would be exceeded and, if so, either defers the
+    operation to background delivery or drops it, according to the policy.
+
+    Operations are decided in priority order: the estimated cost of the
+    operations still expected (see `expect()`) is reserved for them against
+    the ones of lower priority, and once an operation has been sacrificed no
+    operation of lower priority is performed inline anymore.
+
+    Parameters
+    ----------
+    budget_ms : Optional[float]
+        the maximum logging overhead in milliseconds, None for no budget
+    policy : str
+        either "defer" or "drop"
+    counters : BudgetCounters
+        the counters updated with deferred/dropped operations
+    delivery : BackgroundDelivery
+        the background delivery receiving deferred operations
+    """
+
+    def __init__(
+        self,
+        budget_ms: Optional[float],
+        policy: str,
+        counters: BudgetCounters,
+        delivery: BackgroundDelivery,
+    ):
+        self.__budget_ms: Optional[float] = budget_ms
+        self.__policy: str = policy
+        self.__counters: BudgetCounters = counters
+        self.__delivery: BackgroundDelivery = delivery
+        self.__started_at: float = time.perf_counter()
+        self.__suspended_s: float = 0.0
+        self.__expected: Set[str] = set()
+        self.__sacrificed: int = -1
+
+    @property
+    def spent_ms(self) -> float:
+        return (time.perf_counter() - self.__started_at - self.__suspended_s) * 1000.0
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """Excludes the time spent within the context from the budget.
+        """
+        suspended_at: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__suspended_s += time.perf_counter() - suspended_at
+
+    def expect(self, *kinds: str) -> None:
+        """Declares the kinds of the operations the call will perform, so that
+        the budget they are estimated to cost is reserved for them until they
+        are dispatched (or performed).
+
+        Parameters
+        ----------
+        kinds : str
+            the kinds of operations, among PRIORITIES
+        """
+        self.__expected.update(kinds)
+
+    def __fits(self, kind: str) -> bool:
+        if self.__budget_ms is None:
+            return True
+        priority: int = PRIORITIES.index(kind)
+        if priority < self.__sacrificed:
+            return False
+        reserved_ms: float = sum(
+            self.__counters.estimate(k) for k in self.__expected if PRIORITIES.index(k) > priority)
+        return self.spent_ms + self.__counters.estimate(kind) + reserved_ms <= self.__budget_ms
+
+    def __perform(self, kind: str, inline: Callable[[], None]) -> None:
+        started_at: float = time.perf_counter()
+        inline()
+        self.__counters.observe(kind, (time.perf_counter() - started_at) * 1000.0)
+
+    def perform(self, kind: str, inline: Callable[[], None]) -> None:
+        """Performs a tracking operation that cannot be sacrificed, e.g. the
+        termination of a run, inline whatever the budget, accounting for its
+        cost.
+
+        Parameters
+        ----------
+        kind : str
+            the kind of operation, one of PRIORITIES
+        inline : Callable[[], None]
+            performs the operation in the calling thread
+        """
+        self.__expected.discard(kind)
+        self.__perform(kind, inline)
+
+    def dispatch(
+        self,
+        kind: str,
+        inline: Callable[[], None],
+        deferred: Optional[Callable[[], None]] = None,
+        amount: int = 1,
+    ) -> bool:
+        """Performs a tracking operation inline if it fits the budget, otherwise
+        defers or drops it.
+
+        Parameters
+        ----------
+        kind : str
+            the kind of operation, one of PRIORITIES
+        inline : Callable[[], None]
+            performs the operation in the calling thread
+        deferred : Optional[Callable[[], None]], optional
+            performs the operation from the background thread, by default None
+            (operations that cannot be deferred are dropped when over budget)
+        amount : int, optional
+            the number of tracked items the operation carries, by default 1
+
+        Returns
+        -------
+        bool
+            True if the operation has been performed inline.
+        """
+        self.__expected.discard(kind)
+        if amount == 0:
+            return True
+
+        if self.__fits(kind):
+            self.__perform(kind, inline)
+            return True
+
+        self.__sacrificed = max(self.__sacrificed, PRIORITIES.index(kind))
+        if self.__policy == POLICY_DEFER and deferred is not None:
+            self.__delivery.submit(deferred)
+            self.__counters.count_deferred(kind, amount)
+        else:
+            self.__counters.count_dropped(kind, amount)
+        return False
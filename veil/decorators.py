@@ -1,21 +1,125 @@
 from __future__ import annotations
-from typing import Any, Callable, Optional, Tuple
+from types import MappingProxyType
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Literal, Mapping, Optional, Sequence, Tuple, Union
+import contextlib
 import functools
-from typeguard import check_type
+import inspect
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import time
 
 import mlflow
 from mlflow.entities import Experiment, RunStatus
 from mlflow.tracking.fluent import _get_experiment_id, ActiveRun
 from mlflow.utils.mlflow_tags import MLFLOW_GIT_COMMIT, MLFLOW_GIT_BRANCH, MLFLOW_GIT_REPO_URL
 
+from veil.artifacts import active_run, current_run, discard_spooled, spool_file
+from veil.budget import POLICY_DEFER, POLICY_DROP, BackgroundDelivery, BudgetCounters, LoggingBudget
+from veil.gitinfo import RepoInfo, RepoInfoCache, read_ci_repo_info, read_repo_info
+from veil.histograms import LatencyHistogram, latency_metrics
+from veil.memo import (
+    MEMO_HIT_TAG, MEMO_KEY_TAG, RESULT_ARTIFACT_PATH, MemoIndex, bind_arguments, default_cache_dir, memo_key,
+    result_artifact_file
+)
+from veil.overhead import CallTimer, registry as stats_registry
+from veil.profiling import (
+    PROFILE_ARTIFACT_PATH, PROFILER_CPROFILE, CallProfiler, Hotspot, StackSampler, hotspot_metrics, hotspot_tags,
+    new_profiler
+)
+from veil.resources import SAMPLING_INTERVAL_S as RESOURCES_INTERVAL_S, ResourceSampler
+from veil.resume import SessionState
+from veil.sinks import MlflowSink, Sink
+from veil.source import SCOPE_MODULE, SourceSnapshot, take_snapshots, uploads as source_uploads
+from veil.spans import SPAN_ARTIFACT_FILE, Span, SpanTree, current_tree, recording
+from veil.uploads import (
+    CHUNK_BYTES as UPLOAD_CHUNK_BYTES, MAX_WORKERS as UPLOAD_MAX_WORKERS, ArtifactStore, ChunkedUploader, UploadReport,
+    upload_metrics
+)
+from veil.tokens import SESSION_ENV_VAR, SessionToken, token_from_environ
 from veil.types import StringDict, StringList
+from veil.validation import trusted, validate
+from veil.warmup import WarmupReport, perform as perform_warmup
+
+
+# serializes the sessions implicitly joined by decorated calls
+_join_lock: threading.Lock = threading.Lock()
 
 
 def _active_experiment_id() -> str:
     return _get_experiment_id()
 
 
+def _invoke(
+    timer: CallTimer,
+    func: Callable,
+    args: Tuple,
+    kwargs: Dict[str, Any],
+    profiler: Optional[Union[CallProfiler, StackSampler]] = None,
+    resources: Optional[ResourceSampler] = None
+) -> Any:
+    # invokes the user function, accounting the time spent in it (monitoring included)
+    started_at: float = time.perf_counter()
+    try:
+        if profiler is None and resources is None:
+            return func(*args, **kwargs)
+        # profilers are entered last, so that they only see the user function
+        with (
+            resources if resources is not None else contextlib.nullcontext(),
+            profiler if profiler is not None else contextlib.nullcontext()
+        ):
+            return func(*args, **kwargs)
+    finally:
+        timer.user_s += time.perf_counter() - started_at
+
+
+def _resources_interval(value: Union[bool, float]) -> Optional[float]:
+    # the interval between resource samples, True meaning the default one
+    value = validate(value, Union[bool, float])
+    if value is False:
+        return None
+    if value is True:
+        return RESOURCES_INTERVAL_S
+    if value <= 0:
+        raise ValueError(f"Resource sampling interval must be positive: {value}")
+    return float(value)
+
+
 def _get_repo_info() -> Tuple[str, str, str]:
+    # the git state is read by the first session or by the warm-up, and again only
+    # once it changes, falling back to CI environment variables for missing info
+    repo_info: Optional[RepoInfo] = _repo_infos.get()
+    if repo_info is None or None in repo_info:
+        ci_repo_info: RepoInfo = read_ci_repo_info()
+        repo_info = tuple(
+            value if value is not None else ci_value
+            for value, ci_value in zip(repo_info or (None, None, None), ci_repo_info)
+        )
+    return repo_info
+
+
+def _read_repo_info(path: str) -> Optional[RepoInfo]:
+    # parses the git directory files, falling back to GitPython for the layouts
+    # they cannot be resolved from
+    started_at: float = time.perf_counter()
+    failed: bool = True
+    try:
+        repo_info: Optional[RepoInfo] = read_repo_info(path)
+        if repo_info is not None and repo_info[1] is None:
+            repo_info = _read_repo_info_with_gitpython()
+        failed = False
+        return repo_info
+    finally:
+        stats_registry.record_git(time.perf_counter() - started_at, failed)
+
+
+_repo_infos: RepoInfoCache = RepoInfoCache(_read_repo_info)
+
+
+def _read_repo_info_with_gitpython() -> Tuple[str, str, str]:
     import git
     from git.exc import InvalidGitRepositoryError, NoSuchPathError
 
@@ -53,20 +157,71 @@ def _get_repo_info() -> Tuple[str, str, str]:
 
 class Autologger:
     """ Implements the auto-logging strategy.
+
+    Parameters
+    ----------
+    is_autolog_enabled : bool, optional
+        whether auto-logging is enabled, by default True
+    tracking_uri : str, optional
+        the tracking server uri, by default the one currently used by mlflow
+    experiment_name : str, optional
+        the experiment name, by default the mlflow default experiment
+    logging_budget_ms : Optional[float], optional
+        the maximum logging overhead per decorated call, in milliseconds,
+        by default None (no budget)
+    budget_policy : Literal["defer", "drop"], optional
+        what to do with tracking operations exceeding the budget, by default "defer"
+    sink : Optional[Sink], optional
+        the destination of tracking operations, by default an MlflowSink
+        following tracking_uri
+    cache_dir : Optional[str], optional
+        the directory holding local state such as memoized results, by default
+        $VEIL_CACHE_DIR or ~/.cache/veil
+    artifact_store : Optional[ArtifactStore], optional
+        the store large artifacts are uploaded to in chunks, by default None
+        (uploaded by the sink in a single stream)
     """
 
+    __slots__ = (
+        "__is_autolog_enabled",
+        "__tracking_uri",
+        "__experiment_name",
+        "__logging_budget_ms",
+        "__budget_policy",
+        "__sink",
+        "__cache_dir",
+        "__artifact_store",
+        "__budget_counters",
+        "_current_session",
+        "_delivery",
+    )
+
     def __init__(
         self,
         is_autolog_enabled: bool = True,
         tracking_uri: str = mlflow.get_tracking_uri(),
         experiment_name: str = Experiment.DEFAULT_EXPERIMENT_NAME,
+        logging_budget_ms: Optional[float] = None,
+        budget_policy: Literal["defer", "drop"] = POLICY_DEFER,
+        sink: Optional[Sink] = None,
+        cache_dir: Optional[str] = None,
+        artifact_store: Optional[ArtifactStore] = None,
     ):
         self.is_autolog_enabled = is_autolog_enabled
         self.tracking_uri = tracking_uri
         self.experiment_name = experiment_name
+        self.logging_budget_ms = logging_budget_ms
+        self.budget_policy = budget_policy
+        self.sink = sink if sink is not None else MlflowSink()
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.artifact_store = artifact_store
+
+        # members with intended private access
+        self.__budget_counters: BudgetCounters = BudgetCounters()
 
         # members with intended protected access
         self._current_session: Optional[AutologSession] = None
+        self._delivery: BackgroundDelivery = BackgroundDelivery()
 
     @property
     def is_autolog_enabled(self) -> bool:
@@ -74,7 +229,7 @@ class Autologger:
 
     @is_autolog_enabled.setter
     def is_autolog_enabled(self, value: bool) -> None:
-        self.__is_autolog_enabled: bool = check_type(value, bool)
+        self.__is_autolog_enabled: bool = validate(value, bool)
 
     @property
     def tracking_uri(self) -> str:
@@ -82,7 +237,7 @@ class Autologger:
 
     @tracking_uri.setter
     def tracking_uri(self, value: str) -> None:
-        self.__tracking_uri: str = check_type(value, str)
+        self.__tracking_uri: str = validate(value, str)
 
     @property
     def experiment_name(self) -> str:
@@ -90,12 +245,240 @@ class Autologger:
 
     @experiment_name.setter
     def experiment_name(self, value: str) -> None:
-        self.__experiment_name: str = check_type(value, str)
+        self.__experiment_name: str = validate(value, str)
+
+    @property
+    def logging_budget_ms(self) -> Optional[float]:
+        return self.__logging_budget_ms
+
+    @logging_budget_ms.setter
+    def logging_budget_ms(self, value: Optional[float]) -> None:
+        self.__logging_budget_ms: Optional[float] = validate(value, Optional[float])
+
+    @property
+    def budget_policy(self) -> str:
+        return self.__budget_policy
+
+    @budget_policy.setter
+    def budget_policy(self, value: Literal["defer", "drop"]) -> None:
+        self.__budget_policy: str = validate(value, Literal["defer", "drop"])
+
+    @property
+    def sink(self) -> Sink:
+        return self.__sink
+
+    @sink.setter
+    def sink(self, value: Sink) -> None:
+        self.__sink: Sink = validate(value, Sink)
+
+    @property
+    def cache_dir(self) -> str:
+        return self.__cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, value: str) -> None:
+        self.__cache_dir: str = validate(value, str)
+
+    @property
+    def artifact_store(self) -> Optional[ArtifactStore]:
+        return self.__artifact_store
+
+    @artifact_store.setter
+    def artifact_store(self, value: Optional[ArtifactStore]) -> None:
+        self.__artifact_store: Optional[ArtifactStore] = validate(value, Optional[ArtifactStore])
+
+    @property
+    def budget_counters(self) -> BudgetCounters:
+        return self.__budget_counters
+
+    def flush(self) -> None:
+        """Blocks until every tracking operation deferred by the logging budget
+        has been delivered, then flushes the sink.
+        """
+        self._delivery.flush()
+        self.sink.flush()
+
+    def log_artifact(self, data: Any, artifact_file: Optional[str] = None) -> None:
+        """Stores an artifact of the run of the innermost decorated call being
+        executed by the calling thread or, outside of decorated calls, of the
+        current session, if any.
+
+        Local files are handed over to the sink as they are or, when renamed,
+        hard-linked under their artifact name (copied only across file systems),
+        so that large artifacts are never copied into the interpreter. Buffers
+        are written by local sinks straight from their memory, while the sinks
+        uploading files (e.g. MlflowSink) spool them to a temporary file first.
+
+        Parameters
+        ----------
+        data : Any
+            the path of a local file, or an object supporting the buffer protocol
+            (bytes, bytearray, memoryview, mmap, arrays...)
+        artifact_file : Optional[str], optional
+            the artifact path, relative to the run artifacts root, by default the
+            name of the local file (required for buffers)
+
+        Raises
+        ------
+        ValueError
+            if no artifact_file is given for a buffer.
+        """
+        local_path: Optional[str] = None
+        if isinstance(data, (str, os.PathLike)):
+            local_path = os.fspath(data)
+            artifact_file = artifact_file or os.path.basename(local_path)
+        elif artifact_file is None:
+            raise ValueError("Artifacts logged from buffers require an artifact_file")
+        artifact_file = validate(artifact_file, str)
+
+        run: Optional[Tuple[Sink, str]] = self.__current_run()
+        if run is None:
+            return
+        sink, run_id = run
+
+        if local_path is None:
+            sink.log_bytes(run_id, data, artifact_file)
+        elif posixpath.basename(artifact_file) == os.path.basename(local_path):
+            sink.log_artifact(run_id, local_path, posixpath.dirname(artifact_file) or None)
+        else:
+            sink.log_spooled(
+                run_id, spool_file(local_path, posixpath.basename(artifact_file)),
+                posixpath.dirname(artifact_file) or None)
+
+    def upload_artifact(
+        self,
+        local_path: str,
+        artifact_path: Optional[str] = None,
+        chunk_bytes: int = UPLOAD_CHUNK_BYTES,
+        max_workers: int = UPLOAD_MAX_WORKERS
+    ) -> Optional[UploadReport]:
+        """Uploads a large local file to the artifact store in chunks, concurrently,
+        as an artifact of the run of the innermost decorated call being executed
+        by the calling thread or, outside of decorated calls, of the current
+        session, if any. The upload resumes the chunks of a previous attempt, and
+        its throughput is logged as metrics of the run.
+
+        Without an artifact store, the file is stored by the sink as a whole.
+
+        Parameters
+        ----------
+        local_path : str
+            the path of the local file
+        artifact_path : Optional[str], optional
+            the directory the file is stored into, relative to the run artifacts
+            root, by default the root itself
+        chunk_bytes : int, optional
+            the size of the chunks, by default 64 MiB
+        max_workers : int, optional
+            the number of chunks uploaded concurrently, by default 8
+
+        Returns
+        -------
+        Optional[UploadReport]
+            the outcome of the upload, None if not chunked or not performed.
+        """
+        run: Optional[Tuple[Sink, str]] = self.__current_run()
+        if run is None:
+            return None
+        sink, run_id = run
+
+        if self.artifact_store is None:
+            sink.log_artifact(run_id, local_path, artifact_path)
+            return None
+        report: UploadReport = ChunkedUploader(self.artifact_store, chunk_bytes, max_workers).upload(
+            run_id, local_path, artifact_path)
+        sink.log_metrics(run_id, upload_metrics(report))
+        return report
+
+    def warmup(self, background: bool = False) -> WarmupReport:
+        """Eagerly performs the one-off work otherwise paid by the first decorated
+        call of the process, when autologging is enabled: reading the git state
+        (reused by every session until it changes), warming the mlflow fluent apis up for isolated
+        sinks, connecting the sink and resolving the experiment.
+
+        Steps are best-effort, a failing one being reported and left to be
+        performed on demand by decorated calls.
+
+        Parameters
+        ----------
+        background : bool, optional
+            whether to warm up from a daemon thread, e.g. at import of the
+            application, returning immediately, by default False
+
+        Returns
+        -------
+        WarmupReport
+            the steps performed and their timings, filled as they complete.
+        """
+        steps: List[Tuple[str, Callable[[], None]]] = []
+        if self.is_autolog_enabled:
+            # GitPython gets imported only if the git files cannot be parsed, as by sessions
+            steps.append(("git_state", _get_repo_info))
+            if self.sink.isolated:
+                # isolated calls look up the active experiment first, which is expensive the
+                # first time (e.g. mlflow detecting notebook environments by importing them)
+                steps.append(("mlflow_fluent", _active_experiment_id))
+
+            # the detached sink is safe to use from the background thread and, for isolated
+            # sinks, addresses the tracking store of the fluent apis
+            sink: Sink = self.sink.detach(self)
+            experiment_name: str = self.experiment_name
+            steps.append(("sink", lambda: sink.warmup(experiment_name)))
+        return perform_warmup(steps, background)
+
+    def __current_run(self) -> Optional[Tuple[Sink, str]]:
+        run: Optional[Tuple[Sink, str]] = current_run()
+        if run is None and self.is_autolog_enabled and self._current_session is not None:
+            run = (self.sink.detach(self), self._current_session.run_id)
+        return run
+
+    def _fork(self, sink: Sink) -> Autologger:
+        """Returns a copy of this autologger dispatching to another sink, while
+        sharing the current session, the budget counters and the background
+        delivery, e.g. for decorated calls performed by worker threads.
+        """
+        # the settings have been checked already, as well as the sink detached by veil
+        with trusted():
+            fork: Autologger = Autologger(
+                is_autolog_enabled=self.is_autolog_enabled,
+                tracking_uri=self.tracking_uri,
+                experiment_name=self.experiment_name,
+                logging_budget_ms=self.logging_budget_ms,
+                budget_policy=self.budget_policy,
+                sink=sink,
+                cache_dir=self.cache_dir,
+                artifact_store=self.artifact_store,
+            )
+        fork.__budget_counters = self.__budget_counters
+        fork._current_session = self._current_session
+        fork._delivery = self._delivery
+        return fork
+
+    def _join_environment_session(self) -> None:
+        """Joins the session whose token is carried by $VEIL_SESSION, if no session
+        is active. The joined session stays active for the rest of the process.
+        """
+        token: Optional[str] = token_from_environ()
+        if token is None:
+            return
+        with _join_lock:
+            if self._current_session is None:
+                try:
+                    AutologSession(autologger=self, join=token).__enter__()
+                except ValueError as e:
+                    print(f"Session of ${SESSION_ENV_VAR} cannot be joined: {e}")
 
     def start_session(
         self,
         name: Optional[str] = None,
-        log_tags: StringDict = dict()
+        log_tags: StringDict = dict(),
+        tags_on_parent: bool = False,
+        resume: bool = False,
+        join: Optional[str] = None,
+        export_token: bool = False,
+        log_resources: Union[bool, float] = False,
+        log_latencies: bool = False,
+        log_spans: bool = False
     ):
         """Starts a new session.
 
@@ -105,6 +488,31 @@ class Autologger:
             the experiment name, by default None
         log_tags : StringDict, optional
             the tags to be logged, by default dict()
+        tags_on_parent : bool, optional
+            whether session and git tags are set once on the parent run rather
+            than on every child run, by default False
+        resume : bool, optional
+            whether the session reattaches to the parent run of a previous attempt
+            with the same name that did not finish, skipping the child calls that
+            already finished, by default False
+        join : Optional[str], optional
+            the token of a session started elsewhere to be joined, by default the
+            one carried by $VEIL_SESSION, if no session is active
+        export_token : bool, optional
+            whether the session token is exported into $VEIL_SESSION while the
+            session is active, for subprocesses to join it, by default False
+        log_resources : Union[bool, float], optional
+            whether the resource usage of the process is sampled while the session
+            is active (every given seconds, or every second if True) and logged
+            as metric series on the parent run, by default False
+        log_latencies : bool, optional
+            whether the latency percentiles of each decorated function called
+            within the session are logged as metrics on the parent run, by default
+            False
+        log_spans : bool, optional
+            whether decorated calls nested into other decorated calls are recorded
+            as in-memory spans of the outermost child run rather than as runs,
+            by default False
 
         Returns
         -------
@@ -114,14 +522,25 @@ class Autologger:
         return AutologSession(
             autologger=self,
             name=name,
-            log_tags=log_tags
+            log_tags=log_tags,
+            tags_on_parent=tags_on_parent,
+            resume=resume,
+            join=join,
+            export_token=export_token,
+            log_resources=log_resources,
+            log_latencies=log_latencies,
+            log_spans=log_spans
         )
 
     def run(
         self,
         name: Optional[str] = None,
         log_params: Optional[StringList] = None,
-        log_tags: StringDict = dict()
+        log_tags: StringDict = dict(),
+        log_source: Optional[Literal["function", "module"]] = None,
+        memoize: bool = False,
+        profile: Union[bool, Literal["cprofile", "sampling"]] = False,
+        log_resources: Union[bool, float] = False
     ):
         """Executes a new run.
 
@@ -133,6 +552,20 @@ class Autologger:
             the params to be logged, by default None
         log_tags : StringDict, optional
             the tags to be logged, by default dict()
+        log_source : Optional[Literal["function", "module"]], optional
+            whether the source of the function (or of its module too) is recorded,
+            by default None
+        memoize : bool, optional
+            whether results of previous calls with the same arguments and code are
+            reused, by default False
+        profile : Union[bool, Literal["cprofile", "sampling"]], optional
+            whether calls are profiled, either deterministically with cProfile
+            ("cprofile" or True) or by sampling their stacks ("sampling"), by
+            default False
+        log_resources : Union[bool, float], optional
+            whether the resource usage of the process is sampled during calls (every
+            given seconds, or every second if True) and logged as metric series on
+            the child run, by default False
 
         Returns
         -------
@@ -143,7 +576,60 @@ class Autologger:
             autologger=self,
             name=name,
             log_params=log_params,
-            log_tags=log_tags
+            log_tags=log_tags,
+            log_source=log_source,
+            memoize=memoize,
+            profile=profile,
+            log_resources=log_resources
+        )
+
+    def sweep(
+        self,
+        func: Callable,
+        grid: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
+        executor: Union[Literal["thread", "process"], Executor] = "thread",
+        max_workers: Optional[int] = None,
+        n_samples: Optional[int] = None,
+        seed: Optional[int] = None,
+        name: Optional[str] = None
+    ):
+        """Executes a function over the points of a parameter space, concurrently.
+
+        Parameters
+        ----------
+        func : Callable
+            the function, called with the point params as keyword arguments; if
+            decorated with run, its options are preserved
+        grid : Union[Mapping[str, Any], Sequence[Mapping[str, Any]]]
+            either the explicit points or the space, mapping each param to its
+            values (or to a callable drawing a value from a random.Random)
+        executor : Union[Literal["thread", "process"], Executor], optional
+            where points are computed, by default "thread"
+        max_workers : Optional[int], optional
+            the maximum number of points in progress, by default the executor one
+        n_samples : Optional[int], optional
+            the number of points randomly drawn from the space, by default None
+            (the full grid)
+        seed : Optional[int], optional
+            the seed of random draws, by default None
+        name : Optional[str], optional
+            the sweep name, by default the function name
+
+        Returns
+        -------
+        List[SweepPoint]
+            the outcome of every point, in order.
+        """
+        from veil.sweeps import sweep
+        return sweep(
+            autologger=self,
+            func=func,
+            grid=grid,
+            executor=executor,
+            max_workers=max_workers,
+            n_samples=n_samples,
+            seed=seed,
+            name=name
         )
 
 
@@ -151,24 +637,27 @@ class MlflowIsolated:
     """ Isolates an Mlflow experiment.
     """
 
+    __slots__ = ("__autologger",)
+
     def __init__(
         self,
         autologger: Autologger
     ):
         # members with intended private access
-        self.__autologger: Autologger = check_type(autologger, Autologger)
+        self.__autologger: Autologger = validate(autologger, Autologger)
 
     def __call__(self, func: Callable):
         """
         Execute the decorator as well as the wrapped function
         """
-        check_type(func, Callable)
+        validate(func, Callable)
 
         @functools.wraps(func)
         def isolation_wrapper(*args, **kwargs):
             result: Any = None
 
-            if self.__autologger.is_autolog_enabled and self.__autologger._current_session is not None:
+            if (self.__autologger.is_autolog_enabled and self.__autologger._current_session is not None
+                    and self.__autologger.sink.isolated):
 
                 # 3) switch the run current active run (which is paused) within mlflow with a new one
                 past_active_run: ActiveRun = mlflow.active_run()
@@ -218,21 +707,111 @@ class AutologSession:
         the experiment name, by default None
     log_tags : StringDict, optional
         the tags to be logged, by default dict()
+    tags_on_parent : bool, optional
+        whether session and git tags are set once on the parent run, child runs
+        getting only their specific tags, by default False
+    resume : bool, optional
+        whether the parent run id and the results of finished child calls are
+        persisted in a local session state (keyed by experiment and session name,
+        hence required), so that the next attempt after a failure reattaches to the
+        same parent run and returns those results without calling again, by default
+        False
+    join : Optional[str], optional
+        the token of a session started elsewhere (see token), whose parent run
+        gets the child runs of this one, within its tracking uri and experiment;
+        a joined session neither creates nor terminates parent runs. By default
+        the token carried by $VEIL_SESSION, unless another session is active
+    export_token : bool, optional
+        whether the token is exported into $VEIL_SESSION while the session is
+        active, so that subprocesses join it, by default False
+    log_resources : Union[bool, float], optional
+        whether the cpu usage, resident memory, I/O bytes and threads of the process
+        are sampled from a background thread while the session is active (every
+        given seconds, or every second if True) and logged as metric series on
+        the parent run when it terminates, by default False. Joined sessions do
+        not sample, the parent run belonging to another process
+    log_latencies : bool, optional
+        whether the wall time of every call of decorated functions within the
+        session is recorded into a log-bucketed histogram per run name (constant
+        memory, at most 4.4% of relative error) and summarized on the parent run
+        when it terminates, as veil.latency.<name>.p50_s/p90_s/p99_s/max_s/count
+        metrics, by default False. Joined sessions do not log latencies, the
+        parent run belonging to another process
+    log_spans : bool, optional
+        whether decorated calls nested into the call of a child run (by the same
+        thread) are recorded as in-memory spans (name, params, start, end, status)
+        rather than as runs of their own, by default False. The span tree is
+        attached to the child run once it terminates, as SPAN_ARTIFACT_FILE,
+        together with veil.spans.* summary metrics. Nested calls are always
+        invoked, i.e. they are neither memoized, profiled nor resumed
+
+    Raises
+    ------
+    ValueError
+        if the session is resumable but has no name.
     """
 
+    __slots__ = (
+        "__name",
+        "__log_tags",
+        "__tags_on_parent",
+        "__resume",
+        "__join",
+        "__export_token",
+        "__autologger",
+        "__isolated",
+        "__run_id",
+        "__past_session",
+        "__git_tags",
+        "__state",
+        "__joined",
+        "__past_settings",
+        "__past_token",
+        "__log_resources",
+        "__resources",
+        "__log_latencies",
+        "__latencies",
+        "__log_spans",
+    )
+
     def __init__(
         self,
         autologger: Autologger,
         name: Optional[str] = None,
         log_tags: StringDict = dict(),
+        tags_on_parent: bool = False,
+        resume: bool = False,
+        join: Optional[str] = None,
+        export_token: bool = False,
+        log_resources: Union[bool, float] = False,
+        log_latencies: bool = False,
+        log_spans: bool = False,
     ):
         self.name = name
         self.log_tags = log_tags
+        self.tags_on_parent = tags_on_parent
+        self.resume = resume
+        self.join = join
+        self.export_token = export_token
+        self.log_resources = log_resources
+        self.log_latencies = log_latencies
+        self.log_spans = log_spans
+        if self.resume and not self.name:
+            raise ValueError("Resumable sessions require a name, identifying them across attempts")
 
         # members with intended private access
-        self.__autologger: Autologger = check_type(autologger, Autologger)
+        self.__autologger: Autologger = validate(autologger, Autologger)
+        with trusted():
+            self.__isolated: MlflowIsolated = MlflowIsolated(autologger=self.__autologger)
         self.__run_id: Optional[str] = None
         self.__past_session: Optional[AutologSession] = None
+        self.__git_tags: Optional[Mapping[str, Optional[str]]] = None
+        self.__state: Optional[SessionState] = None
+        self.__joined: Optional[SessionToken] = None
+        self.__past_settings: Optional[Tuple[str, str, Sink]] = None
+        self.__past_token: Optional[str] = None
+        self.__resources: Optional[ResourceSampler] = None
+        self.__latencies: Dict[str, LatencyHistogram] = dict()
 
     @property
     def autologger(self) -> Autologger:
@@ -242,13 +821,33 @@ class AutologSession:
     def run_id(self) -> Optional[str]:
         return self.__run_id
 
+    @property
+    def token(self) -> Optional[str]:
+        """The token other processes join this session with, None if not active.
+        """
+        if self.__run_id is None:
+            return None
+        return SessionToken(self.autologger.tracking_uri, self.autologger.experiment_name, self.__run_id).encode()
+
+    @property
+    def joined(self) -> bool:
+        """Whether the session has joined one started elsewhere.
+        """
+        return self.__joined is not None
+
+    @property
+    def state(self) -> Optional[SessionState]:
+        """The local state of the session, None unless resumable and active.
+        """
+        return self.__state
+
     @property
     def name(self) -> Optional[str]:
         return self.__name
 
     @name.setter
     def name(self, value: Optional[str]) -> None:
-        self.__name: Optional[str] = check_type(value, Optional[str])
+        self.__name: Optional[str] = validate(value, Optional[str])
 
     @property
     def log_tags(self) -> StringDict:
@@ -256,46 +855,239 @@ class AutologSession:
 
     @log_tags.setter
     def log_tags(self, value: StringDict) -> None:
-        self.__log_tags: StringDict = check_type(value, StringDict)
+        self.__log_tags: StringDict = validate(value, StringDict)
+
+    @property
+    def tags_on_parent(self) -> bool:
+        return self.__tags_on_parent
+
+    @tags_on_parent.setter
+    def tags_on_parent(self, value: bool) -> None:
+        self.__tags_on_parent: bool = validate(value, bool)
+
+    @property
+    def resume(self) -> bool:
+        return self.__resume
+
+    @resume.setter
+    def resume(self, value: bool) -> None:
+        self.__resume: bool = validate(value, bool)
+
+    @property
+    def join(self) -> Optional[str]:
+        return self.__join
+
+    @join.setter
+    def join(self, value: Optional[str]) -> None:
+        self.__join: Optional[str] = validate(value, Optional[str])
+
+    @property
+    def export_token(self) -> bool:
+        return self.__export_token
+
+    @export_token.setter
+    def export_token(self, value: bool) -> None:
+        self.__export_token: bool = validate(value, bool)
+
+    @property
+    def log_resources(self) -> Optional[float]:
+        """The interval between resource samples, in seconds, None if not sampled.
+        """
+        return self.__log_resources
+
+    @log_resources.setter
+    def log_resources(self, value: Union[bool, float]) -> None:
+        self.__log_resources: Optional[float] = _resources_interval(value)
+
+    @property
+    def log_latencies(self) -> bool:
+        return self.__log_latencies
+
+    @log_latencies.setter
+    def log_latencies(self, value: bool) -> None:
+        self.__log_latencies: bool = validate(value, bool)
+
+    @property
+    def log_spans(self) -> bool:
+        return self.__log_spans
+
+    @log_spans.setter
+    def log_spans(self, value: bool) -> None:
+        self.__log_spans: bool = validate(value, bool)
+
+    @property
+    def latencies(self) -> Mapping[str, LatencyHistogram]:
+        """The latency histograms of the decorated functions, keyed by run name.
+        """
+        return MappingProxyType(self.__latencies)
+
+    def _record_latency(self, name: str, latency_s: float) -> None:
+        if self.__log_latencies:
+            histogram: Optional[LatencyHistogram] = self.__latencies.get(name)
+            if histogram is None:
+                histogram = self.__latencies.setdefault(name, LatencyHistogram())
+            histogram.record(latency_s)
+
+    @property
+    def git_tags(self) -> Mapping[str, Optional[str]]:
+        """The mlflow special tags for .git info, looked up once per session.
+        """
+        if self.__git_tags is None:
+            repo_uri, sha_commit, branch_name = _get_repo_info()
+            self.__git_tags = MappingProxyType({
+                MLFLOW_GIT_REPO_URL: repo_uri,
+                MLFLOW_GIT_COMMIT: sha_commit,
+                MLFLOW_GIT_BRANCH: branch_name,
+            })
+        return self.__git_tags
 
     def __enter__(self):
+        # a session started elsewhere is joined if explicitly given, or if carried by
+        # the environment of a process without active sessions
+        token: Optional[str] = self.join
+        if token is None and self.autologger._current_session is None:
+            token = token_from_environ()
+        self.__joined = SessionToken.decode(token) if token is not None else None
+
         # switch the session currently used by the autologger to this one
         self.__past_session = self.autologger._current_session
         self.autologger._current_session = self
-
-        @MlflowIsolated(autologger=self.autologger)
+        self.__git_tags = None
+        self.__state = None
+        self.__latencies = dict()
+
+        # joined sessions log within the tracking uri and experiment of the origin one, by
+        # means of a detached sink so that parallel workers never terminate the parent run
+        if self.__joined is not None:
+            self.__past_settings = (self.autologger.tracking_uri, self.autologger.experiment_name, self.autologger.sink)
+            with trusted():
+                self.autologger.tracking_uri = self.__joined.tracking_uri
+                self.autologger.experiment_name = self.__joined.experiment_name
+                self.autologger.sink = self.autologger.sink.detach(self.autologger)
+
+        @self.__isolated
         def do_enter():
             # starting a session means managing the context so to:
-            if self.autologger.is_autolog_enabled:
-                # immediately starts and stops a novel parent run associated with this context
+            if self.autologger.is_autolog_enabled and self.__joined is not None:
+                # reuses the parent run of the joined session
+                self.__run_id = self.__joined.run_id
+
+            elif self.autologger.is_autolog_enabled:
+                # creates a novel parent run associated with this context, eventually
+                # tagged once with session-constant tags
                 # note that this run will be resumed within run-annotated functions.
-                run: ActiveRun = mlflow.start_run(run_name=self.name)
-                mlflow.end_run(status=RunStatus.to_string(RunStatus.RUNNING))
-                self.__run_id = run.info.run_id
+                sink: Sink = self.autologger.sink
+                run_id: Optional[str] = None
+
+                # reattaches to the parent run of the previous attempt, if resumable
+                if self.resume:
+                    self.__state = SessionState(self.autologger.cache_dir, self.autologger.experiment_name, self.name)
+                    run_id = self.__state.load_run_id()
+                    if run_id is not None and not sink.resume_session(run_id):
+                        run_id = None
+                        self.__state.clear()
+
+                if run_id is None:
+                    tags: Optional[StringDict] = None
+                    if self.tags_on_parent:
+                        tags = {**self.log_tags, **self.git_tags}
+                    run_id = sink.start_session(
+                        experiment_name=self.autologger.experiment_name,
+                        name=self.name,
+                        tags=tags
+                    )
+                    if self.__state is not None:
+                        self.__state.save_run_id(run_id)
+                self.__run_id = run_id
+
+        started_at: float = time.perf_counter()
+        failed: bool = True
+        try:
+            do_enter()
+            failed = False
+        finally:
+            stats_registry.record_session("enter", time.perf_counter() - started_at, failed)
+
+        # samples the resources used while the session is active
+        if self.log_resources is not None and self.__run_id is not None and self.__joined is None:
+            self.__resources = ResourceSampler(self.log_resources).__enter__()
 
-        do_enter()
+        # exports the token for subprocesses
+        if self.export_token and self.__run_id is not None:
+            self.__past_token = os.environ.get(SESSION_ENV_VAR)
+            os.environ[SESSION_ENV_VAR] = self.token
 
     def __exit__(self, exc_type, exc_value, exc_tb):
 
-        @MlflowIsolated(autologger=self.autologger)
+        # stops sampling the resources
+        resources: Optional[ResourceSampler] = self.__resources
+        self.__resources = None
+        if resources is not None:
+            resources.__exit__(None, None, None)
+
+        # withdraws the exported token
+        if self.export_token and self.__run_id is not None:
+            if self.__past_token is None:
+                os.environ.pop(SESSION_ENV_VAR, None)
+            else:
+                os.environ[SESSION_ENV_VAR] = self.__past_token
+            self.__past_token = None
+
+        @self.__isolated
         def do_exit():
             # terminating a session means managing the context so to:
-            if self.autologger.is_autolog_enabled:
+            if self.autologger.is_autolog_enabled and self.__joined is not None:
+                # leaves the parent run to the joined session
+                self.__run_id = None
+
+            elif self.autologger.is_autolog_enabled:
+
+                # logs the resources used while the session was active
+                if resources is not None and len(resources) > 0:
+                    try:
+                        self.autologger.sink.log_metric_series(self.__run_id, *resources.series())
+                    except Exception as e:
+                        print(f"Resource usage of session {self.__run_id} cannot be logged: {e}")
 
-                # immediately starts and stops the parent run associated with this context
+                # logs the latency percentiles of the decorated functions
+                if self.__latencies:
+                    try:
+                        self.autologger.sink.log_metrics(self.__run_id, latency_metrics(self.__latencies))
+                    except Exception as e:
+                        print(f"Latencies of session {self.__run_id} cannot be logged: {e}")
+
+                # terminates the parent run associated with this context
                 # note that it is terminated with a given status, according to exceptions within the
                 # context manager.
                 termination_status: RunStatus = RunStatus.FINISHED
                 if exc_type:
                     termination_status = RunStatus.FAILED
-                mlflow.start_run(
-                    run_id=self.autologger._current_session.run_id)
-                mlflow.end_run(status=RunStatus.to_string(termination_status))
+                self.autologger.sink.end_session(
+                    run_id=self.autologger._current_session.run_id,
+                    status=RunStatus.to_string(termination_status)
+                )
                 self.__run_id = None
 
-        do_exit()
+                # the state of a successful session is not needed anymore
+                if self.__state is not None and termination_status == RunStatus.FINISHED:
+                    self.__state.clear()
+                self.__state = None
 
-        # switch back the session currently used by the autologger to the previous one
+        started_at: float = time.perf_counter()
+        failed: bool = True
+        try:
+            do_exit()
+            failed = False
+        finally:
+            stats_registry.record_session("exit", time.perf_counter() - started_at, failed)
+
+        # switch back the settings and the session currently used by the autologger
+        if self.__past_settings is not None:
+            with trusted():
+                self.autologger.tracking_uri, self.autologger.experiment_name, self.autologger.sink = (
+                    self.__past_settings)
+            self.__past_settings = None
+        self.__joined = None
         self.autologger._current_session = self.__past_session
         self.__past_session = None
 
@@ -313,21 +1105,58 @@ class Run:
         the params to be logged, by default None
     log_tags : StringDict, optional
         the tags to be logged, by default dict()
+    log_source : Optional[Literal["function", "module"]], optional
+        whether the source of the decorated function (or of its module too) is
+        hashed at decoration time, tagged on every child run and uploaded as an
+        artifact the first time it is seen within the experiment, by default None
+    memoize : bool, optional
+        whether calls are keyed by function identity, source digest and arguments,
+        returning the pickled result of a previous FINISHED child run with the same
+        key (looked up in the local cache first and in the sink later) instead of
+        recomputing it, by default False. Calls whose arguments cannot be keyed
+        (see veil.memo.memo_key) are performed and logged as usual
+    profile : Union[bool, Literal["cprofile", "sampling"]], optional
+        whether calls are profiled, the child run getting the profile as artifacts
+        and its top cumulative hotspots as tags (functions) and metrics (timings and
+        calls), by default False. With "cprofile" (or True) every function call is
+        profiled and the pstats dump gets attached, with "sampling" the call stack is
+        sampled from a background thread, at a fraction of the overhead, and the
+        folded stacks get attached together with their flamegraph
+    log_resources : Union[bool, float], optional
+        whether the cpu usage, resident memory, I/O bytes and threads of the process
+        are sampled from a background thread during calls (every given seconds, or
+        every second if True) and logged as metric series on the child run, by
+        default False
     """
 
+    __slots__ = (
+        "__autologger", "__name", "__log_params", "__log_tags", "__log_source", "__memoize", "__profile",
+        "__log_resources"
+    )
+
     def __init__(
         self,
         autologger: Autologger,
         name: Optional[str] = None,
         log_params: Optional[StringList] = None,
         log_tags: StringDict = dict(),
+        log_source: Optional[Literal["function", "module"]] = None,
+        memoize: bool = False,
+        profile: Union[bool, Literal["cprofile", "sampling"]] = False,
+        log_resources: Union[bool, float] = False,
     ):
         # members with intended private access
-        self.__autologger: Autologger = check_type(autologger, Autologger)
-        self.__name: Optional[str] = check_type(name, Optional[str])
-        self.__log_params: Optional[StringList] = check_type(
+        self.__autologger: Autologger = validate(autologger, Autologger)
+        self.__name: Optional[str] = validate(name, Optional[str])
+        self.__log_params: Optional[StringList] = validate(
             log_params, Optional[StringList])
-        self.__log_tags: StringDict = check_type(log_tags, StringDict)
+        self.__log_tags: StringDict = validate(log_tags, StringDict)
+        self.__log_source: Optional[str] = validate(log_source, Optional[Literal["function", "module"]])
+        self.__memoize: bool = validate(memoize, bool)
+        self.__profile: Optional[str] = validate(profile, Union[bool, Literal["cprofile", "sampling"]]) or None
+        if self.__profile is True:
+            self.__profile = PROFILER_CPROFILE
+        self.__log_resources: Optional[float] = _resources_interval(log_resources)
 
     @property
     def autologger(self) -> Autologger:
@@ -345,66 +1174,418 @@ class Run:
     def log_tags(self) -> StringDict:
         return self.__log_tags
 
-    def __call__(self, func: Callable):
-        """
-        Execute the decorator as well as the wrapped function
-        """
-        check_type(func, Callable)
+    @property
+    def log_source(self) -> Optional[str]:
+        return self.__log_source
 
-        @functools.wraps(func)
-        @MlflowIsolated(autologger=self.__autologger)
-        def wrapper(*args, **kwargs):
-            result: Any = None
+    @property
+    def memoize(self) -> bool:
+        return self.__memoize
 
-            if self.__autologger.is_autolog_enabled and self.__autologger._current_session:
+    @property
+    def profile(self) -> Optional[str]:
+        return self.__profile
 
-                # resume the parent run
-                mlflow.start_run(
-                    run_id=self.__autologger._current_session.run_id)
+    @property
+    def log_resources(self) -> Optional[float]:
+        return self.__log_resources
 
-                # retrieves the tags from the context
-                tags: StringDict = self.__autologger._current_session.log_tags.copy()
+    def _rebind(self, autologger: Autologger) -> Run:
+        """Returns a copy of this run bound to another autologger.
+        """
+        with trusted():
+            return Run(
+                autologger=autologger,
+                name=self.__name,
+                log_params=self.__log_params,
+                log_tags=self.__log_tags,
+                log_source=self.__log_source,
+                memoize=self.__memoize,
+                profile=self.__profile or False,
+                log_resources=self.__log_resources or False,
+            )
+
+    def _child_tags(
+        self,
+        session: AutologSession,
+        snapshots: List[SourceSnapshot] = []
+    ) -> Mapping[str, Optional[str]]:
+        """Merges the tags of the child runs within the given session, meant to be
+        computed once per session and reused across calls.
 
-                # ...then overrides them with run-bound tags...
-                tags.update(self.__log_tags)
+        Parameters
+        ----------
+        session : AutologSession
+            the current session
+        snapshots : List[SourceSnapshot], optional
+            the source snapshots of the decorated function, by default []
 
-                # ...and eventuallly sets mlflow special tags for .git info
-                repo_uri, sha_commit, branch_name = _get_repo_info()
-                tags.update({
-                    MLFLOW_GIT_REPO_URL: repo_uri,
-                    MLFLOW_GIT_COMMIT: sha_commit,
-                    MLFLOW_GIT_BRANCH: branch_name,
-                })
+        Returns
+        -------
+        Mapping[str, Optional[str]]
+            the frozen tags mapping.
+        """
+        if session.tags_on_parent:
+            # session and git tags are already on the parent, only run-specific deltas are left
+            tags: StringDict = {
+                k: v for k, v in self.__log_tags.items() if session.log_tags.get(k) != v}
+        else:
+            # retrieves the tags from the context, then overrides them with run-bound tags
+            # and eventually with mlflow special tags for .git info
+            tags: StringDict = session.log_tags.copy()
+            tags.update(self.__log_tags)
+            tags.update(session.git_tags)
+
+        tags.update({snapshot.tag: snapshot.digest for snapshot in snapshots})
+        return MappingProxyType(tags)
+
+    def _upload_source(self, sink: Sink, run_id: str, snapshots: List[SourceSnapshot]) -> None:
+        # uploads the snapshots never seen before within the experiment, neither by this
+        # process nor by previous ones
+        experiment_name: str = self.__autologger.experiment_name
+        for snapshot in snapshots:
+            if any(r != run_id for r in sink.search_runs(experiment_name, {snapshot.tag: snapshot.digest})):
+                continue
+            sink.log_text(run_id, snapshot.text, snapshot.artifact_file)
+
+    def _lookup_result(self, sink: Sink, key: str) -> Optional[Tuple[str, Any]]:
+        """Looks up the memoized result of a call, in the local cache first and
+        among the FINISHED runs of the experiment later.
 
-                # uses the user provided run name instead of function name, if any
-                _run_name: str = func.__name__
-                if not self.__name is None:
-                    _run_name = self.__name
+        Returns
+        -------
+        Optional[Tuple[str, Any]]
+            the id of the run which computed the result and the result itself,
+            None if not found.
+        """
+        experiment_name: str = self.__autologger.experiment_name
+        index: MemoIndex = MemoIndex(self.__autologger.cache_dir)
+        entry: Optional[Tuple[str, str]] = index.lookup(experiment_name, key)
+        if entry is None:
+            for run_id in sink.search_runs(experiment_name, {MEMO_KEY_TAG: key}, RunStatus.to_string(RunStatus.FINISHED)):
+                local_path: Optional[str] = sink.load_artifact(run_id, result_artifact_file(key))
+                if local_path is not None:
+                    entry = index.adopt(experiment_name, key, run_id, local_path)
+                    break
+        if entry is None:
+            return None
 
-                # starts the child run with a context manager (eventually closing it gracefully in case of exceptions)
-                with mlflow.start_run(run_name=_run_name, nested=True) as active_run:
+        try:
+            return entry[0], index.load(entry[1])
+        except Exception as e:
+            print(f"Memoized result {key} cannot be loaded: {e}")
+            return None
 
-                    # then logs tags and...
-                    mlflow.set_tags(tags)
+    def _log_profile(
+        self,
+        sink: Sink,
+        budget: LoggingBudget,
+        run_id: str,
+        name: str,
+        profiler: Union[CallProfiler, StackSampler]
+    ) -> None:
+        # the hotspots are tagged and logged as metrics, the profile is stored into a temporary
+        # directory and uploaded as spooled artifacts, removed once uploaded or dropped
+        directory: str = tempfile.mkdtemp(prefix="veil-profile-")
+        try:
+            hotspots: List[Hotspot] = profiler.hotspots()
+            tags: Dict[str, str] = hotspot_tags(hotspots)
+            metrics: Dict[str, float] = hotspot_metrics(hotspots)
+            paths: List[str] = profiler.store(directory, name)
+        except Exception as e:
+            print(f"Profile of run {run_id} cannot be stored: {e}")
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+
+        budget.dispatch(
+            "tags",
+            inline=lambda: sink.set_tags(run_id, tags),
+            deferred=lambda: sink.detach(self.__autologger).set_tags(run_id, tags),
+            amount=len(tags),
+        )
+        budget.dispatch(
+            "metrics",
+            inline=lambda: sink.log_metrics(run_id, metrics),
+            deferred=lambda: sink.detach(self.__autologger).log_metrics(run_id, metrics),
+            amount=len(metrics),
+        )
 
-                    # ...the params with which the funciton has been called
-                    for k, v in kwargs.items():
-                        if self.__log_params is not None and len(self.__log_params) > 0:
-                            if k in self.log_params:
-                                mlflow.log_param(k, v)
-                        else:
-                            mlflow.log_param(k, v)
+        def upload(target: Sink) -> None:
+            pending: List[str] = list(paths)
+            try:
+                while pending:
+                    target.log_spooled(run_id, pending.pop(0), PROFILE_ARTIFACT_PATH)
+            finally:
+                for path in pending:
+                    discard_spooled(path)
+
+        uploaded: bool = budget.dispatch(
+            "artifacts",
+            inline=lambda: upload(sink),
+            deferred=lambda: upload(sink.detach(self.__autologger)),
+            amount=len(paths),
+        )
+        if not paths or (not uploaded and self.__autologger.budget_policy == POLICY_DROP):
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _log_resources(self, sink: Sink, budget: LoggingBudget, run_id: str, sampler: ResourceSampler) -> None:
+        series, timestamps = sampler.series()
+        budget.dispatch(
+            "metrics",
+            inline=lambda: sink.log_metric_series(run_id, series, timestamps),
+            deferred=lambda: sink.detach(self.__autologger).log_metric_series(run_id, series, timestamps),
+            amount=len(series) * len(timestamps),
+        )
 
-                    # finally the function gets invoked
-                    result = func(*args, **kwargs)
+    def _log_spans(self, sink: Sink, budget: LoggingBudget, run_id: str, tree: SpanTree) -> None:
+        # the span tree is summarized as metrics and uploaded once, as a single artifact
+        metrics: Dict[str, float] = tree.metrics(RunStatus.to_string(RunStatus.FAILED))
+        text: str = tree.to_json()
+        budget.dispatch(
+            "metrics",
+            inline=lambda: sink.log_metrics(run_id, metrics),
+            deferred=lambda: sink.detach(self.__autologger).log_metrics(run_id, metrics),
+            amount=len(metrics),
+        )
+        budget.dispatch(
+            "artifacts",
+            inline=lambda: sink.log_text(run_id, text, SPAN_ARTIFACT_FILE),
+            deferred=lambda: sink.detach(self.__autologger).log_text(run_id, text, SPAN_ARTIFACT_FILE),
+        )
 
-                # stops the parent run
-                mlflow.end_run()
+    def __call__(self, func: Callable):
+        """
+        Execute the decorator as well as the wrapped function
+        """
+        validate(func, Callable)
+        stats_key: str = f"{func.__module__}.{func.__qualname__}"
+
+        # uses the user provided run name instead of function name, if any
+        run_name: str = self.__name if self.__name is not None else func.__name__
+
+        # the source gets hashed once, at decoration time
+        snapshots: List[SourceSnapshot] = []
+        if self.__log_source is not None:
+            snapshots = take_snapshots(func, include_module=self.__log_source == SCOPE_MODULE)
+
+        # as well as the call key ingredients, needed by memoized calls and resumable sessions
+        # (at decoration time if memoized, on first need otherwise)
+        key_inputs: List[Optional[Tuple[Optional[str], Optional[inspect.Signature]]]] = [None]
+
+        def load_key_inputs() -> Tuple[Optional[str], Optional[inspect.Signature]]:
+            if key_inputs[0] is None:
+                code_digest: Optional[str] = next((s.digest for s in snapshots if s.scope != SCOPE_MODULE), None)
+                if code_digest is None:
+                    code_digest = next((s.digest for s in take_snapshots(func)), None)
+                signature: Optional[inspect.Signature] = None
+                try:
+                    signature = inspect.signature(func)
+                except (TypeError, ValueError):
+                    pass
+                key_inputs[0] = (code_digest, signature)
+            return key_inputs[0]
+
+        def call_key(args: Tuple, kwargs: Dict[str, Any]) -> Optional[str]:
+            # calls whose arguments cannot be keyed are neither memoized nor resumed
+            code_digest, signature = load_key_inputs()
+            try:
+                return memo_key(stats_key, code_digest, bind_arguments(signature, args, kwargs))
+            except TypeError as e:
+                print(f"Call of {stats_key} cannot be keyed: {e}")
+                return None
+
+        if self.__memoize:
+            load_key_inputs()
+
+        # the child tags get merged once per session
+        tags_cache: List[Optional[Tuple[AutologSession, Mapping[str, Optional[str]]]]] = [None]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # calls performed by processes carrying a session token join that session
+            if self.__autologger._current_session is None and self.__autologger.is_autolog_enabled:
+                self.__autologger._join_environment_session()
+
+            # calls nested into a decorated call recording spans become spans of its own
+            tree: Optional[SpanTree] = current_tree() if self.__autologger.is_autolog_enabled else None
+
+            # accounts the whole call, isolation included, to the overhead statistics
+            timer: CallTimer = CallTimer()
+            started_at: float = time.perf_counter()
+            failed: bool = True
+            try:
+                result: Any = (
+                    span_wrapper(tree, timer, *args, **kwargs) if tree is not None
+                    else isolated_wrapper(timer, *args, **kwargs)
+                )
+                failed = False
+                return result
+            finally:
+                stats_registry.record_call(stats_key, time.perf_counter() - started_at, timer, failed)
+
+        def call_params(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            # the params with which the function has been called
+            return {
+                k: v for k, v in kwargs.items()
+                if self.__log_params is None or len(self.__log_params) == 0 or k in self.__log_params
+            }
+
+        def span_wrapper(tree: SpanTree, timer: CallTimer, *args, **kwargs):
+            # neither the sink nor mlflow get involved, the span living in memory only
+            span: Optional[Span] = tree.open(run_name, call_params(kwargs))
+            status: RunStatus = RunStatus.FAILED
+            invoked_at: float = time.perf_counter()
+            try:
+                result: Any = _invoke(timer, func, args, kwargs)
+                status = RunStatus.FINISHED
+                return result
+            finally:
+                tree.close(span, RunStatus.to_string(status))
+                session: Optional[AutologSession] = self.__autologger._current_session
+                if session is not None:
+                    session._record_latency(run_name, time.perf_counter() - invoked_at)
+
+        # the autologger has been checked by the run already
+        with trusted():
+            isolation: MlflowIsolated = MlflowIsolated(autologger=self.__autologger)
+
+        @isolation
+        def isolated_wrapper(timer: CallTimer, *args, **kwargs):
+            result: Any = None
+
+            if self.__autologger.is_autolog_enabled and self.__autologger._current_session:
+                sink: Sink = self.__autologger.sink
+
+                # retrieves the tags of the child run, .git info being looked up once per session
+                session: AutologSession = self.__autologger._current_session
+                cache = tags_cache[0]
+                if cache is None or cache[0] is not session:
+                    git_started_at: float = time.perf_counter()
+                    cache = tags_cache[0] = (session, self._child_tags(session, snapshots))
+                    timer.git_s += time.perf_counter() - git_started_at
+                tags: Mapping[str, Optional[str]] = cache[1]
+                _run_name: str = run_name
+
+                # the logging budget accounts for tracking operations only
+                budget: LoggingBudget = LoggingBudget(
+                    budget_ms=self.__autologger.logging_budget_ms,
+                    policy=self.__autologger.budget_policy,
+                    counters=self.__autologger.budget_counters,
+                    delivery=self.__autologger._delivery,
+                )
+                budget.expect("status", "params", "tags")
+
+                # the params with which the function has been called
+                params: Dict[str, Any] = call_params(kwargs)
+
+                # short-circuits the calls already finished by a previous attempt of the session
+                state: Optional[SessionState] = session.state
+                key: Optional[str] = call_key(args, kwargs) if state is not None or self.__memoize else None
+                if state is not None and key is not None:
+                    finished: Optional[Tuple[str, Any]] = state.lookup(key)
+                    if finished is not None:
+                        return finished[1]
+
+                # looks up the result of previous calls with the same key, if memoized
+                hit: Optional[Tuple[str, Any]] = None
+                if self.__memoize and key is not None:
+                    hit = self._lookup_result(sink, key)
+                    memo_tags: StringDict = {MEMO_KEY_TAG: key}
+                    if hit is not None:
+                        memo_tags[MEMO_HIT_TAG] = hit[0]
+                    tags = MappingProxyType({**tags, **memo_tags})
+
+                # starts the child run within the parent one
+                run_id: str = sink.start_run(
+                    experiment_name=self.__autologger.experiment_name,
+                    parent_run_id=self.__autologger._current_session.run_id,
+                    name=_run_name
+                )
+                termination_status: RunStatus = RunStatus.FAILED
+                profiler: Optional[Union[CallProfiler, StackSampler]] = (
+                    new_profiler(self.__profile) if self.__profile else None)
+                resources: Optional[ResourceSampler] = (
+                    ResourceSampler(self.__log_resources) if self.__log_resources is not None else None)
+                tree: Optional[SpanTree] = SpanTree(_run_name, params) if session.log_spans else None
+                try:
+                    # then logs params, tags and artifacts in priority order, so that whenever
+                    # the logging budget is exceeded the latter are the first to be sacrificed
+                    budget.dispatch(
+                        "params",
+                        inline=lambda: sink.log_params(run_id, params),
+                        deferred=lambda: sink.detach(self.__autologger).log_params(run_id, params),
+                        amount=len(params),
+                    )
+                    budget.dispatch(
+                        "tags",
+                        inline=lambda: sink.set_tags(run_id, tags),
+                        deferred=lambda: sink.detach(self.__autologger).set_tags(run_id, tags),
+                        amount=len(tags),
+                    )
+
+                    # source snapshots are uploaded once per experiment
+                    pending: List[SourceSnapshot] = [
+                        snapshot for snapshot in snapshots
+                        if source_uploads.claim(self.__autologger.experiment_name, snapshot.digest)
+                    ]
+                    uploaded: bool = budget.dispatch(
+                        "artifacts",
+                        inline=lambda: self._upload_source(sink, run_id, pending),
+                        deferred=lambda: self._upload_source(sink.detach(self.__autologger), run_id, pending),
+                        amount=len(pending),
+                    )
+                    if not uploaded and self.__autologger.budget_policy == POLICY_DROP:
+                        for snapshot in pending:
+                            source_uploads.release(self.__autologger.experiment_name, snapshot.digest)
+
+                    # finally the function gets invoked, unless memoized
+                    if hit is not None:
+                        result = hit[1]
+                    else:
+                        with (
+                            budget.suspended(),
+                            active_run(sink.detach(self.__autologger), run_id),
+                            recording(tree) if tree is not None else contextlib.nullcontext()
+                        ):
+                            invoked_at: float = time.perf_counter()
+                            try:
+                                result = _invoke(timer, func, args, kwargs, profiler, resources)
+                            finally:
+                                session._record_latency(_run_name, time.perf_counter() - invoked_at)
+
+                        if self.__memoize and key is not None:
+                            result_path: Optional[str] = MemoIndex(self.__autologger.cache_dir).store(
+                                self.__autologger.experiment_name, key, run_id, result)
+                            if result_path is not None:
+                                budget.dispatch(
+                                    "artifacts",
+                                    inline=lambda: sink.log_artifact(run_id, result_path, RESULT_ARTIFACT_PATH),
+                                    deferred=lambda: sink.detach(self.__autologger).log_artifact(
+                                        run_id, result_path, RESULT_ARTIFACT_PATH),
+                                )
+                    if state is not None and key is not None:
+                        state.complete(key, run_id, result)
+                    termination_status = RunStatus.FINISHED
+                finally:
+                    # failed calls get their profile too
+                    if profiler is not None and profiler.profiled:
+                        self._log_profile(sink, budget, run_id, _run_name, profiler)
+                    if resources is not None and len(resources) > 0:
+                        self._log_resources(sink, budget, run_id, resources)
+                    if tree is not None:
+                        tree.close(tree.root, RunStatus.to_string(termination_status))
+                        if tree.size > 0 or tree.dropped > 0:
+                            self._log_spans(sink, budget, run_id, tree)
+
+                    # stops the child run (eventually gracefully in case of exceptions)
+                    budget.perform("status", lambda: sink.end_run(run_id, RunStatus.to_string(termination_status)))
 
             else:
-                result = func(*args, **kwargs)
+                result = _invoke(timer, func, args, kwargs)
             return result
 
+        # keeps track of the decoration, so that it can be rebound (e.g. by sweeps)
+        wrapper.__veil_run__ = self
         return wrapper
 
 
@@ -0,0 +1,191 @@
+from __future__ import annotations
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union
+import threading
+
+from veil.overhead import LATENCY_BUCKETS_S, StatsRegistry, registry
+
+
+"""Default address the exporter listens on, local only."""
+EXPORTER_HOST = "127.0.0.1"
+
+"""Default port the exporter listens on."""
+EXPORTER_PORT = 9464
+
+"""Path the metrics are served at, any other path answering 404."""
+METRICS_PATH = "/metrics"
+
+"""Content type of the Prometheus text exposition format."""
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _value(value: Union[int, float]) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if isinstance(value, int) else repr(float(value))
+
+
+def render_metrics(snapshot: Dict[str, Dict]) -> str:
+    """Renders overhead statistics in the Prometheus text exposition format:
+    per-function call, error and time counters, a call duration histogram,
+    and session and git lookup counters.
+
+    Parameters
+    ----------
+    snapshot : Dict[str, Dict]
+        the statistics, as returned by veil.stats()
+
+    Returns
+    -------
+    str
+        the metrics, one sample per line.
+    """
+    lines: List[str] = []
+    functions: List[Tuple[str, Dict]] = sorted(snapshot["functions"].items())
+
+    counters = (
+        ("veil_function_calls_total", "calls", "Calls of decorated functions."),
+        ("veil_function_errors_total", "errors", "Calls of decorated functions raising an exception."),
+        ("veil_function_user_seconds_total", "user_s", "Time spent in the user code of decorated functions."),
+        ("veil_function_tracking_seconds_total", "tracking_s", "Time spent in tracking I/O by decorated functions."),
+        ("veil_function_git_seconds_total", "git_s", "Time spent in git lookups by decorated functions."),
+    )
+    for metric, key, description in counters:
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, stats in functions:
+            lines.append(f"{metric}{{function=\"{_escape(name)}\"}} {_value(stats[key])}")
+
+    metric: str = "veil_function_duration_seconds"
+    lines.append(f"# HELP {metric} Duration of the calls of decorated functions, tracking included.")
+    lines.append(f"# TYPE {metric} histogram")
+    for name, stats in functions:
+        label: str = f"function=\"{_escape(name)}\""
+        cumulative: int = 0
+        for bound, count in zip((*LATENCY_BUCKETS_S, float("inf")), stats["latency_buckets"]):
+            cumulative += count
+            lines.append(f"{metric}_bucket{{{label},le=\"{_value(bound)}\"}} {cumulative}")
+        lines.append(f"{metric}_sum{{{label}}} {_value(stats['total_s'])}")
+        lines.append(f"{metric}_count{{{label}}} {stats['calls']}")
+
+    sessions: Dict = snapshot["sessions"]
+    lines.append("# HELP veil_sessions_total Session enters and exits.")
+    lines.append("# TYPE veil_sessions_total counter")
+    for phase in ("enter", "exit"):
+        lines.append(f"veil_sessions_total{{phase=\"{phase}\"}} {sessions[phase]}")
+    lines.append("# HELP veil_session_seconds_total Time spent entering and exiting sessions.")
+    lines.append("# TYPE veil_session_seconds_total counter")
+    for phase in ("enter", "exit"):
+        lines.append(f"veil_session_seconds_total{{phase=\"{phase}\"}} {_value(sessions[f'{phase}_s'])}")
+    lines.append("# HELP veil_session_errors_total Session enters and exits raising an exception.")
+    lines.append("# TYPE veil_session_errors_total counter")
+    lines.append(f"veil_session_errors_total {sessions['errors']}")
+
+    git: Dict = snapshot["git"]
+    lines.append("# HELP veil_git_lookups_total Git lookups.")
+    lines.append("# TYPE veil_git_lookups_total counter")
+    lines.append(f"veil_git_lookups_total {git['calls']}")
+    lines.append("# HELP veil_git_lookup_errors_total Git lookups raising an exception.")
+    lines.append("# TYPE veil_git_lookup_errors_total counter")
+    lines.append(f"veil_git_lookup_errors_total {git['errors']}")
+    lines.append("# HELP veil_git_lookup_seconds_total Time spent in git lookups.")
+    lines.append("# TYPE veil_git_lookup_seconds_total counter")
+    lines.append(f"veil_git_lookup_seconds_total {_value(git['time_s'])}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body: bytes = render_metrics(self.server.registry.snapshot()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class MetricsExporter:
+    """ Serves the statistics gathered by decorated functions over HTTP, in the
+    Prometheus text exposition format, from a background thread.
+
+    The statistics are the ones veil already accounts on every call, so that
+    exporting them adds nothing to the call path: the cost of rendering them
+    is paid by the scrapes.
+
+    Parameters
+    ----------
+    host : str, optional
+        the address to listen on, by default EXPORTER_HOST
+    port : int, optional
+        the port to listen on, 0 picking a free one, by default EXPORTER_PORT
+    stats_registry : StatsRegistry, optional
+        the statistics to export, by default the process-wide ones
+    """
+
+    def __init__(self, host: str = EXPORTER_HOST, port: int = EXPORTER_PORT, stats_registry: StatsRegistry = registry):
+        self.__host: str = host
+        self.__port: int = port
+        self.__registry: StatsRegistry = stats_registry
+        self.__server: Optional[ThreadingHTTPServer] = None
+        self.__thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.__server is not None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The address the exporter listens on, with the actual port once started.
+        """
+        if self.__server is not None:
+            return self.__server.server_address[:2]
+        return self.__host, self.__port
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}{METRICS_PATH}"
+
+    def start(self) -> MetricsExporter:
+        """Starts serving the metrics, doing nothing if already serving them.
+
+        Raises
+        ------
+        OSError
+            if the address cannot be bound.
+        """
+        if self.__server is None:
+            server: ThreadingHTTPServer = ThreadingHTTPServer((self.__host, self.__port), _MetricsHandler)
+            server.daemon_threads = True
+            server.registry = self.__registry
+            self.__server = server
+            self.__thread = threading.Thread(target=server.serve_forever, name="veil-exporter", daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving the metrics and releases the address.
+        """
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__thread.join()
+            self.__server = None
+            self.__thread = None
+
+    def __enter__(self) -> MetricsExporter:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        self.stop()
@@ -0,0 +1,282 @@
+from __future__ import annotations
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+import os
+import re
+import threading
+
+
+"""Type alias for the repository uri, the HEAD commit sha and the branch name."""
+RepoInfo = Tuple[Optional[str], Optional[str], Optional[str]]
+
+"""Environment variables set by CI services, as (repo uri, commit sha, branch name)."""
+CI_ENVIRONMENT_VARIABLES: List[Tuple[str, str, str]] = [
+    ("CI_REPOSITORY_URL", "CI_COMMIT_SHA", "CI_COMMIT_REF_NAME"),                           # gitlab
+    ("BITBUCKET_GIT_HTTP_ORIGIN", "BITBUCKET_COMMIT", "BITBUCKET_BRANCH"),                  # bitbucket
+    ("BUILD_REPOSITORY_URI", "BUILD_SOURCEVERSION", "BUILD_SOURCEBRANCHNAME"),              # azure devops
+    ("GIT_URL", "GIT_COMMIT", "GIT_BRANCH"),                                                # jenkins
+    ("CIRCLE_REPOSITORY_URL", "CIRCLE_SHA1", "CIRCLE_BRANCH"),                              # circleci
+]
+
+# the modification time, inode and size of a file, None if missing
+_FileStat = Optional[Tuple[int, int, int]]
+
+_SECTION = re.compile(r'^\[\s*([^\s\]"]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+_SHA = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+
+def find_git_dir(path: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """Looks for the git directory of the repository containing the given path,
+    searching parent directories too.
+
+    Parameters
+    ----------
+    path : Optional[str], optional
+        the path to start from, by default the current working directory
+
+    Returns
+    -------
+    Optional[Tuple[str, str]]
+        the git directory holding HEAD and the common directory holding refs and
+        config (they differ for linked worktrees), None if not in a repository.
+    """
+    current: str = os.path.abspath(path or os.getcwd())
+    while True:
+        dot_git: str = os.path.join(current, ".git")
+        git_dir: Optional[str] = None
+        if os.path.isdir(dot_git):
+            git_dir = dot_git
+        elif os.path.isfile(dot_git):
+            # linked worktrees and submodules point to their git directory
+            content: str = _read(dot_git) or ""
+            if content.startswith("gitdir:"):
+                git_dir = os.path.normpath(os.path.join(current, content[len("gitdir:"):].strip()))
+
+        if git_dir is not None and os.path.isfile(os.path.join(git_dir, "HEAD")):
+            common_dir: str = git_dir
+            commondir: Optional[str] = _read(os.path.join(git_dir, "commondir"))
+            if commondir:
+                common_dir = os.path.normpath(os.path.join(git_dir, commondir.strip()))
+            return git_dir, common_dir
+
+        parent: str = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def read_config(common_dir: str) -> Dict[str, Dict[str, str]]:
+    """Parses the git config of a repository.
+
+    Parameters
+    ----------
+    common_dir : str
+        the common git directory
+
+    Returns
+    -------
+    Dict[str, Dict[str, str]]
+        the values keyed by section (e.g. 'remote "origin"') and lower-case name.
+    """
+    config: Dict[str, Dict[str, str]] = dict()
+    section: Optional[Dict[str, str]] = None
+    for line in (_read(os.path.join(common_dir, "config")) or "").splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        match = _SECTION.match(line)
+        if match:
+            name, subsection = match.group(1).lower(), match.group(2)
+            key: str = name if subsection is None else f'{name} "{subsection}"'
+            section = config.setdefault(key, dict())
+        elif section is not None and "=" in line:
+            k, v = line.split("=", 1)
+            section.setdefault(k.strip().lower(), v.strip().strip('"'))
+    return config
+
+
+def resolve_ref(common_dir: str, ref: str, git_dir: Optional[str] = None) -> Optional[str]:
+    """Resolves a ref to a commit sha, looking at loose refs first and at
+    packed refs later.
+
+    Parameters
+    ----------
+    common_dir : str
+        the common git directory
+    ref : str
+        the full ref name, e.g. refs/heads/main
+    git_dir : Optional[str], optional
+        the worktree git directory, by default the common one
+
+    Returns
+    -------
+    Optional[str]
+        the commit sha, None if the ref cannot be resolved.
+    """
+    for _ in range(8):
+        content: Optional[str] = None
+        for directory in dict.fromkeys([git_dir or common_dir, common_dir]):
+            content = _read(os.path.join(directory, *ref.split("/")))
+            if content is not None:
+                break
+
+        if content is None:
+            for line in (_read(os.path.join(common_dir, "packed-refs")) or "").splitlines():
+                if line and line[0] not in "#^":
+                    sha, _, name = line.partition(" ")
+                    if name.strip() == ref:
+                        return sha
+            return None
+
+        content = content.strip()
+        if content.startswith("ref:"):
+            # symbolic refs point to other refs
+            ref = content[len("ref:"):].strip()
+        else:
+            return content if _SHA.match(content) else None
+    return None
+
+
+def read_repo_info(path: Optional[str] = None) -> Optional[RepoInfo]:
+    """Reads the remote uri, the HEAD commit sha and the branch name of the
+    repository containing the given path, by parsing the files of its git
+    directory (HEAD, refs, packed-refs and config).
+
+    Parameters
+    ----------
+    path : Optional[str], optional
+        the path to start from, by default the current working directory
+
+    Returns
+    -------
+    Optional[RepoInfo]
+        the repository info, whose branch name is None for detached HEADs, or
+        None if not in a repository.
+    """
+    git_dirs: Optional[Tuple[str, str]] = find_git_dir(path)
+    if git_dirs is None:
+        return None
+    git_dir, common_dir = git_dirs
+
+    repo_uri, sha_commit, branch_name = None, None, None
+
+    # the uri of the first remote, in order of declaration
+    for section, values in read_config(common_dir).items():
+        if section.startswith("remote ") and "url" in values:
+            repo_uri = values["url"]
+            break
+
+    head: str = (_read(os.path.join(git_dir, "HEAD")) or "").strip()
+    if head.startswith("ref:"):
+        ref: str = head[len("ref:"):].strip()
+        if ref.startswith("refs/heads/"):
+            branch_name = ref[len("refs/heads/"):]
+        sha_commit = resolve_ref(common_dir, ref, git_dir)
+    elif _SHA.match(head):
+        sha_commit = head
+
+    return repo_uri, sha_commit, branch_name
+
+
+def read_ci_repo_info(environ: Optional[Mapping[str, str]] = None) -> RepoInfo:
+    """Reads the repository info from the environment variables set by CI
+    services.
+
+    Parameters
+    ----------
+    environ : Optional[Mapping[str, str]], optional
+        the environment, by default os.environ
+
+    Returns
+    -------
+    RepoInfo
+        the repository info, whose items are None when not available.
+    """
+    environ = os.environ if environ is None else environ
+
+    # github actions splits the repository uri in two variables
+    if "GITHUB_SHA" in environ:
+        repo_uri: Optional[str] = None
+        if "GITHUB_SERVER_URL" in environ and "GITHUB_REPOSITORY" in environ:
+            repo_uri = f"{environ['GITHUB_SERVER_URL']}/{environ['GITHUB_REPOSITORY']}"
+        branch_name: Optional[str] = environ.get("GITHUB_HEAD_REF") or environ.get("GITHUB_REF_NAME")
+        return repo_uri, environ["GITHUB_SHA"], branch_name
+
+    for uri_variable, sha_variable, branch_variable in CI_ENVIRONMENT_VARIABLES:
+        if sha_variable in environ:
+            return environ.get(uri_variable), environ[sha_variable], environ.get(branch_variable)
+
+    return None, None, None
+
+
+class RepoInfoCache:
+    """ Caches the repository info by git directory, so that it is read again
+    only when the working directory moves to another repository or when the
+    files it was read from change, e.g. HEAD on checkouts and the ref it points
+    to on commits.
+
+    Validating an entry takes a few stats, whereas reading the info may take
+    GitPython to be imported.
+
+    Parameters
+    ----------
+    read : Callable[[str], Optional[RepoInfo]]
+        reads the info of the repository containing the given directory, None
+        if not in a repository
+    """
+
+    def __init__(self, read: Callable[[str], Optional[RepoInfo]]):
+        self.__read: Callable[[str], Optional[RepoInfo]] = read
+        self.__lock: threading.Lock = threading.Lock()
+        self.__cwd: Optional[str] = None
+        self.__git_dirs: Optional[Tuple[str, str]] = None
+        self.__entries: Dict[Optional[str], Tuple[List[Tuple[str, _FileStat]], Optional[RepoInfo]]] = dict()
+
+    def get(self) -> Optional[RepoInfo]:
+        """Returns the info of the repository containing the current working
+        directory, None if not in a repository.
+        """
+        cwd: str = os.getcwd()
+        with self.__lock:
+            if cwd != self.__cwd:
+                self.__cwd, self.__git_dirs = cwd, find_git_dir(cwd)
+            git_dirs: Optional[Tuple[str, str]] = self.__git_dirs
+            entry = self.__entries.get(git_dirs[0] if git_dirs is not None else None)
+        if entry is not None and all(_stat(path) == stat for path, stat in entry[0]):
+            return entry[1]
+
+        # the files are stat before being read, so that changes in between invalidate the entry
+        paths: List[str] = _watched_paths(git_dirs) if git_dirs is not None else []
+        stats: List[Tuple[str, _FileStat]] = [(path, _stat(path)) for path in paths]
+        repo_info: Optional[RepoInfo] = self.__read(cwd)
+        with self.__lock:
+            self.__entries[git_dirs[0] if git_dirs is not None else None] = (stats, repo_info)
+        return repo_info
+
+
+def _watched_paths(git_dirs: Tuple[str, str]) -> List[str]:
+    # the files the repository info is read from
+    git_dir, common_dir = git_dirs
+    paths: List[str] = [os.path.join(git_dir, "HEAD"), os.path.join(common_dir, "config")]
+    head: str = (_read(paths[0]) or "").strip()
+    if head.startswith("ref:"):
+        ref: List[str] = head[len("ref:"):].strip().split("/")
+        paths.extend(dict.fromkeys([os.path.join(git_dir, *ref), os.path.join(common_dir, *ref)]))
+        paths.append(os.path.join(common_dir, "packed-refs"))
+    return paths
+
+
+def _stat(path: str) -> _FileStat:
+    # git replaces files rather than rewriting them, hence inodes change too
+    try:
+        stat: os.stat_result = os.stat(path)
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+    except OSError:
+        return None
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, List, Sequence
+import math
+import re
+import threading
+
+
+"""Prefix of the latency metrics logged on parent runs."""
+LATENCY_PREFIX = "veil.latency"
+
+"""Percentiles logged for each decorated function, keyed by metric suffix."""
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+"""Smallest latency told apart, in seconds: shorter ones fall into the first bucket."""
+MIN_LATENCY_S = 1e-6
+
+"""Buckets per doubling of latency, i.e. a relative error of at most 2^(1/16) - 1 (4.4%)."""
+BUCKETS_PER_OCTAVE = 16
+
+"""Doublings of MIN_LATENCY_S covered by the buckets (up to ~4.8 hours), longer latencies
+falling into the last bucket."""
+OCTAVES = 34
+
+
+class LatencyHistogram:
+    """ A streaming histogram of latencies with logarithmic buckets, HDR-style:
+    memory is constant (one counter per bucket) regardless of the number of
+    recorded latencies, and percentiles have a bounded relative error.
+
+    Recording is thread-safe and costs a logarithm and a counter increment.
+    """
+
+    __slots__ = ("__lock", "__counts", "__count", "__sum_s", "__max_s")
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__counts: array = array("Q", bytes(8 * BUCKETS_PER_OCTAVE * OCTAVES))
+        self.__count: int = 0
+        self.__sum_s: float = 0.0
+        self.__max_s: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def sum_s(self) -> float:
+        return self.__sum_s
+
+    @property
+    def max_s(self) -> float:
+        return self.__max_s
+
+    @staticmethod
+    def bucket(latency_s: float) -> int:
+        """Returns the bucket of a latency.
+        """
+        if latency_s <= MIN_LATENCY_S:
+            return 0
+        return min(int(math.log2(latency_s / MIN_LATENCY_S) * BUCKETS_PER_OCTAVE), BUCKETS_PER_OCTAVE * OCTAVES - 1)
+
+    @staticmethod
+    def upper_bound(bucket: int) -> float:
+        """Returns the highest latency of a bucket, in seconds, unbounded for the last one.
+        """
+        if bucket >= BUCKETS_PER_OCTAVE * OCTAVES - 1:
+            return math.inf
+        return MIN_LATENCY_S * 2.0 ** ((bucket + 1) / BUCKETS_PER_OCTAVE)
+
+    def record(self, latency_s: float) -> None:
+        bucket: int = self.bucket(latency_s)
+        with self.__lock:
+            self.__counts[bucket] += 1
+            self.__count += 1
+            self.__sum_s += latency_s
+            if latency_s > self.__max_s:
+                self.__max_s = latency_s
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Adds the latencies recorded by another histogram to this one.
+        """
+        counts, count, sum_s, max_s = other.__snapshot()
+        with self.__lock:
+            for bucket, n in enumerate(counts):
+                if n:
+                    self.__counts[bucket] += n
+            self.__count += count
+            self.__sum_s += sum_s
+            self.__max_s = max(self.__max_s, max_s)
+
+    def buckets(self) -> List[int]:
+        """Returns the count of each bucket.
+        """
+        return self.__snapshot()[0].tolist()
+
+    def percentiles(self, quantiles: Sequence[float]) -> List[float]:
+        """Estimates the latencies below which the given fractions of the
+        recorded ones fall, as the upper bounds of their buckets (capped at the
+        maximum latency), by means of a single cumulative pass over the buckets.
+
+        Parameters
+        ----------
+        quantiles : Sequence[float]
+            the fractions, between 0 and 1
+
+        Returns
+        -------
+        List[float]
+            the latencies in seconds, in the same order, 0.0 if none was recorded.
+        """
+        counts, count, _, max_s = self.__snapshot()
+        if count == 0:
+            return [0.0 for _ in quantiles]
+        cumulative: List[int] = list(accumulate(counts))
+        return [
+            min(self.upper_bound(bisect_left(cumulative, max(math.ceil(q * count), 1))), max_s)
+            for q in quantiles
+        ]
+
+    def __snapshot(self):
+        with self.__lock:
+            return array("Q", self.__counts), self.__count, self.__sum_s, self.__max_s
+
+
+def metric_name(name: str) -> str:
+    """Replaces the characters mlflow does not allow in metric names.
+    """
+    return re.sub(r"[^\w\-\. /]", "_", name)
+
+
+def latency_metrics(histograms: Dict[str, LatencyHistogram]) -> Dict[str, float]:
+    """Summarizes latency histograms as metrics, i.e. percentiles, maximum
+    and count of each one, keyed as LATENCY_PREFIX.<name>.<statistic>.
+    """
+    metrics: Dict[str, float] = dict()
+    for name, histogram in histograms.items():
+        prefix: str = f"{LATENCY_PREFIX}.{metric_name(name)}"
+        for suffix, value in zip(PERCENTILES, histogram.percentiles(list(PERCENTILES.values()))):
+            metrics[f"{prefix}.{suffix}_s"] = value
+        metrics[f"{prefix}.max_s"] = histogram.max_s
+        metrics[f"{prefix}.count"] = histogram.count
+    return metrics
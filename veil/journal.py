@@ -0,0 +1,371 @@
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, Iterator, List, Literal, NamedTuple, Optional
+import json
+import lzma
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+
+"""Header of journal files."""
+MAGIC = b"VEILJRN\x01"
+
+"""Compression codecs of journal blocks."""
+CODECS = ("none", "zlib", "lzma")
+
+"""Journaled events, whose position is their binary code: new events are appended."""
+EVENTS = (
+    "start_session",
+    "end_session",
+    "resume_session",
+    "start_run",
+    "end_run",
+    "log_params",
+    "set_tags",
+    "log_artifact",
+    "log_metrics",
+)
+
+# block header: magic, codec, index length, stored length, raw length, records count, crc32 of
+# the stored payload, first and last timestamps; followed by the index and the stored payload
+_BLOCK = struct.Struct("<4sBxIIIIIdd")
+_BLOCK_MAGIC = b"VJBK"
+
+# record header: length of the rest of the record, event code, timestamp
+_RECORD = struct.Struct("<IBd")
+
+
+class JournalEvent(NamedTuple):
+    """ An event of the journal, addressed by run and by session (i.e. the
+    parent run id, equal to run_id for session events).
+    """
+    event: str
+    run_id: str
+    session_id: Optional[str]
+    timestamp: float
+    data: Dict[str, Any]
+
+
+class JournalBlock(NamedTuple):
+    """ The index entry of a journal block, read from its uncompressed header.
+    """
+    offset: int
+    codec: str
+    stored_length: int
+    raw_length: int
+    records: int
+    first_timestamp: float
+    last_timestamp: float
+    run_ids: FrozenSet[str]
+    session_ids: FrozenSet[str]
+    payload_offset: int
+    crc: int
+
+
+def _compress(codec: str, data: bytes, level: Optional[int]) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6 if level is None else level)
+    if codec == "lzma":
+        return lzma.compress(data, preset=6 if level is None else level)
+    return data
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data)
+    return data
+
+
+def _encode_id(value: Optional[str]) -> bytes:
+    encoded: bytes = (value or "").encode("utf-8")
+    if len(encoded) > 255:
+        raise ValueError(f"Run ids longer than 255 bytes cannot be journaled: {value}")
+    return bytes([len(encoded)]) + encoded
+
+
+class JournalWriter:
+    """ Appends events to a journal file.
+
+    The journal is a sequence of independently compressed blocks, each one
+    preceded by an uncompressed header indexing the runs and sessions it holds
+    and its time span, so that readers skip irrelevant blocks without
+    decompressing them. Events are buffered until block_size bytes of them are
+    pending, or until flush(): buffered events are lost if the process crashes.
+
+    Parameters
+    ----------
+    path : str
+        the path of the journal, appended to if it exists
+    codec : Literal["none", "zlib", "lzma"], optional
+        the block compression codec, by default "zlib"
+    level : Optional[int], optional
+        the compression level, by default the codec one
+    block_size : int, optional
+        the uncompressed size of blocks, in bytes, by default 256 KiB
+    """
+
+    def __init__(
+        self,
+        path: str,
+        codec: Literal["none", "zlib", "lzma"] = "zlib",
+        level: Optional[int] = None,
+        block_size: int = 256 * 1024
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown journal codec: {codec}")
+        self.__path: str = path
+        self.__codec: str = codec
+        self.__level: Optional[int] = level
+        self.__block_size: int = block_size
+        self.__lock: threading.Lock = threading.Lock()
+        self.__file = None
+        self.__records: List[bytes] = []
+        self.__pending: int = 0
+        self.__run_ids: set = set()
+        self.__session_ids: set = set()
+        self.__first_timestamp: float = 0.0
+        self.__last_timestamp: float = 0.0
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def append(
+        self,
+        event: str,
+        run_id: str,
+        session_id: Optional[str],
+        timestamp: float,
+        data: Dict[str, Any]
+    ) -> None:
+        """Appends an event to the current block.
+        """
+        body: bytes = (
+            _encode_id(run_id)
+            + _encode_id(session_id)
+            + json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+        )
+        record: bytes = _RECORD.pack(_RECORD.size - 4 + len(body), EVENTS.index(event), timestamp) + body
+        with self.__lock:
+            if not self.__records:
+                self.__first_timestamp = self.__last_timestamp = timestamp
+            self.__first_timestamp = min(self.__first_timestamp, timestamp)
+            self.__last_timestamp = max(self.__last_timestamp, timestamp)
+            self.__records.append(record)
+            self.__pending += len(record)
+            self.__run_ids.add(run_id)
+            if session_id:
+                self.__session_ids.add(session_id)
+            if self.__pending >= self.__block_size:
+                self.__write_block()
+
+    def flush(self) -> None:
+        """Writes the pending events as a block, and flushes the file.
+        """
+        with self.__lock:
+            self.__write_block()
+            if self.__file is not None:
+                self.__file.flush()
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__write_block()
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+
+    def __open(self):
+        if self.__file is None:
+            directory: str = os.path.dirname(self.__path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.__path) and os.path.getsize(self.__path) > 0:
+                # drops the block truncated by a crash, if any, before appending
+                with JournalReader(self.__path) as reader:
+                    end: int = reader.end_offset
+                os.truncate(self.__path, end)
+            self.__file = open(self.__path, "ab")
+            if self.__file.tell() == 0:
+                self.__file.write(MAGIC)
+        return self.__file
+
+    def __write_block(self) -> None:
+        if not self.__records:
+            return
+        raw: bytes = b"".join(self.__records)
+        stored: bytes = _compress(self.__codec, raw, self.__level)
+        index: bytes = json.dumps(
+            [sorted(self.__run_ids), sorted(self.__session_ids)], separators=(",", ":")).encode("utf-8")
+        header: bytes = _BLOCK.pack(
+            _BLOCK_MAGIC, CODECS.index(self.__codec), len(index), len(stored), len(raw),
+            len(self.__records), zlib.crc32(stored), self.__first_timestamp, self.__last_timestamp
+        )
+        self.__open().write(header + index + stored)
+
+        self.__records = []
+        self.__pending = 0
+        self.__run_ids = set()
+        self.__session_ids = set()
+
+
+class JournalReader:
+    """ Reads a journal file through a read-only memory map: only block headers
+    are scanned when opening it, while blocks get decompressed one at a time and
+    only if they may hold the requested events. A block truncated by a crash of
+    the writer ends the journal.
+
+    Parameters
+    ----------
+    path : str
+        the path of the journal
+    """
+
+    def __init__(self, path: str):
+        self.__path: str = path
+        self.__file = open(path, "rb")
+        self.__map: Optional[mmap.mmap] = None
+        self.__blocks: List[JournalBlock] = []
+        self.__end_offset: int = len(MAGIC)
+        try:
+            if os.fstat(self.__file.fileno()).st_size < len(MAGIC):
+                raise ValueError(f"{path} is not a veil journal")
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.__map[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a veil journal")
+            self.__blocks = self.__scan()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> JournalReader:
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        self.close()
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def blocks(self) -> List[JournalBlock]:
+        return self.__blocks
+
+    @property
+    def end_offset(self) -> int:
+        """The offset following the last complete block.
+        """
+        return self.__end_offset
+
+    def __len__(self) -> int:
+        return sum(block.records for block in self.__blocks)
+
+    def __iter__(self) -> Iterator[JournalEvent]:
+        return self.events()
+
+    def close(self) -> None:
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+
+    def __scan(self) -> List[JournalBlock]:
+        blocks: List[JournalBlock] = []
+        offset: int = len(MAGIC)
+        size: int = len(self.__map)
+        while offset + _BLOCK.size <= size:
+            magic, codec, index_length, stored_length, raw_length, records, crc, first, last = \
+                _BLOCK.unpack_from(self.__map, offset)
+            payload_offset: int = offset + _BLOCK.size + index_length
+            if magic != _BLOCK_MAGIC or payload_offset + stored_length > size:
+                break
+            run_ids, session_ids = json.loads(self.__map[offset + _BLOCK.size:payload_offset])
+            blocks.append(JournalBlock(
+                offset, CODECS[codec], stored_length, raw_length, records, first, last,
+                frozenset(run_ids), frozenset(session_ids), payload_offset, crc
+            ))
+            offset = payload_offset + stored_length
+        self.__end_offset = offset
+        return blocks
+
+    def read_block(self, block: JournalBlock) -> Iterator[JournalEvent]:
+        """Decompresses a block and iterates its events.
+
+        Raises
+        ------
+        ValueError
+            if the block is corrupted.
+        """
+        stored: bytes = self.__map[block.payload_offset:block.payload_offset + block.stored_length]
+        if zlib.crc32(stored) != block.crc:
+            raise ValueError(f"Corrupted journal block at offset {block.offset}")
+        raw: bytes = _decompress(block.codec, stored)
+
+        position: int = 0
+        while position < len(raw):
+            length, code, timestamp = _RECORD.unpack_from(raw, position)
+            end: int = position + 4 + length
+            position += _RECORD.size
+            run_id: str = raw[position + 1:position + 1 + raw[position]].decode("utf-8")
+            position += 1 + raw[position]
+            session_id: str = raw[position + 1:position + 1 + raw[position]].decode("utf-8")
+            position += 1 + raw[position]
+            data: Dict[str, Any] = json.loads(raw[position:end])
+            event: str = EVENTS[code] if code < len(EVENTS) else "unknown"
+            yield JournalEvent(event, run_id, session_id or None, timestamp, data)
+            position = end
+
+    def events(
+        self,
+        run_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        since: Optional[float] = None,
+        start: int = 0
+    ) -> Iterator[JournalEvent]:
+        """Iterates the events of the journal, in order.
+
+        Parameters
+        ----------
+        run_id : Optional[str], optional
+            the run the events must be addressed to, by default any
+        session_id : Optional[str], optional
+            the session the events must belong to, by default any
+        since : Optional[float], optional
+            the minimum timestamp of the events, by default any
+        start : int, optional
+            the number of events to seek past, by default 0
+
+        Returns
+        -------
+        Iterator[JournalEvent]
+            the events.
+        """
+        position: int = 0
+        for block in self.__blocks:
+            if position + block.records <= start:
+                # seeks past the whole block
+                position += block.records
+                continue
+            if (
+                (run_id is not None and run_id not in block.run_ids)
+                or (session_id is not None and session_id not in block.session_ids)
+                or (since is not None and block.last_timestamp < since)
+            ):
+                position += block.records
+                continue
+
+            for event in self.read_block(block):
+                position += 1
+                if position <= start:
+                    continue
+                if run_id is not None and event.run_id != run_id:
+                    continue
+                if session_id is not None and event.session_id != session_id:
+                    continue
+                if since is not None and event.timestamp < since:
+                    continue
+                yield event
@@ -0,0 +1,265 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+
+
+"""Tag holding the memoization key of a child run."""
+MEMO_KEY_TAG = "veil.memo.key"
+
+"""Tag holding the id of the run a memoized result has been taken from."""
+MEMO_HIT_TAG = "veil.memo.hit"
+
+"""Artifact directory of memoized results, relative to the run artifacts root."""
+RESULT_ARTIFACT_PATH = "veil/memo"
+
+
+def default_cache_dir() -> str:
+    """Returns the directory holding veil local state, i.e. $VEIL_CACHE_DIR if set,
+    ~/.cache/veil otherwise.
+    """
+    return os.environ.get("VEIL_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "veil")
+
+
+"""Pickle protocol of the arguments keyed by their pickled bytes, fixed so that keys are stable."""
+KEY_PICKLE_PROTOCOL = 4
+
+# the encoders of argument types registered through register_key_encoder
+_key_encoders: Dict[type, Callable[[Any], Any]] = {}
+
+
+def result_artifact_file(key: str) -> str:
+    return f"{RESULT_ARTIFACT_PATH}/{key}.pkl"
+
+
+def register_key_encoder(cls: type, encoder: Callable[[Any], Any]) -> None:
+    """Registers how the arguments of a type (and of its subclasses) are keyed,
+    instead of by their pickled bytes.
+
+    Parameters
+    ----------
+    cls : type
+        the type of the arguments
+    encoder : Callable[[Any], Any]
+        the function returning the content an argument gets keyed by, i.e. bytes
+        or any value memo_key can key itself: equal arguments must be encoded
+        the same, different ones differently
+    """
+    _key_encoders[cls] = encoder
+
+
+def _type_name(value: Any) -> str:
+    return f"{type(value).__module__}.{type(value).__qualname__}"
+
+
+def _digest(data: Any) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _encode(value: Any) -> Any:
+    # each value is tagged with its exact type, so that e.g. 1, 1.0, True, "1",
+    # (1, 2) and [1, 2] never share a key
+    if value is None or type(value) in (bool, int, str):
+        return [type(value).__name__, value]
+    if type(value) is float:
+        return ["float", repr(value)]
+    if type(value) in (list, tuple):
+        return [type(value).__name__, [_encode(item) for item in value]]
+    if type(value) is dict:
+        items: List[Any] = [[_encode(k), _encode(v)] for k, v in value.items()]
+        return ["dict", sorted(items, key=lambda item: json.dumps(item[0]))]
+    if type(value) in (set, frozenset):
+        return [type(value).__name__, sorted((_encode(item) for item in value), key=json.dumps)]
+    if type(value) is bytes:
+        return ["bytes", _digest(value)]
+
+    for cls in type(value).__mro__:
+        if cls in _key_encoders:
+            encoded: Any = _key_encoders[cls](value)
+            return [_type_name(value), _digest(encoded) if isinstance(encoded, bytes) else _encode(encoded)]
+
+    # buffers (e.g. numpy arrays) are keyed by their layout and bytes, unless holding objects
+    try:
+        view: Optional[memoryview] = memoryview(value)
+    except TypeError:
+        view = None
+    if view is not None:
+        with view:
+            if "O" not in view.format:
+                data: Any = view if view.c_contiguous else view.tobytes()
+                return [_type_name(value), [view.format, list(view.shape), _digest(data)]]
+
+    try:
+        data = pickle.dumps(value, protocol=KEY_PICKLE_PROTOCOL)
+    except Exception as e:
+        raise TypeError(f"Argument of type {_type_name(value)} cannot be keyed: {e}") from e
+    return [_type_name(value), _digest(data)]
+
+
+def bind_arguments(signature: Optional[inspect.Signature], args: Tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps the arguments of a call to the parameter names, defaults included.
+
+    Parameters
+    ----------
+    signature : Optional[inspect.Signature]
+        the signature of the called function, None if not available
+    args : Tuple
+        the positional arguments
+    kwargs : Dict[str, Any]
+        the keyword arguments
+
+    Returns
+    -------
+    Dict[str, Any]
+        the arguments keyed by parameter name.
+    """
+    if signature is not None:
+        try:
+            bound: inspect.BoundArguments = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return dict(bound.arguments)
+        except TypeError:
+            pass
+    return {"args": list(args), "kwargs": kwargs}
+
+
+def memo_key(identity: str, code_digest: Optional[str], arguments: Mapping[str, Any]) -> str:
+    """Computes the memoization key of a call.
+
+    Arguments are encoded together with their exact type: JSON primitives and
+    builtin containers by value, types registered through register_key_encoder
+    by their encoding, buffers by their bytes and other objects by their pickled
+    bytes. Objects whose pickle is not deterministic (e.g. holding sets of
+    strings) may get other keys across processes, i.e. miss memoized results.
+
+    Parameters
+    ----------
+    identity : str
+        the qualified name of the function
+    code_digest : Optional[str]
+        the digest of the function source, None if not available
+    arguments : Mapping[str, Any]
+        the call arguments, keyed by parameter name
+
+    Returns
+    -------
+    str
+        the sha256 hex digest of the key.
+
+    Raises
+    ------
+    TypeError
+        if an argument cannot be keyed, i.e. cannot be pickled.
+    """
+    payload: str = json.dumps(
+        {"function": identity, "code": code_digest, "arguments": _encode(dict(arguments))},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoIndex:
+    """ Local index of memoized results, so that looking up a result computed
+    on this machine requires no round trip to the tracking store.
+
+    Results are pickled in `<directory>/memo/<experiment digest>/<key>.pkl`,
+    next to a `<key>.json` entry recording the run they belong to. Entries are
+    written atomically, so concurrent processes never read partial results.
+    Note that unpickling runs arbitrary code: the cache directory and the
+    tracking store must be trusted.
+
+    Parameters
+    ----------
+    directory : Optional[str], optional
+        the cache directory, by default default_cache_dir()
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.__directory: str = directory or default_cache_dir()
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    def lookup(self, experiment_name: str, key: str) -> Optional[Tuple[str, str]]:
+        """Looks up the result of a call.
+
+        Returns
+        -------
+        Optional[Tuple[str, str]]
+            the id of the run which computed the result and the local path of the
+            pickled result, None if unknown.
+        """
+        result_path, entry_path = self.__paths(experiment_name, key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                run_id: str = json.load(f)["run_id"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return (run_id, result_path) if os.path.isfile(result_path) else None
+
+    def store(self, experiment_name: str, key: str, run_id: str, result: Any) -> Optional[str]:
+        """Pickles the result of a call into the index.
+
+        Returns
+        -------
+        Optional[str]
+            the local path of the pickled result, None if the result cannot be pickled.
+        """
+        try:
+            data: bytes = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Result of memoized call {key} cannot be pickled: {e}")
+            return None
+
+        result_path, _ = self.__paths(experiment_name, key)
+        self.__write(result_path, data)
+        self.__write_entry(experiment_name, key, run_id)
+        return result_path
+
+    def adopt(self, experiment_name: str, key: str, run_id: str, local_path: str) -> Tuple[str, str]:
+        """Copies a pickled result retrieved from the tracking store into the index.
+
+        Returns
+        -------
+        Tuple[str, str]
+            the run id and the local path of the pickled result.
+        """
+        result_path, _ = self.__paths(experiment_name, key)
+        if os.path.abspath(local_path) != os.path.abspath(result_path):
+            with open(local_path, "rb") as f:
+                self.__write(result_path, f.read())
+        self.__write_entry(experiment_name, key, run_id)
+        return run_id, result_path
+
+    @staticmethod
+    def load(result_path: str) -> Any:
+        with open(result_path, "rb") as f:
+            return pickle.load(f)
+
+    def __paths(self, experiment_name: str, key: str) -> Tuple[str, str]:
+        experiment_digest: str = hashlib.sha256(experiment_name.encode("utf-8")).hexdigest()[:16]
+        root: str = os.path.join(self.__directory, "memo", experiment_digest)
+        return os.path.join(root, f"{key}.pkl"), os.path.join(root, f"{key}.json")
+
+    def __write_entry(self, experiment_name: str, key: str, run_id: str) -> None:
+        _, entry_path = self.__paths(experiment_name, key)
+        entry: str = json.dumps({"experiment_name": experiment_name, "run_id": run_id})
+        self.__write(entry_path, entry.encode("utf-8"))
+
+    @staticmethod
+    def __write(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Dict, List, Union
+import threading
+
+
+"""Type alias for the statistics of a single instrumented entity."""
+StatsDict = Dict[str, Union[int, float, List[int]]]
+
+"""Upper bounds of the call latency buckets, in seconds, the last bucket being unbounded."""
+LATENCY_BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class CallTimer:
+    """ Accumulates the time spent by a single decorated call in user code
+    and in git lookups, the remainder being accounted to tracking I/O.
+    """
+
+    __slots__ = ("user_s", "git_s")
+
+    def __init__(self):
+        self.user_s: float = 0.0
+        self.git_s: float = 0.0
+
+
+class FunctionStats:
+    """ Counters and timers of a single decorated function, together with
+    the count of calls per latency bucket (see LATENCY_BUCKETS_S).
+    """
+
+    __slots__ = ("calls", "errors", "user_s", "tracking_s", "git_s", "total_s", "latency_buckets")
+
+    def __init__(self):
+        self.calls: int = 0
+        self.errors: int = 0
+        self.user_s: float = 0.0
+        self.tracking_s: float = 0.0
+        self.git_s: float = 0.0
+        self.total_s: float = 0.0
+        self.latency_buckets: List[int] = [0] * (len(LATENCY_BUCKETS_S) + 1)
+
+    def as_dict(self) -> StatsDict:
+        stats: StatsDict = {name: getattr(self, name) for name in self.__slots__}
+        stats["latency_buckets"] = list(self.latency_buckets)
+        return stats
+
+
+class StatsRegistry:
+    """ Process-wide registry of veil overhead statistics.
+
+    Decorated functions are keyed by their qualified name, while session
+    enter/exit and git lookups are accounted separately.
+    """
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__functions: Dict[str, FunctionStats] = dict()
+        self.__sessions: StatsDict = dict()
+        self.__git: StatsDict = dict()
+        self.reset()
+
+    def record_call(self, name: str, total_s: float, timer: CallTimer, failed: bool) -> None:
+        with self.__lock:
+            stats: FunctionStats = self.__functions.get(name)
+            if stats is None:
+                stats = self.__functions[name] = FunctionStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.user_s += timer.user_s
+            stats.git_s += timer.git_s
+            stats.tracking_s += max(total_s - timer.user_s - timer.git_s, 0.0)
+            stats.total_s += total_s
+            stats.latency_buckets[bisect_left(LATENCY_BUCKETS_S, total_s)] += 1
+
+    def record_session(self, phase: str, elapsed_s: float, failed: bool) -> None:
+        with self.__lock:
+            self.__sessions[phase] += 1
+            self.__sessions[f"{phase}_s"] += elapsed_s
+            self.__sessions["errors"] += failed
+
+    def record_git(self, elapsed_s: float, failed: bool) -> None:
+        with self.__lock:
+            self.__git["calls"] += 1
+            self.__git["time_s"] += elapsed_s
+            self.__git["errors"] += failed
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Returns a copy of the collected statistics.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            the statistics of decorated functions (keyed by qualified name),
+            sessions and git lookups.
+        """
+        with self.__lock:
+            return {
+                "functions": {name: stats.as_dict() for name, stats in self.__functions.items()},
+                "sessions": dict(self.__sessions),
+                "git": dict(self.__git),
+            }
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__functions.clear()
+            self.__sessions.update({"enter": 0, "enter_s": 0.0, "exit": 0, "exit_s": 0.0, "errors": 0})
+            self.__git.update({"calls": 0, "time_s": 0.0, "errors": 0})
+
+
+"""The process-wide statistics registry."""
+registry: StatsRegistry = StatsRegistry()
+
+
+def stats() -> Dict[str, Dict]:
+    """Returns the overhead statistics collected so far by veil.
+
+    Returns
+    -------
+    Dict[str, Dict]
+        the statistics of decorated functions (calls, errors, time in user code,
+        in tracking I/O, in git lookups and overall, calls per latency bucket),
+        sessions and git lookups.
+    """
+    return registry.snapshot()
+
+
+def reset_stats() -> None:
+    """Resets the overhead statistics collected so far by veil.
+    """
+    registry.reset()
@@ -0,0 +1,378 @@
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional, Union
+import cProfile
+import hashlib
+import html
+import os
+import pstats
+import sys
+import threading
+import time
+
+
+"""Artifact directory of call profiles, relative to the run artifacts root."""
+PROFILE_ARTIFACT_PATH = "veil/profile"
+
+"""Prefix of the tags and metrics describing the hotspots of a profiled call."""
+HOTSPOT_PREFIX = "veil.profile.hotspot"
+
+"""Number of hotspots tagged and logged per profiled call."""
+HOTSPOTS = 10
+
+"""Deterministic profiling of every function call, by means of cProfile."""
+PROFILER_CPROFILE = "cprofile"
+
+"""Statistical profiling of the call stacks, sampled from a background thread."""
+PROFILER_SAMPLING = "sampling"
+
+"""Interval between stack samples, in seconds."""
+SAMPLING_INTERVAL_S = 0.01
+
+"""Maximum number of distinct stacks kept by a sampler, the others being merged."""
+MAX_STACKS = 10000
+
+"""Maximum number of frames of a sampled stack, the outermost ones being dropped."""
+MAX_DEPTH = 128
+
+"""Folded stack accounting the samples of the stacks exceeding MAX_STACKS."""
+OVERFLOW_STACK = "[other stacks]"
+
+# profilers hook the interpreter per thread, and only one of them at a time
+_active: threading.local = threading.local()
+
+
+class Hotspot(NamedTuple):
+    """ A function of a profiled call, with its cumulative time (callees
+    included) and total time (callees excluded). Sampling profilers estimate
+    both times from the samples, which they report as calls.
+    """
+    function: str
+    calls: int
+    cumulative_s: float
+    total_s: float
+
+
+def hotspot_tags(hotspots: List[Hotspot]) -> Dict[str, str]:
+    """Returns the hotspot functions, tagged by rank (starting from 1).
+    """
+    return {f"{HOTSPOT_PREFIX}.{rank}": h.function for rank, h in enumerate(hotspots, start=1)}
+
+
+def hotspot_metrics(hotspots: List[Hotspot]) -> Dict[str, float]:
+    """Returns the hotspot timings and calls, keyed by rank (starting from 1).
+    """
+    metrics: Dict[str, float] = dict()
+    for rank, h in enumerate(hotspots, start=1):
+        metrics[f"{HOTSPOT_PREFIX}.{rank}.cumulative_s"] = h.cumulative_s
+        metrics[f"{HOTSPOT_PREFIX}.{rank}.total_s"] = h.total_s
+        metrics[f"{HOTSPOT_PREFIX}.{rank}.calls"] = h.calls
+    return metrics
+
+
+class CallProfiler:
+    """ Profiles the code executed within the context by means of cProfile.
+
+    Profilers hook the interpreter per thread and cannot be stacked: within a
+    profiled context of the same thread (e.g. a profiled call nested in another
+    one) the profiler stays idle, the code being already accounted by the
+    outer one. Since Python 3.12 a single cProfile profiler can be active per
+    process: while another thread is being profiled the profiler stays idle too.
+    """
+
+    def __init__(self):
+        self.__profile: Optional[cProfile.Profile] = None
+
+    @property
+    def profiled(self) -> bool:
+        """Whether a profile has been collected.
+        """
+        return self.__profile is not None
+
+    def __enter__(self) -> CallProfiler:
+        if not getattr(_active, "profiling", False):
+            profile: cProfile.Profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:
+                # another profiler is active within the process, the call runs unprofiled
+                print(f"Call cannot be profiled: {e}")
+                return self
+            self.__profile = profile
+            _active.profiling = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        if self.__profile is not None and _active.profiling:
+            self.__profile.disable()
+            _active.profiling = False
+
+    def hotspots(self, top: int = HOTSPOTS) -> List[Hotspot]:
+        """Returns the functions with the highest cumulative time.
+
+        Parameters
+        ----------
+        top : int, optional
+            the number of functions, by default HOTSPOTS
+
+        Returns
+        -------
+        List[Hotspot]
+            the hotspots, from the most expensive one.
+        """
+        if self.__profile is None:
+            return []
+        hotspots: List[Hotspot] = []
+        for (filename, line, function), (_, calls, total_s, cumulative_s, _) in pstats.Stats(self.__profile).stats.items():
+            # skips the profiler itself, exiting the context
+            if filename == __file__ or function == "<method 'disable' of '_lsprof.Profiler' objects>":
+                continue
+            label: str = function if filename == "~" else f"{function} ({os.path.basename(filename)}:{line})"
+            hotspots.append(Hotspot(label, calls, cumulative_s, total_s))
+        hotspots.sort(key=lambda h: h.cumulative_s, reverse=True)
+        return hotspots[:top]
+
+    def dump(self, path: str) -> str:
+        """Dumps the profile in the pstats format, readable by pstats.Stats or
+        by visualizers such as snakeviz.
+
+        Returns
+        -------
+        str
+            the path of the dump.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__profile.dump_stats(path)
+        return path
+
+    def store(self, directory: str, name: str) -> List[str]:
+        """Stores the profile as directory/name.pstats.
+
+        Returns
+        -------
+        List[str]
+            the paths of the stored files.
+        """
+        return [self.dump(os.path.join(directory, f"{name}.pstats"))]
+
+
+class StackSampler:
+    """ Samples the call stack of the thread executing the context from a
+    background thread, every interval_s seconds, aggregating the samples as
+    folded stacks (i.e. the frames from the outermost to the innermost one,
+    separated by semicolons) rooted at the code entering the context.
+
+    Unlike cProfile, the sampled code runs at full speed: the overhead only
+    depends on the sampling rate and on the stack depth. Memory is bounded by
+    max_stacks distinct stacks of at most max_depth frames. Within a sampled
+    context of the same thread the sampler stays idle, the code being already
+    sampled by the outer one.
+
+    Parameters
+    ----------
+    interval_s : float, optional
+        the interval between samples, in seconds, by default SAMPLING_INTERVAL_S
+    max_stacks : int, optional
+        the maximum number of distinct stacks, by default MAX_STACKS
+    max_depth : int, optional
+        the maximum number of frames per stack, by default MAX_DEPTH
+    """
+
+    def __init__(
+        self,
+        interval_s: float = SAMPLING_INTERVAL_S,
+        max_stacks: int = MAX_STACKS,
+        max_depth: int = MAX_DEPTH
+    ):
+        self.__interval_s: float = interval_s
+        self.__max_stacks: int = max_stacks
+        self.__max_depth: int = max_depth
+        self.__stacks: Dict[str, int] = dict()
+        self.__samples: int = 0
+        self.__elapsed_s: float = 0.0
+        self.__thread_id: Optional[int] = None
+        self.__root = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__stop: threading.Event = threading.Event()
+
+    @property
+    def profiled(self) -> bool:
+        """Whether the sampler has been active.
+        """
+        return self.__thread is not None
+
+    @property
+    def samples(self) -> int:
+        return self.__samples
+
+    @property
+    def elapsed_s(self) -> float:
+        return self.__elapsed_s
+
+    @property
+    def stacks(self) -> Dict[str, int]:
+        """The number of samples of each folded stack.
+        """
+        return dict(self.__stacks)
+
+    def __enter__(self) -> StackSampler:
+        if not getattr(_active, "sampling", False):
+            _active.sampling = True
+            self.__thread_id = threading.get_ident()
+            # stacks are rooted right above the frame entering the context
+            self.__root = sys._getframe(1)
+            self.__elapsed_s = time.perf_counter()
+            self.__thread = threading.Thread(target=self.__sample, name="veil-sampler", daemon=True)
+            self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        if self.__thread is not None and self.__root is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__elapsed_s = time.perf_counter() - self.__elapsed_s
+            self.__root = None
+            _active.sampling = False
+
+    def __sample(self) -> None:
+        labels: Dict[object, str] = dict()
+        while not self.__stop.wait(self.__interval_s):
+            frame = sys._current_frames().get(self.__thread_id)
+            frames: List[str] = []
+            while frame is not None and frame is not self.__root and len(frames) < self.__max_depth:
+                code = frame.f_code
+                label: Optional[str] = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+                frames.append(label)
+                frame = frame.f_back
+            # skips the samples of the sampler itself, entering or exiting the context
+            if not frames or frames[-1].startswith(f"{__name__}:"):
+                continue
+
+            stack: str = ";".join(reversed(frames))
+            if stack not in self.__stacks and len(self.__stacks) >= self.__max_stacks:
+                stack = OVERFLOW_STACK
+            self.__stacks[stack] = self.__stacks.get(stack, 0) + 1
+            self.__samples += 1
+
+    def hotspots(self, top: int = HOTSPOTS) -> List[Hotspot]:
+        """Returns the functions appearing in the most samples, their times
+        being estimated as samples times the sampling interval.
+
+        Parameters
+        ----------
+        top : int, optional
+            the number of functions, by default HOTSPOTS
+
+        Returns
+        -------
+        List[Hotspot]
+            the hotspots, from the most sampled one.
+        """
+        cumulative: Dict[str, int] = dict()
+        total: Dict[str, int] = dict()
+        for stack, count in self.__stacks.items():
+            frames: List[str] = stack.split(";")
+            for label in dict.fromkeys(frames):
+                cumulative[label] = cumulative.get(label, 0) + count
+            total[frames[-1]] = total.get(frames[-1], 0) + count
+        hotspots: List[Hotspot] = [
+            Hotspot(label, count, count * self.__interval_s, total.get(label, 0) * self.__interval_s)
+            for label, count in cumulative.items()
+        ]
+        hotspots.sort(key=lambda h: h.calls, reverse=True)
+        return hotspots[:top]
+
+    def folded(self) -> str:
+        """Returns the samples in the collapsed-stack format, i.e. one folded
+        stack and its count per line, readable by flamegraph.pl or speedscope.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.__stacks.items()))
+
+    def store(self, directory: str, name: str) -> List[str]:
+        """Stores the samples as directory/name.folded, in the collapsed-stack
+        format, and as directory/name.svg, rendered as a flamegraph.
+
+        Returns
+        -------
+        List[str]
+            the paths of the stored files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths: List[str] = [os.path.join(directory, f"{name}.folded"), os.path.join(directory, f"{name}.svg")]
+        contents: List[str] = [self.folded(), render_flamegraph(self.__stacks, title=name)]
+        for path, content in zip(paths, contents):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        return paths
+
+
+def new_profiler(kind: str) -> Union[CallProfiler, StackSampler]:
+    """Returns a profiler of the given kind, either PROFILER_CPROFILE or PROFILER_SAMPLING.
+    """
+    if kind == PROFILER_SAMPLING:
+        return StackSampler()
+    return CallProfiler()
+
+
+def render_flamegraph(stacks: Dict[str, int], title: str = "", width: int = 1200) -> str:
+    """Renders folded stacks as a self-contained SVG flamegraph, i.e. frames
+    stacked from the bottom with widths proportional to their samples.
+
+    Parameters
+    ----------
+    stacks : Dict[str, int]
+        the number of samples of each folded stack
+    title : str, optional
+        the graph title, by default ""
+    width : int, optional
+        the graph width, in pixels, by default 1200
+
+    Returns
+    -------
+    str
+        the SVG document.
+    """
+    # merges the stacks into a tree of (samples, children) nodes
+    root: list = [0, dict()]
+    for stack, count in stacks.items():
+        node: list = root
+        node[0] += count
+        for label in stack.split(";"):
+            node = node[1].setdefault(label, [0, dict()])
+            node[0] += count
+
+    def depth_of(node: list) -> int:
+        return 1 + max((depth_of(child) for child in node[1].values()), default=0)
+
+    row: int = 16
+    top: int = 24
+    height: int = top + depth_of(root) * row
+    scale: float = (width - 20) / max(root[0], 1)
+    rects: List[str] = []
+
+    def draw(label: str, node: list, x: float, depth: int) -> None:
+        w: float = node[0] * scale
+        if w < 0.5:
+            return
+        y: int = height - (depth + 1) * row
+        hue: int = int(hashlib.md5(label.encode("utf-8")).hexdigest()[:2], 16) % 60
+        text: str = html.escape(label if len(label) * 7 <= w - 6 else label[:max(int((w - 6) / 7) - 2, 0)] + "..")
+        rects.append(
+            f'<g><title>{html.escape(label)} ({node[0]} samples, {100 * node[0] / max(root[0], 1):.2f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row - 1}" fill="hsl({hue},90%,60%)" rx="2"/>'
+            + (f'<text x="{x + 3:.1f}" y="{y + row - 4}">{text}</text>' if w > 20 else "")
+            + "</g>"
+        )
+        for child_label, child in node[1].items():
+            draw(child_label, child, x, depth + 1)
+            x += child[0] * scale
+
+    draw("all", root, 10.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<text x="{width / 2}" y="16" text-anchor="middle" font-size="14">{html.escape(title)}</text>'
+        + "".join(rects)
+        + "</svg>\n"
+    )
@@ -0,0 +1,295 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+import json
+import os
+import threading
+import time
+
+from veil.journal import MAGIC, JournalReader
+from veil.sinks import Sink
+from veil.types import MetricEvent
+
+
+class ReplayReport(NamedTuple):
+    """ The outcome of a replay.
+    """
+    events: int
+    runs: int
+    skipped: int
+    failed: int
+    elapsed_s: float
+
+    @property
+    def events_per_s(self) -> float:
+        return self.events / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def runs_per_s(self) -> float:
+        return self.runs / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.events} events, {self.runs} runs replayed ({self.skipped} skipped, {self.failed} failed) "
+            f"in {self.elapsed_s:.2f}s: {self.events_per_s:.0f} events/s, {self.runs_per_s:.1f} runs/s"
+        )
+
+
+class _RecordedRun:
+    """ Everything recorded about a run, merged in event order.
+    """
+
+    __slots__ = ("run_id", "parent_run_id", "experiment", "name", "params", "tags", "metrics", "artifacts", "status")
+
+    def __init__(self, run_id: str, parent_run_id: Optional[str], experiment: str, name: Optional[str]):
+        self.run_id: str = run_id
+        self.parent_run_id: Optional[str] = parent_run_id
+        self.experiment: str = experiment
+        self.name: Optional[str] = name
+        self.params: Dict[str, Any] = dict()
+        self.tags: Dict[str, Any] = dict()
+        self.metrics: List[MetricEvent] = []
+        self.artifacts: List[Tuple[str, str]] = []
+        self.status: Optional[str] = None
+
+
+def read_events(path: str) -> Iterator[Tuple[str, str, float, Dict[str, Any]]]:
+    """Reads the events recorded by a JournalSink or by a JsonlSink.
+
+    Parameters
+    ----------
+    path : str
+        the path of the journal or of the JSONL file
+
+    Returns
+    -------
+    Iterator[Tuple[str, str, float, Dict[str, Any]]]
+        the event names, run ids, timestamps (epoch seconds) and data, in order.
+    """
+    with open(path, "rb") as f:
+        is_journal: bool = f.read(len(MAGIC)) == MAGIC
+
+    if is_journal:
+        with JournalReader(path) as reader:
+            for event in reader:
+                yield event.event, event.run_id, event.timestamp, event.data
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    data: Dict[str, Any] = json.loads(line)
+                    timestamp: float = data.pop("timestamp")
+                    yield data.pop("event"), data.pop("run_id"), timestamp, data
+
+
+class Checkpoint:
+    """ The progress of replays of a recording, appended to a JSONL file so that
+    an interrupted replay restarts where it stopped: runs are mapped to the
+    target ones as soon as they are created, marked as logged once their data
+    is written and marked as done once terminated.
+
+    Parameters
+    ----------
+    path : str
+        the path of the checkpoint file
+    """
+
+    def __init__(self, path: str):
+        self.__path: str = path
+        self.__lock: threading.Lock = threading.Lock()
+        self.__targets: Dict[str, str] = dict()
+        self.__logged: Set[str] = set()
+        self.__done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry: Dict[str, Any] = json.loads(line)
+                    except ValueError:
+                        # the last line may be truncated by a crash
+                        continue
+                    if "target_run_id" in entry:
+                        self.__targets[entry["run_id"]] = entry["target_run_id"]
+                    if entry.get("logged"):
+                        self.__logged.add(entry["run_id"])
+                    if entry.get("done"):
+                        self.__done.add(entry["run_id"])
+        self.__file = open(path, "a", encoding="utf-8")
+
+    def target(self, run_id: str) -> Optional[str]:
+        return self.__targets.get(run_id)
+
+    def is_logged(self, run_id: str) -> bool:
+        return run_id in self.__logged
+
+    def is_done(self, run_id: str) -> bool:
+        return run_id in self.__done
+
+    def created(self, run_id: str, target_run_id: str) -> None:
+        self.__targets[run_id] = target_run_id
+        self.__append({"run_id": run_id, "target_run_id": target_run_id})
+
+    def logged(self, run_id: str) -> None:
+        self.__logged.add(run_id)
+        self.__append({"run_id": run_id, "logged": True})
+
+    def done(self, run_id: str) -> None:
+        self.__done.add(run_id)
+        self.__append({"run_id": run_id, "done": True})
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__file.close()
+
+    def __append(self, entry: Dict[str, Any]) -> None:
+        with self.__lock:
+            self.__file.write(json.dumps(entry) + "\n")
+            self.__file.flush()
+
+
+def replay(
+    path: str,
+    target: Sink,
+    workers: int = 8,
+    checkpoint_path: Optional[str] = None
+) -> ReplayReport:
+    """Replays the events recorded by a JournalSink or by a JsonlSink into
+    another sink, e.g. a client-mode MlflowSink addressing a tracking server.
+
+    Events are merged per run, so that each run costs one creation, one batched
+    write of its params and tags, batched writes of its metrics (with their
+    recorded timestamps), its artifacts and one termination. Sessions are
+    replayed first and child runs later, by up to workers threads, each run
+    being replayed by a single thread so that its operations keep their order.
+    Sessions are terminated last, and only once all their child runs have been
+    replayed. Progress is checkpointed step by step (the creation of each run,
+    the write of its data and its termination), so that replaying again resumes
+    each run where it stopped: only a crash between a step and its checkpoint
+    may perform that step twice.
+
+    Parameters
+    ----------
+    path : str
+        the path of the recording
+    target : Sink
+        the sink receiving the events, which must not be isolated
+    workers : int, optional
+        the number of concurrent workers, by default 8
+    checkpoint_path : Optional[str], optional
+        the path of the checkpoint file, by default path + ".checkpoint"
+
+    Returns
+    -------
+    ReplayReport
+        the number of events read, of runs replayed, skipped (already done or
+        missing their parent) and failed, and the elapsed time.
+    """
+    if target.isolated:
+        raise ValueError("Replays require a sink not bound to the mlflow fluent state")
+
+    started_at: float = time.perf_counter()
+    runs: Dict[str, _RecordedRun] = dict()
+    events: int = 0
+    for event, run_id, timestamp, data in read_events(path):
+        events += 1
+        if event in ("start_session", "start_run"):
+            runs[run_id] = _RecordedRun(run_id, data.get("parent_run_id"), data["experiment"], data.get("name"))
+            continue
+        run: Optional[_RecordedRun] = runs.get(run_id)
+        if run is None:
+            continue
+        if event == "log_params":
+            run.params.update(data["params"])
+        elif event == "set_tags":
+            run.tags.update(data["tags"])
+        elif event == "log_metrics":
+            run.metrics.append((data["metrics"], data.get("step"), timestamp))
+        elif event == "log_artifact":
+            run.artifacts.append((data["artifact_file"], data["path"]))
+        elif event in ("end_run", "end_session"):
+            run.status = data["status"]
+        elif event == "resume_session":
+            run.status = None
+
+    checkpoint: Checkpoint = Checkpoint(checkpoint_path or f"{path}.checkpoint")
+    counters: Dict[str, int] = {"runs": 0, "skipped": 0, "failed": 0}
+    lock: threading.Lock = threading.Lock()
+
+    def count(outcome: str) -> None:
+        with lock:
+            counters[outcome] += 1
+
+    def replay_run(run: _RecordedRun) -> None:
+        if checkpoint.is_done(run.run_id):
+            return count("skipped")
+        try:
+            target_run_id: Optional[str] = checkpoint.target(run.run_id)
+            if target_run_id is None:
+                if run.parent_run_id is None:
+                    target_run_id = target.start_session(run.experiment, run.name)
+                else:
+                    parent_target_run_id: Optional[str] = checkpoint.target(run.parent_run_id)
+                    if parent_target_run_id is None:
+                        return count("skipped")
+                    target_run_id = target.start_run(run.experiment, parent_target_run_id, run.name)
+                checkpoint.created(run.run_id, target_run_id)
+
+            if not checkpoint.is_logged(run.run_id):
+                target.log_batch(target_run_id, run.params, run.tags)
+                if run.metrics:
+                    target.log_metric_batch(target_run_id, run.metrics)
+                for artifact_file, local_path in run.artifacts:
+                    if os.path.isfile(local_path):
+                        target.log_artifact(target_run_id, local_path, os.path.dirname(artifact_file) or None)
+                    else:
+                        print(f"Artifact {artifact_file} of run {run.run_id} is missing: {local_path}")
+                checkpoint.logged(run.run_id)
+
+            # sessions are terminated once their child runs have been replayed
+            if run.parent_run_id is not None and run.status is not None:
+                target.end_run(target_run_id, run.status)
+                checkpoint.done(run.run_id)
+            count("runs")
+        except Exception as e:
+            print(f"Run {run.run_id} cannot be replayed: {e}")
+            count("failed")
+
+    def is_replayed(run: _RecordedRun) -> bool:
+        # runs recorded without termination are replayed once their data is
+        return checkpoint.is_done(run.run_id) or (run.status is None and checkpoint.is_logged(run.run_id))
+
+    def end_session(run: _RecordedRun) -> None:
+        if run.status is None or checkpoint.is_done(run.run_id) or not checkpoint.is_logged(run.run_id):
+            return
+        pending: int = sum(not is_replayed(child) for child in children_of.get(run.run_id, []))
+        if pending > 0:
+            print(f"Session {run.run_id} cannot be terminated: {pending} child runs are not replayed")
+            return
+        try:
+            target.end_session(checkpoint.target(run.run_id), run.status)
+            checkpoint.done(run.run_id)
+        except Exception as e:
+            print(f"Session {run.run_id} cannot be terminated: {e}")
+            count("failed")
+
+    sessions: List[_RecordedRun] = [run for run in runs.values() if run.parent_run_id is None]
+    children: List[_RecordedRun] = [run for run in runs.values() if run.parent_run_id is not None]
+    children_of: Dict[str, List[_RecordedRun]] = dict()
+    for run in children:
+        children_of.setdefault(run.parent_run_id, []).append(run)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="veil-replay") as pool:
+            list(pool.map(replay_run, sessions))
+            list(pool.map(replay_run, children))
+            list(pool.map(end_session, sessions))
+        target.flush()
+    finally:
+        checkpoint.close()
+
+    return ReplayReport(
+        events=events,
+        runs=counters["runs"],
+        skipped=counters["skipped"],
+        failed=counters["failed"],
+        elapsed_s=time.perf_counter() - started_at,
+    )
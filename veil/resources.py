@@ -0,0 +1,171 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import os
+import threading
+import time
+
+
+"""Prefix of the resource usage metrics."""
+RESOURCE_PREFIX = "veil.resources"
+
+"""Resource usage series, logged as RESOURCE_PREFIX.<name> metrics."""
+SERIES = ("cpu_percent", "rss_bytes", "io_read_bytes", "io_write_bytes", "threads")
+
+"""Default interval between resource samples, in seconds."""
+SAMPLING_INTERVAL_S = 1.0
+
+"""Number of samples preallocated per series."""
+CAPACITY = 1024
+
+_PROC_STAT = "/proc/self/stat"
+_PROC_IO = "/proc/self/io"
+_HAS_PROC: bool = os.path.exists(_PROC_STAT)
+_CLOCK_TICKS: int = os.sysconf("SC_CLK_TCK") if _HAS_PROC else 100
+_PAGE_SIZE: int = os.sysconf("SC_PAGE_SIZE") if _HAS_PROC else 4096
+
+
+class ResourceUsage(NamedTuple):
+    """ The resource usage of the process: cpu time (user and system), resident
+    memory, bytes read and written by I/O syscalls so far, and threads.
+    """
+    cpu_s: float
+    rss_bytes: int
+    read_bytes: int
+    write_bytes: int
+    threads: int
+
+
+def _read_proc() -> ResourceUsage:
+    with open(_PROC_STAT, "rb") as f:
+        # the fields following the process name, which may contain spaces
+        fields: List[bytes] = f.read().rpartition(b")")[2].split()
+    read_bytes: int = 0
+    write_bytes: int = 0
+    try:
+        with open(_PROC_IO, "rb") as f:
+            for line in f:
+                key, _, value = line.partition(b":")
+                if key == b"rchar":
+                    read_bytes = int(value)
+                elif key == b"wchar":
+                    write_bytes = int(value)
+    except OSError:
+        pass
+    return ResourceUsage(
+        cpu_s=(int(fields[11]) + int(fields[12])) / _CLOCK_TICKS,
+        rss_bytes=int(fields[21]) * _PAGE_SIZE,
+        read_bytes=read_bytes,
+        write_bytes=write_bytes,
+        threads=int(fields[17]),
+    )
+
+
+def read_usage() -> ResourceUsage:
+    """Reads the current resource usage of the process from /proc/self, falling
+    back to cpu time and threads only where procfs is not available.
+    """
+    if _HAS_PROC:
+        return _read_proc()
+    return ResourceUsage(time.process_time(), 0, 0, 0, threading.active_count())
+
+
+class ResourceSampler:
+    """ Samples the resource usage of the process from a background thread,
+    every interval_s seconds while within the context, plus once on exit.
+
+    Samples are stored into arrays preallocated for capacity samples: once full,
+    every other sample is discarded and the sampling interval doubles, so that
+    memory stays constant however long the context lasts. The cpu usage of a
+    sample is the percentage of a core used since the previous one, while I/O
+    bytes are counted since entering the context.
+
+    Parameters
+    ----------
+    interval_s : float, optional
+        the interval between samples, in seconds, by default SAMPLING_INTERVAL_S
+    capacity : int, optional
+        the number of samples preallocated per series, by default CAPACITY
+    """
+
+    def __init__(self, interval_s: float = SAMPLING_INTERVAL_S, capacity: int = CAPACITY):
+        if interval_s <= 0:
+            raise ValueError(f"Resource sampling interval must be positive: {interval_s}")
+        self.__interval_s: float = interval_s
+        self.__capacity: int = max(capacity, 2)
+        self.__timestamps: array = array("d", bytes(8 * self.__capacity))
+        self.__values: Dict[str, array] = {name: array("d", bytes(8 * self.__capacity)) for name in SERIES}
+        self.__size: int = 0
+        self.__stride: int = 1
+        self.__ticks: int = 0
+        self.__baseline: Optional[ResourceUsage] = None
+        self.__last: Tuple[float, float] = (0.0, 0.0)
+        self.__thread: Optional[threading.Thread] = None
+        self.__stop: threading.Event = threading.Event()
+
+    @property
+    def interval_s(self) -> float:
+        """The current sampling interval, doubling whenever the buffers fill up.
+        """
+        return self.__interval_s * self.__stride
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __enter__(self) -> ResourceSampler:
+        self.__baseline = read_usage()
+        self.__last = (time.time(), self.__baseline.cpu_s)
+        self.__thread = threading.Thread(target=self.__sample, name="veil-resources", daemon=True)
+        self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        self.__stop.set()
+        self.__thread.join()
+        self.__record(force=True)
+
+    def __sample(self) -> None:
+        while not self.__stop.wait(self.__interval_s):
+            self.__record()
+
+    def __record(self, force: bool = False) -> None:
+        self.__ticks += 1
+        if self.__ticks % self.__stride and not force:
+            return
+        try:
+            usage: ResourceUsage = read_usage()
+        except (OSError, ValueError, IndexError):
+            return
+
+        if self.__size == self.__capacity:
+            # keeps every other sample, halving the resolution
+            for buffer in (self.__timestamps, *self.__values.values()):
+                buffer[:self.__capacity // 2] = buffer[0:self.__capacity:2]
+            self.__size = self.__capacity // 2
+            self.__stride *= 2
+
+        timestamp: float = time.time()
+        last_timestamp, last_cpu_s = self.__last
+        elapsed_s: float = timestamp - last_timestamp
+        i: int = self.__size
+        self.__timestamps[i] = timestamp
+        self.__values["cpu_percent"][i] = 100.0 * (usage.cpu_s - last_cpu_s) / elapsed_s if elapsed_s > 0 else 0.0
+        self.__values["rss_bytes"][i] = usage.rss_bytes
+        self.__values["io_read_bytes"][i] = usage.read_bytes - self.__baseline.read_bytes
+        self.__values["io_write_bytes"][i] = usage.write_bytes - self.__baseline.write_bytes
+        self.__values["threads"][i] = usage.threads
+        self.__size += 1
+        self.__last = (timestamp, usage.cpu_s)
+
+    def series(self) -> Tuple[Dict[str, List[float]], List[float]]:
+        """Returns the samples.
+
+        Returns
+        -------
+        Tuple[Dict[str, List[float]], List[float]]
+            the values of each series, keyed by metric name, and their timestamps.
+        """
+        return (
+            {f"{RESOURCE_PREFIX}.{name}": values[:self.__size].tolist() for name, values in self.__values.items()},
+            self.__timestamps[:self.__size].tolist(),
+        )
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import Any, Optional, Tuple
+import hashlib
+import json
+import os
+import shutil
+
+from veil.memo import MemoIndex
+
+
+class SessionState:
+    """ Local state of a resumable session, persisted across processes so that
+    a session failed halfway can be restarted from where it stopped.
+
+    The state lives in `<directory>/sessions/<digest of experiment and session
+    name>/`, the name identifying the session across attempts, and holds the parent run id together with the pickled results of the
+    child calls that finished, keyed like memoized calls. It is removed once the
+    session finishes successfully.
+
+    Parameters
+    ----------
+    directory : str
+        the cache directory
+    experiment_name : str
+        the experiment name
+    name : str
+        the session name
+
+    Raises
+    ------
+    ValueError
+        if the session name is empty, unnamed sessions being indistinguishable.
+    """
+
+    def __init__(self, directory: str, experiment_name: str, name: str):
+        if not name:
+            raise ValueError("Resumable sessions require a name")
+        digest: str = hashlib.sha256(f"{experiment_name}\0{name}".encode("utf-8")).hexdigest()[:16]
+        self.__directory: str = os.path.join(directory, "sessions", digest)
+        self.__experiment_name: str = experiment_name
+        self.__name: str = name
+        self.__results: MemoIndex = MemoIndex(self.__directory)
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    @property
+    def __state_path(self) -> str:
+        return os.path.join(self.__directory, "state.json")
+
+    def load_run_id(self) -> Optional[str]:
+        """Returns the parent run id of the previous attempt, None if there was none.
+        """
+        try:
+            with open(self.__state_path, "r", encoding="utf-8") as f:
+                return json.load(f)["run_id"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save_run_id(self, run_id: str) -> None:
+        os.makedirs(self.__directory, exist_ok=True)
+        tmp_path: str = f"{self.__state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"experiment_name": self.__experiment_name, "name": self.__name, "run_id": run_id}, f)
+        os.replace(tmp_path, self.__state_path)
+
+    def lookup(self, key: str) -> Optional[Tuple[str, Any]]:
+        """Looks up a child call that already finished.
+
+        Returns
+        -------
+        Optional[Tuple[str, Any]]
+            the child run id and the call result, None if the call did not finish
+            (or its result cannot be loaded).
+        """
+        entry: Optional[Tuple[str, str]] = self.__results.lookup(self.__experiment_name, key)
+        if entry is None:
+            return None
+        try:
+            return entry[0], self.__results.load(entry[1])
+        except Exception as e:
+            print(f"Result of finished call {key} cannot be loaded: {e}")
+            return None
+
+    def complete(self, key: str, run_id: str, result: Any) -> bool:
+        """Records a finished child call.
+
+        Returns
+        -------
+        bool
+            True if recorded, False if its result cannot be pickled (the call will
+            be performed again on resume).
+        """
+        return self.__results.store(self.__experiment_name, key, run_id, result) is not None
+
+    def clear(self) -> None:
+        shutil.rmtree(self.__directory, ignore_errors=True)
@@ -0,0 +1,455 @@
+from __future__ import annotations
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import fcntl
+import json
+import multiprocessing
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+
+from veil.sinks import BatchingSink, Sink, _new_run_id
+from veil.types import MetricEvent
+
+
+"""Environment variable carrying the name of the event ring of a job, for worker
+processes to attach to it."""
+RING_ENV_VAR = "VEIL_RING"
+
+"""Default capacity of event rings, in bytes."""
+RING_CAPACITY = 16 * 1024 * 1024
+
+"""Shortest and longest sleeps of processes polling a ring, in seconds: the sleep
+doubles while the ring stays empty (or full)."""
+MIN_POLL_S = 0.0005
+MAX_POLL_S = 0.05
+
+# header: head (bytes ever written) and tail (bytes ever read), on distinct cache lines,
+# then the capacity and whether the ring is closed
+_HEAD = struct.Struct("<Q")
+_TAIL_OFFSET = 64
+_INFO = struct.Struct("<QB")
+_INFO_OFFSET = 128
+_DATA_OFFSET = 192
+
+# record header: length of the payload, records being aligned to 8 bytes
+_RECORD = struct.Struct("<I")
+_PADDING = 0xFFFFFFFF
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class EventRing:
+    """ A ring buffer of byte records in shared memory, written by any number of
+    processes and read by a single one.
+
+    Writers hold a lock (a file lock among processes, a thread lock within them)
+    just for the time of copying a record into the ring, while the reader takes
+    no lock at all: records are published by advancing the head once copied,
+    and released by advancing the tail once read.
+
+    Parameters
+    ----------
+    name : Optional[str], optional
+        the name of the shared memory, by default a new one when creating
+    capacity : int, optional
+        the capacity in bytes, when creating, by default RING_CAPACITY
+    create : bool, optional
+        whether to create the ring rather than attaching to an existing one, by default True
+    """
+
+    def __init__(self, name: Optional[str] = None, capacity: int = RING_CAPACITY, create: bool = True):
+        if create:
+            if capacity < 64:
+                raise ValueError(f"Ring capacity must be at least 64 bytes: {capacity}")
+            capacity = _aligned(capacity)
+            self.__memory = shared_memory.SharedMemory(
+                name=name or f"veil-{uuid.uuid4().hex[:16]}", create=True, size=_DATA_OFFSET + capacity)
+            _INFO.pack_into(self.__memory.buf, _INFO_OFFSET, capacity, 0)
+        else:
+            self.__memory = shared_memory.SharedMemory(name=name)
+            # the ring belongs to its creator, which is the one unlinking it
+            resource_tracker.unregister(self.__memory._name, "shared_memory")
+        self.__created: bool = create
+        self.__capacity: int = _INFO.unpack_from(self.__memory.buf, _INFO_OFFSET)[0]
+        self.__thread_lock: threading.Lock = threading.Lock()
+        self.__lock_file = open(os.path.join(tempfile.gettempdir(), f"{self.__memory.name.lstrip('/')}.lock"), "a")
+
+    @property
+    def name(self) -> str:
+        return self.__memory.name
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def closed(self) -> bool:
+        return bool(_INFO.unpack_from(self.__memory.buf, _INFO_OFFSET)[1])
+
+    @closed.setter
+    def closed(self, value: bool) -> None:
+        _INFO.pack_into(self.__memory.buf, _INFO_OFFSET, self.__capacity, int(value))
+
+    @property
+    def head(self) -> int:
+        return _HEAD.unpack_from(self.__memory.buf, 0)[0]
+
+    @property
+    def tail(self) -> int:
+        return _HEAD.unpack_from(self.__memory.buf, _TAIL_OFFSET)[0]
+
+    def put(self, record: bytes, timeout_s: Optional[float] = None) -> int:
+        """Writes a record, waiting for the reader to make room for it if needed.
+
+        Parameters
+        ----------
+        record : bytes
+            the record
+        timeout_s : Optional[float], optional
+            the longest wait for room, by default None (no limit)
+
+        Returns
+        -------
+        int
+            the head of the ring once the record is published.
+
+        Raises
+        ------
+        ValueError
+            if the record exceeds the capacity, or the ring is closed.
+        TimeoutError
+            if no room has been made in time.
+        """
+        size: int = _aligned(_RECORD.size + len(record))
+        if size > self.__capacity // 2:
+            raise ValueError(f"Record of {len(record)} bytes exceeds half the ring capacity")
+
+        buf: memoryview = self.__memory.buf
+        deadline: Optional[float] = None if timeout_s is None else time.monotonic() + timeout_s
+        poll_s: float = MIN_POLL_S
+        with self.__thread_lock:
+            fcntl.flock(self.__lock_file, fcntl.LOCK_EX)
+            try:
+                while True:
+                    if self.closed:
+                        raise ValueError(f"Ring {self.name} is closed")
+                    head: int = self.head
+                    position: int = head % self.__capacity
+                    # records do not wrap around, the end of the ring being padded instead
+                    padding: int = self.__capacity - position if self.__capacity - position < size else 0
+                    if head + padding + size - self.tail <= self.__capacity:
+                        break
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise TimeoutError(f"Ring {self.name} has been full for {timeout_s} seconds")
+                    time.sleep(poll_s)
+                    poll_s = min(poll_s * 2, MAX_POLL_S)
+
+                if padding:
+                    _RECORD.pack_into(buf, _DATA_OFFSET + position, _PADDING)
+                    position = 0
+                _RECORD.pack_into(buf, _DATA_OFFSET + position, len(record))
+                start: int = _DATA_OFFSET + position + _RECORD.size
+                buf[start:start + len(record)] = record
+                head += padding + size
+                _HEAD.pack_into(buf, 0, head)
+                return head
+            finally:
+                fcntl.flock(self.__lock_file, fcntl.LOCK_UN)
+
+    def get(self) -> List[bytes]:
+        """Reads every published record, to be called by a single process.
+        """
+        buf: memoryview = self.__memory.buf
+        head: int = self.head
+        tail: int = self.tail
+        records: List[bytes] = []
+        while tail < head:
+            position: int = tail % self.__capacity
+            length: int = _RECORD.unpack_from(buf, _DATA_OFFSET + position)[0]
+            if length == _PADDING:
+                tail += self.__capacity - position
+                continue
+            start: int = _DATA_OFFSET + position + _RECORD.size
+            records.append(bytes(buf[start:start + length]))
+            tail += _aligned(_RECORD.size + length)
+        _HEAD.pack_into(buf, _TAIL_OFFSET, tail)
+        return records
+
+    def wait_read(self, head: int, timeout_s: Optional[float] = None) -> bool:
+        """Waits for the reader to read the records published up to a head.
+
+        Returns
+        -------
+        bool
+            True if the records have been read, False on timeout.
+        """
+        deadline: Optional[float] = None if timeout_s is None else time.monotonic() + timeout_s
+        poll_s: float = MIN_POLL_S
+        while self.tail < head:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(poll_s)
+            poll_s = min(poll_s * 2, MAX_POLL_S)
+        return True
+
+    def close(self) -> None:
+        """Detaches from the ring, which is also destroyed if created by this process.
+        """
+        self.__lock_file.close()
+        self.__memory.close()
+        if self.__created:
+            # processes attached from this one may have unregistered the ring
+            resource_tracker.register(self.__memory._name, "shared_memory")
+            self.__memory.unlink()
+            try:
+                os.remove(self.__lock_file.name)
+            except OSError:
+                pass
+
+
+class RingSink(Sink):
+    """ Sends tracking operations to the logging process of a job (see
+    LoggingProcess) through its event ring, so that worker processes share a
+    single connection to the tracking server instead of one each.
+
+    Run ids are allocated by the sink, the logging process translating them.
+    Operations are one-way: runs cannot be searched nor artifacts loaded, and
+    sessions are assumed to be resumed. Logged files must survive until the
+    logging process uploads them, while buffers get spooled and spooled files
+    are taken over by the logging process.
+
+    Parameters
+    ----------
+    ring : Optional[str], optional
+        the name of the event ring, by default the one in $VEIL_RING
+    timeout_s : Optional[float], optional
+        the longest wait for room in a full ring, by default 60 seconds
+    """
+
+    def __init__(self, ring: Optional[str] = None, timeout_s: Optional[float] = 60.0):
+        name: Optional[str] = ring or os.environ.get(RING_ENV_VAR)
+        if not name:
+            raise ValueError(f"No event ring given, nor found in ${RING_ENV_VAR}")
+        self.__ring: EventRing = EventRing(name, create=False)
+        self.__timeout_s: Optional[float] = timeout_s
+        self.__head: int = 0
+
+    @property
+    def ring(self) -> EventRing:
+        return self.__ring
+
+    def __send(self, operation: str, *args) -> None:
+        record: bytes = json.dumps([operation, *args], separators=(",", ":"), default=str).encode("utf-8")
+        self.__head = self.__ring.put(record, self.__timeout_s)
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        run_id: str = _new_run_id()
+        self.__send("start_session", run_id, experiment_name, name, dict(tags) if tags else tags)
+        return run_id
+
+    def end_session(self, run_id: str, status: str) -> None:
+        self.__send("end_session", run_id, status)
+
+    def resume_session(self, run_id: str) -> bool:
+        self.__send("resume_session", run_id)
+        return True
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        run_id: str = _new_run_id()
+        self.__send("start_run", run_id, experiment_name, parent_run_id, name)
+        return run_id
+
+    def end_run(self, run_id: str, status: str) -> None:
+        self.__send("end_run", run_id, status)
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        self.__send("log_params", run_id, dict(params))
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        self.__send("set_tags", run_id, dict(tags))
+
+    def log_batch(self, run_id: str, params: Dict[str, Any], tags: Dict[str, Any]) -> None:
+        self.__send("log_batch", run_id, dict(params), dict(tags))
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        self.__send("log_metrics", run_id, dict(metrics), step)
+
+    def log_metric_series(self, run_id: str, series: Dict[str, Sequence[float]], timestamps: Sequence[float]) -> None:
+        self.__send("log_metric_series", run_id, {k: list(values) for k, values in series.items()}, list(timestamps))
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        self.__send("log_metric_batch", run_id, [(dict(values), step, t) for values, step, t in metrics])
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        self.__send("log_text", run_id, text, artifact_file)
+
+    def log_spooled(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        # spooled files, e.g. buffers, are taken over by the logging process
+        self.__send("log_spooled", run_id, os.path.abspath(local_path), artifact_path)
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        self.__send("log_artifact", run_id, os.path.abspath(local_path), artifact_path)
+
+    def flush(self) -> None:
+        """Blocks until the logging process has received every operation sent so far.
+        """
+        self.__ring.wait_read(self.__head, self.__timeout_s)
+
+
+class RingConsumer:
+    """ Delivers the tracking operations read from an event ring to a sink,
+    translating the run ids allocated by the senders.
+
+    Parameters
+    ----------
+    ring : EventRing
+        the event ring
+    target : Sink
+        the sink receiving the operations
+    """
+
+    def __init__(self, ring: EventRing, target: Sink):
+        self.__ring: EventRing = ring
+        self.__target: Sink = target
+        self.__ids: Dict[str, str] = dict()
+        self.__children: Dict[str, List[str]] = dict()
+        self.__failures: int = 0
+
+    @property
+    def failures(self) -> int:
+        return self.__failures
+
+    def __dispatch(self, operation: str, run_id: str, *args) -> None:
+        if operation == "start_session":
+            self.__ids[run_id] = self.__target.start_session(*args)
+        elif operation == "start_run":
+            experiment_name, parent_run_id, name = args
+            self.__ids[run_id] = self.__target.start_run(
+                experiment_name, self.__ids.get(parent_run_id, parent_run_id), name)
+            self.__children.setdefault(parent_run_id, []).append(run_id)
+        else:
+            getattr(self.__target, operation)(self.__ids.get(run_id, run_id), *args)
+            if operation == "end_session":
+                # runs of terminated sessions cannot be referred anymore
+                for child_run_id in [run_id, *self.__children.pop(run_id, [])]:
+                    self.__ids.pop(child_run_id, None)
+
+    def drain(self) -> int:
+        """Delivers the operations published so far, then flushes the sink.
+
+        Returns
+        -------
+        int
+            the number of delivered operations.
+        """
+        records: List[bytes] = self.__ring.get()
+        for record in records:
+            try:
+                self.__dispatch(*json.loads(record))
+            except Exception as e:
+                self.__failures += 1
+                print(f"Tracking operation from the event ring failed: {e}")
+        if records:
+            self.__target.flush()
+        return len(records)
+
+    def run(self) -> None:
+        """Delivers operations until the ring is closed and drained.
+        """
+        poll_s: float = MIN_POLL_S
+        while True:
+            closed: bool = self.__ring.closed
+            if self.drain():
+                poll_s = MIN_POLL_S
+            elif closed:
+                return
+            else:
+                time.sleep(poll_s)
+                poll_s = min(poll_s * 2, MAX_POLL_S)
+
+
+def _consume(name: str, target_factory: Callable[[], Sink], batch_size: int) -> None:
+    ring: EventRing = EventRing(name, create=False)
+    try:
+        RingConsumer(ring, BatchingSink(target_factory(), batch_size=batch_size)).run()
+    finally:
+        ring.close()
+
+
+class LoggingProcess:
+    """ The single logging process of a multi-process job: worker processes send
+    their tracking operations through a shared-memory event ring (see RingSink),
+    and the logging process delivers them in batches (see BatchingSink) to the
+    sink built by target_factory, e.g. an MlflowSink with an explicit tracking uri.
+
+    While running, the name of the ring is exported as $VEIL_RING, so that the
+    worker processes spawned in the meanwhile find it.
+
+    Parameters
+    ----------
+    target_factory : Callable[[], Sink]
+        builds the sink of the logging process, within it (hence it must be
+        picklable where processes are spawned)
+    capacity : int, optional
+        the capacity of the event ring in bytes, by default RING_CAPACITY
+    batch_size : int, optional
+        the number of pending operations triggering a batch, by default 1000
+    """
+
+    def __init__(
+        self,
+        target_factory: Callable[[], Sink],
+        capacity: int = RING_CAPACITY,
+        batch_size: int = 1000
+    ):
+        self.__target_factory: Callable[[], Sink] = target_factory
+        self.__capacity: int = capacity
+        self.__batch_size: int = batch_size
+        self.__ring: Optional[EventRing] = None
+        self.__process: Optional[multiprocessing.process.BaseProcess] = None
+
+    @property
+    def ring(self) -> Optional[EventRing]:
+        return self.__ring
+
+    @property
+    def is_running(self) -> bool:
+        return self.__process is not None
+
+    def start(self) -> LoggingProcess:
+        if self.__process is None:
+            self.__ring = EventRing(capacity=self.__capacity)
+            self.__process = multiprocessing.Process(
+                target=_consume,
+                args=(self.__ring.name, self.__target_factory, self.__batch_size),
+                name="veil-logging",
+                daemon=True,
+            )
+            self.__process.start()
+            os.environ[RING_ENV_VAR] = self.__ring.name
+        return self
+
+    def stop(self) -> None:
+        """Closes the event ring, then waits for the logging process to deliver
+        the operations still in it.
+        """
+        if self.__process is not None:
+            if os.environ.get(RING_ENV_VAR) == self.__ring.name:
+                del os.environ[RING_ENV_VAR]
+            self.__ring.closed = True
+            self.__process.join()
+            self.__ring.close()
+            self.__process = None
+            self.__ring = None
+
+    def __enter__(self) -> LoggingProcess:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        self.stop()
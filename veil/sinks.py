@@ -0,0 +1,1462 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, TYPE_CHECKING
+import atexit
+import functools
+import json
+import os
+import shutil
+import posixpath
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+import mlflow
+from mlflow.entities import Metric, Param, RunStatus, RunTag
+from mlflow.tracking import MlflowClient
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+from veil.artifacts import discard_spooled, spool_file, write_buffer
+from veil.journal import JournalWriter
+from veil.types import MetricEvent
+
+if TYPE_CHECKING:
+    from veil.decorators import Autologger
+
+
+class RunIdAllocator:
+    """ Allocates run ids client-side, reserving a block of them at once: ids
+    share a random prefix, drawn once per block, followed by a counter.
+
+    Parameters
+    ----------
+    block_size : int, optional
+        the number of ids reserved at once, by default 65536
+    """
+
+    def __init__(self, block_size: int = 65536):
+        self.__block_size: int = block_size
+        self.__lock: threading.Lock = threading.Lock()
+        self.__prefix: str = ""
+        self.__next: int = block_size
+
+    def allocate(self) -> str:
+        with self.__lock:
+            if self.__next >= self.__block_size:
+                self.__prefix = uuid.uuid4().hex[:24]
+                self.__next = 0
+            run_id: str = f"{self.__prefix}{self.__next:08x}"
+            self.__next += 1
+            return run_id
+
+    def reset(self) -> None:
+        """Gives the reserved block up, the next id reserving a new one.
+
+        Forked processes must reset the allocators they inherit, otherwise they
+        would allocate the same ids as their parent.
+        """
+        # the lock may have been held by another thread of the parent at fork time
+        self.__lock = threading.Lock()
+        self.__next = self.__block_size
+
+
+_allocator: RunIdAllocator = RunIdAllocator()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_allocator.reset)
+
+
+def _new_run_id() -> str:
+    return _allocator.allocate()
+
+
+@functools.lru_cache(maxsize=None)
+def _client(tracking_uri: str) -> MlflowClient:
+    return MlflowClient(tracking_uri=tracking_uri)
+
+
+def _fluent_client() -> MlflowClient:
+    """Returns a client addressing the tracking server mlflow is currently set
+    to, e.g. the one of the autologger within MlflowIsolated.
+    """
+    return _client(mlflow.get_tracking_uri())
+
+
+def _artifact_path(root: str, run_id: str, artifact_file: str) -> str:
+    return os.path.join(root, run_id, *artifact_file.split("/"))
+
+
+def _write_artifact(root: str, run_id: str, artifact_file: str, text: str) -> str:
+    path: str = _artifact_path(root, run_id, artifact_file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def _write_artifact_buffer(root: str, run_id: str, artifact_file: str, data: Any) -> str:
+    path: str = _artifact_path(root, run_id, artifact_file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_buffer(data, path)
+    return path
+
+
+def _spool_buffer(data: Any, artifact_file: str) -> str:
+    # the file gets the name of the artifact, within a directory of its own
+    path: str = os.path.join(tempfile.mkdtemp(prefix="veil-"), posixpath.basename(artifact_file))
+    write_buffer(data, path)
+    return path
+
+
+def _copy_artifact(root: str, run_id: str, local_path: str, artifact_path: Optional[str]) -> Tuple[str, str]:
+    artifact_file: str = os.path.basename(local_path)
+    if artifact_path:
+        artifact_file = f"{artifact_path.strip('/')}/{artifact_file}"
+    path: str = _artifact_path(root, run_id, artifact_file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copyfile(local_path, path)
+    return artifact_file, path
+
+
+class RunCreation(NamedTuple):
+    """ A run to be created, a session (parent run) if it has no parent.
+    """
+    experiment_name: str
+    parent_run_id: Optional[str]
+    name: Optional[str]
+
+
+class Sink(ABC):
+    """ Destination of the tracking operations dispatched by an Autologger.
+
+    Runs are always addressed by their identifier, so that operations can be
+    delivered from threads other than the one executing the decorated call.
+    """
+
+    """Whether the sink operates on the mlflow fluent state, hence it must be
+    invoked within MlflowIsolated."""
+    isolated: bool = False
+
+    @abstractmethod
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        """Creates the parent run of a session.
+
+        Parameters
+        ----------
+        experiment_name : str
+            the experiment name
+        name : Optional[str]
+            the parent run name
+        tags : Optional[Dict[str, Any]], optional
+            the tags of the parent run, by default None
+
+        Returns
+        -------
+        str
+            the parent run id.
+        """
+
+    @abstractmethod
+    def end_session(self, run_id: str, status: str) -> None:
+        """Terminates the parent run of a session with the given status.
+        """
+
+    def resume_session(self, run_id: str) -> bool:
+        """Reattaches to the parent run of a previous session, marking it as
+        running again. By default sessions cannot be resumed.
+
+        Parameters
+        ----------
+        run_id : str
+            the parent run id
+
+        Returns
+        -------
+        bool
+            True if the parent run has been reattached.
+        """
+        return False
+
+    @abstractmethod
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        """Creates a child run of the given parent run.
+
+        Parameters
+        ----------
+        experiment_name : str
+            the experiment name
+        parent_run_id : str
+            the parent run id
+        name : str
+            the child run name
+
+        Returns
+        -------
+        str
+            the child run id.
+        """
+
+    @abstractmethod
+    def end_run(self, run_id: str, status: str) -> None:
+        """Terminates a child run with the given status.
+        """
+
+    @abstractmethod
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        """Logs the params of a run.
+        """
+
+    @abstractmethod
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        """Sets the tags of a run.
+        """
+
+    def create_runs(self, runs: List[RunCreation]) -> List[str]:
+        """Creates several runs at once.
+
+        Parameters
+        ----------
+        runs : List[RunCreation]
+            the runs to be created
+
+        Returns
+        -------
+        List[str]
+            the ids of the created runs, in the same order.
+        """
+        return [
+            self.start_session(r.experiment_name, r.name) if r.parent_run_id is None
+            else self.start_run(r.experiment_name, r.parent_run_id, r.name)
+            for r in runs
+        ]
+
+    def log_batch(self, run_id: str, params: Dict[str, Any], tags: Dict[str, Any]) -> None:
+        """Logs the params and sets the tags of a run at once.
+        """
+        if params:
+            self.log_params(run_id, params)
+        if tags:
+            self.set_tags(run_id, tags)
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        """Logs metrics of a run, by default discarding them.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        metrics : Dict[str, float]
+            the metric values, keyed by name
+        step : Optional[int], optional
+            the step the values refer to, by default None
+        """
+
+    def log_metric_series(self, run_id: str, series: Dict[str, Sequence[float]], timestamps: Sequence[float]) -> None:
+        """Logs time series of metrics of a run, by default as a batch of metric events.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        series : Dict[str, Sequence[float]]
+            the values of each metric, keyed by name, the i-th one being logged as step i
+        timestamps : Sequence[float]
+            the timestamps of the steps, in seconds since the epoch
+        """
+        self.log_metric_batch(run_id, [
+            ({k: values[step] for k, values in series.items()}, step, timestamps[step])
+            for step in range(len(timestamps))
+        ])
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        """Logs several metric events of a run, by default one event at a time,
+        stamped when logged.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        metrics : Sequence[MetricEvent]
+            the metric values of each event, keyed by name, together with their
+            step and timestamp
+        """
+        for values, step, _ in metrics:
+            self.log_metrics(run_id, values, step)
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        """Stores a text artifact of a run, by default discarding it.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        text : str
+            the artifact content
+        artifact_file : str
+            the artifact path, relative to the run artifacts root
+        """
+
+    def log_bytes(self, run_id: str, data: Any, artifact_file: str) -> None:
+        """Stores a binary artifact of a run straight from memory, by default
+        spooling it to a temporary file for log_spooled.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        data : Any
+            the artifact content, an object supporting the buffer protocol
+        artifact_file : str
+            the artifact path, relative to the run artifacts root
+        """
+        self.log_spooled(run_id, _spool_buffer(data, artifact_file), posixpath.dirname(artifact_file) or None)
+
+    def log_spooled(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        """Stores a spooled file, i.e. a temporary file the sink takes over, as an
+        artifact of a run: the file (and its directory, once empty) is removed as
+        soon as stored, possibly later by sinks delivering in background. By
+        default the file is stored by log_artifact, then removed.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        local_path : str
+            the path of the spooled file
+        artifact_path : Optional[str], optional
+            the directory the file is stored into, relative to the run artifacts
+            root, by default the root itself
+        """
+        try:
+            self.log_artifact(run_id, local_path, artifact_path)
+        finally:
+            discard_spooled(local_path)
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        """Stores a local file as an artifact of a run, by default discarding it.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        local_path : str
+            the path of the local file
+        artifact_path : Optional[str], optional
+            the directory the file is stored into, relative to the run artifacts
+            root, by default the root itself
+        """
+
+    def load_artifact(self, run_id: str, artifact_file: str) -> Optional[str]:
+        """Retrieves an artifact of a run, by default finding none.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        artifact_file : str
+            the artifact path, relative to the run artifacts root
+
+        Returns
+        -------
+        Optional[str]
+            the local path of the artifact, None if not available.
+        """
+        return None
+
+    def search_runs(self, experiment_name: str, tags: Dict[str, str], status: Optional[str] = None) -> List[str]:
+        """Looks for the runs having the given tags, by default finding none.
+
+        Parameters
+        ----------
+        experiment_name : str
+            the experiment name
+        tags : Dict[str, str]
+            the tags the runs must have
+        status : Optional[str], optional
+            the status the runs must have, by default any
+
+        Returns
+        -------
+        List[str]
+            the ids of the matching runs.
+        """
+        return []
+
+    def flush(self) -> None:
+        """Persists any operation buffered by the sink.
+        """
+
+    def warmup(self, experiment_name: str) -> None:
+        """Eagerly performs the setup the sink would otherwise perform on its first
+        operation, e.g. opening connections, by default nothing.
+
+        Parameters
+        ----------
+        experiment_name : str
+            the experiment name the sink will be addressed with
+        """
+
+    def detach(self, autologger: Autologger) -> Sink:
+        """Returns a sink that can be used outside of the thread executing the
+        decorated call, e.g. for background delivery.
+
+        Parameters
+        ----------
+        autologger : Autologger
+            the autologger dispatching to this sink
+
+        Returns
+        -------
+        Sink
+            the detached sink, by default this very sink.
+        """
+        return self
+
+
+class MlflowSink(Sink):
+    """ Dispatches tracking operations to mlflow.
+
+    Without a tracking uri the sink follows the one of the autologger, by means
+    of the mlflow fluent apis within MlflowIsolated: runs get started and ended
+    through them, so that child runs are active while decorated calls execute,
+    whereas every operation addresses its run id explicitly, with a client of
+    the tracking server mlflow is set to. With a tracking uri the sink addresses
+    it with a dedicated client, regardless of the mlflow global state.
+
+    Parameters
+    ----------
+    tracking_uri : Optional[str], optional
+        the tracking server uri, by default None
+    """
+
+    def __init__(self, tracking_uri: Optional[str] = None):
+        self.__tracking_uri: Optional[str] = tracking_uri
+        self.__client: Optional[MlflowClient] = None
+        self.__experiment_ids: Dict[str, str] = dict()
+        self.__detached: Dict[str, MlflowSink] = dict()
+
+    @property
+    def tracking_uri(self) -> Optional[str]:
+        return self.__tracking_uri
+
+    @property
+    def isolated(self) -> bool:
+        return self.__tracking_uri is None
+
+    @property
+    def client(self) -> MlflowClient:
+        if self.__client is None:
+            self.__client = MlflowClient(tracking_uri=self.__tracking_uri)
+        return self.__client
+
+    @property
+    def __run_client(self) -> MlflowClient:
+        return _fluent_client() if self.isolated else self.client
+
+    def __experiment_id(self, experiment_name: str) -> str:
+        experiment_id: Optional[str] = self.__experiment_ids.get(experiment_name)
+        if experiment_id is None:
+            experiment = self.client.get_experiment_by_name(experiment_name)
+            if experiment is not None:
+                experiment_id = experiment.experiment_id
+            else:
+                experiment_id = self.client.create_experiment(experiment_name)
+            self.__experiment_ids[experiment_name] = experiment_id
+        return experiment_id
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        if self.isolated:
+            # immediately starts and stops a novel parent run, note that this run
+            # will be resumed by child runs.
+            run = mlflow.start_run(run_name=name)
+            mlflow.end_run(status=RunStatus.to_string(RunStatus.RUNNING))
+            if tags:
+                self.set_tags(run.info.run_id, tags)
+            return run.info.run_id
+        return self.client.create_run(
+            self.__experiment_id(experiment_name),
+            tags={k: str(v) for k, v in (tags or {}).items()},
+            run_name=name
+        ).info.run_id
+
+    def end_session(self, run_id: str, status: str) -> None:
+        if self.isolated:
+            mlflow.start_run(run_id=run_id)
+            mlflow.end_run(status=status)
+        else:
+            self.client.set_terminated(run_id, status=status)
+
+    def resume_session(self, run_id: str) -> bool:
+        try:
+            if self.isolated:
+                mlflow.start_run(run_id=run_id)
+                mlflow.end_run(status=RunStatus.to_string(RunStatus.RUNNING))
+            else:
+                self.client.update_run(run_id, status=RunStatus.to_string(RunStatus.RUNNING))
+            return True
+        except Exception as e:
+            print(f"Session {run_id} cannot be resumed: {e}")
+            return False
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        if self.isolated:
+            # resumes the parent run so that the child run gets nested into it
+            mlflow.start_run(run_id=parent_run_id)
+            return mlflow.start_run(run_name=name, nested=True).info.run_id
+        return self.client.create_run(
+            self.__experiment_id(experiment_name),
+            tags={MLFLOW_PARENT_RUN_ID: parent_run_id},
+            run_name=name
+        ).info.run_id
+
+    def end_run(self, run_id: str, status: str) -> None:
+        active_run: Optional[mlflow.ActiveRun] = mlflow.active_run() if self.isolated else None
+        if active_run is not None and active_run.info.run_id == run_id:
+            # stops the child run started by start_run first, then the resumed parent run
+            mlflow.end_run(status=status)
+            mlflow.end_run()
+        else:
+            self.__run_client.set_terminated(run_id, status=status)
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        self.__run_client.log_batch(run_id, params=[Param(k, str(v)) for k, v in params.items()])
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        self.__run_client.log_batch(run_id, tags=[RunTag(k, str(v)) for k, v in tags.items()])
+
+    def create_runs(self, runs: List[RunCreation]) -> List[str]:
+        if self.isolated or len(runs) < 2:
+            return super().create_runs(runs)
+        # the tracking server has no bulk creation endpoint, hence runs get
+        # created by concurrent requests
+        with ThreadPoolExecutor(max_workers=min(len(runs), 8)) as executor:
+            return list(executor.map(lambda r: super(MlflowSink, self).create_runs([r])[0], runs))
+
+    def log_batch(self, run_id: str, params: Dict[str, Any], tags: Dict[str, Any]) -> None:
+        self.__run_client.log_batch(
+            run_id,
+            params=[Param(k, str(v)) for k, v in params.items()],
+            tags=[RunTag(k, str(v)) for k, v in tags.items()]
+        )
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        timestamp: int = int(time.time() * 1000)
+        self.__run_client.log_batch(
+            run_id, metrics=[Metric(k, float(v), timestamp, step or 0) for k, v in metrics.items()])
+
+    def log_metric_series(self, run_id: str, series: Dict[str, Sequence[float]], timestamps: Sequence[float]) -> None:
+        # batches carry up to 1000 metrics of any step
+        client: MlflowClient = self.__run_client
+        metrics: List[Metric] = [
+            Metric(k, float(v), int(timestamps[step] * 1000), step)
+            for k, values in series.items() for step, v in enumerate(values)
+        ]
+        for start in range(0, len(metrics), 1000):
+            client.log_batch(run_id, metrics=metrics[start:start + 1000])
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        client: MlflowClient = self.__run_client
+        entries: List[Metric] = [
+            Metric(k, float(v), int(timestamp * 1000), step or 0)
+            for values, step, timestamp in metrics for k, v in values.items()
+        ]
+        for start in range(0, len(entries), 1000):
+            client.log_batch(run_id, metrics=entries[start:start + 1000])
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        self.__run_client.log_text(run_id, text, artifact_file)
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        self.__run_client.log_artifact(run_id, local_path, artifact_path)
+
+    def load_artifact(self, run_id: str, artifact_file: str) -> Optional[str]:
+        try:
+            return mlflow.artifacts.download_artifacts(
+                run_id=run_id, artifact_path=artifact_file, tracking_uri=self.__tracking_uri)
+        except Exception as e:
+            print(f"Artifact {artifact_file} of run {run_id} is not available: {e}")
+            return None
+
+    def search_runs(self, experiment_name: str, tags: Dict[str, str], status: Optional[str] = None) -> List[str]:
+        filters: List[str] = [f"tags.`{k}` = '{v}'" for k, v in tags.items()]
+        if status is not None:
+            filters.append(f"attributes.status = '{status}'")
+        if self.isolated:
+            runs = mlflow.search_runs(
+                experiment_names=[experiment_name], filter_string=" and ".join(filters), output_format="list")
+        else:
+            runs = self.client.search_runs(
+                [self.__experiment_id(experiment_name)], filter_string=" and ".join(filters))
+        return [run.info.run_id for run in runs]
+
+    def warmup(self, experiment_name: str) -> None:
+        # creates the client, connecting to the tracking server, and resolves the experiment
+        self.__experiment_id(experiment_name)
+
+    def detach(self, autologger: Autologger) -> Sink:
+        if not self.isolated:
+            return self
+        # the fluent apis are bound to the mlflow global state, hence a detached
+        # sink addresses the tracking server of the autologger explicitly
+        detached: Optional[MlflowSink] = self.__detached.get(autologger.tracking_uri)
+        if detached is None:
+            detached = self.__detached[autologger.tracking_uri] = MlflowSink(
+                tracking_uri=autologger.tracking_uri)
+        return detached
+
+
+class NoopSink(Sink):
+    """ Discards every tracking operation, e.g. to measure the overhead of
+    veil itself.
+    """
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        return _new_run_id()
+
+    def end_session(self, run_id: str, status: str) -> None:
+        pass
+
+    def resume_session(self, run_id: str) -> bool:
+        return True
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        return _new_run_id()
+
+    def end_run(self, run_id: str, status: str) -> None:
+        pass
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        pass
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        pass
+
+    def log_bytes(self, run_id: str, data: Any, artifact_file: str) -> None:
+        pass
+
+
+class JsonlSink(Sink):
+    """ Appends tracking operations as JSON events, one per line, to a local
+    file. Events are flushed whenever a run or a session terminates.
+
+    Parameters
+    ----------
+    path : str
+        the path of the JSONL file
+    artifacts_dir : Optional[str], optional
+        the directory artifacts are stored into, by default path + ".artifacts"
+    """
+
+    def __init__(self, path: str, artifacts_dir: Optional[str] = None):
+        self.__path: str = path
+        self.__artifacts_dir: str = artifacts_dir or f"{path}.artifacts"
+        self.__lock: threading.Lock = threading.Lock()
+        self.__file = None
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def artifacts_dir(self) -> str:
+        return self.__artifacts_dir
+
+    def __write(self, event: Dict[str, Any], flush: bool = False, timestamp: Optional[float] = None) -> None:
+        event["timestamp"] = time.time() if timestamp is None else timestamp
+        line: str = json.dumps(event, default=str) + "\n"
+        with self.__lock:
+            if self.__file is None:
+                directory: str = os.path.dirname(self.__path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.__file = open(self.__path, "a", encoding="utf-8")
+            self.__file.write(line)
+            if flush:
+                self.__file.flush()
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        run_id: str = _new_run_id()
+        self.__write({"event": "start_session", "run_id": run_id, "experiment": experiment_name, "name": name})
+        if tags:
+            self.set_tags(run_id, tags)
+        return run_id
+
+    def end_session(self, run_id: str, status: str) -> None:
+        self.__write({"event": "end_session", "run_id": run_id, "status": status}, flush=True)
+
+    def resume_session(self, run_id: str) -> bool:
+        self.__write({"event": "resume_session", "run_id": run_id}, flush=True)
+        return True
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        run_id: str = _new_run_id()
+        self.__write({"event": "start_run", "run_id": run_id, "parent_run_id": parent_run_id,
+                      "experiment": experiment_name, "name": name})
+        return run_id
+
+    def end_run(self, run_id: str, status: str) -> None:
+        self.__write({"event": "end_run", "run_id": run_id, "status": status}, flush=True)
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        self.__write({"event": "log_params", "run_id": run_id, "params": dict(params)})
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        self.__write({"event": "set_tags", "run_id": run_id, "tags": dict(tags)})
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        self.__write({"event": "log_metrics", "run_id": run_id, "metrics": dict(metrics), "step": step})
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        for values, step, timestamp in metrics:
+            self.__write(
+                {"event": "log_metrics", "run_id": run_id, "metrics": dict(values), "step": step}, timestamp=timestamp)
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        path: str = _write_artifact(self.__artifacts_dir, run_id, artifact_file, text)
+        self.__write({"event": "log_artifact", "run_id": run_id, "artifact_file": artifact_file, "path": path})
+
+    def log_bytes(self, run_id: str, data: Any, artifact_file: str) -> None:
+        path: str = _write_artifact_buffer(self.__artifacts_dir, run_id, artifact_file, data)
+        self.__write({"event": "log_artifact", "run_id": run_id, "artifact_file": artifact_file, "path": path})
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        artifact_file, path = _copy_artifact(self.__artifacts_dir, run_id, local_path, artifact_path)
+        self.__write({"event": "log_artifact", "run_id": run_id, "artifact_file": artifact_file, "path": path})
+
+    def load_artifact(self, run_id: str, artifact_file: str) -> Optional[str]:
+        path: str = _artifact_path(self.__artifacts_dir, run_id, artifact_file)
+        return path if os.path.isfile(path) else None
+
+    def flush(self) -> None:
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.flush()
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+
+
+class JournalSink(Sink):
+    """ Appends tracking operations to a compressed, block-indexed journal (see
+    veil.journal), suited to spooling millions of events to be inspected or
+    replayed later. Blocks are written when full, when a session terminates, on
+    flush() and at interpreter exit.
+
+    Parameters
+    ----------
+    path : str
+        the path of the journal
+    artifacts_dir : Optional[str], optional
+        the directory artifacts are stored into, by default path + ".artifacts"
+    codec : str, optional
+        the block compression codec, one of "none", "zlib" and "lzma", by default "zlib"
+    block_size : int, optional
+        the uncompressed size of blocks, in bytes, by default 256 KiB
+    """
+
+    def __init__(
+        self,
+        path: str,
+        artifacts_dir: Optional[str] = None,
+        codec: str = "zlib",
+        block_size: int = 256 * 1024
+    ):
+        self.__writer: JournalWriter = JournalWriter(path, codec=codec, block_size=block_size)
+        self.__artifacts_dir: str = artifacts_dir or f"{path}.artifacts"
+        self.__lock: threading.Lock = threading.Lock()
+        self.__sessions: Dict[str, str] = dict()
+        atexit.register(self.close)
+
+    @property
+    def path(self) -> str:
+        return self.__writer.path
+
+    @property
+    def artifacts_dir(self) -> str:
+        return self.__artifacts_dir
+
+    def __append(
+        self,
+        event: str,
+        run_id: str,
+        data: Dict[str, Any],
+        session_id: Optional[str] = None,
+        timestamp: Optional[float] = None
+    ) -> None:
+        if session_id is None:
+            with self.__lock:
+                session_id = self.__sessions.get(run_id)
+        self.__writer.append(event, run_id, session_id, time.time() if timestamp is None else timestamp, data)
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        run_id: str = _new_run_id()
+        with self.__lock:
+            self.__sessions[run_id] = run_id
+        self.__append("start_session", run_id, {"experiment": experiment_name, "name": name})
+        if tags:
+            self.set_tags(run_id, tags)
+        return run_id
+
+    def end_session(self, run_id: str, status: str) -> None:
+        self.__append("end_session", run_id, {"status": status})
+        with self.__lock:
+            # child runs are mapped to their session until then, for deferred operations
+            self.__sessions = {k: v for k, v in self.__sessions.items() if v != run_id}
+        self.__writer.flush()
+
+    def resume_session(self, run_id: str) -> bool:
+        with self.__lock:
+            self.__sessions[run_id] = run_id
+        self.__append("resume_session", run_id, {})
+        return True
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        run_id: str = _new_run_id()
+        with self.__lock:
+            self.__sessions[run_id] = parent_run_id
+        self.__append("start_run", run_id, {"parent_run_id": parent_run_id, "experiment": experiment_name, "name": name})
+        return run_id
+
+    def end_run(self, run_id: str, status: str) -> None:
+        self.__append("end_run", run_id, {"status": status})
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        self.__append("log_params", run_id, {"params": dict(params)})
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        self.__append("set_tags", run_id, {"tags": dict(tags)})
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        self.__append("log_metrics", run_id, {"metrics": dict(metrics), "step": step})
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        for values, step, timestamp in metrics:
+            self.__append("log_metrics", run_id, {"metrics": dict(values), "step": step}, timestamp=timestamp)
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        path: str = _write_artifact(self.__artifacts_dir, run_id, artifact_file, text)
+        self.__append("log_artifact", run_id, {"artifact_file": artifact_file, "path": path})
+
+    def log_bytes(self, run_id: str, data: Any, artifact_file: str) -> None:
+        path: str = _write_artifact_buffer(self.__artifacts_dir, run_id, artifact_file, data)
+        self.__append("log_artifact", run_id, {"artifact_file": artifact_file, "path": path})
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        artifact_file, path = _copy_artifact(self.__artifacts_dir, run_id, local_path, artifact_path)
+        self.__append("log_artifact", run_id, {"artifact_file": artifact_file, "path": path})
+
+    def load_artifact(self, run_id: str, artifact_file: str) -> Optional[str]:
+        path: str = _artifact_path(self.__artifacts_dir, run_id, artifact_file)
+        return path if os.path.isfile(path) else None
+
+    def flush(self) -> None:
+        self.__writer.flush()
+
+    def close(self) -> None:
+        self.__writer.close()
+
+
+class SqliteSink(Sink):
+    """ Stores runs, params and tags into a local SQLite database. Changes are
+    committed whenever a run or a session terminates.
+
+    Parameters
+    ----------
+    path : str
+        the path of the SQLite database
+    artifacts_dir : Optional[str], optional
+        the directory artifacts are stored into, by default path + ".artifacts"
+    """
+
+    _SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            parent_run_id TEXT,
+            experiment TEXT,
+            name TEXT,
+            status TEXT,
+            start_time REAL,
+            end_time REAL
+        );
+        CREATE TABLE IF NOT EXISTS params (run_id TEXT, key TEXT, value TEXT, PRIMARY KEY (run_id, key));
+        CREATE TABLE IF NOT EXISTS tags (run_id TEXT, key TEXT, value TEXT, PRIMARY KEY (run_id, key));
+        CREATE TABLE IF NOT EXISTS artifacts (run_id TEXT, artifact_file TEXT, path TEXT, PRIMARY KEY (run_id, artifact_file));
+        CREATE TABLE IF NOT EXISTS metrics (run_id TEXT, key TEXT, value REAL, step INTEGER, timestamp REAL);
+        CREATE INDEX IF NOT EXISTS tags_by_value ON tags (key, value);
+    """
+
+    def __init__(self, path: str, artifacts_dir: Optional[str] = None):
+        self.__path: str = path
+        self.__artifacts_dir: str = artifacts_dir or f"{path}.artifacts"
+        self.__lock: threading.Lock = threading.Lock()
+        self.__connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        with self.__lock:
+            if self.__connection is None:
+                self.__connection = sqlite3.connect(self.__path, check_same_thread=False)
+                self.__connection.executescript(self._SCHEMA)
+            return self.__connection
+
+    @property
+    def artifacts_dir(self) -> str:
+        return self.__artifacts_dir
+
+    def warmup(self, experiment_name: str) -> None:
+        # opens the database, creating the schema if missing
+        self.connection
+
+    def __execute(self, statement: str, rows: list, commit: bool = False) -> None:
+        connection: sqlite3.Connection = self.connection
+        with self.__lock:
+            connection.executemany(statement, rows)
+            if commit:
+                connection.commit()
+
+    def create_runs(self, runs: List[RunCreation]) -> List[str]:
+        started_at: float = time.time()
+        rows: List[Tuple] = [
+            (_new_run_id(), r.parent_run_id, r.experiment_name, r.name, RunStatus.to_string(RunStatus.RUNNING), started_at)
+            for r in runs
+        ]
+        self.__execute("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, NULL)", rows)
+        return [row[0] for row in rows]
+
+    def __terminate_run(self, run_id: str, status: str) -> None:
+        self.__execute(
+            "UPDATE runs SET status = ?, end_time = ? WHERE run_id = ?",
+            [(status, time.time(), run_id)],
+            commit=True
+        )
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        run_id: str = self.create_runs([RunCreation(experiment_name, None, name)])[0]
+        if tags:
+            self.set_tags(run_id, tags)
+        return run_id
+
+    def end_session(self, run_id: str, status: str) -> None:
+        self.__terminate_run(run_id, status)
+
+    def resume_session(self, run_id: str) -> bool:
+        connection: sqlite3.Connection = self.connection
+        with self.__lock:
+            cursor: sqlite3.Cursor = connection.execute(
+                "UPDATE runs SET status = ?, end_time = NULL WHERE run_id = ? AND parent_run_id IS NULL",
+                (RunStatus.to_string(RunStatus.RUNNING), run_id)
+            )
+            connection.commit()
+            return cursor.rowcount > 0
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        return self.create_runs([RunCreation(experiment_name, parent_run_id, name)])[0]
+
+    def end_run(self, run_id: str, status: str) -> None:
+        self.__terminate_run(run_id, status)
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        self.__execute(
+            "INSERT OR REPLACE INTO params VALUES (?, ?, ?)",
+            [(run_id, k, str(v)) for k, v in params.items()]
+        )
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        self.__execute(
+            "INSERT OR REPLACE INTO tags VALUES (?, ?, ?)",
+            [(run_id, k, str(v)) for k, v in tags.items()]
+        )
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        timestamp: float = time.time()
+        self.__execute(
+            "INSERT INTO metrics VALUES (?, ?, ?, ?, ?)",
+            [(run_id, k, float(v), step or 0, timestamp) for k, v in metrics.items()]
+        )
+
+    def log_metric_series(self, run_id: str, series: Dict[str, Sequence[float]], timestamps: Sequence[float]) -> None:
+        self.__execute(
+            "INSERT INTO metrics VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_id, k, float(v), step, timestamps[step])
+                for k, values in series.items() for step, v in enumerate(values)
+            ]
+        )
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        self.__execute(
+            "INSERT INTO metrics VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_id, k, float(v), step or 0, timestamp)
+                for values, step, timestamp in metrics for k, v in values.items()
+            ]
+        )
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        path: str = _write_artifact(self.__artifacts_dir, run_id, artifact_file, text)
+        self.__execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)", [(run_id, artifact_file, path)])
+
+    def log_bytes(self, run_id: str, data: Any, artifact_file: str) -> None:
+        path: str = _write_artifact_buffer(self.__artifacts_dir, run_id, artifact_file, data)
+        self.__execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)", [(run_id, artifact_file, path)])
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        artifact_file, path = _copy_artifact(self.__artifacts_dir, run_id, local_path, artifact_path)
+        self.__execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)", [(run_id, artifact_file, path)])
+
+    def load_artifact(self, run_id: str, artifact_file: str) -> Optional[str]:
+        path: str = _artifact_path(self.__artifacts_dir, run_id, artifact_file)
+        return path if os.path.isfile(path) else None
+
+    def search_runs(self, experiment_name: str, tags: Dict[str, str], status: Optional[str] = None) -> List[str]:
+        statement: str = "SELECT run_id FROM runs WHERE experiment = ?"
+        values: List[Any] = [experiment_name]
+        for k, v in tags.items():
+            statement += " AND run_id IN (SELECT run_id FROM tags WHERE key = ? AND value = ?)"
+            values.extend([k, str(v)])
+        if status is not None:
+            statement += " AND status = ?"
+            values.append(status)
+        connection: sqlite3.Connection = self.connection
+        with self.__lock:
+            return [row[0] for row in connection.execute(statement, values)]
+
+    def flush(self) -> None:
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.commit()
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.commit()
+                self.__connection.close()
+                self.__connection = None
+
+
+class BatchingSink(Sink):
+    """ Allocates run ids client-side and buffers every tracking operation,
+    creating runs lazily and in bulk on the target sink.
+
+    Buffered operations are flushed when batch_size of them are pending, when a
+    session terminates, on flush() and at interpreter exit. Client-side ids are
+    translated to the ones of the target sink on flush, hence sessions cannot be
+    resumed.
+
+    Parameters
+    ----------
+    target : Sink
+        the sink receiving the flushed operations, which must not be isolated
+    batch_size : int, optional
+        the number of pending operations triggering a flush, by default 1000
+    max_workers : int, optional
+        the number of runs whose operations are flushed concurrently, by default 8
+    """
+
+    def __init__(self, target: Sink, batch_size: int = 1000, max_workers: int = 8):
+        if target.isolated:
+            raise ValueError("BatchingSink requires a sink not bound to the mlflow fluent state")
+
+        self.__target: Sink = target
+        self.__batch_size: int = batch_size
+        self.__max_workers: int = max_workers
+        self.__lock: threading.Lock = threading.Lock()
+        self.__flush_lock: threading.Lock = threading.Lock()
+        self.__ids: Dict[str, str] = dict()
+        self.__children: Dict[str, List[str]] = dict()
+        self.__creations: List[Tuple[str, RunCreation]] = []
+        self.__data: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = dict()
+        self.__artifacts: Dict[str, List[Tuple[str, str, Optional[str]]]] = dict()
+        self.__metrics: Dict[str, List[MetricEvent]] = dict()
+        self.__terminations: Dict[str, Tuple[str, bool]] = dict()
+        self.__pending: int = 0
+        atexit.register(self.flush)
+
+    @property
+    def target(self) -> Sink:
+        return self.__target
+
+    def __create(self, creation: RunCreation) -> str:
+        run_id: str = _new_run_id()
+        with self.__lock:
+            self.__creations.append((run_id, creation))
+            if creation.parent_run_id is not None:
+                self.__children.setdefault(creation.parent_run_id, []).append(run_id)
+            self.__pending += 1
+        self.__maybe_flush()
+        return run_id
+
+    def __update(self, run_id: str, params: Dict[str, Any], tags: Dict[str, Any]) -> None:
+        with self.__lock:
+            data = self.__data.get(run_id)
+            if data is None:
+                data = self.__data[run_id] = (dict(), dict())
+            data[0].update(params)
+            data[1].update(tags)
+            self.__pending += len(params) + len(tags)
+        self.__maybe_flush()
+
+    def __terminate(self, run_id: str, status: str, is_session: bool) -> None:
+        with self.__lock:
+            self.__terminations[run_id] = (status, is_session)
+            self.__pending += 1
+        if is_session:
+            self.flush()
+        else:
+            self.__maybe_flush()
+
+    def __maybe_flush(self) -> None:
+        if self.__pending >= self.__batch_size:
+            self.flush()
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        run_id: str = self.__create(RunCreation(experiment_name, None, name))
+        if tags:
+            self.__update(run_id, {}, tags)
+        return run_id
+
+    def end_session(self, run_id: str, status: str) -> None:
+        self.__terminate(run_id, status, True)
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        return self.__create(RunCreation(experiment_name, parent_run_id, name))
+
+    def end_run(self, run_id: str, status: str) -> None:
+        self.__terminate(run_id, status, False)
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        self.__update(run_id, params, {})
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        self.__update(run_id, {}, tags)
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        with self.__lock:
+            self.__metrics.setdefault(run_id, []).append((dict(metrics), step, time.time()))
+            self.__pending += len(metrics)
+        self.__maybe_flush()
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        with self.__lock:
+            self.__metrics.setdefault(run_id, []).extend((dict(values), step, t) for values, step, t in metrics)
+            self.__pending += sum(len(values) for values, _, _ in metrics)
+        self.__maybe_flush()
+
+    def __add_artifact(self, run_id: str, artifact: Tuple[str, str, Optional[str]]) -> None:
+        with self.__lock:
+            self.__artifacts.setdefault(run_id, []).append(artifact)
+            self.__pending += 1
+        self.__maybe_flush()
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        self.__add_artifact(run_id, ("text", text, artifact_file))
+
+    def log_spooled(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        # spooled files, e.g. buffers that may change after the call, are kept until the next flush
+        self.__add_artifact(run_id, ("spool", local_path, artifact_path))
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        # note that the local file must survive until the next flush
+        self.__add_artifact(run_id, ("file", local_path, artifact_path))
+
+    def load_artifact(self, run_id: str, artifact_file: str) -> Optional[str]:
+        return self.__target.load_artifact(self.__ids.get(run_id, run_id), artifact_file)
+
+    def search_runs(self, experiment_name: str, tags: Dict[str, str], status: Optional[str] = None) -> List[str]:
+        # only runs already flushed to the target can be found
+        return self.__target.search_runs(experiment_name, tags, status)
+
+    def warmup(self, experiment_name: str) -> None:
+        self.__target.warmup(experiment_name)
+
+    def flush(self) -> None:
+        with self.__flush_lock:
+            with self.__lock:
+                creations, self.__creations = self.__creations, []
+                data, self.__data = self.__data, dict()
+                artifacts, self.__artifacts = self.__artifacts, dict()
+                metrics, self.__metrics = self.__metrics, dict()
+                terminations, self.__terminations = self.__terminations, dict()
+                self.__pending = 0
+
+            # creates the pending runs in bulk, sessions first so that children can refer to them
+            for is_session in (True, False):
+                group: List[Tuple[str, RunCreation]] = [
+                    (run_id, c) for run_id, c in creations if (c.parent_run_id is None) == is_session]
+                if group:
+                    created: List[str] = self.__target.create_runs([
+                        c._replace(parent_run_id=self.__ids.get(c.parent_run_id, c.parent_run_id))
+                        for _, c in group
+                    ])
+                    self.__ids.update(zip([run_id for run_id, _ in group], created))
+
+            # then logs data and terminations, in order for each run and concurrently among runs
+            def deliver(run_id: str) -> None:
+                target_run_id: str = self.__ids.get(run_id, run_id)
+                if run_id in data:
+                    self.__target.log_batch(target_run_id, *data[run_id])
+                if run_id in metrics:
+                    self.__target.log_metric_batch(target_run_id, metrics[run_id])
+                for kind, content, path in artifacts.get(run_id, []):
+                    if kind == "text":
+                        self.__target.log_text(target_run_id, content, path)
+                    elif kind == "spool":
+                        self.__target.log_spooled(target_run_id, content, path)
+                    else:
+                        self.__target.log_artifact(target_run_id, content, path)
+                if run_id in terminations:
+                    status, is_session = terminations[run_id]
+                    if is_session:
+                        self.__target.end_session(target_run_id, status)
+                    else:
+                        self.__target.end_run(target_run_id, status)
+
+            run_ids: List[str] = list(dict.fromkeys([*data, *metrics, *artifacts, *terminations]))
+            if len(run_ids) > 1 and self.__max_workers > 1:
+                with ThreadPoolExecutor(max_workers=min(len(run_ids), self.__max_workers)) as executor:
+                    list(executor.map(deliver, run_ids))
+            else:
+                for run_id in run_ids:
+                    deliver(run_id)
+            self.__target.flush()
+
+            # runs of terminated sessions cannot be referred anymore
+            for run_id, (_, is_session) in terminations.items():
+                if is_session:
+                    with self.__lock:
+                        children: List[str] = self.__children.pop(run_id, [])
+                    for child_run_id in [run_id, *children]:
+                        self.__ids.pop(child_run_id, None)
+
+
+"""Prefix of the session ids of FanoutSink, followed by the ids on every destination."""
+_FANOUT_PREFIX = "fanout"
+
+
+class FanoutSink(Sink):
+    """ Dispatches every tracking operation to several sinks at once, e.g. a
+    central tracking server and a local mirror.
+
+    Each operation is sent to every destination concurrently, from worker
+    threads, so that its latency is the one of the slowest destination rather
+    than the sum of them. Failures are isolated per destination: a destination
+    failing to create a run is skipped by the later operations on that run, and
+    an operation fails only when every destination fails it.
+
+    Runs are identified by the id assigned by the first destination creating
+    them, preferably the first one, which also serves searches. Sessions are
+    instead identified by the ids assigned by every destination, e.g.
+    `fanout.<id 0>.<id 1>` (empty where a destination failed to create them), so
+    that a session resumed or joined by another process is still dispatched to
+    every destination. Other runs unknown to the sink (e.g. found by a search)
+    are addressed on the first destination only.
+
+    Parameters
+    ----------
+    targets : Sequence[Sink]
+        the destinations, none of which must be isolated
+    max_workers : Optional[int], optional
+        the number of destinations addressed concurrently, by default all of them
+    """
+
+    def __init__(self, targets: Sequence[Sink], max_workers: Optional[int] = None):
+        if not targets:
+            raise ValueError("FanoutSink requires at least a destination")
+        if any(target.isolated for target in targets):
+            raise ValueError("FanoutSink requires sinks not bound to the mlflow fluent state")
+
+        self.__targets: List[Sink] = list(targets)
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.__targets), thread_name_prefix="veil-fanout")
+        self.__lock: threading.Lock = threading.Lock()
+        self.__ids: Dict[str, List[Optional[str]]] = dict()
+        self.__children: Dict[str, List[str]] = dict()
+        self.__failures: List[int] = [0] * len(self.__targets)
+
+    @property
+    def targets(self) -> List[Sink]:
+        return list(self.__targets)
+
+    @property
+    def failures(self) -> List[int]:
+        """The number of failed operations of each destination.
+        """
+        with self.__lock:
+            return list(self.__failures)
+
+    def __ids_of(self, run_id: Optional[str]) -> List[Optional[str]]:
+        with self.__lock:
+            ids: Optional[List[Optional[str]]] = self.__ids.get(run_id)
+        if ids is not None:
+            return ids
+        # sessions started by another process carry the ids of every destination
+        prefix, _, joined = (run_id or "").partition(".")
+        if prefix == _FANOUT_PREFIX:
+            parts: List[str] = joined.split(".")
+            if len(parts) == len(self.__targets) and any(parts):
+                return [part or None for part in parts]
+        return [run_id] + [None] * (len(self.__targets) - 1)
+
+    def __broadcast(self, name: str, operations: List[Optional[Callable[[Sink], Any]]]) -> List[Any]:
+        # the first destination is addressed by the calling thread, the others by workers
+        def call(i: int) -> Tuple[Any, Optional[Exception]]:
+            try:
+                return operations[i](self.__targets[i]), None
+            except Exception as e:
+                with self.__lock:
+                    self.__failures[i] += 1
+                print(f"Operation {name} failed on destination {i}: {e}")
+                return None, e
+
+        futures: Dict[int, Future] = {
+            i: self.__executor.submit(call, i) for i in range(1, len(operations)) if operations[i] is not None}
+        outcomes: Dict[int, Tuple[Any, Optional[Exception]]] = dict()
+        if operations[0] is not None:
+            outcomes[0] = call(0)
+        outcomes.update((i, future.result()) for i, future in futures.items())
+
+        if outcomes and all(e is not None for _, e in outcomes.values()):
+            raise next(iter(outcomes.values()))[1]
+        return [outcomes[i][0] if i in outcomes else None for i in range(len(operations))]
+
+    def __forward(self, name: str, run_id: str, *args) -> List[Any]:
+        return self.__broadcast(name, [
+            None if target_run_id is None else (lambda t, r=target_run_id: getattr(t, name)(r, *args))
+            for target_run_id in self.__ids_of(run_id)
+        ])
+
+    def __register(self, ids: List[Optional[str]], parent_run_id: Optional[str]) -> str:
+        if parent_run_id is None:
+            run_id: str = ".".join([_FANOUT_PREFIX, *(target_run_id or "" for target_run_id in ids)])
+        else:
+            run_id = next(target_run_id for target_run_id in ids if target_run_id is not None)
+        with self.__lock:
+            self.__ids[run_id] = ids
+            if parent_run_id is not None:
+                self.__children.setdefault(parent_run_id, []).append(run_id)
+        return run_id
+
+    def start_session(self, experiment_name: str, name: Optional[str], tags: Optional[Dict[str, Any]] = None) -> str:
+        ids: List[Optional[str]] = self.__broadcast(
+            "start_session", [lambda t: t.start_session(experiment_name, name, tags)] * len(self.__targets))
+        return self.__register(ids, None)
+
+    def end_session(self, run_id: str, status: str) -> None:
+        try:
+            self.__forward("end_session", run_id, status)
+        finally:
+            # runs of terminated sessions cannot be referred anymore
+            with self.__lock:
+                for child_run_id in [run_id, *self.__children.pop(run_id, [])]:
+                    self.__ids.pop(child_run_id, None)
+
+    def resume_session(self, run_id: str) -> bool:
+        return any(self.__forward("resume_session", run_id))
+
+    def start_run(self, experiment_name: str, parent_run_id: str, name: str) -> str:
+        return self.create_runs([RunCreation(experiment_name, parent_run_id, name)])[0]
+
+    def end_run(self, run_id: str, status: str) -> None:
+        self.__forward("end_run", run_id, status)
+
+    def log_params(self, run_id: str, params: Dict[str, Any]) -> None:
+        self.__forward("log_params", run_id, params)
+
+    def set_tags(self, run_id: str, tags: Dict[str, Any]) -> None:
+        self.__forward("set_tags", run_id, tags)
+
+    def create_runs(self, runs: List[RunCreation]) -> List[str]:
+        # each destination creates the runs whose parent it knows, with its own parent ids
+        parents: List[List[Optional[str]]] = [
+            self.__ids_of(r.parent_run_id) if r.parent_run_id is not None else [None] * len(self.__targets)
+            for r in runs
+        ]
+        creatable: List[List[int]] = [
+            [j for j, r in enumerate(runs) if r.parent_run_id is None or parents[j][i] is not None]
+            for i in range(len(self.__targets))
+        ]
+
+        def create(i: int) -> Optional[Callable[[Sink], Any]]:
+            if not creatable[i]:
+                return None
+            return lambda t: t.create_runs([runs[j]._replace(parent_run_id=parents[j][i]) for j in creatable[i]])
+
+        created: List[Optional[List[str]]] = self.__broadcast(
+            "create_runs", [create(i) for i in range(len(self.__targets))])
+        ids: List[List[Optional[str]]] = [[None] * len(self.__targets) for _ in runs]
+        for i, target_run_ids in enumerate(created):
+            for j, target_run_id in zip(creatable[i], target_run_ids or []):
+                ids[j][i] = target_run_id
+        if any(all(target_run_id is None for target_run_id in run_ids) for run_ids in ids):
+            raise ValueError("Runs cannot be created on any destination")
+        return [self.__register(run_ids, r.parent_run_id) for run_ids, r in zip(ids, runs)]
+
+    def log_batch(self, run_id: str, params: Dict[str, Any], tags: Dict[str, Any]) -> None:
+        self.__forward("log_batch", run_id, params, tags)
+
+    def log_metrics(self, run_id: str, metrics: Dict[str, float], step: Optional[int] = None) -> None:
+        self.__forward("log_metrics", run_id, metrics, step)
+
+    def log_metric_series(self, run_id: str, series: Dict[str, Sequence[float]], timestamps: Sequence[float]) -> None:
+        self.__forward("log_metric_series", run_id, series, timestamps)
+
+    def log_metric_batch(self, run_id: str, metrics: Sequence[MetricEvent]) -> None:
+        self.__forward("log_metric_batch", run_id, metrics)
+
+    def log_text(self, run_id: str, text: str, artifact_file: str) -> None:
+        self.__forward("log_text", run_id, text, artifact_file)
+
+    def log_bytes(self, run_id: str, data: Any, artifact_file: str) -> None:
+        self.__forward("log_bytes", run_id, data, artifact_file)
+
+    def log_spooled(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        # every destination takes a spooled file of its own over, linked to the same content
+        name: str = os.path.basename(local_path)
+        try:
+            self.__broadcast("log_spooled", [
+                None if target_run_id is None else (
+                    lambda t, r=target_run_id: t.log_spooled(r, spool_file(local_path, name), artifact_path))
+                for target_run_id in self.__ids_of(run_id)
+            ])
+        finally:
+            discard_spooled(local_path)
+
+    def log_artifact(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> None:
+        self.__forward("log_artifact", run_id, local_path, artifact_path)
+
+    def load_artifact(self, run_id: str, artifact_file: str) -> Optional[str]:
+        # the first destination holding the artifact serves it
+        for i, target_run_id in enumerate(self.__ids_of(run_id)):
+            if target_run_id is not None:
+                try:
+                    local_path: Optional[str] = self.__targets[i].load_artifact(target_run_id, artifact_file)
+                except Exception as e:
+                    print(f"Operation load_artifact failed on destination {i}: {e}")
+                    continue
+                if local_path is not None:
+                    return local_path
+        return None
+
+    def search_runs(self, experiment_name: str, tags: Dict[str, str], status: Optional[str] = None) -> List[str]:
+        return self.__targets[0].search_runs(experiment_name, tags, status)
+
+    def warmup(self, experiment_name: str) -> None:
+        self.__broadcast("warmup", [lambda t: t.warmup(experiment_name)] * len(self.__targets))
+
+    def flush(self) -> None:
+        self.__broadcast("flush", [lambda t: t.flush()] * len(self.__targets))
+
+    def close(self) -> None:
+        """Flushes every destination and stops the worker threads.
+        """
+        self.flush()
+        self.__executor.shutdown()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import Callable, List, NamedTuple, Set, Tuple
+import hashlib
+import inspect
+import threading
+
+
+"""Scopes of source snapshots."""
+SCOPE_FUNCTION = "function"
+SCOPE_MODULE = "module"
+
+
+class SourceSnapshot(NamedTuple):
+    """ The source code of a decorated function (or of its module), together
+    with its sha256 digest.
+    """
+    scope: str
+    text: str
+    digest: str
+
+    @property
+    def tag(self) -> str:
+        return f"veil.source.{self.scope}.hash"
+
+    @property
+    def artifact_file(self) -> str:
+        return f"source/{self.scope}/{self.digest}.py"
+
+
+def take_snapshots(func: Callable, include_module: bool = False) -> List[SourceSnapshot]:
+    """Takes the source snapshots of a function, and optionally of its module.
+
+    Parameters
+    ----------
+    func : Callable
+        the function
+    include_module : bool, optional
+        whether the module source gets snapshotted too, by default False
+
+    Returns
+    -------
+    List[SourceSnapshot]
+        the snapshots, missing those whose source is not available (e.g. for
+        functions defined in interactive sessions).
+    """
+    func = inspect.unwrap(func)
+    targets: List[Tuple[str, object]] = [(SCOPE_FUNCTION, func)]
+    if include_module:
+        targets.append((SCOPE_MODULE, inspect.getmodule(func)))
+
+    snapshots: List[SourceSnapshot] = []
+    for scope, target in targets:
+        try:
+            text: str = inspect.getsource(target)
+        except (OSError, TypeError) as e:
+            print(f"Source of {getattr(func, '__qualname__', func)} ({scope}) is not available: {e}")
+            continue
+        snapshots.append(SourceSnapshot(scope, text, hashlib.sha256(text.encode("utf-8")).hexdigest()))
+    return snapshots
+
+
+class UploadRegistry:
+    """ Keeps track of the source snapshots already uploaded by this process,
+    per experiment, so that each of them gets uploaded once.
+    """
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__claimed: Set[Tuple[str, str]] = set()
+
+    def claim(self, experiment_name: str, digest: str) -> bool:
+        """Claims the upload of a snapshot.
+
+        Returns
+        -------
+        bool
+            True if the snapshot had not been claimed before.
+        """
+        key: Tuple[str, str] = (experiment_name, digest)
+        with self.__lock:
+            if key in self.__claimed:
+                return False
+            self.__claimed.add(key)
+            return True
+
+    def release(self, experiment_name: str, digest: str) -> None:
+        """Releases the claim of a snapshot which could not be uploaded.
+        """
+        with self.__lock:
+            self.__claimed.discard((experiment_name, digest))
+
+
+"""The process-wide registry of uploaded source snapshots."""
+uploads: UploadRegistry = UploadRegistry()
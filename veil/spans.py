@@ -0,0 +1,170 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import threading
+import time
+
+from veil.histograms import metric_name
+
+
+"""Path of the span tree artifact of child runs, relative to their artifacts root."""
+SPAN_ARTIFACT_FILE = "veil/spans.json"
+
+"""Prefix of the span metrics logged on child runs."""
+SPAN_PREFIX = "veil.spans"
+
+"""Largest number of spans recorded per child run, later ones being counted as dropped."""
+MAX_SPANS = 10000
+
+# the span tree being recorded by each thread, if any
+_active: threading.local = threading.local()
+
+
+class Span:
+    """ A decorated call recorded in memory: its name and params, its start and
+    end (epoch seconds), its status and the spans of the calls nested into it.
+    """
+
+    __slots__ = ("name", "params", "start", "end", "status", "children")
+
+    def __init__(self, name: str, params: Dict[str, Any]):
+        self.name: str = name
+        self.params: Dict[str, Any] = params
+        self.start: float = time.time()
+        self.end: Optional[float] = None
+        self.status: Optional[str] = None
+        self.children: List[Span] = []
+
+    @property
+    def duration_s(self) -> float:
+        return max((self.end if self.end is not None else time.time()) - self.start, 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {"name": self.name, "start": self.start, "end": self.end, "status": self.status}
+        # empty members are left out, keeping deep trees compact
+        if self.params:
+            span["params"] = self.params
+        if self.children:
+            span["children"] = [child.as_dict() for child in self.children]
+        return span
+
+
+class SpanTree:
+    """ The spans of the decorated calls nested into the call of a child run,
+    the root span being the call itself.
+
+    Trees are recorded by the thread executing the call, hence they are not
+    thread-safe: calls performed by other threads are not nested into them.
+
+    Parameters
+    ----------
+    name : str
+        the name of the child run
+    params : Dict[str, Any]
+        the params of the child run
+    max_spans : int, optional
+        the largest number of spans recorded, by default MAX_SPANS
+    """
+
+    __slots__ = ("__root", "__stack", "__size", "__dropped", "__max_spans")
+
+    def __init__(self, name: str, params: Dict[str, Any], max_spans: int = MAX_SPANS):
+        self.__root: Span = Span(name, params)
+        self.__stack: List[Span] = [self.__root]
+        self.__size: int = 0
+        self.__dropped: int = 0
+        self.__max_spans: int = max_spans
+
+    @property
+    def root(self) -> Span:
+        return self.__root
+
+    @property
+    def size(self) -> int:
+        """The number of spans recorded, the root excluded.
+        """
+        return self.__size
+
+    @property
+    def dropped(self) -> int:
+        """The number of spans not recorded, once max_spans were.
+        """
+        return self.__dropped
+
+    def open(self, name: str, params: Dict[str, Any]) -> Optional[Span]:
+        """Starts the span of a call nested into the innermost open one.
+
+        Returns
+        -------
+        Optional[Span]
+            the span, None if dropped.
+        """
+        if self.__size >= self.__max_spans:
+            self.__dropped += 1
+            return None
+        span: Span = Span(name, params)
+        self.__stack[-1].children.append(span)
+        self.__stack.append(span)
+        self.__size += 1
+        return span
+
+    def close(self, span: Optional[Span], status: str) -> None:
+        """Ends a span, which must be the innermost open one (or the root).
+        """
+        if span is None:
+            return
+        span.end = time.time()
+        span.status = status
+        if len(self.__stack) > 1 and self.__stack[-1] is span:
+            self.__stack.pop()
+
+    def to_json(self) -> str:
+        return json.dumps(self.__root.as_dict(), separators=(",", ":"), default=str)
+
+    def metrics(self, failed_status: str) -> Dict[str, float]:
+        """Summarizes the spans as metrics: their count, depth, failures and
+        drops, keyed as SPAN_PREFIX.<statistic>, then the calls, total and
+        maximum duration of each name, keyed as SPAN_PREFIX.<name>.<statistic>.
+
+        Parameters
+        ----------
+        failed_status : str
+            the status of failed spans
+        """
+        metrics: Dict[str, float] = {
+            f"{SPAN_PREFIX}.count": self.__size,
+            f"{SPAN_PREFIX}.dropped": self.__dropped,
+            f"{SPAN_PREFIX}.depth": 0,
+            f"{SPAN_PREFIX}.errors": 0,
+        }
+        pending: List[Tuple[Span, int]] = [(child, 1) for child in self.__root.children]
+        while pending:
+            span, depth = pending.pop()
+            pending.extend((child, depth + 1) for child in span.children)
+            metrics[f"{SPAN_PREFIX}.depth"] = max(metrics[f"{SPAN_PREFIX}.depth"], depth)
+            metrics[f"{SPAN_PREFIX}.errors"] += span.status == failed_status
+
+            prefix: str = f"{SPAN_PREFIX}.{metric_name(span.name)}"
+            metrics[f"{prefix}.calls"] = metrics.get(f"{prefix}.calls", 0) + 1
+            metrics[f"{prefix}.total_s"] = metrics.get(f"{prefix}.total_s", 0.0) + span.duration_s
+            metrics[f"{prefix}.max_s"] = max(metrics.get(f"{prefix}.max_s", 0.0), span.duration_s)
+        return metrics
+
+
+def current_tree() -> Optional[SpanTree]:
+    """Returns the span tree being recorded by the calling thread, if any.
+    """
+    return getattr(_active, "tree", None)
+
+
+@contextmanager
+def recording(tree: SpanTree) -> Iterator[SpanTree]:
+    """Makes a span tree the one recorded by the calling thread while within the context.
+    """
+    past_tree: Optional[SpanTree] = current_tree()
+    _active.tree = tree
+    try:
+        yield tree
+    finally:
+        _active.tree = past_tree
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Literal, Mapping, NamedTuple, Optional, Sequence, Union
+import functools
+import itertools
+import json
+import os
+import random
+import time
+
+from mlflow.entities import RunStatus
+
+from veil.decorators import Autologger, Run
+
+
+class SweepPoint(NamedTuple):
+    """ The outcome of a point of a sweep.
+    """
+    params: Dict[str, Any]
+    result: Any
+    error: Optional[BaseException]
+    elapsed_s: float
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+def expand_grid(
+    grid: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
+    n_samples: Optional[int] = None,
+    seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Expands a parameter space into its points.
+
+    Parameters
+    ----------
+    grid : Union[Mapping[str, Any], Sequence[Mapping[str, Any]]]
+        either the explicit points or the space, mapping each param to the
+        sequence of its values or to a callable drawing a value from a random.Random
+    n_samples : Optional[int], optional
+        the number of points randomly drawn, by default None (every point of the
+        grid, which requires no callable in the space)
+    seed : Optional[int], optional
+        the seed of random draws, by default None
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        the points, as params keyed by name.
+    """
+    rng: random.Random = random.Random(seed)
+    if isinstance(grid, Mapping):
+        if n_samples is None:
+            if any(callable(values) for values in grid.values()):
+                raise ValueError("Sampled params require n_samples")
+            keys: List[str] = list(grid)
+            return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+        return [
+            {k: values(rng) if callable(values) else rng.choice(list(values)) for k, values in grid.items()}
+            for _ in range(n_samples)
+        ]
+
+    points: List[Dict[str, Any]] = [dict(point) for point in grid]
+    if n_samples is not None:
+        points = rng.sample(points, min(n_samples, len(points)))
+    return points
+
+
+def sweep(
+    autologger: Autologger,
+    func: Callable,
+    grid: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
+    executor: Union[Literal["thread", "process"], Executor] = "thread",
+    max_workers: Optional[int] = None,
+    n_samples: Optional[int] = None,
+    seed: Optional[int] = None,
+    name: Optional[str] = None
+) -> List[SweepPoint]:
+    """Executes a function over the points of a parameter space, each point being
+    tracked as a child run of the current session (a novel one, if none is active).
+
+    Points are tracked by at most max_workers threads, dispatching to the detached
+    sink of the autologger since the mlflow fluent apis are not thread-safe. With
+    the "thread" executor points are computed by those very threads, otherwise they
+    are submitted to the executor (e.g. processes, which require func to be
+    picklable). A failed point does not affect the others: its error is returned
+    in its outcome. Once every point completes, the counts of points are tagged
+    on the parent run and their outcomes are stored in sweep/<name>.json.
+
+    Parameters
+    ----------
+    autologger : Autologger
+        the autologger
+    func : Callable
+        the function, called with the point params as keyword arguments; if
+        decorated with run, its options are preserved
+    grid : Union[Mapping[str, Any], Sequence[Mapping[str, Any]]]
+        either the explicit points or the space, see expand_grid
+    executor : Union[Literal["thread", "process"], Executor], optional
+        where points are computed, by default "thread"
+    max_workers : Optional[int], optional
+        the maximum number of points in progress, by default min(32, cpu count + 4)
+    n_samples : Optional[int], optional
+        the number of points randomly drawn from the space, by default None
+    seed : Optional[int], optional
+        the seed of random draws, by default None
+    name : Optional[str], optional
+        the sweep name, by default the function name
+
+    Returns
+    -------
+    List[SweepPoint]
+        the outcome of every point, in order.
+    """
+    points: List[Dict[str, Any]] = expand_grid(grid, n_samples, seed)
+    sweep_name: str = name or getattr(func, "__name__", "sweep")
+
+    if autologger.is_autolog_enabled and autologger._current_session is None:
+        with autologger.start_session(name=sweep_name):
+            return sweep(autologger, func, points, executor, max_workers, name=sweep_name)
+
+    workers: int = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    owned_executor: Optional[Executor] = None
+    if executor == "process":
+        executor = owned_executor = ProcessPoolExecutor(max_workers=workers)
+
+    # worker threads dispatch to the detached sink, within the current session
+    fork: Autologger = autologger._fork(autologger.sink.detach(autologger))
+    run: Optional[Run] = getattr(func, "__veil_run__", None)
+    raw_func: Callable = func.__wrapped__ if run is not None else func
+    run = run._rebind(fork) if run is not None else Run(autologger=fork)
+
+    target: Callable = raw_func
+    if isinstance(executor, Executor):
+        # processes unpickle functions by reference, hence they get the decorated one
+        # and unwrap it there
+        @functools.wraps(raw_func)
+        def target(**params):
+            return executor.submit(_call_untracked, func, params).result()
+
+    decorated: Callable = run(target)
+
+    def evaluate(params: Dict[str, Any]) -> SweepPoint:
+        started_at: float = time.perf_counter()
+        try:
+            return SweepPoint(params, decorated(**params), None, time.perf_counter() - started_at)
+        except Exception as e:
+            return SweepPoint(params, None, e, time.perf_counter() - started_at)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="veil-sweep") as pool:
+            outcomes: List[SweepPoint] = list(pool.map(evaluate, points))
+    finally:
+        if owned_executor is not None:
+            owned_executor.shutdown()
+
+    _write_summary(autologger, sweep_name, outcomes)
+    return outcomes
+
+
+def _call_untracked(func: Callable, params: Dict[str, Any]) -> Any:
+    # the point is already tracked by the sweep, even if the executor forwards the
+    # session (e.g. forked processes or processes carrying a session token)
+    if getattr(func, "__veil_run__", None) is not None:
+        func = func.__wrapped__
+    return func(**params)
+
+
+def _write_summary(autologger: Autologger, sweep_name: str, outcomes: List[SweepPoint]) -> None:
+    session = autologger._current_session
+    if not autologger.is_autolog_enabled or session is None or session.run_id is None:
+        return
+
+    failed: int = sum(outcome.failed for outcome in outcomes)
+    summary: List[Dict[str, Any]] = [
+        {
+            "params": outcome.params,
+            "status": RunStatus.to_string(RunStatus.FAILED if outcome.failed else RunStatus.FINISHED),
+            "elapsed_s": outcome.elapsed_s,
+            "error": repr(outcome.error) if outcome.failed else None,
+        }
+        for outcome in outcomes
+    ]
+
+    sink = autologger.sink.detach(autologger)
+    sink.set_tags(session.run_id, {
+        f"veil.sweep.{sweep_name}.points": len(outcomes),
+        f"veil.sweep.{sweep_name}.finished": len(outcomes) - failed,
+        f"veil.sweep.{sweep_name}.failed": failed,
+    })
+    sink.log_text(session.run_id, json.dumps(summary, default=repr, indent=2), f"sweep/{sweep_name}.json")
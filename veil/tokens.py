@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import Mapping, NamedTuple, Optional
+import base64
+import binascii
+import json
+import os
+
+
+"""Environment variable carrying the token of the session a process joins."""
+SESSION_ENV_VAR = "VEIL_SESSION"
+
+_VERSION = "v1"
+
+
+class SessionToken(NamedTuple):
+    """ Everything a process needs to log child runs within a session started
+    elsewhere, e.g. by the scheduler of a multi-node job.
+    """
+    tracking_uri: str
+    experiment_name: str
+    run_id: str
+
+    def encode(self) -> str:
+        """Encodes the token as a compact, environment-safe string.
+        """
+        payload: bytes = json.dumps(list(self), separators=(",", ":")).encode("utf-8")
+        return f"{_VERSION}.{base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')}"
+
+    @classmethod
+    def decode(cls, token: str) -> SessionToken:
+        """Decodes a token.
+
+        Raises
+        ------
+        ValueError
+            if the token is malformed.
+        """
+        version, _, payload = token.strip().partition(".")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported session token version: {version}")
+        try:
+            values = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Malformed session token: {e}") from e
+        if not isinstance(values, list) or len(values) != 3 or not all(isinstance(v, str) for v in values):
+            raise ValueError("Malformed session token")
+        return cls(*values)
+
+
+def token_from_environ(environ: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """Returns the session token carried by the environment, if any.
+
+    Parameters
+    ----------
+    environ : Optional[Mapping[str, str]], optional
+        the environment, by default os.environ
+    """
+    environ = os.environ if environ is None else environ
+    return environ.get(SESSION_ENV_VAR) or None
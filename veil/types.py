@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 
 """Type alias for generic lists of strings."""
@@ -6,3 +6,6 @@ StringList = List[str]
 
 """Type alias for generic dictionaries with string keys and values."""
 StringDict = Dict[str, str]
+
+"""Type alias for metric events: the values keyed by name, the step and the timestamp (epoch seconds)."""
+MetricEvent = Tuple[Dict[str, float], Optional[int], float]
@@ -0,0 +1,287 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Set
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import time
+
+from veil.artifacts import mapped, write_buffer
+from veil.histograms import metric_name
+
+
+"""Prefix of the metrics describing the artifact uploads of a run."""
+UPLOAD_PREFIX = "veil.upload"
+
+"""Default size of the chunks uploaded concurrently, in bytes."""
+CHUNK_BYTES = 64 * 1024 * 1024
+
+"""Default number of chunks uploaded concurrently."""
+MAX_WORKERS = 8
+
+"""Default time after which the chunks staged by uploads left unfinished are pruned, in seconds."""
+STAGING_TTL_S = 7 * 24 * 3600.0
+
+
+class ArtifactStore(ABC):
+    """ A store accepting artifacts in chunks, uploaded concurrently and in any
+    order, then assembled into the artifact once all of them are uploaded.
+
+    Uploads are identified by the artifact file they store together with a
+    fingerprint of the uploaded content, rather than by the run they belong to:
+    the chunks already uploaded by a previous attempt with the same fingerprint
+    are kept, so that the upload can be resumed, even by a retry logging to
+    another run.
+    """
+
+    @abstractmethod
+    def begin(self, run_id: str, artifact_file: str, fingerprint: str) -> Set[int]:
+        """Starts or resumes the upload of an artifact.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        artifact_file : str
+            the artifact path, relative to the run artifacts root
+        fingerprint : str
+            the fingerprint of the content, chunks of other contents being discarded
+
+        Returns
+        -------
+        Set[int]
+            the indexes of the chunks already uploaded.
+        """
+
+    @abstractmethod
+    def put_chunk(self, run_id: str, artifact_file: str, index: int, data: memoryview) -> None:
+        """Uploads a chunk of an artifact, possibly concurrently with others.
+        """
+
+    @abstractmethod
+    def complete(self, run_id: str, artifact_file: str, chunks: int) -> str:
+        """Assembles the uploaded chunks into the artifact.
+
+        Returns
+        -------
+        str
+            the location of the artifact.
+        """
+
+
+class LocalArtifactStore(ArtifactStore):
+    """ Stores artifacts into a local directory, as <root>/<run id>/<artifact file>,
+    i.e. the layout of the artifacts of the local sinks.
+
+    Chunks are written to a staging directory next to the artifacts, i.e.
+    <root>/.uploads/<digest of the artifact file>, each one atomically, so that
+    only complete chunks are found when resuming. The staging directories of
+    uploads left unfinished for longer than staging_ttl_s are pruned whenever
+    an upload begins.
+
+    Parameters
+    ----------
+    root : str
+        the root directory of the artifacts
+    staging_ttl_s : float, optional
+        the time after which unfinished uploads are pruned, by default one week
+    """
+
+    def __init__(self, root: str, staging_ttl_s: float = STAGING_TTL_S):
+        self.__root: str = root
+        self.__staging_ttl_s: float = staging_ttl_s
+
+    @property
+    def root(self) -> str:
+        return self.__root
+
+    def path(self, run_id: str, artifact_file: str) -> str:
+        """Returns the local path of an artifact.
+        """
+        return os.path.join(self.__root, run_id, *artifact_file.split("/"))
+
+    def __staging(self, artifact_file: str) -> str:
+        digest: str = hashlib.sha256(artifact_file.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.__root, ".uploads", digest)
+
+    def __prune(self) -> None:
+        # chunks being staged touch their directory, hence only abandoned ones get old
+        uploads: str = os.path.join(self.__root, ".uploads")
+        expired_at: float = time.time() - self.__staging_ttl_s
+        try:
+            entries: List[os.DirEntry] = list(os.scandir(uploads))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime < expired_at:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def begin(self, run_id: str, artifact_file: str, fingerprint: str) -> Set[int]:
+        self.__prune()
+        staging: str = self.__staging(artifact_file)
+        manifest: str = os.path.join(staging, "manifest.json")
+        try:
+            with open(manifest) as f:
+                if json.load(f)["fingerprint"] == fingerprint:
+                    return {int(name) for name in os.listdir(staging) if name.isdigit()}
+        except (OSError, ValueError, KeyError):
+            pass
+
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        with open(manifest, "w") as f:
+            json.dump({"fingerprint": fingerprint}, f)
+        return set()
+
+    def put_chunk(self, run_id: str, artifact_file: str, index: int, data: memoryview) -> None:
+        path: str = os.path.join(self.__staging(artifact_file), f"{index:08d}")
+        write_buffer(data, f"{path}.partial")
+        os.replace(f"{path}.partial", path)
+
+    def complete(self, run_id: str, artifact_file: str, chunks: int) -> str:
+        staging: str = self.__staging(artifact_file)
+        path: str = self.path(run_id, artifact_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.partial", "wb") as out:
+            for index in range(chunks):
+                with open(os.path.join(staging, f"{index:08d}"), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(f"{path}.partial", path)
+        shutil.rmtree(staging, ignore_errors=True)
+        return path
+
+
+class UploadReport(NamedTuple):
+    """ The outcome of the upload of an artifact: its size and chunks, those
+    resumed from a previous attempt, and the throughput of the uploaded bytes.
+    """
+    artifact_file: str
+    location: str
+    size_bytes: int
+    chunks: int
+    resumed_chunks: int
+    uploaded_bytes: int
+    elapsed_s: float
+
+    @property
+    def throughput_bytes_s(self) -> float:
+        return self.uploaded_bytes / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def fingerprint(local_path: str, chunk_bytes: int) -> str:
+    """Returns the fingerprint of the upload of a local file, i.e. its size and
+    modification time, so that modified files do not resume stale chunks.
+    """
+    stat: os.stat_result = os.stat(local_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}:{chunk_bytes}"
+
+
+def upload_metrics(report: UploadReport) -> Dict[str, float]:
+    """Summarizes an upload as metrics, keyed as UPLOAD_PREFIX.<artifact file>.<statistic>.
+    """
+    prefix: str = f"{UPLOAD_PREFIX}.{metric_name(report.artifact_file)}"
+    return {
+        f"{prefix}.size_bytes": report.size_bytes,
+        f"{prefix}.chunks": report.chunks,
+        f"{prefix}.resumed_chunks": report.resumed_chunks,
+        f"{prefix}.elapsed_s": report.elapsed_s,
+        f"{prefix}.throughput_bytes_s": report.throughput_bytes_s,
+    }
+
+
+class ChunkedUploader:
+    """ Uploads local files to an artifact store in chunks, chunk_bytes each,
+    by means of a bounded pool of threads.
+
+    Files are mapped into memory and chunks are views of the mapping, hence they
+    are never read into the interpreter. Chunks uploaded by a failed attempt are
+    not uploaded again by the next one, whatever run it logs to.
+
+    Parameters
+    ----------
+    store : ArtifactStore
+        the store receiving the chunks
+    chunk_bytes : int, optional
+        the size of the chunks, by default CHUNK_BYTES
+    max_workers : int, optional
+        the number of chunks uploaded concurrently, by default MAX_WORKERS
+    """
+
+    def __init__(self, store: ArtifactStore, chunk_bytes: int = CHUNK_BYTES, max_workers: int = MAX_WORKERS):
+        if chunk_bytes <= 0 or max_workers <= 0:
+            raise ValueError(f"Chunk size and workers must be positive: {chunk_bytes}, {max_workers}")
+        self.__store: ArtifactStore = store
+        self.__chunk_bytes: int = chunk_bytes
+        self.__max_workers: int = max_workers
+
+    @property
+    def store(self) -> ArtifactStore:
+        return self.__store
+
+    def upload(self, run_id: str, local_path: str, artifact_path: Optional[str] = None) -> UploadReport:
+        """Uploads a local file as an artifact of a run.
+
+        Parameters
+        ----------
+        run_id : str
+            the run id
+        local_path : str
+            the path of the local file
+        artifact_path : Optional[str], optional
+            the directory the file is stored into, relative to the run artifacts
+            root, by default the root itself
+
+        Returns
+        -------
+        UploadReport
+            the outcome of the upload.
+
+        Raises
+        ------
+        Exception
+            the first error raised by a chunk upload, once the others are over.
+        """
+        artifact_file: str = os.path.basename(local_path)
+        if artifact_path:
+            artifact_file = posixpath.join(artifact_path.strip("/"), artifact_file)
+
+        started_at: float = time.perf_counter()
+        uploaded: Set[int] = self.__store.begin(
+            run_id, artifact_file, fingerprint(local_path, self.__chunk_bytes))
+        with mapped(local_path) as view:
+            size: int = len(view)
+            chunks: int = max((size + self.__chunk_bytes - 1) // self.__chunk_bytes, 1)
+            pending: List[int] = [index for index in range(chunks) if index not in uploaded]
+
+            def put(index: int) -> None:
+                with view[index * self.__chunk_bytes:(index + 1) * self.__chunk_bytes] as chunk:
+                    self.__store.put_chunk(run_id, artifact_file, index, chunk)
+
+            with ThreadPoolExecutor(
+                max_workers=min(self.__max_workers, max(len(pending), 1)), thread_name_prefix="veil-upload"
+            ) as executor:
+                futures: List[Future] = [executor.submit(put, index) for index in pending]
+                # the chunks not started yet are not uploaded once one fails
+                for future in wait(futures, return_when=FIRST_EXCEPTION).not_done:
+                    future.cancel()
+            for future in futures:
+                if not future.cancelled() and future.exception() is not None:
+                    raise future.exception()
+
+        location: str = self.__store.complete(run_id, artifact_file, chunks)
+        resumed: int = chunks - len(pending)
+        return UploadReport(
+            artifact_file=artifact_file,
+            location=location,
+            size_bytes=size,
+            chunks=chunks,
+            resumed_chunks=resumed,
+            uploaded_bytes=sum(min(self.__chunk_bytes, size - index * self.__chunk_bytes) for index in pending),
+            elapsed_s=time.perf_counter() - started_at,
+        )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Literal, Optional, Union, get_args, get_origin
+import collections.abc
+import threading
+from typeguard import check_type
+
+
+# whether values are type-checked when assigned to veil objects
+_strict_mode: bool = True
+
+# the number of trusted contexts entered by each thread
+_trusted: threading.local = threading.local()
+
+# the fast checks of the expected types, compiled once per type (None if typeguard is needed)
+_checks: Dict[Any, Optional[Callable[[Any], bool]]] = dict()
+
+
+def _compile(expected_type: Any) -> Optional[Callable[[Any], bool]]:
+    # a fast check accepting the common values of a type, everything else being left to
+    # typeguard, so that it still decides on what it accepts and raises the errors
+    origin: Any = get_origin(expected_type)
+    args: tuple = get_args(expected_type)
+    if expected_type is Any:
+        return lambda value: True
+    if origin is None and isinstance(expected_type, type) and not getattr(expected_type, "_is_protocol", False):
+        return lambda value: isinstance(value, expected_type)
+    if origin is Literal:
+        return lambda value: any(type(value) is type(arg) and value == arg for arg in args)
+    if origin is collections.abc.Callable and not args:
+        return callable
+    if origin is Union:
+        checks = [_compile(arg) for arg in args]
+        if None in checks:
+            return None
+        return lambda value: any(check(value) for check in checks)
+    if origin is list and len(args) == 1:
+        item = _compile(args[0])
+        if item is None:
+            return None
+        return lambda value: isinstance(value, list) and all(item(i) for i in value)
+    if origin is dict and len(args) == 2:
+        key, item = _compile(args[0]), _compile(args[1])
+        if key is None or item is None:
+            return None
+        return lambda value: isinstance(value, dict) and all(key(k) and item(v) for k, v in value.items())
+    return None
+
+
+def set_strict_mode(enabled: bool) -> None:
+    """Enables or disables the type-checking of values assigned to veil objects.
+
+    Parameters
+    ----------
+    enabled : bool
+        whether values are type-checked, True by default
+    """
+    global _strict_mode
+    _strict_mode = check_type(enabled, bool)
+
+
+def is_strict_mode() -> bool:
+    return _strict_mode
+
+
+@contextmanager
+def trusted() -> Iterator[None]:
+    """Skips the type-checking of the values assigned by the calling thread while
+    within the context, e.g. by internal copies of objects already checked.
+    """
+    _trusted.depth = getattr(_trusted, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _trusted.depth -= 1
+
+
+def validate(value: Any, expected_type: Any) -> Any:
+    """Type-checks a value in strict mode, otherwise (or within trusted contexts)
+    returns it as is. Each expected type is compiled once into a fast check of
+    its common values, typeguard being called for the others only.
+
+    Parameters
+    ----------
+    value : Any
+        the value to be checked
+    expected_type : Any
+        the expected type
+
+    Returns
+    -------
+    Any
+        the value.
+
+    Raises
+    ------
+    TypeCheckError
+        if the value is not of the expected type, in strict mode.
+    """
+    if not _strict_mode or getattr(_trusted, "depth", 0):
+        return value
+    try:
+        check: Optional[Callable[[Any], bool]] = _checks[expected_type]
+    except KeyError:
+        check = _checks[expected_type] = _compile(expected_type)
+    except TypeError:
+        # unhashable types are not cached
+        check = None
+    if check is not None and check(value):
+        return value
+    return check_type(value, expected_type)
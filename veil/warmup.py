@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+import threading
+import time
+
+
+class WarmupStep(NamedTuple):
+    """ A step performed by a warm-up, with the time it took and the error it
+    raised, if any.
+    """
+    name: str
+    elapsed_s: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class WarmupReport:
+    """ Reports the steps performed by a warm-up, as they complete.
+
+    Warm-ups performed in the background fill the report from their own thread,
+    hence the report can be waited for.
+    """
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__steps: List[WarmupStep] = []
+        self.__done: threading.Event = threading.Event()
+
+    @property
+    def steps(self) -> Tuple[WarmupStep, ...]:
+        """The steps completed so far, in order.
+        """
+        with self.__lock:
+            return tuple(self.__steps)
+
+    @property
+    def elapsed_s(self) -> float:
+        return sum(step.elapsed_s for step in self.steps)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every step completed so far succeeded.
+        """
+        return all(step.ok for step in self.steps)
+
+    @property
+    def done(self) -> bool:
+        return self.__done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the warm-up is over, or until the timeout expires.
+
+        Returns
+        -------
+        bool
+            whether the warm-up is over.
+        """
+        return self.__done.wait(timeout)
+
+    def _record(self, step: WarmupStep) -> None:
+        with self.__lock:
+            self.__steps.append(step)
+
+    def _finish(self) -> None:
+        self.__done.set()
+
+    def __repr__(self) -> str:
+        steps: str = ", ".join(
+            f"{step.name}={step.elapsed_s * 1000:.1f}ms" + ("" if step.ok else f" ({step.error})")
+            for step in self.steps
+        )
+        return f"WarmupReport({steps}{'' if self.done else ', ...'})"
+
+
+def perform(steps: Sequence[Tuple[str, Callable[[], None]]], background: bool = False) -> WarmupReport:
+    """Performs the steps of a warm-up, one after the other, timing each one.
+
+    Steps are best-effort: a failing step is reported and the next ones are
+    performed anyway, since the work it did not do will be done later on demand.
+
+    Parameters
+    ----------
+    steps : Sequence[Tuple[str, Callable[[], None]]]
+        the names of the steps, together with the functions performing them
+    background : bool, optional
+        whether to perform the steps from a daemon thread, returning immediately,
+        by default False
+
+    Returns
+    -------
+    WarmupReport
+        the report of the warm-up, filled as steps complete.
+    """
+    report: WarmupReport = WarmupReport()
+
+    def warmup() -> None:
+        try:
+            for name, step in steps:
+                started_at: float = time.perf_counter()
+                error: Optional[str] = None
+                try:
+                    step()
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    print(f"Warm-up step {name} cannot be performed: {e}")
+                report._record(WarmupStep(name, time.perf_counter() - started_at, error))
+        finally:
+            report._finish()
+
+    if background:
+        threading.Thread(target=warmup, name="veil-warmup", daemon=True).start()
+    else:
+        warmup()
+    return report